@@ -1,5 +1,21 @@
-from .dm_agent import get_dm_graph
-from .character_agent import get_character_graph
-from .summarizer import summarize_messages
+# LangGraph and the agent modules cost ~0.2s to import and are only needed once a
+# campaign actually talks to the LLM, so these thin wrappers defer loading them to the
+# first call. LLM provider SDKs are deferred further still: get_llm_instance imports
+# only the provider the campaign is configured for.
+
+def get_dm_graph(*args, **kwargs):
+    from .dm_agent import get_dm_graph as _get_dm_graph
+    return _get_dm_graph(*args, **kwargs)
+
+
+def get_character_graph(*args, **kwargs):
+    from .character_agent import get_character_graph as _get_character_graph
+    return _get_character_graph(*args, **kwargs)
+
+
+async def summarize_messages(*args, **kwargs):
+    from .summarizer import summarize_messages as _summarize_messages
+    return await _summarize_messages(*args, **kwargs)
+
 
 __all__ = ["get_dm_graph", "get_character_graph", "summarize_messages"]
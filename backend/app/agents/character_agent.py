@@ -4,27 +4,40 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 
+from app.agents.graph_registry import GraphRegistry, graph_cache_key
 from app.agents.models import AgentState, should_continue, get_llm_instance
 
 logger = logging.getLogger(__name__)
 
-def get_character_graph(api_key: str, model_name: str, character_details: dict, campaign_id: str = None, db=None, llm_provider: str = "gemini"):
+# Compiled character graphs. The character itself is not part of the key: its details
+# arrive per call in the graph state (see AgentState.character).
+_character_graph_cache = GraphRegistry("character")
+
+
+def get_character_graph(api_key: str, model_name: str, llm_provider: str = "gemini"):
     """
-    Creates a LangGraph agent for a specific NPC/Character.
-    character_details should include:
+    Returns the (cached) LangGraph agent that roleplays a party member / NPC.
+    Invoke it with state["character"] holding:
     - name
     - race
     - role (class)
     - background
     - alignment
-    - context (optional campaign context)
+    and state["campaign_id"] for the interact tool.
     """
-    try:
-        from app.ai_tools import create_interact_tool
+    final_api_key = api_key
+    if not final_api_key:
+        return None
+
+    # Skip tool-binding for local providers (inconsistent tool-calling support).
+    is_local = (llm_provider or "").lower() in ("local", "ollama", "lmstudio")
+    cache_key = graph_cache_key(final_api_key, model_name, llm_provider, "character" if is_local else "character+interact")
+    cached = _character_graph_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-        final_api_key = api_key
-        if not final_api_key:
-            return None
+    try:
+        from app.ai_tools import interact_with_object
 
         llm = get_llm_instance(
             api_key=final_api_key,
@@ -33,11 +46,7 @@ def get_character_graph(api_key: str, model_name: str, character_details: dict,
             temperature=0.8
         )
 
-        char_tools = []
-        # Skip tool-binding for local providers (inconsistent tool-calling support).
-        is_local = (llm_provider or "").lower() in ("local", "ollama", "lmstudio")
-        if campaign_id and character_details.get('name') and not is_local:
-             char_tools.append(create_interact_tool(campaign_id, character_details['name'], db=db))
+        char_tools = [] if is_local else [interact_with_object]
 
         # Bind the specific character tools
         if char_tools:
@@ -52,6 +61,7 @@ def get_character_graph(api_key: str, model_name: str, character_details: dict,
     async def call_character_model(state: AgentState, config: RunnableConfig):
         messages = state["messages"]
         sender = state.get("sender_name", "Player")
+        character_details = state.get("character") or {}
 
         name = character_details.get("name", "Unknown")
         race = character_details.get("race", "Unknown")
@@ -93,4 +103,6 @@ def get_character_graph(api_key: str, model_name: str, character_details: dict,
          workflow.add_edge("agent", END)
 
     workflow.set_entry_point("agent")
-    return workflow.compile()
+    compiled = workflow.compile()
+    _character_graph_cache.put(cache_key, compiled)
+    return compiled
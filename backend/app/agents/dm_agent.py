@@ -1,34 +1,29 @@
-import hashlib
 import logging
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 
+from app.agents.graph_registry import GraphRegistry, graph_cache_key
 from app.agents.models import AgentState, should_continue, get_llm_instance
 from app.services.dm_rules import RULES_BLOCK
 from game_engine.tools import game_tools
 
 logger = logging.getLogger(__name__)
 
-# Cache for compiled graphs, keyed by a HASH of the API key (never the raw key) + model +
-# provider. Different campaigns/keys stay isolated without retaining plaintext secrets in a
-# process-lifetime module dict.
-_dm_graph_cache = {}
-
-
-def _graph_cache_key(api_key, model_name, llm_provider):
-    digest = hashlib.sha256(api_key.encode()).hexdigest() if api_key else "none"
-    return (digest, model_name, llm_provider)
+# Compiled DM graphs, keyed by a HASH of the API key (never the raw key) + model +
+# provider. Different campaigns/keys stay isolated without retaining plaintext secrets.
+_dm_graph_cache = GraphRegistry("dm")
 
 
 def get_dm_graph(api_key: str = None, model_name: str = "gemini-3-flash-preview", llm_provider: str = "gemini"):
     # Check cache first
     final_api_key = api_key
-    cache_key = _graph_cache_key(final_api_key, model_name, llm_provider)
+    cache_key = graph_cache_key(final_api_key, model_name, llm_provider, "dm")
 
-    if cache_key in _dm_graph_cache:
-        return _dm_graph_cache[cache_key], None
+    cached = _dm_graph_cache.get(cache_key)
+    if cached is not None:
+        return cached, None
 
     # Re-initialize LLM ensuring it attaches to current loop if needed
     try:
@@ -181,5 +176,5 @@ def get_dm_graph(api_key: str = None, model_name: str = "gemini-3-flash-preview"
     workflow.add_edge("tools", "agent")
 
     compiled = workflow.compile()
-    _dm_graph_cache[cache_key] = compiled
+    _dm_graph_cache.put(cache_key, compiled)
     return compiled, None
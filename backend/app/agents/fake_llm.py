@@ -0,0 +1,66 @@
+"""Deterministic stand-in chat model for load tests.
+
+The app never builds one: scripts/load_test.py patches `_build_llm` in its own process
+so its campaigns (llm_provider = "fake") get a `FakeChatModel`, and the load test
+exercises the real agent graphs, callbacks and persistence without a network or a bill. Each call waits `latency_ms` (asynchronously on the async path, so
+it behaves like a provider round trip rather than blocking the loop) and returns
+`tokens` words picked by a RNG seeded from the prompt: the same prompt always gets
+the same reply. Token usage is reported like a real provider's, so usage tracking
+runs too.
+
+Defaults come from FAKE_LLM_LATENCY_MS / FAKE_LLM_TOKENS (see scripts/load_test.py).
+"""
+import asyncio
+import hashlib
+import os
+import random
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+_WORDS = ("torchlight", "flickers", "across", "the", "cold", "stone", "as", "dust", "settles",
+          "and", "a", "distant", "echo", "answers", "your", "steps", "shadows", "stir", "near",
+          "painted", "serpents", "on", "crumbling", "walls")
+
+
+class FakeChatModel(BaseChatModel):
+    latency_ms: float = 0.0
+    tokens: int = 40
+
+    @classmethod
+    def from_env(cls) -> "FakeChatModel":
+        return cls(latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")),
+                   tokens=int(os.getenv("FAKE_LLM_TOKENS", "40")))
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _reply(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        rng = random.Random(hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest())
+        text = " ".join(rng.choice(_WORDS) for _ in range(self.tokens)).capitalize() + "."
+        input_tokens = len(prompt.split())
+        message = AIMessage(content=text, usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": self.tokens,
+            "total_tokens": input_tokens + self.tokens,
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._reply(messages)
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        # Replies are plain narration; the agents end their turn without tool calls.
+        return self
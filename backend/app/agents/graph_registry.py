@@ -0,0 +1,53 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Compiled graphs hold an LLM client each; keys differ only by campaign key / model /
+# provider, so a few dozen cover every active campaign.
+MAX_CACHED_GRAPHS = 32
+
+
+def graph_cache_key(api_key, model_name, llm_provider, template: str) -> tuple:
+    """Registry key: a HASH of the API key (never the raw key) + model + provider + the
+    graph template (which prompt/tool set it was compiled with)."""
+    digest = hashlib.sha256(api_key.encode()).hexdigest() if api_key else "none"
+    return (digest, model_name, llm_provider, template)
+
+
+class GraphRegistry:
+    """Bounded LRU of compiled LangGraph agents.
+
+    Building a graph constructs an LLM client, binds tools and compiles a StateGraph,
+    so agents are compiled once per key and reused; anything per-call (the character
+    speaking, the sender, the narration mode) travels in the graph state instead.
+    """
+
+    def __init__(self, name: str, maxsize: int = MAX_CACHED_GRAPHS):
+        self.name = name
+        self.maxsize = maxsize
+        self._graphs: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        graph = self._graphs.get(key)
+        if graph is not None:
+            self._graphs.move_to_end(key)
+        return graph
+
+    def put(self, key: Hashable, graph: Any) -> None:
+        self._graphs[key] = graph
+        self._graphs.move_to_end(key)
+        while len(self._graphs) > self.maxsize:
+            self._graphs.popitem(last=False)
+            logger.debug("%s graph registry full (%d); evicted least recently used", self.name, self.maxsize)
+
+    def clear(self) -> None:
+        self._graphs.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._graphs
+
+    def __len__(self) -> int:
+        return len(self._graphs)
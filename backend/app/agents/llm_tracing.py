@@ -0,0 +1,54 @@
+"""LLM side of request tracing (see app/utils/tracing.py).
+
+get_llm_instance attaches `TracingCallbackHandler` to every model it builds while
+tracing is on: each model call becomes an `llm.call` span under whatever span is
+current (normally `llm.agent` in AIService), carrying the model name and the
+token usage the provider reported.
+"""
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import ChatGeneration, LLMResult
+from opentelemetry import trace
+
+from app.utils import tracing
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    # Called on the model's own task rather than an executor thread, so the span
+    # picks up the caller's context as its parent.
+    run_inline = True
+
+    def __init__(self):
+        self._spans: Dict[UUID, trace.Span] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if not tracing.in_trace():
+            return
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name") or (serialized or {}).get("name")
+        self._spans[run_id] = tracing.tracer.start_span("llm.call", attributes={
+            k: v for k, v in {"model": model, "llm_type": params.get("_type")}.items() if v})
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        current = self._spans.pop(run_id, None)
+        if current is None:
+            return
+        for generations in response.generations:
+            for gen in generations:
+                usage = getattr(gen.message, "usage_metadata", None) if isinstance(gen, ChatGeneration) else None
+                if usage:
+                    current.set_attributes({
+                        "input_tokens": usage.get("input_tokens", 0),
+                        "output_tokens": usage.get("output_tokens", 0),
+                    })
+        current.end()
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        current = self._spans.pop(run_id, None)
+        if current is None:
+            return
+        current.record_exception(error)
+        current.set_status(trace.Status(trace.StatusCode.ERROR))
+        current.end()
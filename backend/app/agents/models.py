@@ -14,6 +14,7 @@ class AgentState(TypedDict):
     api_key: str
     model_name: str
     llm_provider: str
+    character: dict  # character agents: name / race / role / background / alignment
 
 def should_continue(state: AgentState):
     from langgraph.graph import END
@@ -24,6 +25,26 @@ def should_continue(state: AgentState):
     return END
 
 def get_llm_instance(api_key: str, model_name: str, llm_provider: str, temperature: float = 0.7):
+    from app.agents.replay_llm import RecordingCallbackHandler, replay_model
+    from app.utils import tracing
+    from app.utils.session_recorder import recorder
+
+    # Session replay (scripts/replay_session.py) serves recorded responses instead.
+    replay = replay_model()
+    if replay is not None:
+        return replay
+    llm = _build_llm(api_key, model_name, llm_provider, temperature)
+    callbacks = []
+    if recorder.active:
+        callbacks.append(RecordingCallbackHandler())
+    if tracing.enabled():
+        from app.agents.llm_tracing import TracingCallbackHandler
+        callbacks.append(TracingCallbackHandler())
+    if callbacks:
+        llm.callbacks = callbacks
+    return llm
+
+def _build_llm(api_key: str, model_name: str, llm_provider: str, temperature: float):
     provider = (llm_provider or "gemini").lower()
     if provider == "gemini":
         from langchain_google_genai import ChatGoogleGenerativeAI
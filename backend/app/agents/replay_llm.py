@@ -0,0 +1,69 @@
+"""LLM side of session record / replay (see app/utils/session_recorder.py).
+
+Recording: get_llm_instance attaches `RecordingCallbackHandler` to every model it
+builds while SESSION_RECORD_PATH is set, which writes each response to the
+recording. Replay: scripts/replay_session.py installs a `ReplayChatModel` via
+`set_replay_model`, and get_llm_instance hands it out instead of a provider client,
+so the recorded responses (tool calls included) come back in order with no network.
+"""
+from collections import deque
+from typing import Any, Iterable, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+from pydantic import Field
+
+from app.utils.session_recorder import recorder
+
+# Served once the recorded responses run out (the replay diverged or was cut short).
+STUB_REPLY = "The scene holds its breath."
+
+_replay_model: Optional["ReplayChatModel"] = None
+
+
+class RecordingCallbackHandler(BaseCallbackHandler):
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for gen in generations:
+                if isinstance(gen, ChatGeneration):
+                    recorder.record_llm(message_to_dict(gen.message))
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that returns recorded responses first-in, first-out."""
+    responses: Any = Field(default_factory=deque)
+    served: int = 0
+    stubbed: int = 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "ReplayChatModel":
+        return cls(responses=deque(messages_from_dict([r['message'] for r in records if r.get('type') == 'llm'])))
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        try:
+            message = self.responses.popleft()
+            self.served += 1
+        except IndexError:
+            message = AIMessage(content=STUB_REPLY)
+            self.stubbed += 1
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplayChatModel":
+        # Tool calls are part of the recorded messages; the schemas are not needed.
+        return self
+
+
+def set_replay_model(model: Optional[ReplayChatModel]) -> None:
+    global _replay_model
+    _replay_model = model
+
+
+def replay_model() -> Optional[ReplayChatModel]:
+    return _replay_model
@@ -1,6 +1,9 @@
 import logging
 import asyncio
+from typing import Annotated
+
 from langchain_core.tools import tool
+from langgraph.prebuilt import InjectedState
 
 from app.services.game_service import GameService
 from app.services.loot_service import LootService
@@ -12,153 +15,144 @@ from app.socket_manager import sio
 
 logger = logging.getLogger(__name__)
 
-def create_interact_tool(campaign_id: str, character_name: str, db=None):
-    """Factory to create a stateful interact tool for a specific AI character."""
-
-    @tool
-    async def interact_with_object(target_name: str) -> str:
-        """Use this to open doors, loot corpses, search chests, or interact with an object on the map.
-        It will automatically move your character up to 25 feet towards the object if necessary.
-        If it's too far (more than 25 feet), or if there are multiple objects matching the name, it will ask for clarification.
-        """
-        session = db
-        if not session:
-            # Fallback if testing outside of a provided db scope. We own this session,
-            # so we commit the staged interaction (open_vessel stages only now).
-            async with AsyncSessionLocal() as temp_session:
-                result = await _run_interact(target_name, temp_session)
-                await temp_session.commit()
-                return result
+@tool
+async def interact_with_object(target_name: str, state: Annotated[dict, InjectedState]) -> str:
+    """Use this to open doors, loot corpses, search chests, or interact with an object on the map.
+    It will automatically move your character up to 25 feet towards the object if necessary.
+    If it's too far (more than 25 feet), or if there are multiple objects matching the name, it will ask for clarification.
+    """
+    # The acting character and campaign come from the graph state, not a closure, so
+    # one compiled character graph serves every character (see character_agent.py).
+    campaign_id = state.get("campaign_id")
+    character_name = (state.get("character") or {}).get("name")
+    # This tool owns its session, so it commits the staged interaction (open_vessel
+    # stages only).
+    async with AsyncSessionLocal() as session:
+        result = await _run_interact(campaign_id, character_name, target_name, session)
+        await session.commit()
+        return result
+
+
+async def _run_interact(campaign_id: str, character_name: str, target_name: str, session) -> str:
+    try:
+        game_state = await GameService.get_game_state(campaign_id, session)
+        if not game_state:
+            return "Error: Game state not found."
+
+        # Find the actor
+        actor = None
+        for p in game_state.party + game_state.npcs:
+            if getattr(p, 'name', '') == character_name:
+                actor = p
+                break
+
+        if not actor:
+             return "Error: Could not locate your character on the map."
+
+        # Find matching interactables and vessels
+        matches = []
+        interactables = getattr(game_state.location, 'interactables', [])
+        for item in interactables:
+            # check if name or id matches
+            iname = item.get('name', '')
+            iid = item.get('id', '')
+            if target_name.lower() in iname.lower() or target_name.lower() in iid.lower():
+                matches.append(("interactable", item))
+
+        for v in getattr(game_state, 'vessels', []):
+            if target_name.lower() in v.name.lower():
+                matches.append(("vessel", v))
+
+        if len(matches) > 1:
+            names = [m[1].get('name') if m[0] == 'interactable' else m[1].name for m in matches]
+            # Filter out exact identical names to avoid "Found multiple: door, door"
+            unique_names = list(set(names))
+            if len(unique_names) > 1:
+                 return f"Found multiple objects matching '{target_name}': {', '.join(unique_names)}. Ask the player to clarify which one they mean."
+            # If they are all called "Wooden Door", we will just pick the closest one below.
+
+        elif len(matches) == 0:
+            return f"Could not find any object matching '{target_name}' nearby."
+
+        # Find the closest match out of all matches
+        best_match = None
+        best_dist = float('inf')
+        for m_type, m_obj in matches:
+             if m_type == 'interactable':
+                 tp = m_obj.get('position', {})
+                 t_pos = Coordinates(**tp) if tp else Coordinates(x=0, y=0)
+             else:
+                 t_pos = m_obj.position
+
+             dist = actor.position.distance_to(t_pos)
+             if dist < best_dist:
+                 best_dist = dist
+                 best_match = (m_type, m_obj, t_pos)
+
+        obj_type, target, t_pos = best_match
+
+        # Check distance
+        max_reach = 6 # 5 cells movement (25ft) + 1 cell interact reach
+
+        if best_dist > max_reach:
+             return f"The object is {best_dist * 5} feet away. You can only move up to 25 feet and interact at 5 feet (30 feet total reach). Inform the player it is too far to reach."
+
+        # If distance > 1, we need to move adjacent to the target.
+        if best_dist > 1:
+            # In interact, party members block movement too (can't path through them).
+            index = game_state.spatial_index()
+            obstacle_cells = index.obstacle_cells(exclude=actor) | index.party_cells(exclude=actor)
+
+            max_move = actor.speed // 5 if hasattr(actor, 'speed') and actor.speed else 6
+
+            best_cell, path = PathfindingService.find_best_cell_adjacent_to(
+                actor.position, t_pos, max_move, game_state.location.walkable_cells, obstacle_cells
+            )
+
+            if best_cell is None:
+                 return f"There is no walkable path to reach the {target_name}."
+
+            game_state.move_entity(actor, *best_cell)
+
+            # Emit animation
+            if sio:
+                anim_path = [{"x": c[0], "y": c[1]} for c in path]
+                await sio.emit('entity_path_animation', {'entity_id': actor.id, 'path': anim_path}, room=campaign_id)
+
+                # Apply local state change before acting
+                await StateService.emit_state_update(campaign_id, game_state, sio)
+                await asyncio.sleep(0.5) # Let animation play briefly
+
+        # Now act on it using LootService rules
+        act_target_name = None
+        target_id = None
+        if obj_type == 'interactable':
+             target_id = target.get('id')
+             act_target_name = target.get('name')
+        else:
+             act_target_name = target.name
+
+        result = await LootService.open_vessel(campaign_id, actor.name, act_target_name, session, target_id=target_id)
+
+        # Note: open_vessel performs distance validation and stages the DB writes; the
+        # session owner (interact_with_object above) commits them.
+        if result.get("success"):
+             if sio:
+                 if "game_state" in result:
+                     await StateService.emit_state_update(campaign_id, result["game_state"], sio)
+                 if "message" in result:
+                     await sio.emit('chat_message', {
+                         'sender_id': 'system',
+                         'sender_name': 'System',
+                         'content': result['message'],
+                         'timestamp': "Just now",
+                         'is_system': True,
+                         'message_type': 'narration'
+                     }, room=campaign_id)
+             return f"Successfully moved to and opened the {act_target_name}. Tell the player what you did."
         else:
-            # The provided session is owned by the caller (the agent's chat session),
-            # which commits the unit of work.
-            return await _run_interact(target_name, session)
-
-    async def _run_interact(target_name: str, session) -> str:
-        try:
-            game_state = await GameService.get_game_state(campaign_id, session)
-            if not game_state:
-                return "Error: Game state not found."
-
-            # Find the actor
-            actor = None
-            for p in game_state.party + game_state.npcs:
-                if getattr(p, 'name', '') == character_name:
-                    actor = p
-                    break
-
-            if not actor:
-                 return "Error: Could not locate your character on the map."
-
-            # Find matching interactables and vessels
-            matches = []
-            interactables = getattr(game_state.location, 'interactables', [])
-            for item in interactables:
-                # check if name or id matches
-                iname = item.get('name', '')
-                iid = item.get('id', '')
-                if target_name.lower() in iname.lower() or target_name.lower() in iid.lower():
-                    matches.append(("interactable", item))
-
-            for v in getattr(game_state, 'vessels', []):
-                if target_name.lower() in v.name.lower():
-                    matches.append(("vessel", v))
-
-            if len(matches) > 1:
-                names = [m[1].get('name') if m[0] == 'interactable' else m[1].name for m in matches]
-                # Filter out exact identical names to avoid "Found multiple: door, door"
-                unique_names = list(set(names))
-                if len(unique_names) > 1:
-                     return f"Found multiple objects matching '{target_name}': {', '.join(unique_names)}. Ask the player to clarify which one they mean."
-                # If they are all called "Wooden Door", we will just pick the closest one below.
-
-            elif len(matches) == 0:
-                return f"Could not find any object matching '{target_name}' nearby."
-
-            # Find the closest match out of all matches
-            best_match = None
-            best_dist = float('inf')
-            for m_type, m_obj in matches:
-                 if m_type == 'interactable':
-                     tp = m_obj.get('position', {})
-                     t_pos = Coordinates(**tp) if tp else Coordinates(x=0, y=0)
-                 else:
-                     t_pos = m_obj.position
-
-                 dist = actor.position.distance_to(t_pos)
-                 if dist < best_dist:
-                     best_dist = dist
-                     best_match = (m_type, m_obj, t_pos)
-
-            obj_type, target, t_pos = best_match
-
-            # Check distance
-            max_reach = 6 # 5 cells movement (25ft) + 1 cell interact reach
-
-            if best_dist > max_reach:
-                 return f"The object is {best_dist * 5} feet away. You can only move up to 25 feet and interact at 5 feet (30 feet total reach). Inform the player it is too far to reach."
-
-            # If distance > 1, we need to move adjacent to the target.
-            if best_dist > 1:
-                # In interact, party members block movement too (can't path through them).
-                obstacle_cells = set()
-                for entity in [e for e in game_state.enemies if e.hp_current > 0] + game_state.party + game_state.npcs:
-                    if entity.id != actor.id and getattr(entity, 'position', None):
-                        obstacle_cells.add((entity.position.x, entity.position.y))
-
-                max_move = actor.speed // 5 if hasattr(actor, 'speed') and actor.speed else 6
-
-                best_cell, path = PathfindingService.find_best_cell_adjacent_to(
-                    actor.position, t_pos, max_move, game_state.location.walkable_cells, obstacle_cells
-                )
-
-                if best_cell is None:
-                     return f"There is no walkable path to reach the {target_name}."
-
-                actor.position.x = best_cell[0]
-                actor.position.y = best_cell[1]
-
-                # Emit animation
-                if sio:
-                    anim_path = [{"x": c[0], "y": c[1]} for c in path]
-                    await sio.emit('entity_path_animation', {'entity_id': actor.id, 'path': anim_path}, room=campaign_id)
-
-                    # Apply local state change before acting
-                    await StateService.emit_state_update(campaign_id, game_state, sio)
-                    await asyncio.sleep(0.5) # Let animation play briefly
-
-            # Now act on it using LootService rules
-            act_target_name = None
-            target_id = None
-            if obj_type == 'interactable':
-                 target_id = target.get('id')
-                 act_target_name = target.get('name')
-            else:
-                 act_target_name = target.name
-
-            result = await LootService.open_vessel(campaign_id, actor.name, act_target_name, session, target_id=target_id)
-
-            # Note: open_vessel performs distance validation and stages the DB writes; the
-            # session owner (temp_session wrapper above, or the caller's session) commits them.
-            if result.get("success"):
-                 if sio:
-                     if "game_state" in result:
-                         await StateService.emit_state_update(campaign_id, result["game_state"], sio)
-                     if "message" in result:
-                         await sio.emit('chat_message', {
-                             'sender_id': 'system',
-                             'sender_name': 'System',
-                             'content': result['message'],
-                             'timestamp': "Just now",
-                             'is_system': True,
-                             'message_type': 'narration'
-                         }, room=campaign_id)
-                 return f"Successfully moved to and opened the {act_target_name}. Tell the player what you did."
-            else:
-                 return f"Failed to open '{act_target_name}': {result.get('message')}"
-
-        except Exception as e:
-            logger.error(f"Error in interact_with_object tool: {e}", exc_info=True)
-            return f"An error occurred while trying to interact: {e}"
-
-    return interact_with_object
+             return f"Failed to open '{act_target_name}': {result.get('message')}"
+
+    except Exception as e:
+        logger.error(f"Error in interact_with_object tool: {e}", exc_info=True)
+        return f"An error occurred while trying to interact: {e}"
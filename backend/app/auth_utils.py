@@ -1,7 +1,7 @@
 import logging
-from firebase_admin import auth
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.utils import token_cache
 
 # Initialize Firebase Admin SDK
 # In Cloud Run, it uses Application Default Credentials automatically.
@@ -16,7 +16,8 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(secur
     logger.debug("Entering verify_token dependency")
     token = credentials.credentials
     try:
-        decoded_token = auth.verify_id_token(token)
+        # Cached per token until its exp; cold verifications run off the event loop
+        decoded_token = await token_cache.verify_id_token(token)
         logger.debug("Token verified successfully")
         return decoded_token
     except Exception as e:
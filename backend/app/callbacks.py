@@ -22,7 +22,7 @@ class SocketIOCallbackHandler(AsyncCallbackHandler):
         from db.session import AsyncSessionLocal
         from sqlalchemy import text
         from uuid import uuid4
-        import json
+        from app.utils import json_codec
 
         # Inject agent name
         data['agent_name'] = self.agent_name
@@ -34,7 +34,7 @@ class SocketIOCallbackHandler(AsyncCallbackHandler):
         try:
             async with AsyncSessionLocal() as db:
                 log_id = str(uuid4())
-                full_content_str = json.dumps(data.get('full_content', ''))
+                full_content_str = json_codec.dumps(data.get('full_content', ''))
 
                 # Prepend agent name to content for visibility in simple logs
                 db_content = f"[{self.agent_name}] {data.get('content', '')}"
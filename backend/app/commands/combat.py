@@ -73,11 +73,8 @@ class AttackCommand(Command):
 
                     # Check if it is THIS user's turn
                     if start_res['active_entity_id'] != sender_id:
-                        active_name = "Unknown"
-                        for c in (start_res['game_state'].party + start_res['game_state'].enemies + start_res['game_state'].npcs):
-                            if c.id == start_res['active_entity_id']:
-                                active_name = c.name
-                                break
+                        active_char = start_res['game_state'].get_entity(start_res['active_entity_id'])
+                        active_name = active_char.name if active_char else "Unknown"
 
 
                         # Trigger AI Turn if it's not the player
@@ -90,11 +87,8 @@ class AttackCommand(Command):
         # Check Logic: Is it my turn?
         if game_state.phase == 'combat':
             if game_state.active_entity_id != sender_id:
-                active_name = "Unknown"
-                for c in (game_state.party + game_state.enemies + game_state.npcs):
-                    if c.id == game_state.active_entity_id:
-                        active_name = c.name
-                        break
+                active_char = game_state.get_entity(game_state.active_entity_id)
+                active_name = active_char.name if active_char else "Unknown"
                 await sio.emit('system_message', {'content': f"🚫 It is not your turn! It is **{active_name}**'s turn."}, room=campaign_id)
                 return
 
@@ -171,11 +165,8 @@ class AttackCommand(Command):
                 await sio.emit('system_message', {'content': "⚔️ **COMBAT STARTED!** Rolling Initiative..."}, room=campaign_id)
                 await StateService.emit_state_update(campaign_id, start_res['game_state'], sio)
 
-                active_name = "Unknown"
-                for c in (start_res['game_state'].party + start_res['game_state'].enemies + start_res['game_state'].npcs):
-                    if c.id == start_res['active_entity_id']:
-                        active_name = c.name
-                        break
+                active_char = start_res['game_state'].get_entity(start_res['active_entity_id'])
+                active_name = active_char.name if active_char else "Unknown"
                 # await sio.emit('system_message', {'content': f"Initiative Rolled! It is **{active_name}**'s turn first."}, room=campaign_id)
 
                 from app.services.turn_manager import TurnManager
@@ -250,22 +241,17 @@ class CastCommand(Command):
         if target_name or ctx.target_id:
             target_char_for_combat_check = GameService._find_char_by_name(game_state, target_name or "", ctx.target_id)
             if target_char_for_combat_check:
-                if any(e.id == target_char_for_combat_check.id for e in game_state.enemies):
+                faction = game_state.entity_index().faction_of(target_char_for_combat_check.id)
+                if faction == "enemy":
+                    is_hostile_target = True
+                elif faction == "npc" and target_char_for_combat_check.hostile:
                     is_hostile_target = True
-                else:
-                    for n in game_state.npcs:
-                        if n.id == target_char_for_combat_check.id and n.hostile:
-                            is_hostile_target = True
-                            break
 
         # If in combat, check turn
         if game_state.phase == 'combat':
             if game_state.active_entity_id != sender_id:
-                active_name = "Unknown"
-                for c in (game_state.party + game_state.enemies + game_state.npcs):
-                    if c.id == game_state.active_entity_id:
-                        active_name = c.name
-                        break
+                active_char = game_state.get_entity(game_state.active_entity_id)
+                active_name = active_char.name if active_char else "Unknown"
                 await sio.emit('system_message', {'content': f"🚫 It is not your turn! It is **{active_name}**'s turn."}, room=campaign_id)
                 return
 
@@ -321,11 +307,8 @@ class CastCommand(Command):
                 await StateService.emit_state_update(campaign_id, start_res['game_state'], sio)
 
                 # Check if it is THIS user's turn
-                active_name = "Unknown"
-                for c in (start_res['game_state'].party + start_res['game_state'].enemies + start_res['game_state'].npcs):
-                    if c.id == start_res['active_entity_id']:
-                        active_name = c.name
-                        break
+                active_char = start_res['game_state'].get_entity(start_res['active_entity_id'])
+                active_name = active_char.name if active_char else "Unknown"
                 # await sio.emit('system_message', {'content': f"Initiative Rolled! It is **{active_name}**'s turn first."}, room=campaign_id)
 
                 # Trigger AI Turn if it's not the player
@@ -310,7 +310,7 @@ class CheckCommand(Command):
         from game_engine.dice import Dice
         from game_engine.character_sheet import CharacterSheet
 
-        sheet = CharacterSheet(actor.model_dump())
+        sheet = CharacterSheet.from_entity(actor)
         ability_mod = sheet.get_mod(ability)
 
         # Proficiency: check if character has this skill in their proficiencies
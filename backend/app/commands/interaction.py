@@ -56,14 +56,18 @@ class OpenCommand(Command):
                 # Enrich item data
                 from sqlalchemy import select
                 from db.schema import items
+                from app.services.compendium_store import get_store
                 import json
+                store = get_store()
                 enriched = []
                 for item_id in vessel_data.get('contents', []):
                     try:
-                        ires = await ctx.db.execute(select(items).where(items.c.id == item_id))
-                        irow = ires.mappings().fetchone()
+                        irow = store.get("items", item_id) if store else None
+                        if irow is None:
+                            ires = await ctx.db.execute(select(items).where(items.c.id == item_id))
+                            irow = ires.mappings().fetchone()
                         if irow:
-                            idata = json.loads(irow['data'])
+                            idata = irow['data'] if isinstance(irow['data'], dict) else json.loads(irow['data'])
                             desc_val = idata.get('desc', [])
                             desc_str = "\n".join([str(d) for d in desc_val]) if isinstance(desc_val, list) else str(desc_val)
                             enriched.append({
@@ -1,6 +1,7 @@
 import logging
 from typing import Dict, List, Optional
 from .base import Command, CommandContext
+from app.utils import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -57,10 +58,12 @@ class CommandRegistry:
             return False
 
         args = parts[1:]
-        try:
-            await command.execute(ctx, args)
-            return True
-        except Exception as e:
-            logger.error(f"Error executing command {cmd_name}: {e}")
-            await ctx.sio.emit('system_message', {'content': f"Command Error: {e}"}, room=ctx.campaign_id)
-            return True # Logic handled, even if error
+        with tracing.span(f"command.{command.name.lower()}") as span:
+            try:
+                await command.execute(ctx, args)
+                return True
+            except Exception as e:
+                span.record_exception(e)
+                logger.error(f"Error executing command {cmd_name}: {e}")
+                await ctx.sio.emit('system_message', {'content': f"Command Error: {e}"}, room=ctx.campaign_id)
+                return True # Logic handled, even if error
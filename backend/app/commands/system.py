@@ -4,10 +4,10 @@ from .registry import CommandRegistry
 from app.services.chat_service import ChatService
 from app.services.ai_service import AIService
 from app.services.context_builder import build_narrative_context
-import json
 import random
 from langchain_core.messages import HumanMessage
 from app.services.game_service import GameService
+from app.utils.json_blob import load_blob
 
 class HelpCommand(Command):
     name = "help"
@@ -111,7 +111,7 @@ class DMCommand(Command):
     async def _handle_banter(self, ctx, response_text, state_row):
         ai_characters = []
         if state_row:
-            state_data = json.loads(state_row['state_data'])
+            state_data = load_blob(state_row['state_data'])
             party = state_data.get('party', [])
             for char in party:
                 if char.get('is_ai') or char.get('control_mode') == 'ai':
@@ -134,3 +134,10 @@ class ImageGenerationRequest(BaseModel):
 class ImageGenerationResponse(BaseModel):
     image_base64: str
     prompt_used: str
+
+class ImageJobResponse(BaseModel):
+    job_id: str
+    status: str
+    prompt: str
+    image_base64: Optional[str] = None
+    error: Optional[str] = None
@@ -1,7 +1,7 @@
 import os
 import firebase_admin
 import logging
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials
 
 logger = logging.getLogger(__name__)
 
@@ -86,4 +86,6 @@ WWxQ6RfITJQIg5LNTQ6axUg9c5LabzPVnc3bcsxAaW5ObtbNo8MWSwnZfWj3TWyo
         raise e
 
 def get_firestore():
+    # Deferred: the Firestore client stack is heavy and nothing on the startup path uses it
+    from firebase_admin import firestore
     return firestore.client()
@@ -1,6 +1,11 @@
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 from typing import List, Dict, Optional, Literal, Any
 from uuid import uuid4
+from datetime import datetime, timezone
+
+from app.utils.cell_grid import CellGrid
+from app.utils.entity_index import EntityIndex
+from app.utils.spatial_index import SpatialIndex
 
 # --- Conditions ---
 class Condition(BaseModel):
@@ -175,20 +180,24 @@ class Location(BaseModel):
     name: str
     description: str
     interactables: List[Dict[str, Any]] = []
-    walkable_cells: List[Coordinates] = Field(default_factory=list)
+    # Packed (x, y) columns; dumps as the usual [{x, y}, ...] list (see app/utils/cell_grid.py)
+    walkable_cells: CellGrid = Field(default_factory=CellGrid)
     party_locations: List[Dict[str, Any]] = Field(default_factory=list)
 
     @model_validator(mode='after')
     def enforce_spawn_cells_are_walkable(self) -> 'Location':
-        if self.party_locations and self.walkable_cells is not None:
-            existing = {(h.x, h.y) for h in self.walkable_cells}
+        if self.party_locations:
+            existing = set(self.walkable_cells.cells)
+            missing = []
             for p_loc in self.party_locations:
                 pos = p_loc.get('position')
                 if pos:
                     coord = Coordinates(**pos) if isinstance(pos, dict) else pos
                     if (coord.x, coord.y) not in existing:
-                        self.walkable_cells.append(coord)
+                        missing.append((coord.x, coord.y))
                         existing.add((coord.x, coord.y))
+            if missing:
+                self.walkable_cells = self.walkable_cells.with_cells(missing)
         return self
 
 class LogEntry(BaseModel):
@@ -199,6 +208,10 @@ class LogEntry(BaseModel):
     result: str
     timestamp: str
 
+# Entries kept in GameState.combat_log; older ones drop off (the full history is
+# the game_events table).
+COMBAT_LOG_MAX = 50
+
 class GameState(BaseModel):
     session_id: str
     version: int = 0
@@ -216,3 +229,68 @@ class GameState(BaseModel):
     dm_settings: DMSettings = Field(default_factory=DMSettings)
     has_moved_this_turn: bool = False
     has_acted_this_turn: bool = False
+
+    # Cached roster index; never serialized. Dropped by roster_changed() wherever the
+    # roster changes (see app/utils/entity_index.py)
+    _entity_index: Any = PrivateAttr(default=None)
+    # Cached occupancy spatial hash; never serialized. Kept in step by move_entity()
+    # (see app/utils/spatial_index.py)
+    _spatial_index: Any = PrivateAttr(default=None)
+    # Last game_events.seq this state reflects; None until loaded or saved (see StateService)
+    _event_seq: Optional[int] = PrivateAttr(default=None)
+
+    def entity_index(self) -> EntityIndex:
+        """Roster lookup index, built on first use after a roster change."""
+        # Read __pydantic_private__ directly: going through pydantic's __getattr__ for
+        # the private attribute costs more than the lookup it serves.
+        private = self.__pydantic_private__
+        index = private['_entity_index']
+        if index is None:
+            index = private['_entity_index'] = EntityIndex.from_state(self)
+        return index
+
+    def invalidate_entity_index(self) -> None:
+        """Call after renaming an entity in place (name, race, role, type, target_id)."""
+        self.__pydantic_private__['_entity_index'] = None
+
+    def roster_changed(self) -> None:
+        """Call after adding, removing or replacing a party member, enemy or NPC: drops
+        the cached roster and spatial indexes."""
+        private = self.__pydantic_private__
+        private['_entity_index'] = private['_spatial_index'] = None
+
+    def get_entity(self, entity_id: Optional[str]):
+        """Party member, enemy or NPC by exact id."""
+        if not entity_id:
+            return None
+        index = self.__pydantic_private__['_entity_index'] or self.entity_index()
+        return index.by_id.get(entity_id)
+
+    def spatial_index(self) -> SpatialIndex:
+        """Cell / range lookup over positioned entities, built on first use after a
+        roster change and updated in place by move_entity()."""
+        private = self.__pydantic_private__
+        index = private['_spatial_index']
+        if index is None:
+            index = private['_spatial_index'] = SpatialIndex.from_state(self)
+        return index
+
+    def move_entity(self, entity, x: int, y: int) -> None:
+        """Put `entity` on (x, y). Every position change of a live state goes through
+        here, so the cached spatial index only refiles the one entity."""
+        if entity.position is None:
+            entity.position = Coordinates(x=x, y=y)
+        else:
+            entity.position.x, entity.position.y = x, y
+        private = self.__pydantic_private__
+        index = private['_spatial_index']
+        if index is not None and not index.move(entity, (x, y)):
+            private['_spatial_index'] = None  # not on this roster: rebuild on next use
+
+    def log_action(self, actor_id: str, action: str, result: str, target_id: Optional[str] = None) -> LogEntry:
+        """Append to the capped combat log."""
+        entry = LogEntry(tick=self.version, actor_id=actor_id, action=action, target_id=target_id,
+                         result=result, timestamp=datetime.now(timezone.utc).isoformat())
+        self.combat_log.append(entry)
+        del self.combat_log[:-COMBAT_LOG_MAX]
+        return entry
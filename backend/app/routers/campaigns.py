@@ -2,21 +2,23 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 import json
 import logging
-import base64
 from ..permissions import verify_token, is_admin
 from ..dependencies import get_db
 from ..dtos import (
     CampaignCreateRequest, CampaignResponse, CampaignDetailsResponse,
     UpdateCampaignRequest, TestAPIKeyRequest, ModelListResponse,
     CampaignParticipantResponse, UpdateParticipantRequest,
-    CampaignTemplateResponse, ImageGenerationRequest, ImageGenerationResponse
+    CampaignTemplateResponse, ImageGenerationRequest, ImageGenerationResponse, ImageJobResponse
 )
 from ..models import GameState, Location, NPC, Coordinates
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert, update, delete, desc, text
-from db.schema import campaigns, campaign_templates, campaign_participants, game_states, characters, chat_messages, npcs, locations, debug_logs, profiles, campaign_memories, quests, spells, monsters, items
+from db.schema import campaigns, campaign_templates, campaign_participants, game_states, game_events, characters, chat_messages, npcs, locations, debug_logs, profiles, campaign_memories, quests, spells, monsters, items
+from ..services.ai_service import AIService
 from ..services.campaign_loader import instantiate_campaign
+from ..services.chat_service import ChatService
+from ..utils.json_blob import load_blob
 from sqlalchemy.exc import SQLAlchemyError
 
 router = APIRouter()
@@ -205,7 +207,7 @@ async def create_campaign(
                          initial_location_source_id = start_loc_id
                          initial_location_id = l_row.id
 
-                         l_data = json.loads(l_row.data)
+                         l_data = load_blob(l_row.data)
                          l_desc = l_data.get('description', {})
                          if isinstance(l_desc, dict):
                              initial_location_desc = l_desc.get('visual', "A mystery location.")
@@ -224,7 +226,7 @@ async def create_campaign(
                      all_npcs = n_res.all()
 
                      for n_row in all_npcs:
-                         n_data = json.loads(n_row.data)
+                         n_data = load_blob(n_row.data)
                          schedule = n_data.get('schedule', [])
                          is_here = False
                          for slot in schedule:
@@ -352,6 +354,7 @@ async def update_campaign(
         )
         await db.execute(stmt)
         await db.commit()
+        AIService.invalidate_campaign_config(campaign_id)
 
     # Fetch updated
     query = select(campaigns).where(campaigns.c.id == campaign_id)
@@ -414,6 +417,7 @@ async def update_campaign_settings(
 
     await db.execute(stmt)
     await db.commit()
+    AIService.invalidate_campaign_config(campaign_id)
 
     return {"status": "success", "message": "Settings updated"}
 
@@ -664,7 +668,8 @@ async def delete_campaign(
         await db.execute(delete(campaign_memories).where(campaign_memories.c.campaign_id == campaign_id))
         await db.execute(delete(debug_logs).where(debug_logs.c.campaign_id == campaign_id))
 
-        # Delete related game states
+        # Delete related game states and their event log
+        await db.execute(delete(game_events).where(game_events.c.campaign_id == campaign_id))
         await db.execute(delete(game_states).where(game_states.c.campaign_id == campaign_id))
         # Delete related characters
         await db.execute(delete(characters).where(characters.c.campaign_id == campaign_id))
@@ -677,6 +682,8 @@ async def delete_campaign(
         await db.execute(delete(campaigns).where(campaigns.c.id == campaign_id))
 
         await db.commit()
+        ChatService.clear_tail(campaign_id)
+        AIService.invalidate_campaign_config(campaign_id)
     except SQLAlchemyError as e:
         await db.rollback()
         logger.error("Database error deleting campaign: %s", str(e))
@@ -724,18 +731,7 @@ async def get_campaign_logs(
         logger.error("Database error fetching logs: %s", str(e))
         raise HTTPException(status_code=500, detail="Failed to fetch logs due to database error.")
 
-@router.post("/{campaign_id}/images/generate", response_model=ImageGenerationResponse)
-async def generate_campaign_image(
-    campaign_id: str,
-    req: ImageGenerationRequest,
-    user: dict = Depends(verify_token),
-    db: AsyncSession = Depends(get_db)
-):
-    from app.services.ai_service import AIService
-    import hashlib
-    from db.schema import image_cache
-
-    # Check if participant
+async def _require_participant(campaign_id: str, user: dict, db: AsyncSession):
     if not await is_admin(user, db):
          query = select(campaign_participants.c.status).where(
              campaign_participants.c.campaign_id == campaign_id,
@@ -745,14 +741,27 @@ async def generate_campaign_image(
          if not check.scalar():
               raise HTTPException(status_code=403, detail="Access denied")
 
-    # Hash the prompt for caching
-    prompt_hash = hashlib.sha256(req.prompt.encode('utf-8')).hexdigest()
+
+def _job_response(job, image_base64: str = None) -> ImageJobResponse:
+    return ImageJobResponse(job_id=job.id, status=job.status, prompt=job.prompt,
+                            image_base64=image_base64, error=job.error)
+
+
+@router.post("/{campaign_id}/images/generate", response_model=ImageGenerationResponse)
+async def generate_campaign_image(
+    campaign_id: str,
+    req: ImageGenerationRequest,
+    user: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """Blocking variant: returns the image once its (shared) job finishes."""
+    from app.services.image_job_service import ImageJobService
+
+    await _require_participant(campaign_id, user, db)
 
     # Check Cache
     try:
-        cache_query = select(image_cache.c.image_base64).where(image_cache.c.prompt_hash == prompt_hash)
-        cache_res = await db.execute(cache_query)
-        cached_img = cache_res.scalar()
+        cached_img = await ImageJobService.read_cache(ImageJobService.prompt_hash(req.prompt), db)
         if cached_img:
             return ImageGenerationResponse(
                 image_base64=cached_img,
@@ -761,34 +770,62 @@ async def generate_campaign_image(
     except SQLAlchemyError as e:
         logger.warning("Cache database read error: %s", str(e))
 
-    # Generate Image via AI
-    image_bytes = await AIService.generate_scene_image(campaign_id, req.prompt, db)
-    if not image_bytes:
+    # Concurrent requests for the same prompt share one generation
+    job = ImageJobService.submit(campaign_id, req.prompt)
+    # End the read-only transaction so the pooled connection goes back while this
+    # request waits out the queue and the generation (the job uses its own session).
+    await db.commit()
+    b64_img = await ImageJobService.wait(job)
+    if not b64_img:
         raise HTTPException(status_code=500, detail="Failed to generate image")
 
-    b64_img = base64.b64encode(image_bytes).decode('utf-8')
-
-    # Save cache
-    try:
-        stmt = insert(image_cache).values(
-            prompt_hash=prompt_hash,
-            image_base64=b64_img
-        )
-        await db.execute(stmt)
-        await db.commit()
-    except SQLAlchemyError as e:
-         logger.warning("Cache write database error: %s", str(e))
-         await db.rollback()
-
-    # Broadcast stats
-    from app.socket_manager import sio
-    await sio.emit('ai_stats', {
-        'type': 'usage',
-        'is_image': True,
-        'model': 'imagen-4.0-fast-generate-001'
-    }, room=campaign_id)
-
     return ImageGenerationResponse(
         image_base64=b64_img,
         prompt_used=req.prompt
     )
+
+@router.post("/{campaign_id}/images/jobs", response_model=ImageJobResponse, status_code=202)
+async def submit_campaign_image_job(
+    campaign_id: str,
+    req: ImageGenerationRequest,
+    user: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue (or join) a generation job; poll it or wait for the `image_ready` event."""
+    from app.services.image_job_service import ImageJobService
+
+    await _require_participant(campaign_id, user, db)
+    return _job_response(ImageJobService.submit(campaign_id, req.prompt))
+
+@router.post("/{campaign_id}/images/scene/{source_id}", response_model=ImageJobResponse, status_code=202)
+async def submit_scene_image_job(
+    campaign_id: str,
+    source_id: str,
+    user: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue (or join) the scene-art job for a room, the one room prefetch warms."""
+    from app.services.image_job_service import ImageJobService
+
+    await _require_participant(campaign_id, user, db)
+    job = await ImageJobService.scene_job(campaign_id, source_id, db)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Location not found")
+    return _job_response(job)
+
+@router.get("/{campaign_id}/images/jobs/{job_id}", response_model=ImageJobResponse)
+async def get_campaign_image_job(
+    campaign_id: str,
+    job_id: str,
+    user: dict = Depends(verify_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """Job status; carries the image once it is done."""
+    from app.services.image_job_service import DONE, ImageJobService
+
+    await _require_participant(campaign_id, user, db)
+    job = ImageJobService.get(job_id)
+    if job is None or campaign_id not in job.campaign_ids:
+        raise HTTPException(status_code=404, detail="Image job not found")
+    image = await ImageJobService.read_cache(job.id, db) if job.status == DONE else None
+    return _job_response(job, image)
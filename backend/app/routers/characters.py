@@ -3,6 +3,8 @@ import logging
 from ..dependencies import get_db
 from ..permissions import verify_token
 from ..dtos import CreateCharacterRequest, CharacterResponse
+from ..services.state_service import SCHEMA_KEY
+from ..utils.json_blob import load_blob
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
@@ -12,13 +14,22 @@ from uuid import uuid4
 router = APIRouter(prefix="/characters", tags=["characters"])
 logger = logging.getLogger(__name__)
 
+
+def _untrusted_sheet(sheet_data):
+    """Client-supplied sheets must not carry the save path's schema stamp, which would
+    let hydration skip the repairs for them (see state_service.SCHEMA_KEY)."""
+    if isinstance(sheet_data, dict) and SCHEMA_KEY in sheet_data:
+        sheet_data = {k: v for k, v in sheet_data.items() if k != SCHEMA_KEY}
+    return sheet_data
+
+
 @router.post("/", response_model=CharacterResponse)
 async def create_character(req: CreateCharacterRequest, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     if not req.campaign_id:
         raise HTTPException(status_code=400, detail="Campaign ID is required to create a character.")
 
     new_id = str(uuid4())
-    sheet_data_json = json.dumps(req.sheet_data)
+    sheet_data_json = json.dumps(_untrusted_sheet(req.sheet_data))
 
     try:
         await db.execute(
@@ -80,7 +91,7 @@ async def get_user_characters(user_id: str, campaign_id: str | None = None, user
             race=row["race"],
             level=row["level"],
             xp=row["xp"],
-            sheet_data=json.loads(row["sheet_data"]),
+            sheet_data=load_blob(row["sheet_data"]),
             backstory=row["backstory"]
         ) for row in rows
     ]
@@ -129,7 +140,7 @@ async def update_character(character_id: str, req: CreateCharacterRequest | dict
     if req.xp is not None:
         update_values["xp"] = req.xp
     if req.sheet_data is not None:
-        update_values["sheet_data"] = json.dumps(req.sheet_data)
+        update_values["sheet_data"] = json.dumps(_untrusted_sheet(req.sheet_data))
     if req.backstory is not None:
         update_values["backstory"] = req.backstory
     if req.campaign_id is not None:
@@ -157,6 +168,6 @@ async def update_character(character_id: str, req: CreateCharacterRequest | dict
         race=row["race"],
         level=row["level"],
         xp=row["xp"],
-        sheet_data=json.loads(row["sheet_data"]),
+        sheet_data=load_blob(row["sheet_data"]),
         backstory=row["backstory"]
     )
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
 from ..permissions import verify_token, is_admin
 from ..dependencies import get_db
+from ..services.chat_service import ChatService
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
@@ -30,6 +31,7 @@ async def get_chat_history(
     campaign_id: str,
     limit: int = Query(50, ge=1, le=100),
     before: Optional[datetime] = None,
+    before_id: Optional[str] = None,
     user: dict = Depends(verify_token),
     db: AsyncSession = Depends(get_db)
 ):
@@ -51,11 +53,18 @@ async def get_chat_history(
     """
     params = {"cid": campaign_id, "limit": limit}
 
-    if before:
+    # Keyset paging on (created_at, id): pass the oldest loaded message's created_at
+    # as `before` and its id as `before_id`. The id tie-break keeps messages that
+    # share a timestamp from being skipped or repeated across pages.
+    if before and before_id:
+        query_str += " AND (created_at, id) < (:before, :before_id)"
+        params["before"] = before
+        params["before_id"] = before_id
+    elif before:
         query_str += " AND created_at < :before"
         params["before"] = before
 
-    query_str += " ORDER BY created_at DESC LIMIT :limit"
+    query_str += " ORDER BY created_at DESC, id DESC LIMIT :limit"
 
     result = await db.execute(text(query_str), params)
     rows = result.mappings().all()
@@ -86,6 +95,7 @@ async def clear_chat_history(
             {"cid": campaign_id}
         )
         await db.commit()
+        ChatService.clear_tail(campaign_id)
         return {"status": "success", "message": "Chat history cleared"}
     except SQLAlchemyError as e:
         await db.rollback()
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import json
 from ..dependencies import get_db
+from ..services import compendium_service
+from ..services.compendium_store import get_store
+from ..utils.http_cache import etag_json_response, etag_matches, not_modified
 
 router = APIRouter(prefix="/compendium", tags=["compendium"])
 
@@ -13,48 +16,78 @@ class CompendiumItem(BaseModel):
     name: str
     data: dict
 
-ALLOWED_TABLES = {"spells", "feats", "races", "classes", "alignments", "subraces", "backgrounds", "items", "monsters"}
+class CompendiumHit(BaseModel):
+    id: str
+    name: str
+    data: Optional[dict] = None
+    score: Optional[float] = None
+    level: Optional[int] = None
+    school: Optional[str] = None
+    type: Optional[str] = None
+    cr: Optional[str] = None
+
+class CompendiumPage(BaseModel):
+    results: List[CompendiumHit]
+    next_cursor: Optional[str] = None
+
+ALLOWED_TABLES = set(compendium_service.SEARCHABLE)
 
 async def search_compendium(table_name: str, q: str, db: AsyncSession, limit_val: int = 25) -> List[CompendiumItem]:
-    """Generic helper to search a given table by name."""
+    """Generic helper to search a given table by name (ranked, first page only)."""
     if table_name not in ALLOWED_TABLES:
         raise ValueError(f"Invalid table name: {table_name}")
 
-    if q and len(q.strip()) > 0:
-        result = await db.execute(
-            text(f"SELECT id, name, data FROM {table_name} WHERE name LIKE :q LIMIT :limit"),
-            {"q": f"%{q}%", "limit": limit_val}
-        )
-    else:
-        result = await db.execute(
-            text(f"SELECT id, name, data FROM {table_name} LIMIT :limit"),
-            {"limit": limit_val}
+    page = await compendium_service.search(db, table_name, q=q, limit=limit_val)
+    return [
+        CompendiumItem(id=r['id'], name=r['name'], data=r.get('data') or {})
+        for r in page["results"]
+    ]
+
+@router.get("/search/{table_name}", response_model=CompendiumPage)
+async def search_table(
+    request: Request,
+    table_name: str,
+    q: Optional[str] = Query(None),
+    level: Optional[int] = Query(None),
+    school: Optional[str] = Query(None),
+    cr: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    class_: Optional[str] = Query(None, alias="class"),
+    limit: int = Query(compendium_service.DEFAULT_LIMIT, ge=1, le=compendium_service.MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    slim: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+):
+    """Ranked fuzzy search with filters and keyset pagination.
+
+    Pass `next_cursor` back as `cursor` for the following page. `slim=true`
+    omits the full `data` blob.
+    """
+    filters = {"level": level, "school": school, "cr": cr, "type": type, "class": class_}
+    try:
+        page = await compendium_service.search(
+            db, table_name, q=q, filters=filters, limit=limit, cursor=cursor, slim=slim
         )
-    rows = result.mappings().all()
-
-    results = []
-    for row in rows:
-        try:
-            data = json.loads(row['data'])
-        except json.JSONDecodeError:
-            data = {}
-
-        results.append(CompendiumItem(
-            id=row['id'],
-            name=row['name'],
-            data=data
-        ))
-
-    return results
+    except compendium_service.CompendiumQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return etag_json_response(request, CompendiumPage(**page))
 
 @router.get("/spells", response_model=List[CompendiumItem])
-async def search_spells(q: str = Query(None), db: AsyncSession = Depends(get_db)):
+async def search_spells(request: Request, q: str = Query(None), db: AsyncSession = Depends(get_db)):
     """Search for spells by name. Returns first 25 if no query."""
-    return await search_compendium("spells", q, db)
+    return etag_json_response(request, await search_compendium("spells", q, db))
 
 @router.get("/spells/{item_id}", response_model=CompendiumItem)
-async def get_spell(item_id: str, db: AsyncSession = Depends(get_db)):
-    """Get a specific spell by ID."""
+async def get_spell(item_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """Get a specific spell by ID. SRD spells are served from the compendium store."""
+    store = get_store()
+    row = store.get("spells", item_id) if store else None
+    if row:
+        etag = f'"{store.version[:16]}-{item_id}"'
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return etag_json_response(request, CompendiumItem(id=row['id'], name=row['name'], data=row['data']), etag)
+
     result = await db.execute(
         text("SELECT id, name, data FROM spells WHERE id = :id"),
         {"id": item_id}
@@ -68,33 +101,34 @@ async def get_spell(item_id: str, db: AsyncSession = Depends(get_db)):
     except json.JSONDecodeError:
         data = {}
 
-    return CompendiumItem(id=row['id'], name=row['name'], data=data)
+    return etag_json_response(request, CompendiumItem(id=row['id'], name=row['name'], data=data))
+
 @router.get("/feats", response_model=List[CompendiumItem])
-async def search_feats(q: str = Query(None), db: AsyncSession = Depends(get_db)):
+async def search_feats(request: Request, q: str = Query(None), db: AsyncSession = Depends(get_db)):
     """Search for feats by name. Returns first 25 if no query."""
-    return await search_compendium("feats", q, db)
+    return etag_json_response(request, await search_compendium("feats", q, db))
 
 @router.get("/races", response_model=List[CompendiumItem])
-async def search_races(q: str = Query(None), db: AsyncSession = Depends(get_db)):
+async def search_races(request: Request, q: str = Query(None), db: AsyncSession = Depends(get_db)):
     """Search for races by name. Returns first 25 if no query."""
-    return await search_compendium("races", q, db)
+    return etag_json_response(request, await search_compendium("races", q, db))
 
 @router.get("/classes", response_model=List[CompendiumItem])
-async def search_classes(q: str = Query(None), db: AsyncSession = Depends(get_db)):
+async def search_classes(request: Request, q: str = Query(None), db: AsyncSession = Depends(get_db)):
     """Search for classes by name. Returns first 25 if no query."""
-    return await search_compendium("classes", q, db)
+    return etag_json_response(request, await search_compendium("classes", q, db))
 
 @router.get("/alignments", response_model=List[CompendiumItem])
-async def search_alignments(q: str = Query(None), db: AsyncSession = Depends(get_db)):
+async def search_alignments(request: Request, q: str = Query(None), db: AsyncSession = Depends(get_db)):
     """Search for alignments by name. Returns first 25 if no query."""
-    return await search_compendium("alignments", q, db)
+    return etag_json_response(request, await search_compendium("alignments", q, db))
 
 @router.get("/subraces", response_model=List[CompendiumItem])
-async def search_subraces(q: str = Query(None), db: AsyncSession = Depends(get_db)):
+async def search_subraces(request: Request, q: str = Query(None), db: AsyncSession = Depends(get_db)):
     """Search for subraces by name. Returns first 25 if no query."""
-    return await search_compendium("subraces", q, db)
+    return etag_json_response(request, await search_compendium("subraces", q, db))
 
 @router.get("/backgrounds", response_model=List[CompendiumItem])
-async def search_backgrounds(q: str = Query(None), db: AsyncSession = Depends(get_db)):
+async def search_backgrounds(request: Request, q: str = Query(None), db: AsyncSession = Depends(get_db)):
     """Search for backgrounds. Returns all or matches."""
-    return await search_compendium("backgrounds", q, db, limit_val=50)
+    return etag_json_response(request, await search_compendium("backgrounds", q, db, limit_val=50))
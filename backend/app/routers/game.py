@@ -5,12 +5,12 @@ from ..models import GameState
 
 from ..dependencies import get_db
 from ..permissions import verify_token
+from ..utils.json_blob import load_blob
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sqlalchemy import text
 
-import json
 from uuid import uuid4
 
 
@@ -26,19 +26,22 @@ async def get_game_state(session_id: str, user: dict = Depends(verify_token), db
     if not row:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    return GameState(**json.loads(row["state_data"]))
+    return GameState(**load_blob(row["state_data"]))
 
 @router.post("/state/{session_id}")
 async def update_game_state(session_id: str, state: GameState, user: dict = Depends(verify_token), db: AsyncSession = Depends(get_db)):
     # Upsert the single per-campaign row (uq_game_states_campaign_id); a plain INSERT
     # would violate the constraint on the second call for a campaign.
     await db.execute(
-        text("""INSERT INTO game_states (id, campaign_id, turn_index, phase, state_data)
-                VALUES (:id, :campaign_id, :turn_index, :phase, :state_data)
+        # The posted state supersedes any logged events, so the snapshot folds them all in.
+        text("""INSERT INTO game_states (id, campaign_id, turn_index, phase, state_data, event_seq)
+                VALUES (:id, :campaign_id, :turn_index, :phase, :state_data,
+                        (SELECT COALESCE(MAX(seq), 0) FROM game_events WHERE campaign_id = :campaign_id))
                 ON CONFLICT (campaign_id) DO UPDATE SET
                     turn_index = EXCLUDED.turn_index,
                     phase = EXCLUDED.phase,
                     state_data = EXCLUDED.state_data,
+                    event_seq = EXCLUDED.event_seq,
                     updated_at = now()"""),
         {
             "id": str(uuid4()),
@@ -3,9 +3,8 @@ from fastapi import APIRouter, Query, Depends
 from pydantic import BaseModel
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-import json
 from ..dependencies import get_db
+from ..services import compendium_service
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -18,29 +17,8 @@ class Item(BaseModel):
 @router.get("/search", response_model=List[Item])
 async def search_items(q: str = Query(None), db: AsyncSession = Depends(get_db)):
     """Search for items by name. Returns first 25 if no query."""
-    if q and len(q.strip()) > 0:
-        result = await db.execute(
-            text("SELECT id, name, type, data FROM items WHERE name LIKE :q LIMIT 25"),
-            {"q": f"%{q}%"}
-        )
-    else:
-        result = await db.execute(
-            text("SELECT id, name, type, data FROM items LIMIT 25")
-        )
-    rows = result.mappings().all()
-
-    items = []
-    for row in rows:
-        try:
-            data = json.loads(row['data'])
-        except (json.JSONDecodeError, TypeError):
-            data = {}
-
-        items.append(Item(
-            id=row['id'],
-            name=row['name'],
-            type=row['type'],
-            data=data
-        ))
-
-    return items
+    page = await compendium_service.search(db, "items", q=q, limit=25)
+    return [
+        Item(id=r['id'], name=r['name'], type=r.get('type'), data=r.get('data') or {})
+        for r in page["results"]
+    ]
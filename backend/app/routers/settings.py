@@ -6,7 +6,6 @@ from app.auth_utils import verify_token
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-import google.genai as genai
 
 router = APIRouter(tags=["settings"])
 logger = logging.getLogger(__name__)
@@ -14,6 +13,8 @@ logger = logging.getLogger(__name__)
 @router.post("/test-key", response_model=ModelListResponse)
 async def test_api_key(request: TestAPIKeyRequest):
     if request.provider.lower() == "gemini":
+        # Deferred: google.genai adds ~0.17s to cold start and only this route needs it
+        import google.genai as genai
         try:
             client = genai.Client(api_key=request.api_key)
             models = []
@@ -1,23 +1,57 @@
 from app.agents import get_dm_graph, get_character_graph, summarize_messages
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.messages import SystemMessage, HumanMessage
 from app.callbacks import SocketIOCallbackHandler
+from app.utils import metrics, offload, tracing
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
+from collections import OrderedDict
+import time
 import traceback
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Every narration, bark and chat reply needs the campaign's LLM config. The campaign
+# routes invalidate an entry when they change it; the TTL bounds staleness for writes
+# that bypass them (manual SQL, another process).
+CAMPAIGN_CONFIG_TTL_SECONDS = 300
+MAX_CACHED_CAMPAIGN_CONFIGS = 1024
+FALLBACK_MODEL = "gemini-3-flash-preview"
+FALLBACK_PROVIDER = "gemini"
+
+
 class AIService:
+    # campaign_id -> (expires_at monotonic, (api_key, model, llm_provider))
+    _campaign_config_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @classmethod
+    def invalidate_campaign_config(cls, campaign_id: str):
+        cls._campaign_config_cache.pop(campaign_id, None)
+
     @staticmethod
     async def get_campaign_config(campaign_id: str, db: AsyncSession):
+        cache = AIService._campaign_config_cache
+        hit = cache.get(campaign_id)
+        if hit and hit[0] > time.monotonic():
+            cache.move_to_end(campaign_id)
+            return hit[1]
+
+        config = await AIService._load_campaign_config(campaign_id, db)
+        if config is not None:
+            cache[campaign_id] = (time.monotonic() + CAMPAIGN_CONFIG_TTL_SECONDS, config)
+            cache.move_to_end(campaign_id)
+            while len(cache) > MAX_CACHED_CAMPAIGN_CONFIGS:
+                cache.popitem(last=False)
+            return config
+        return (None, FALLBACK_MODEL, FALLBACK_PROVIDER)
+
+    @staticmethod
+    async def _load_campaign_config(campaign_id: str, db: AsyncSession):
+        """(api_key, model, llm_provider) from the campaigns row, or None if there is none."""
         result = await db.execute(text("SELECT api_key, model, llm_provider FROM campaigns WHERE id = :id"), {"id": campaign_id})
         row = result.mappings().fetchone()
 
-        fallback_model = "gemini-3-flash-preview"
-        fallback_provider = "gemini"
-
         # BYOK: campaigns must supply their own key — there is no server-key fallback.
         # When no key is configured we return api_key=None and let callers degrade
         # gracefully (they already guard on a falsy api_key and surface a friendly
@@ -26,16 +60,16 @@ class AIService:
         # would escape uncaught instead of becoming a clean 400.
         if row:
             api_key = row.get("api_key") or None
-            model = row.get("model") or fallback_model
-            llm_provider = row.get("llm_provider") or fallback_provider
-            # Local providers (Ollama/LM Studio) need no API key — the server ignores it.
+            model = row.get("model") or FALLBACK_MODEL
+            llm_provider = row.get("llm_provider") or FALLBACK_PROVIDER
+            # Local providers (Ollama/LM Studio) need no API key.
             # Supply a placeholder so the downstream "no key → cannot function" gates pass
             # and get_llm_instance can build the client.
             if not api_key and (llm_provider or "").lower() in ("local", "ollama", "lmstudio"):
                 api_key = "local"
             return (api_key, model, llm_provider)
 
-        return (None, fallback_model, fallback_provider)
+        return None
 
 
     @staticmethod
@@ -131,6 +165,26 @@ class AIService:
           """
           return [SystemMessage(content=narrator_persona)] + history + [HumanMessage(content=task_prompt)]
 
+    @staticmethod
+    async def _ainvoke_measured(graph, inputs: dict, config: dict, mode: str, llm_provider: str):
+        """graph.ainvoke, recording its latency and the tokens of the messages it added."""
+        provider = (llm_provider or FALLBACK_PROVIDER).lower()
+        start = time.perf_counter()
+        try:
+            with tracing.span("llm.agent", mode=mode, provider=provider):
+                final_state = await graph.ainvoke(inputs, config=config)
+        finally:
+            metrics.LLM_SECONDS.observe(time.perf_counter() - start, mode=mode, provider=provider)
+        for message in final_state["messages"][len(inputs["messages"]):]:
+            usage = getattr(message, "usage_metadata", None)
+            if not isinstance(usage, dict):
+                continue
+            for direction in ("input", "output"):
+                if usage.get(f"{direction}_tokens"):
+                    metrics.LLM_TOKENS.inc(usage[f"{direction}_tokens"], mode=mode, provider=provider,
+                                           direction=direction)
+        return final_state
+
     @staticmethod
     async def generate_dm_narration(campaign_id: str, context: str, history: list, db: AsyncSession, sid: str = None, mode: str = "chat", flags: list = None):
         """
@@ -184,7 +238,7 @@ class AIService:
         config = {"callbacks": [callback_handler], "recursion_limit": 10}
 
         try:
-             final_state = await dm_graph.ainvoke(inputs, config=config)
+             final_state = await AIService._ainvoke_measured(dm_graph, inputs, config, mode, llm_provider)
              msg_content = final_state["messages"][-1].content
              if isinstance(msg_content, list):
                  return "".join([b.get("text", "") if isinstance(b, dict) else str(b) for b in msg_content])
@@ -215,29 +269,8 @@ class AIService:
 
     @staticmethod
     async def get_messages_after(campaign_id: str, after_date, db: AsyncSession):
-        if not after_date:
-            result = await db.execute(
-                text("SELECT * FROM chat_messages WHERE campaign_id = :cid ORDER BY created_at ASC LIMIT 100"),
-                {"cid": campaign_id}
-            )
-        else:
-            result = await db.execute(
-                text("SELECT * FROM chat_messages WHERE campaign_id = :cid AND created_at > :dt ORDER BY created_at ASC LIMIT 100"),
-                {"cid": campaign_id, "dt": after_date}
-            )
-
-        rows = result.mappings().all()
-        messages = []
-        for row in rows:
-            if "DM Agent is offline" in row["content"] or "The DM is confused" in row["content"]:
-                continue
-            if row["sender_id"] == "dm":
-                messages.append(AIMessage(content=row["content"]))
-            elif row["sender_id"] == "system":
-                messages.append(SystemMessage(content=row["content"]))
-            else:
-                messages.append(HumanMessage(content=f"{row['sender_name']}: {row['content']}"))
-        return messages
+        from app.services.chat_service import ChatService
+        return await ChatService.get_messages_after(campaign_id, after_date, db=db)
 
     @staticmethod
     async def generate_chat_response(campaign_id: str, sender_name: str, db: AsyncSession, sid: str = None, rich_context: str = None):
@@ -317,7 +350,7 @@ class AIService:
              config = {"callbacks": [callback_handler], "recursion_limit": 10}
 
         try:
-             final_state = await dm_graph.ainvoke(inputs, config=config)
+             final_state = await AIService._ainvoke_measured(dm_graph, inputs, config, "chat", llm_provider)
              msg_content = final_state["messages"][-1].content
              if isinstance(msg_content, list):
                  return "".join([b.get("text", "") if isinstance(b, dict) else str(b) for b in msg_content])
@@ -350,8 +383,6 @@ class AIService:
         char_agent = get_character_graph(
             api_key=api_key,
             model_name=model or 'gemini-3-flash-preview',
-            character_details=char_details,
-            campaign_id=campaign_id,
             llm_provider=llm_provider
         )
 
@@ -372,6 +403,7 @@ class AIService:
         inputs = {
             "messages": char_messages,
             "campaign_id": campaign_id,
+            "character": char_details,
             "sender_name": "System" # Or whatever triggered it
         }
 
@@ -381,7 +413,7 @@ class AIService:
              config = {"callbacks": [callback_handler], "recursion_limit": 10}
 
         try:
-             final_state = await char_agent.ainvoke(inputs, config=config)
+             final_state = await AIService._ainvoke_measured(char_agent, inputs, config, "character", llm_provider)
              msg_content = final_state["messages"][-1].content
 
              parsed_content = ""
@@ -429,8 +461,6 @@ class AIService:
         if not api_key:
             return None
 
-        client = genai.Client(api_key=api_key)
-
         # Pipeline Constraint: Prevent Party Members from being drawn, enforce style, and prevent clutter/gore
         negative_prompt = "CRITICAL INSTRUCTION: Do NOT draw any humans, adventurers, or party members. Do NOT draw any alive, awake, or standing monsters. No active creatures, no upright figures, no fighting, no action. The room must only contain the specific items requested."
 
@@ -439,8 +469,10 @@ class AIService:
         enhanced_prompt = f"{style_prompt} Scene: {prompt} {negative_prompt}"
 
         # Model: using imagen-4.0-fast-generate-001 as requested
-        try:
-            response = client.models.generate_images(
+        def generate():
+            # Synchronous SDK call (seconds): runs on the bounded image pool, off the loop.
+            client = genai.Client(api_key=api_key)
+            return client.models.generate_images(
                 model='imagen-4.0-fast-generate-001',
                 prompt=enhanced_prompt,
                 config=types.GenerateImagesConfig(
@@ -448,6 +480,9 @@ class AIService:
                     aspect_ratio="3:4", # Good for sidebar portrait usage
                 )
             )
+
+        try:
+            response = await offload.run("image", generate)
             if response.generated_images:
                 return response.generated_images[0].image.image_bytes # bytes
         except genai.errors.APIError as e:
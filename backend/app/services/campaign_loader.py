@@ -4,11 +4,17 @@ import os
 import asyncio
 import logging
 import traceback
-from sqlalchemy import text
+from sqlalchemy import insert, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.session import AsyncSessionLocal
+from app.services import sync_manifest
 import glob
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
+from db.schema import (
+    npcs as npcs_table, locations as locations_table, quests as quests_table,
+    items as items_table, monsters as monsters_table,
+)
 
 # Define paths relative to this file
 # backend/app/services/campaign_loader.py
@@ -72,121 +78,111 @@ async def sync_template_metadata(db: AsyncSession, data, filepath):
         "initial_state": json.dumps(initial_state)
     })
 
-async def instantiate_campaign(db: AsyncSession, campaign_id: str, template_id: str):
-    """
-    Copies data from the template JSON into the campaign instance tables.
-    """
-    logger.info(f"Instantiating campaign {campaign_id} from template {template_id}")
+HOSTILE_ATTITUDES = ['hostile', 'aggressive', 'violent', 'enemy', 'attack on sight']
 
-    # 1. Get Template Path
-    result = await db.execute(text("SELECT json_path FROM campaign_templates WHERE id = :tid"), {"tid": template_id})
-    row = result.fetchone()
-    if not row:
-        raise ValueError(f"Template {template_id} not found")
+# Parsed templates, ready to insert: json_path -> (mtime_ns, {table: [row, ...]}).
+# Rows carry everything but the per-instance id / campaign_id, with JSON columns
+# already serialized, so instantiating a campaign is one multi-row INSERT per table.
+# Editing a template file (new mtime) re-parses it on the next instantiation.
+_template_cache: Dict[str, Tuple[int, Dict[str, List[dict]]]] = {}
 
-    json_path = row[0]
-    data = load_json_file(json_path)
-    if not data:
-        raise ValueError(f"Could not load JSON from {json_path}")
 
-    # 2. Insert NPCs
-    npcs = data.get('npcs', [])
-    logger.info(f"  - Loading {len(npcs)} NPCs")
-    for npc in npcs:
-        new_id = str(uuid4()) # Generate new unique ID for this instance
-        npc_data = npc
+def _prepare_template_rows(data: dict) -> Dict[str, List[dict]]:
+    npc_rows = []
+    for npc in data.get('npcs', []):
+        npc_data = dict(npc)
 
         # --- Hostility Synchronization ---
         # Automatically set mechanical 'hostile' flag if attitude implies it
         disposition = npc_data.get('disposition', {})
         attitude = disposition.get('attitude', '').lower()
-        HOSTILE_ATTITUDES = ['hostile', 'aggressive', 'violent', 'enemy', 'attack on sight']
-
         if any(h in attitude for h in HOSTILE_ATTITUDES):
-             # Only override if not explicitly set to False (allow manual peace)
-             if 'hostile' not in npc_data:
-                 npc_data['hostile'] = True
-                 logger.info(f"    -> Auto-marked {npc.get('name')} as Hostile based on attitude '{attitude}'")
-
-        await db.execute(text("""
-            INSERT INTO npcs (id, campaign_id, source_id, name, role, data)
-            VALUES (:id, :campaign_id, :source_id, :name, :role, :data)
-        """), {
-            "id": new_id,
-            "campaign_id": campaign_id,
+            # Only override if not explicitly set to False (allow manual peace)
+            if 'hostile' not in npc_data:
+                npc_data['hostile'] = True
+                logger.info(f"    -> Auto-marked {npc.get('name')} as Hostile based on attitude '{attitude}'")
+
+        npc_rows.append({
             "source_id": npc.get('id'), # Keep original ID as reference
             "name": npc.get('name'),
             "role": npc.get('role'),
             "data": json.dumps(npc_data)
         })
 
-    # 3. Insert Locations
-    locations = data.get('atlas', [])
-    logger.info(f"  - Loading {len(locations)} Locations")
-    for loc in locations:
-        new_id = str(uuid4())
-        await db.execute(text("""
-            INSERT INTO locations (id, campaign_id, source_id, name, data)
-            VALUES (:id, :campaign_id, :source_id, :name, :data)
-        """), {
-            "id": new_id,
-            "campaign_id": campaign_id,
+    return {
+        "npcs": npc_rows,
+        "locations": [{
             "source_id": loc.get('id'),
             "name": loc.get('name'),
             "data": json.dumps(loc)
-        })
-
-    # 4. Insert Quests
-    quests = data.get('quests', [])
-    logger.info(f"  - Loading {len(quests)} Quests")
-    for q in quests:
-         new_id = str(uuid4())
-         await db.execute(text("""
-            INSERT INTO quests (id, campaign_id, source_id, title, steps, rewards, data)
-            VALUES (:id, :campaign_id, :source_id, :title, :steps, :rewards, :data)
-        """), {
-            "id": new_id,
-            "campaign_id": campaign_id,
+        } for loc in data.get('atlas', [])],
+        "quests": [{
             "source_id": q.get('id'),
             "title": q.get('title'),
             "steps": json.dumps(q.get('steps', [])),
             "rewards": json.dumps(q.get('rewards', [])),
             "data": json.dumps(q)
-        })
-
-    # 5. Insert Items (Campaign Specific)
-    items = data.get('items', [])
-    logger.info(f"  - Loading {len(items)} Items")
-    for item in items:
-        new_id = str(uuid4())
-        # Note: We are inserting into 'items' table, but now it has campaign_id
-        await db.execute(text("""
-            INSERT INTO items (id, campaign_id, name, type, data)
-            VALUES (:id, :campaign_id, :name, :type, :data)
-        """), {
-            "id": new_id,
-            "campaign_id": campaign_id,
+        } for q in data.get('quests', [])],
+        "items": [{
             "name": item.get('name'),
             "type": item.get('type'),
             "data": json.dumps(item)
-        })
-
-    # 6. Insert Monsters (Campaign Specific)
-    monsters = data.get('monsters', [])
-    logger.info(f"  - Loading {len(monsters)} Monsters")
-    for mon in monsters:
-        new_id = str(uuid4())
-        await db.execute(text("""
-            INSERT INTO monsters (id, campaign_id, name, type, cr, data)
-            VALUES (:id, :campaign_id, :name, :type, :cr, :data)
-        """), {
-            "id": new_id,
-            "campaign_id": campaign_id,
+        } for item in data.get('items', [])],
+        "monsters": [{
             "name": mon.get('name'),
             "type": mon.get('type'),
             "cr": str(mon.get('challenge_rating', 'Unknown')),
             "data": json.dumps(mon)
-        })
+        } for mon in data.get('monsters', [])],
+    }
+
+
+def load_template_rows(json_path: str) -> Optional[Dict[str, List[dict]]]:
+    """Insert-ready rows for a template file, cached until the file's mtime changes."""
+    try:
+        mtime = os.stat(json_path).st_mtime_ns
+    except OSError:
+        logger.warning(f"{json_path} not found.")
+        return None
+    cached = _template_cache.get(json_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    data = load_json_file(json_path)
+    if not data:
+        return None
+    rows = _prepare_template_rows(data)
+    _template_cache[json_path] = (mtime, rows)
+    return rows
+
+
+async def instantiate_campaign(db: AsyncSession, campaign_id: str, template_id: str):
+    """
+    Copies data from the template JSON into the campaign instance tables.
+    """
+    logger.info(f"Instantiating campaign {campaign_id} from template {template_id}")
+
+    # 1. Get Template Path
+    result = await db.execute(text("SELECT json_path FROM campaign_templates WHERE id = :tid"), {"tid": template_id})
+    row = result.fetchone()
+    if not row:
+        raise ValueError(f"Template {template_id} not found")
+
+    json_path = row[0]
+    template_rows = load_template_rows(json_path)
+    if not template_rows:
+        raise ValueError(f"Could not load JSON from {json_path}")
+
+    # 2. Bulk insert NPCs, Locations, Quests, Items, Monsters: each table is a single
+    # executemany that SQLAlchemy batches into multi-row INSERT ... VALUES statements.
+    for table in (npcs_table, locations_table, quests_table, items_table, monsters_table):
+        rows = template_rows[table.name]
+        logger.info(f"  - Loading {len(rows)} {table.name}")
+        if not rows:
+            continue
+        await db.execute(
+            insert(table),
+            [{**r, "id": str(uuid4()), "campaign_id": campaign_id} for r in rows]
+        )
 
     logger.info(f"Successfully instantiated campaign {campaign_id}")
 
@@ -194,15 +190,25 @@ async def instantiate_campaign(db: AsyncSession, campaign_id: str, template_id:
 async def parse_and_load():
     """
     Main entry point for startup script. Syncs templates.
+    Files whose content hash matches the sync manifest are skipped; the manifest
+    key is the absolute path, so a template that moved (json_path changes) re-syncs.
     """
     logger.info(f"Searching for campaign JSONs in {GAMES_DIR}...")
     json_files = glob.glob(os.path.join(GAMES_DIR, "*.json"))
 
     async with AsyncSessionLocal() as db:
+        manifest = await sync_manifest.load_manifest(db, "template:")
+        unchanged = 0
         for file in json_files:
             if "blank_schema.json" in file:
                 continue
 
+            source = f"template:{os.path.abspath(file)}"
+            digest = sync_manifest.file_hash(file)
+            if digest and manifest.get(source) == digest:
+                unchanged += 1
+                continue
+
             logger.info(f"Processing {os.path.basename(file)}...")
             data = load_json_file(file)
             if not data:
@@ -226,11 +232,19 @@ async def parse_and_load():
 
             try:
                 await sync_template_metadata(db, data, file)
+                if digest:
+                    await sync_manifest.record(db, source, digest)
                 await db.commit()
+                # Warm the instantiation cache so the first campaign created from
+                # this template doesn't pay the parse
+                load_template_rows(file)
             except Exception as e:
                 await db.rollback()
                 logger.error(f"Error loading {file}: {e}")
                 logger.error(traceback.format_exc())
 
+        if unchanged:
+            logger.info(f"{unchanged} template(s) unchanged since last sync, skipped.")
+
 if __name__ == "__main__":
     asyncio.run(parse_and_load())
@@ -1,14 +1,111 @@
 import logging
 import datetime
-import json
+from collections import OrderedDict, deque
 from uuid import uuid4
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from db.session import AsyncSessionLocal
+from app.utils import json_codec
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 logger = logging.getLogger(__name__)
 
+# Error chatter the LLM must never see as history. Filtered in SQL (so LIMIT counts
+# real messages) and at append time for the in-memory tail.
+NOISE_MARKERS = ("DM Agent is offline", "The DM is confused")
+NOISE_FILTER_SQL = " AND ".join(f"content NOT LIKE '%{m}%'" for m in NOISE_MARKERS)
+
+# Per-campaign tail of the most recent non-noise messages. save_message appends to it,
+# so narration / chat prompts (5-20 rows) and the summarizer's "since last memory"
+# read are served without a query once a campaign has been seeded from the DB.
+TAIL_SIZE = 100
+MAX_CACHED_CAMPAIGNS = 256
+# Messages saved on a caller's session are staged in session.info and only reach the
+# tail on commit, so a rolled-back turn never leaks into later prompts. Reads on that
+# same session still see them (see _pending).
+_PENDING_MESSAGES = "chat_service.pending_messages"
+
+
+def _is_noise(content: str) -> bool:
+    return any(m in content for m in NOISE_MARKERS)
+
+
+def _local_aware(ts):
+    # asyncpg stores naive datetimes as local time; normalise so buffered and
+    # DB-loaded timestamps (and memory dates) compare cleanly.
+    return ts.astimezone() if isinstance(ts, datetime.datetime) else ts
+
+
+def _to_langchain(rows):
+    messages = []
+    for row in rows:
+        if row["sender_id"] == "dm":
+            messages.append(AIMessage(content=row["content"]))
+        elif row["sender_id"] == "system":
+            messages.append(SystemMessage(content=row["content"]))
+        else:
+            messages.append(HumanMessage(content=f"{row['sender_name']}: {row['content']}"))
+    return messages
+
+
+class _ChatTail:
+    """Last TAIL_SIZE non-noise messages of one campaign, oldest first.
+
+    Created unseeded on the first read; messages saved while the seeding query is in
+    flight are buffered and merged (by id) into the loaded rows, so nothing is lost.
+    """
+    def __init__(self):
+        self.messages = deque(maxlen=TAIL_SIZE)
+        self.seeded = False
+
+    def append(self, msg: dict):
+        self.messages.append(msg)
+
+    def seed(self, rows):
+        loaded = [_tail_record(r) for r in rows]
+        ids = {m["id"] for m in loaded}
+        late = [m for m in self.messages if m["id"] not in ids]
+        self.messages = deque(loaded + late, maxlen=TAIL_SIZE)
+        self.seeded = True
+
+    @property
+    def complete(self) -> bool:
+        """True when the tail holds the campaign's whole (non-noise) history."""
+        return self.seeded and len(self.messages) < TAIL_SIZE
+
+
+def _tail_entry(msg_id, sender_id, sender_name, content, timestamp) -> dict:
+    return {
+        "id": msg_id, "sender_id": sender_id, "sender_name": sender_name,
+        "content": content, "created_at": _local_aware(timestamp),
+    }
+
+
+def _tail_record(row) -> dict:
+    return _tail_entry(row.get("id"), row["sender_id"], row["sender_name"], row["content"], row.get("created_at"))
+
+
+_tails: "OrderedDict[str, _ChatTail]" = OrderedDict()
+
+
+def _pending(db, campaign_id: str) -> list:
+    if db is None:
+        return []
+    return [m for cid, m in db.info.get(_PENDING_MESSAGES, ()) if cid == campaign_id]
+
+
+@event.listens_for(Session, "after_commit")
+def _promote_pending_messages(session):
+    for campaign_id, msg in session.info.pop(_PENDING_MESSAGES, None) or ():
+        ChatService._append_tail(campaign_id, msg)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_messages(session):
+    session.info.pop(_PENDING_MESSAGES, None)
+
+
 class ChatService:
     @staticmethod
     async def save_message(campaign_id: str, sender_id: str, sender_name: str, content: str, db: AsyncSession = None):
@@ -18,7 +115,7 @@ class ChatService:
         # Ensure content is a string for the DB
         if not isinstance(content, str):
             try:
-                content = json.dumps(content)
+                content = json_codec.dumps(content)
             except Exception as e:
                 logger.error(f"Service Error: {e}", exc_info=True)
                 raise e
@@ -31,6 +128,9 @@ class ChatService:
                 {"id": msg_id, "campaign_id": campaign_id, "sender_id": sender_id, "sender_name": sender_name, "content": content, "created_at": timestamp}
             )
             # Note: We do NOT commit here if db is provided, caller handles transaction.
+            if not _is_noise(content):
+                db.info.setdefault(_PENDING_MESSAGES, []).append(
+                    (campaign_id, _tail_entry(msg_id, sender_id, sender_name, content, timestamp)))
             return {"id": msg_id, "timestamp": timestamp.isoformat()}
         else:
             async with AsyncSessionLocal() as session:
@@ -40,41 +140,67 @@ class ChatService:
                     {"id": msg_id, "campaign_id": campaign_id, "sender_id": sender_id, "sender_name": sender_name, "content": content, "created_at": timestamp}
                 )
                 await session.commit()
+                if not _is_noise(content):
+                    ChatService._append_tail(campaign_id, _tail_entry(msg_id, sender_id, sender_name, content, timestamp))
                 return {"id": msg_id, "timestamp": timestamp.isoformat()}
 
     @staticmethod
+    def _append_tail(campaign_id: str, msg: dict):
+        tail = _tails.get(campaign_id)
+        if tail is None:
+            # Unseen campaigns are seeded from the DB on first read instead
+            return
+        tail.append(msg)
+
+    @staticmethod
+    def clear_tail(campaign_id: str):
+        """Drop the cached tail; call after deleting a campaign's chat rows."""
+        _tails.pop(campaign_id, None)
+
+    @staticmethod
+    async def _get_tail(campaign_id: str, db: AsyncSession = None) -> _ChatTail:
+        tail = _tails.get(campaign_id)
+        if tail is None:
+            tail = _tails[campaign_id] = _ChatTail()
+            while len(_tails) > MAX_CACHED_CAMPAIGNS:
+                _tails.popitem(last=False)
+        _tails.move_to_end(campaign_id)
+        if not tail.seeded:
+            query = text(f"""SELECT id, sender_id, sender_name, content, created_at FROM chat_messages
+                WHERE campaign_id = :campaign_id AND {NOISE_FILTER_SQL}
+                ORDER BY created_at DESC, id DESC
+                LIMIT :limit""")
+            params = {"campaign_id": campaign_id, "limit": TAIL_SIZE}
+            if db:
+                rows = (await db.execute(query, params)).mappings().all()
+            else:
+                async with AsyncSessionLocal() as session:
+                    rows = (await session.execute(query, params)).mappings().all()
+            # Seeding on the caller's session also reads its uncommitted rows; those
+            # stay staged until commit.
+            staged = {m["id"] for m in _pending(db, campaign_id)}
+            tail.seed([r for r in reversed(rows) if r.get("id") not in staged])
+        return tail
+    @staticmethod
     async def get_chat_history(campaign_id: str, limit: int = 10, db: AsyncSession = None):
-        if db:
-            result = await db.execute(
-                text("""SELECT * FROM chat_messages
-                   WHERE campaign_id = :campaign_id
-                   ORDER BY created_at DESC
-                   LIMIT :limit"""),
-                {"campaign_id": campaign_id, "limit": limit}
-            )
-            rows = result.mappings().all()
-        else:
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(
-                    text("""SELECT * FROM chat_messages
-                       WHERE campaign_id = :campaign_id
-                       ORDER BY created_at DESC
-                       LIMIT :limit"""),
-                    {"campaign_id": campaign_id, "limit": limit}
-                )
-                rows = result.mappings().all()
-
-        messages = []
-        for row in reversed(rows):
-            if "DM Agent is offline" in row["content"] or "The DM is confused" in row["content"]:
-                continue
-            if row["sender_id"] == "dm":
-                messages.append(AIMessage(content=row["content"]))
-            elif row["sender_id"] == "system":
-                messages.append(SystemMessage(content=row["content"]))
+        """Last `limit` non-noise messages as LangChain messages, oldest first."""
+        if limit > TAIL_SIZE:
+            query = text(f"""SELECT * FROM chat_messages
+                WHERE campaign_id = :campaign_id AND {NOISE_FILTER_SQL}
+                ORDER BY created_at DESC, id DESC
+                LIMIT :limit""")
+            params = {"campaign_id": campaign_id, "limit": limit}
+            if db:
+                rows = (await db.execute(query, params)).mappings().all()
             else:
-                messages.append(HumanMessage(content=f"{row['sender_name']}: {row['content']}"))
-        return messages
+                async with AsyncSessionLocal() as session:
+                    rows = (await session.execute(query, params)).mappings().all()
+            return _to_langchain(reversed(rows))
+
+        tail = await ChatService._get_tail(campaign_id, db)
+        buffered = list(tail.messages) + _pending(db, campaign_id)
+        recent = buffered[-limit:] if limit > 0 else []
+        return _to_langchain(recent)
 
     @staticmethod
     async def get_latest_memory(campaign_id: str):
@@ -98,30 +224,26 @@ class ChatService:
             await db.commit()
 
     @staticmethod
-    async def get_messages_after(campaign_id: str, after_date):
-        async with AsyncSessionLocal() as db:
-            # If no date, get all (with safe limit)
-            if not after_date:
-                result = await db.execute(
-                    text("SELECT * FROM chat_messages WHERE campaign_id = :cid ORDER BY created_at ASC LIMIT 100"),
-                    {"cid": campaign_id}
-                )
-            else:
-                result = await db.execute(
-                    text("SELECT * FROM chat_messages WHERE campaign_id = :cid AND created_at > :dt ORDER BY created_at ASC LIMIT 100"),
-                    {"cid": campaign_id, "dt": after_date}
-                )
+    async def get_messages_after(campaign_id: str, after_date, db: AsyncSession = None):
+        """Up to 100 non-noise messages newer than `after_date` (all history if None), oldest first."""
+        tail = await ChatService._get_tail(campaign_id, db)
+        after = _local_aware(after_date)
+        buffered = list(tail.messages) + _pending(db, campaign_id)
+        # The tail answers when it provably covers the window: it holds the whole
+        # history, or its oldest message is already at/before the cutoff.
+        if tail.complete or (after and buffered and buffered[0]["created_at"] and buffered[0]["created_at"] <= after):
+            rows = [m for m in buffered if not after or (m["created_at"] and m["created_at"] > after)]
+            return _to_langchain(rows[:100])
 
-            rows = result.mappings().all()
-            # Convert to LangChain messages
-            messages = []
-            for row in rows:
-                if "DM Agent is offline" in row["content"] or "The DM is confused" in row["content"]:
-                    continue
-                if row["sender_id"] == "dm":
-                    messages.append(AIMessage(content=row["content"]))
-                elif row["sender_id"] == "system":
-                    messages.append(SystemMessage(content=row["content"]))
-                else:
-                    messages.append(HumanMessage(content=f"{row['sender_name']}: {row['content']}"))
-            return messages
+        query = f"SELECT * FROM chat_messages WHERE campaign_id = :cid AND {NOISE_FILTER_SQL}"
+        params = {"cid": campaign_id}
+        if after_date:
+            query += " AND created_at > :dt"
+            params["dt"] = after_date
+        query += " ORDER BY created_at ASC, id ASC LIMIT 100"
+        if db:
+            rows = (await db.execute(text(query), params)).mappings().all()
+        else:
+            async with AsyncSessionLocal() as session:
+                rows = (await session.execute(text(query), params)).mappings().all()
+        return _to_langchain(rows)
@@ -0,0 +1,236 @@
+"""Precompiled combat profiles: everything the attack / AI-turn path used to re-derive
+from raw SRD and sheet data on every swing.
+
+A `CombatProfile` holds an entity's equipped-weapon attack parameters, its monster
+attack actions, its compiled Multiattack sequence, its maximum attack reach in grid
+cells and its spellcaster flag. Profiles are immutable and cached:
+
+  * monsters / NPCs by source (SRD `index`, else entity id) plus the tuple of action
+    names — stat blocks never change at runtime, so every goblin shares one profile;
+  * players by entity id plus a cheap signature of equipped items, so any equipment
+    change is picked up even on paths that forget to call `invalidate`.
+
+LootService.equip_item calls `invalidate` explicitly on equip/unequip.
+"""
+import random
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+MAX_CACHED_PROFILES = 1024
+CANTRIP_FALLBACK_RANGE = 12  # 60ft for a spellcaster with no listed ranged attack
+
+_RANGE_RE = re.compile(r"range\s+(\d+)")
+
+
+@dataclass(frozen=True)
+class WeaponProfile:
+    """Attack parameters for one equipped weapon (or unarmed when `name` is None)."""
+    name: Optional[str] = None
+    has_data: bool = False
+    damage_dice: Optional[str] = None
+    is_finesse: bool = False
+    is_ranged: bool = False
+    is_offhand: bool = False
+    range_cells: int = 1
+
+    def attack_params(self) -> Dict[str, Any]:
+        """The engine `params` dict CombatService.resolution_attack passes per weapon."""
+        params: Dict[str, Any] = {}
+        if not self.has_data:
+            return params
+        if self.damage_dice:
+            params['weapon_damage_dice'] = self.damage_dice
+            params['weapon_name'] = self.name or 'Weapon'
+        if self.is_finesse:
+            params['is_finesse'] = True
+        if self.is_ranged:
+            params['is_ranged'] = True
+        if self.is_offhand:
+            params['is_offhand'] = True
+        return params
+
+
+UNARMED = WeaponProfile()
+
+
+@dataclass(frozen=True)
+class CombatProfile:
+    weapons: Tuple[WeaponProfile, ...] = (UNARMED,)
+    attacks: Dict[str, dict] = field(default_factory=dict)
+    multiattack_type: Optional[str] = None
+    # "actions": ((name, count), ...); "action_options": (((name, count), ...), ...)
+    multiattack: Tuple = ()
+    max_attack_range: int = 1
+    is_spellcaster: bool = False
+
+    def multiattack_sequence(self) -> list:
+        """Ordered attack-action dicts for one Multiattack, [] if the entity has none.
+        `action_options` picks one option set at random per call."""
+        if not self.multiattack_type or not self.multiattack:
+            return []
+        if self.multiattack_type == 'action_options':
+            entries = random.choice(self.multiattack)
+        else:
+            entries = self.multiattack
+        sequence = []
+        for action_name, count in entries:
+            if action_name in self.attacks:
+                sequence.extend(self.attacks[action_name] for _ in range(count))
+        return sequence
+
+
+# ── Compilation ───────────────────────────────────────────────────────────────
+def _compile_weapon(item: dict, idx: int) -> WeaponProfile:
+    w_data = item.get('data')
+    if not isinstance(w_data, dict):
+        return WeaponProfile(name=item.get('name'))
+
+    damage = w_data.get('damage', {})
+    damage_dice = damage.get('damage_dice') if isinstance(damage, dict) else None
+    properties = w_data.get('properties', []) or []
+    prop_names = [(p.get('name') or '').lower() for p in properties if isinstance(p, dict)]
+
+    is_ranged = 'ranged' in (w_data.get('type') or '').lower() or any('thrown' in n for n in prop_names)
+    range_cells = 1
+    if is_ranged:
+        range_data = w_data.get('range', {})
+        if isinstance(range_data, dict):
+            normal_ft = range_data.get('normal', 120)
+            if isinstance(normal_ft, (int, float)):
+                range_cells = max(1, int(normal_ft) // 5)
+        else:
+            range_cells = 24  # 120ft fallback
+
+    return WeaponProfile(
+        name=item.get('name', 'Weapon'),
+        has_data=True,
+        damage_dice=damage_dice,
+        is_finesse=any('finesse' in n for n in prop_names),
+        is_ranged=is_ranged,
+        is_offhand=idx > 0,
+        range_cells=range_cells,
+    )
+
+
+def _parse_count(entry: dict) -> int:
+    try:
+        return int(entry.get('count', 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def compile_profile(entity) -> CombatProfile:
+    """Build a profile from scratch. Prefer `get_profile`, which caches."""
+    max_range = 1
+    is_spellcaster = False
+
+    # Player equipment
+    weapons: Tuple[WeaponProfile, ...] = (UNARMED,)
+    sheet = getattr(entity, 'sheet_data', None)
+    if isinstance(sheet, dict):
+        equipped = [i for i in sheet.get('equipment', []) if isinstance(i, dict) and i.get('type') == 'Weapon']
+        if equipped:
+            weapons = tuple(_compile_weapon(w, idx) for idx, w in enumerate(equipped))
+        if sheet.get('spells'):
+            is_spellcaster = True
+        # AI range uses the weapon's listed normal range (thrown melee weapons don't extend reach here)
+        for w in equipped:
+            w_data = w.get('data', {})
+            if isinstance(w_data, dict) and 'ranged' in (w_data.get('type') or '').lower():
+                normal = w_data.get('range', {}).get('normal', 120) if isinstance(w_data.get('range', {}), dict) else None
+                if isinstance(normal, int):
+                    max_range = max(max_range, normal // 5)
+
+    # Monster stat block
+    attacks: Dict[str, dict] = {}
+    multiattack_type = None
+    multiattack: Tuple = ()
+    data = getattr(entity, 'data', None)
+    if isinstance(data, dict):
+        actions = [a for a in data.get('actions', []) if isinstance(a, dict)]
+        multi_action = None
+        for action in actions:
+            desc = (action.get('desc') or '').lower()
+            name = (action.get('name') or '').lower()
+            if 'ranged weapon attack' in desc or 'range ' in desc or 'ft.' in desc or 'feet' in desc:
+                match = _RANGE_RE.search(desc)
+                if match:
+                    max_range = max(max_range, int(match.group(1)) // 5)
+            if 'spellcasting' in name or 'spell' in name:
+                is_spellcaster = True
+            if 'multiattack' in name:
+                multi_action = multi_action or action
+            elif action.get('damage'):
+                attacks[action['name']] = action
+
+        if multi_action:
+            if multi_action.get('multiattack_type') == 'actions' and multi_action.get('actions'):
+                multiattack_type = 'actions'
+                multiattack = tuple(
+                    (e.get('action_name', ''), _parse_count(e)) for e in multi_action['actions']
+                )
+            elif multi_action.get('multiattack_type') == 'action_options' and multi_action.get('action_options'):
+                options = multi_action['action_options'].get('from', {}).get('options', [])
+                if options:
+                    multiattack_type = 'action_options'
+                    multiattack = tuple(
+                        tuple((i.get('action_name', ''), _parse_count(i)) for i in opt.get('items', []))
+                        for opt in options
+                    )
+
+    if is_spellcaster and max_range <= 1:
+        max_range = CANTRIP_FALLBACK_RANGE
+
+    return CombatProfile(
+        weapons=weapons,
+        attacks=attacks,
+        multiattack_type=multiattack_type,
+        multiattack=multiattack,
+        max_attack_range=max_range,
+        is_spellcaster=is_spellcaster,
+    )
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+_profiles: "OrderedDict[tuple, CombatProfile]" = OrderedDict()
+
+
+def _cache_key(entity) -> tuple:
+    sheet = getattr(entity, 'sheet_data', None)
+    if isinstance(sheet, dict):
+        equipped = tuple(
+            (i.get('id') or i.get('name'))
+            for i in sheet.get('equipment', []) if isinstance(i, dict) and i.get('type') == 'Weapon'
+        )
+        return ('entity', str(entity.id), equipped, bool(sheet.get('spells')))
+    data = getattr(entity, 'data', None)
+    actions = data.get('actions', []) if isinstance(data, dict) else []
+    names = tuple(a.get('name') for a in actions if isinstance(a, dict))
+    source = data.get('index') if isinstance(data, dict) and data.get('index') else str(entity.id)
+    return ('source', source, names)
+
+
+def get_profile(entity) -> CombatProfile:
+    key = _cache_key(entity)
+    profile = _profiles.get(key)
+    if profile is not None:
+        _profiles.move_to_end(key)
+        return profile
+    profile = compile_profile(entity)
+    _profiles[key] = profile
+    if len(_profiles) > MAX_CACHED_PROFILES:
+        _profiles.popitem(last=False)
+    return profile
+
+
+def invalidate(entity_id: str) -> None:
+    """Drop every cached profile compiled for this entity (equip/unequip)."""
+    entity_id = str(entity_id)
+    for key in [k for k in _profiles if k[1] == entity_id]:
+        del _profiles[key]
+
+
+def clear() -> None:
+    _profiles.clear()
@@ -1,5 +1,3 @@
-import asyncio
-import functools
 import random
 import logging
 from typing import TYPE_CHECKING
@@ -7,7 +5,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.state_service import StateService
 from app.services.pathfinding_service import PathfindingService
+from app.services.combat_profile import get_profile
+from app.utils.entity_index import ENEMY, NPC
+from app.utils.spatial_index import living
+from app.utils import tracing
 from game_engine.engine import GameEngine
+from game_engine.character_sheet import EntityView
 
 if TYPE_CHECKING:
     from app.models import GameState
@@ -135,6 +138,7 @@ class CombatService:
         return game_state.active_entity_id, game_state
 
     @staticmethod
+    @tracing.traced("combat.resolution_attack")
     async def resolution_attack(campaign_id: str, attacker_id: str, attacker_name: str, target_name: str, db: AsyncSession, current_state=None, commit: bool = True, target_id: str = None):
         """
         Mechanically resolves an attack.
@@ -175,60 +179,22 @@ class CombatService:
 
         # Engine Resolution
         engine = GameEngine()
-        actor_data = actor_char.model_dump() if hasattr(actor_char, 'model_dump') else actor_char.dict()
-        target_data = target_char.model_dump() if hasattr(target_char, 'model_dump') else target_char.dict()
+        # Zero-copy views over the live entities; the engine only reads them.
+        actor_data = EntityView(actor_char)
+        target_data = EntityView(target_char)
 
-        # Inject Equipped Weapon Stats if applicable
-        weapons = []
-        if hasattr(actor_char, 'sheet_data') and 'equipment' in actor_char.sheet_data:
-            weapons = [item for item in actor_char.sheet_data['equipment'] if isinstance(item, dict) and item.get('type') == 'Weapon']
-
-        # If no weapons, fallback to Unarmed
-        if not weapons:
-            weapons = [None]
+        # Equipped weapon parameters come precompiled from the actor's combat profile
+        # (unarmed / monster action fallback when nothing is equipped).
+        weapons = get_profile(actor_char).weapons
 
         action_results = []
-        loop = asyncio.get_running_loop()
-
-        for idx, weapon_data in enumerate(weapons):
-            params = {}
-            if weapon_data and 'data' in weapon_data:
-                if 'damage_dice' in weapon_data['data'].get('damage', {}):
-                    params['weapon_damage_dice'] = weapon_data['data']['damage']['damage_dice']
-                    params['weapon_name'] = weapon_data.get('name', 'Weapon')
-
-                properties = weapon_data['data'].get('properties', [])
-                for prop in properties:
-                    if isinstance(prop, dict) and 'finesse' in (prop.get('name') or '').lower():
-                        params['is_finesse'] = True
-                        break
-
-                w_type = (weapon_data['data'].get('type') or '').lower()
-                is_w_ranged = 'ranged' in w_type
-                for prop in properties:
-                    if isinstance(prop, dict) and 'thrown' in (prop.get('name') or '').lower():
-                        is_w_ranged = True
-
-                if is_w_ranged:
-                    params['is_ranged'] = True
-
-                # Second weapon is offhand
-                if idx > 0:
-                    params['is_offhand'] = True
+
+        for weapon in weapons:
+            params = weapon.attack_params()
 
             # Range Limit Check
             dist = actor_char.position.distance_to(target_char.position)
-            is_ranged_attack = params.get('is_ranged', False)
-
-            max_range = 1
-            if is_ranged_attack and weapon_data and 'data' in weapon_data:
-                range_data = weapon_data['data'].get('range', {})
-                if isinstance(range_data, dict):
-                    normal_range_ft = range_data.get('normal', 120)
-                    if isinstance(normal_range_ft, (int, float)):
-                        max_range = max(1, int(normal_range_ft) // 5)
-                else:
-                    max_range = 24 # Fallback 120ft
+            max_range = weapon.range_cells if weapon.is_ranged else 1
 
             if dist > max_range:
                 action_results.append({
@@ -252,18 +218,8 @@ class CombatService:
             if has_damage_resistance(target_char):
                 params["damage_resistance"] = True
 
-            # Run synchronous engine logic for this attack
-            res = await loop.run_in_executor(
-                None,
-                functools.partial(
-                    GameService._run_engine_resolution,
-                    engine,
-                    actor_data,
-                    "attack",
-                    target_data,
-                    params
-                )
-            )
+            # Pure-CPU dice math (microseconds): run inline, an executor hop costs more
+            res = GameService._run_engine_resolution(engine, actor_data, "attack", target_data, params)
             res['weapon_name'] = params.get('weapon_name')
             res['is_ranged'] = params.get('is_ranged', False)
             res['is_finesse'] = params.get('is_finesse', False)
@@ -277,6 +233,12 @@ class CombatService:
         if not action_results:
              return {"success": False, "message": "Attack failed to resolve."}
 
+        # One combat log entry per resolved swing (persisted as 'log' game events)
+        for r in action_results:
+            if r.get("success") and "is_hit" in r:
+                outcome = f"hit {r.get('damage_total', 0)}" if r["is_hit"] else "miss"
+                game_state.log_action(actor_char.id, "attack", f"{r.get('weapon_name') or 'attack'}: {outcome}", target_char.id)
+
         # Take the LAST result for state updates (HP, death, etc)
         action_result = action_results[-1]
 
@@ -298,7 +260,7 @@ class CombatService:
                         action_result["message"] = action_result.get("message", "") + conc_msg
 
             # Hostility — attacking a non-hostile NPC makes it hostile
-            is_npc = any(n.id == getattr(target_char, 'id', None) for n in game_state.npcs)
+            is_npc = game_state.entity_index().faction_of(getattr(target_char, 'id', None)) == "npc"
             if is_npc and not getattr(target_char, 'hostile', False):
                 target_char.hostile = True
                 if hasattr(target_char, 'data') and isinstance(target_char.data, dict):
@@ -430,8 +392,8 @@ class CombatService:
 
         # Engine Resolution
         engine = GameEngine()
-        actor_data = actor_char.model_dump() if hasattr(actor_char, 'model_dump') else actor_char.dict()
-        target_data = target_char.model_dump() if target_char and hasattr(target_char, 'model_dump') else target_char.dict() if target_char else None
+        actor_data = EntityView(actor_char)
+        target_data = EntityView(target_char) if target_char else None
 
         params = {
             "spell_data": matched_spell
@@ -461,18 +423,7 @@ class CombatService:
             if has_damage_resistance(target_char):
                 params["damage_resistance"] = True
 
-        loop = asyncio.get_running_loop()
-        action_result = await loop.run_in_executor(
-            None,
-            functools.partial(
-                GameService._run_engine_resolution,
-                engine,
-                actor_data,
-                "cast",
-                target_data,
-                params
-            )
-        )
+        action_result = GameService._run_engine_resolution(engine, actor_data, "cast", target_data, params)
 
         if not action_result.get("success"):
             return action_result
@@ -504,7 +455,7 @@ class CombatService:
             target_char.hp_current = new_hp
 
             # Hostility — casting on a non-hostile NPC makes it hostile
-            is_npc = any(n.id == getattr(target_char, 'id', None) for n in game_state.npcs)
+            is_npc = game_state.entity_index().faction_of(getattr(target_char, 'id', None)) == "npc"
             if is_npc and not getattr(target_char, 'hostile', False):
                 target_char.hostile = True
                 if hasattr(target_char, 'data') and isinstance(target_char.data, dict):
@@ -540,24 +491,15 @@ class CombatService:
         if not actor_char or not actor_char.position:
             return False, "", game_state
 
-        living_enemies = [e for e in game_state.enemies if getattr(e, 'hp_current', 0) > 0]
-        hostile_npcs = [n for n in game_state.npcs if n.hp_current > 0 and n.hostile]
-        all_hostiles = living_enemies + hostile_npcs
-
-        if not all_hostiles:
-            return False, "", game_state
-
-        # Filter by distance (<= 10) and Line of Sight
+        # Only hostiles standing within 10 cells are candidates; line of sight is
+        # checked for those alone.
+        index = game_state.spatial_index()
+        actor_cell = (actor_char.position.x, actor_char.position.y)
         walkable_cells = getattr(game_state.location, 'walkable_cells', [])
         valid_interrupters = []
-        for hostile in all_hostiles:
-            if not hostile.position:
+        for hostile in index.within(actor_cell, 10, factions=(ENEMY, NPC)):
+            if not living(hostile) or (index.faction_of(hostile) == NPC and not hostile.hostile):
                 continue
-
-            dist = hostile.position.distance_to(actor_char.position)
-            if dist > 10:
-                continue
-
             if PathfindingService.check_line_of_sight(hostile.position, actor_char.position, walkable_cells):
                 valid_interrupters.append(hostile)
 
@@ -569,6 +511,7 @@ class CombatService:
         if getattr(game_state, 'phase', '') != 'combat':
             game_state.phase = 'combat'
             if not getattr(game_state, 'turn_order', []):
+                all_hostiles = [e for e in game_state.enemies if living(e)] + [n for n in game_state.npcs if living(n) and n.hostile]
                 turn_order = [p.id for p in game_state.party if getattr(p, 'hp_current', 0) > 0] + [e.id for e in all_hostiles]
                 random.shuffle(turn_order)
                 game_state.turn_order = turn_order
@@ -581,10 +524,9 @@ class CombatService:
         await ChatService.save_message(campaign_id, 'system', 'System', interruption_msg, db=db)
 
         # We do NOT grant a free telekinetic melee attack from across the map.
-        # Just kickstart the combat loop naturally.
-
-        latest_state = await StateService.get_game_state(campaign_id, db)
-        return True, interruption_msg, latest_state
+        # Just kickstart the combat loop naturally. The in-memory state is what was
+        # just saved, so it is returned as-is rather than reloaded.
+        return True, interruption_msg, game_state
 
     @staticmethod
     async def _handle_entity_death(campaign_id: str, target_char, game_state: 'GameState', is_npc: bool, db: AsyncSession, commit: bool = True):
@@ -638,6 +580,7 @@ class CombatService:
             game_state.npcs = [n for n in game_state.npcs if getattr(n, 'id', None) != target_id_str]
         else:
             game_state.enemies = [e for e in game_state.enemies if getattr(e, 'id', None) != target_id_str]
+        game_state.roster_changed()
 
         if target_id_str in getattr(game_state, 'turn_order', []):
             game_state.turn_order.remove(target_id_str)
@@ -1,5 +1,6 @@
 import logging
 from db.session import AsyncSessionLocal
+from app.utils import tracing
 from app.commands.registry import CommandRegistry, CommandContext
 from app.commands.combat import AttackCommand, CastCommand, EndTurnCommand
 from app.commands.exploration import MoveCommand, IdentifyCommand, EquipCommand, UnequipCommand, RestCommand, CheckCommand
@@ -40,7 +41,8 @@ class CommandService:
                 sid=sid,
                 target_id=target_id
             )
-            was_command = await CommandRegistry.dispatch(content, ctx)
-            if was_command:
-                await db.commit()
-            return was_command
+            with tracing.span("command.dispatch", campaign_id=campaign_id):
+                was_command = await CommandRegistry.dispatch(content, ctx)
+                if was_command:
+                    await db.commit()
+                return was_command
@@ -0,0 +1,261 @@
+"""Compendium search: ranked fuzzy name/description search over the SRD tables.
+
+Replaces the old `WHERE name LIKE '%q%'` scans with one ranked query per request:
+
+  * exact name match > name prefix > trigram similarity > full-text rank over
+    name + description. Trigram terms are only used when `pg_trgm` is installed
+    (init_db creates it fail-open); without it we degrade to ILIKE + tsvector.
+  * structured filters per table (spell level/school/class, monster type/CR,
+    item type), validated against a whitelist — never interpolated from input.
+  * keyset pagination: the cursor is an opaque token carrying the last row's
+    sort key + id, so page N costs the same as page 1 (no OFFSET).
+  * `slim=True` projects only the indexed columns and skips the `data` blob and
+    its json.loads entirely — what the wizard's typeahead lists actually need.
+
+The SQL builder is a pure function so it is unit-testable without a database.
+"""
+import base64
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+
+# Must match the expression indexed in db/init_db.py exactly, or the planner
+# will not use the GIN index.
+SEARCH_DOCUMENT_SQL = "to_tsvector('english', name || ' ' || coalesce(data::jsonb ->> 'desc', ''))"
+# Same for the GIN expression index behind the spell "class" filter.
+SPELL_CLASSES_SQL = "data::jsonb -> 'classes'"
+
+# table -> extra scalar columns returned in slim mode, and the filters it accepts.
+# Filter kinds: "column" (equality on a real column), "int_column", "class"
+# (containment on data->'classes'), "cr" (normalized challenge rating).
+SEARCHABLE: Dict[str, Dict[str, Any]] = {
+    "spells": {"columns": ["level", "school"], "filters": {"level": "int_column", "school": "column", "class": "class"}},
+    "monsters": {"columns": ["type", "cr"], "filters": {"type": "column", "cr": "cr"}},
+    "items": {"columns": ["type"], "filters": {"type": "column"}},
+    "feats": {"columns": [], "filters": {}},
+    "races": {"columns": [], "filters": {}},
+    "subraces": {"columns": [], "filters": {}},
+    "classes": {"columns": [], "filters": {}},
+    "alignments": {"columns": [], "filters": {}},
+    "backgrounds": {"columns": [], "filters": {}},
+}
+
+_trgm_available: Optional[bool] = None
+
+
+class CompendiumQueryError(ValueError):
+    """Bad table, filter or cursor — maps to a 400 at the router."""
+
+
+# ── Cursor ────────────────────────────────────────────────────────────────────
+def encode_cursor(sort_key: Any, row_id: str) -> str:
+    raw = json.dumps([sort_key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise CompendiumQueryError(f"Invalid cursor: {e}")
+    return sort_key, str(row_id)
+
+
+def normalize_cr(cr: Any) -> str:
+    """'1/4' -> '0.25', '2' -> '2'. Stored CR strings use the SRD float form."""
+    value = str(cr).strip()
+    if "/" in value:
+        num, _, den = value.partition("/")
+        try:
+            return f"{int(num) / int(den):g}"
+        except (ValueError, ZeroDivisionError):
+            raise CompendiumQueryError(f"Invalid CR: {cr}")
+    try:
+        return f"{float(value):g}"
+    except ValueError:
+        raise CompendiumQueryError(f"Invalid CR: {cr}")
+
+
+# ── Query builder (pure) ──────────────────────────────────────────────────────
+def build_search_query(
+    table: str,
+    q: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    slim: bool = False,
+    use_trgm: bool = True,
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the ranked search SQL and its bind params.
+
+    Fetches `limit + 1` rows so the caller can tell whether a next page exists.
+    """
+    if table not in SEARCHABLE:
+        raise CompendiumQueryError(f"Invalid table name: {table}")
+    spec = SEARCHABLE[table]
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    q = (q or "").strip()
+
+    params: Dict[str, Any] = {"limit": limit + 1}
+    where: List[str] = []
+
+    for key, value in (filters or {}).items():
+        if value is None or value == "":
+            continue
+        kind = spec["filters"].get(key)
+        if kind is None:
+            raise CompendiumQueryError(f"Filter '{key}' is not supported for {table}")
+        param = f"f_{key}"
+        if kind == "int_column":
+            where.append(f"{key} = :{param}")
+            params[param] = int(value)
+        elif kind == "column":
+            where.append(f"lower({key}) = lower(:{param})")
+            params[param] = str(value)
+        elif kind == "cr":
+            where.append(f"cr = :{param}")
+            params[param] = normalize_cr(value)
+        elif kind == "class":
+            where.append(f"{SPELL_CLASSES_SQL} @> CAST(:{param} AS jsonb)")
+            params[param] = json.dumps([{"index": str(value).strip().lower()}])
+
+    columns = ["id", "name"] + spec["columns"]
+    if not slim:
+        columns.append("data")
+
+    if q:
+        params["q"] = q
+        params["q_contains"] = f"%{q}%"
+        params["q_prefix"] = f"{q}%"
+        tsquery = "plainto_tsquery('english', :q)"
+        score_terms = [
+            "CASE WHEN lower(name) = lower(:q) THEN 2 ELSE 0 END",
+            "CASE WHEN name ILIKE :q_prefix THEN 1 ELSE 0 END",
+            f"ts_rank({SEARCH_DOCUMENT_SQL}, {tsquery})",
+        ]
+        match_terms = ["name ILIKE :q_contains", f"{SEARCH_DOCUMENT_SQL} @@ {tsquery}"]
+        if use_trgm:
+            score_terms.append("similarity(name, :q)")
+            match_terms.append("name % :q")
+        where.append("(" + " OR ".join(match_terms) + ")")
+        score_sql = "round((" + " + ".join(score_terms) + ")::numeric, 6)"
+
+        inner = f"SELECT {', '.join(columns)}, {score_sql} AS score FROM {table}"
+        if where:
+            inner += " WHERE " + " AND ".join(where)
+        sql = f"SELECT * FROM ({inner}) ranked"
+        if cursor:
+            last_score, last_id = decode_cursor(cursor)
+            sql += " WHERE (score < CAST(:c_score AS numeric) OR (score = CAST(:c_score AS numeric) AND id > :c_id))"
+            params["c_score"] = str(last_score)
+            params["c_id"] = last_id
+        sql += " ORDER BY score DESC, id LIMIT :limit"
+    else:
+        if cursor:
+            last_name, last_id = decode_cursor(cursor)
+            where.append("(name, id) > (:c_name, :c_id)")
+            params["c_name"] = str(last_name)
+            params["c_id"] = last_id
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY name, id LIMIT :limit"
+
+    return sql, params
+
+
+def _row_to_result(row: Dict[str, Any], slim: bool) -> Dict[str, Any]:
+    result = {k: v for k, v in row.items() if k not in ("data", "score")}
+    if "score" in row and row["score"] is not None:
+        result["score"] = float(row["score"])
+    if not slim:
+        raw = row.get("data")
+        try:
+            result["data"] = json_codec.loads(raw) if isinstance(raw, str) else (raw or {})
+        except json.JSONDecodeError:
+            result["data"] = {}
+    return result
+
+
+def build_page(rows: List[Dict[str, Any]], limit: int, q: Optional[str], slim: bool) -> Dict[str, Any]:
+    """Trim the +1 probe row and derive the next cursor from the last kept row."""
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        sort_key = str(last["score"]) if (q or "").strip() else last["name"]
+        next_cursor = encode_cursor(sort_key, last["id"])
+    return {"results": [_row_to_result(r, slim) for r in rows], "next_cursor": next_cursor}
+
+
+# ── DB access ─────────────────────────────────────────────────────────────────
+async def _has_trgm(db: AsyncSession) -> bool:
+    """pg_trgm is optional (managed Postgres may refuse CREATE EXTENSION). Probed once."""
+    global _trgm_available
+    if _trgm_available is None:
+        try:
+            res = await db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+            _trgm_available = res.scalar() is not None
+        except SQLAlchemyError as e:
+            logger.warning(f"pg_trgm probe failed, falling back to ILIKE/full-text: {e}")
+            _trgm_available = False
+    return _trgm_available
+
+
+async def search(
+    db: AsyncSession,
+    table: str,
+    q: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    slim: bool = False,
+) -> Dict[str, Any]:
+    """Ranked, filtered, keyset-paginated search. Returns {results, next_cursor}."""
+    use_trgm = await _has_trgm(db) if (q or "").strip() else False
+    sql, params = build_search_query(table, q, filters, limit, cursor, slim, use_trgm)
+    result = await db.execute(text(sql), params)
+    rows = [dict(r) for r in result.mappings().all()]
+    return build_page(rows, limit, q, slim)
+
+
+async def lookup_by_name(db: AsyncSession, table: str, name: str) -> Optional[dict]:
+    """Best single match for `name`: exact, then prefix, then shortest containing name.
+
+    One indexed query instead of the old exact-then-partial pair of ILIKE scans.
+    Returns the parsed `data` blob, or None.
+    """
+    if table not in SEARCHABLE:
+        raise CompendiumQueryError(f"Invalid table name: {table}")
+    if not name or not name.strip():
+        return None
+    name = name.strip()
+    result = await db.execute(
+        text(
+            f"SELECT data FROM {table} WHERE name ILIKE :q_contains "
+            "ORDER BY (lower(name) = lower(:q)) DESC, (name ILIKE :q_prefix) DESC, length(name), name "
+            "LIMIT 1"
+        ),
+        {"q": name, "q_contains": f"%{name}%", "q_prefix": f"{name}%"},
+    )
+    raw = result.scalar()
+    if raw is None:
+        return None
+    try:
+        return json_codec.loads(raw) if isinstance(raw, str) else raw
+    except json.JSONDecodeError:
+        return None
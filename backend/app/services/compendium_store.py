@@ -0,0 +1,173 @@
+"""Process-wide, read-only SRD compendium loaded once at startup.
+
+The SRD tables (spells, monsters, items, classes, races, alignments) never change
+while the server runs, yet spell casts, loot enrichment and the compendium routes
+used to round-trip to Postgres and re-parse the same JSON text every time. This
+module parses `json_data/` once into id / lowercase-name / normalized-name indexes
+and pre-computes the engine form of every spell (`normalize_spell_for_engine`).
+
+Read-through: callers ask the store first and fall back to the database on a miss
+(campaign-scoped rows, feats/subraces, or a store that failed to load). Nothing
+here may be mutated by callers; engine spells are handed out as deep copies
+because they flow into game state.
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from app.services.data_loader import DATA_DIR, load_json_file
+
+logger = logging.getLogger(__name__)
+
+# table -> source file. Alignments come from the `alignments` key of stats_box.json.
+SOURCES = {
+    "spells": "spell_box.json",
+    "items": "equipment_box.json",
+    "monsters": "monsters.json",
+    "classes": "class_box.json",
+    "races": "race_box.json",
+}
+STATS_SOURCES = {"alignments": "stats_box.json", "backgrounds": "stats_box.json"}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """'Acid Arrow', 'acid-arrow' and ' ACID_ARROW ' all map to 'acid arrow'."""
+    return _NON_ALNUM.sub(" ", str(name).lower()).strip()
+
+
+def srd_row(table: str, item: dict) -> Optional[Dict[str, Any]]:
+    """Build the same row shape data_loader.import_table writes, with `data` parsed."""
+    record_id, name = item.get("index"), item.get("name")
+    if not record_id or not name:
+        return None
+    row: Dict[str, Any] = {"id": record_id, "name": name, "data": item}
+    if table == "spells":
+        try:
+            row["level"] = int(item.get("level", 0))
+        except (ValueError, TypeError):
+            row["level"] = 0
+        school = item.get("school", {})
+        row["school"] = school.get("name", "Unknown") if isinstance(school, dict) else str(school)
+    elif table == "monsters":
+        row["type"] = item.get("type", "unknown")
+        row["cr"] = str(item.get("challenge_rating", 0))
+    elif table == "items":
+        category = item.get("equipment_category", {})
+        row["type"] = category.get("name", "Item") if isinstance(category, dict) else "Item"
+    return row
+
+
+class CompendiumTable:
+    """Indexes over one SRD table. Rows keep data_loader's column names."""
+
+    def __init__(self, name: str, rows: List[Dict[str, Any]]):
+        self.name = name
+        self.rows = sorted(rows, key=lambda r: (r["name"], r["id"]))
+        self.by_id = {r["id"]: r for r in self.rows}
+        self.by_lower = {}
+        self.by_norm = {}
+        for r in self.rows:
+            self.by_lower.setdefault(r["name"].lower(), r)
+            self.by_norm.setdefault(normalize_name(r["name"]), r)
+            self.by_norm.setdefault(normalize_name(r["id"]), r)
+        canonical = json.dumps(self.rows, sort_keys=True, separators=(",", ":"), default=str)
+        self.etag = hashlib.sha1(canonical.encode()).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(record_id)
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Exact, then normalized, then prefix, then shortest containing match —
+        the same preference order as compendium_service.lookup_by_name."""
+        if not name or not str(name).strip():
+            return None
+        lowered = str(name).strip().lower()
+        hit = self.by_lower.get(lowered) or self.by_norm.get(normalize_name(lowered))
+        if hit:
+            return hit
+        candidates = [r for r in self.rows if lowered in r["name"].lower()]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda r: (not r["name"].lower().startswith(lowered), len(r["name"]), r["name"]))
+
+
+class CompendiumStore:
+    def __init__(self, tables: Dict[str, CompendiumTable]):
+        self.tables = tables
+        self.version = hashlib.sha1("".join(t.etag for _, t in sorted(tables.items())).encode()).hexdigest()
+        self._engine_spells: Dict[str, dict] = {}
+        spells = tables.get("spells")
+        if spells:
+            from app.services.spell_service import normalize_spell_for_engine
+            for row in spells.rows:
+                try:
+                    self._engine_spells[row["id"]] = normalize_spell_for_engine(row["data"])
+                except (AttributeError, TypeError, ValueError) as e:
+                    logger.warning(f"Could not pre-normalize spell {row['id']}: {e}")
+
+    def table(self, name: str) -> Optional[CompendiumTable]:
+        return self.tables.get(name)
+
+    def get(self, table: str, record_id: str) -> Optional[Dict[str, Any]]:
+        t = self.tables.get(table)
+        return t.get(record_id) if t else None
+
+    def find(self, table: str, name: str) -> Optional[Dict[str, Any]]:
+        t = self.tables.get(table)
+        return t.find(name) if t else None
+
+    def engine_spell(self, index: Optional[str] = None, name: Optional[str] = None) -> Optional[dict]:
+        """Engine-format spell by SRD index or name, as a private deep copy."""
+        if index and index in self._engine_spells:
+            return copy.deepcopy(self._engine_spells[index])
+        if name:
+            row = self.find("spells", name)
+            if row and row["id"] in self._engine_spells:
+                return copy.deepcopy(self._engine_spells[row["id"]])
+        return None
+
+
+def build_store(data_dir: str = DATA_DIR) -> CompendiumStore:
+    tables: Dict[str, CompendiumTable] = {}
+    for table, filename in SOURCES.items():
+        items = load_json_file(os.path.join(data_dir, filename))
+        if isinstance(items, list) and items:
+            tables[table] = CompendiumTable(table, [r for r in (srd_row(table, i) for i in items) if r])
+    stats = load_json_file(os.path.join(data_dir, "stats_box.json"))
+    if isinstance(stats, dict):
+        for table in STATS_SOURCES:
+            if stats.get(table):
+                tables[table] = CompendiumTable(table, [r for r in (srd_row(table, i) for i in stats[table]) if r])
+    return CompendiumStore(tables)
+
+
+_store: Optional[CompendiumStore] = None
+
+
+def load_store(data_dir: str = DATA_DIR) -> Optional[CompendiumStore]:
+    """Build and publish the store. Fail-open: on error the store stays unset and
+    every caller falls back to the database."""
+    global _store
+    try:
+        _store = build_store(data_dir)
+        logger.info(
+            "Compendium store loaded: "
+            + ", ".join(f"{name}={len(t)}" for name, t in sorted(_store.tables.items()))
+        )
+    except (OSError, ValueError) as e:
+        logger.warning(f"Compendium store unavailable, falling back to DB lookups: {e}")
+        _store = None
+    return _store
+
+
+def get_store() -> Optional[CompendiumStore]:
+    return _store
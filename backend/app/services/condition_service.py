@@ -294,7 +294,7 @@ def check_concentration_save(caster, damage: int) -> bool:
     from game_engine.dice import Dice
 
     dc = max(10, damage // 2)
-    sheet = CharacterSheet(caster.model_dump() if hasattr(caster, 'model_dump') else {})
+    sheet = CharacterSheet.from_entity(caster) if hasattr(caster, 'model_dump') else CharacterSheet({})
     save_mod = sheet.get_save("constitution")
     roll = Dice.roll("1d20")
     total = roll["total"] + save_mod
@@ -1,10 +1,11 @@
-import json
 import logging
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from app.models import GameState, Player, NPC
+from app.utils import json_codec
+from app.utils.json_blob import load_blob
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,6 @@ async def format_player_state(party: List[Player]) -> str:
     """
 
     # Return as JSON block to prevent narrative leak
-    import json
     party_data = []
     for p in party:
         sheet = p.sheet_data or {}
@@ -67,7 +67,7 @@ async def format_player_state(party: List[Player]) -> str:
         }
         party_data.append(p_info)
 
-    return "```json\n" + json.dumps(party_data, indent=2) + "\n```"
+    return "```json\n" + json_codec.dumps(party_data, indent=True) + "\n```"
 
 async def format_npc_state(npcs: List[NPC]) -> str:
     """
@@ -188,7 +188,7 @@ async def build_narrative_context(db: AsyncSession, campaign_id: str, state: Gam
             )
             l_row = l_res.mappings().fetchone()
             if l_row:
-                l_data = json.loads(l_row['data'])
+                l_data = load_blob(l_row['data'])
                 description_data = l_data.get('description', {})
                 connections = description_data.get('connections', [])
                 if connections:
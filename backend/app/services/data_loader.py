@@ -1,10 +1,12 @@
-import json
 import os
 import logging
+import asyncpg
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from db.session import AsyncSessionLocal
+from app.services import sync_manifest
+from app.utils import json_codec
 
 # Define paths relative to this file
 # backend/app/services/data_loader.py
@@ -19,8 +21,8 @@ def load_json_file(filepath):
     if not os.path.exists(filepath):
         logger.warning(f"{filepath} not found.")
         return []
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(filepath, 'rb') as f:
+        return json_codec.loads(f.read())
 
 async def is_dataset_loaded(db: AsyncSession):
     try:
@@ -36,6 +38,92 @@ async def is_dataset_loaded(db: AsyncSession):
         logger.error("Database error checking dataset status: %s", str(e))
         return False
 
+# Per-table upsert shape: (columns, row builder). Rows without an index or name are skipped.
+def _int_level(item):
+    try:
+        return int(item.get('level', 0))
+    except (ValueError, TypeError):
+        return 0
+
+
+TABLE_COLUMNS = {
+    "spells": (("id", "name", "level", "school", "data"), lambda item: {
+        "level": _int_level(item),
+        "school": item.get('school', {}).get('name', 'Unknown'),
+    }),
+    "monsters": (("id", "name", "type", "cr", "data"), lambda item: {
+        "type": item.get('type', 'unknown'),
+        "cr": str(item.get('challenge_rating', 0)),
+    }),
+    "items": (("id", "name", "type", "data"), lambda item: {
+        "type": item.get('equipment_category', {}).get('name', 'Item'),
+    }),
+}
+for _simple in ("classes", "races", "alignments", "backgrounds"):
+    TABLE_COLUMNS[_simple] = (("id", "name", "data"), lambda item: {})
+
+# (manifest source, file, [(table, key in file or None for a top-level list)])
+DATASET_FILES = [
+    ("dataset:spell_box.json", "spell_box.json", [("spells", None)]),
+    ("dataset:equipment_box.json", "equipment_box.json", [("items", None)]),
+    ("dataset:monsters.json", "monsters.json", [("monsters", None)]),
+    ("dataset:class_box.json", "class_box.json", [("classes", None)]),
+    ("dataset:race_box.json", "race_box.json", [("races", None)]),
+    ("dataset:stats_box.json", "stats_box.json", [("alignments", "alignments"), ("backgrounds", "backgrounds")]),
+]
+
+
+def build_rows(table_name, items, name_key="name"):
+    """Upsert rows for one compendium table. Later duplicates of an id win, as they
+    did when rows were upserted one by one."""
+    columns, extra = TABLE_COLUMNS[table_name]
+    rows = {}
+    for item in items:
+        record_id = item.get('index')
+        name = item.get(name_key)
+        if not record_id or not name: continue
+        rows[record_id] = {"id": record_id, "name": name, "data": json_codec.dumps(item), **extra(item)}
+    return columns, list(rows.values())
+
+
+async def _copy_connection(db: AsyncSession):
+    """The session's underlying asyncpg connection, or None if COPY isn't available."""
+    try:
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+    except (SQLAlchemyError, AttributeError):
+        return None
+    return driver if isinstance(driver, asyncpg.Connection) else None
+
+
+async def upsert_rows(db: AsyncSession, table_name, columns, rows):
+    """Upsert `rows` into `table_name` on id. COPYs into a temp table and merges with a
+    single INSERT ... SELECT ... ON CONFLICT; falls back to a batched executemany
+    when the session isn't backed by asyncpg. Joins the caller's transaction."""
+    col_list = ", ".join(columns)
+    updates = ", ".join(f"{c}=excluded.{c}" for c in columns if c != "id")
+    driver = await _copy_connection(db)
+    if driver is None:
+        values = ", ".join(f":{c}" for c in columns)
+        await db.execute(
+            text(f"INSERT INTO {table_name} ({col_list}) VALUES ({values}) ON CONFLICT(id) DO UPDATE SET {updates}"),
+            rows
+        )
+        return
+
+    staging = f"_import_{table_name}"
+    await db.execute(text(f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    await driver.copy_records_to_table(
+        staging, records=[tuple(r[c] for c in columns) for r in rows], columns=list(columns)
+    )
+    await db.execute(text(
+        f"INSERT INTO {table_name} ({col_list}) SELECT {col_list} FROM {staging} "
+        f"ON CONFLICT(id) DO UPDATE SET {updates}"
+    ))
+    await db.execute(text(f"TRUNCATE {staging}"))
+
+
 async def import_table(db: AsyncSession, table_name, json_filename, json_dir, name_key="name"):
     logger.info(f"--- Importing {table_name} from {json_filename} ---")
     filepath = os.path.join(json_dir, json_filename)
@@ -44,110 +132,16 @@ async def import_table(db: AsyncSession, table_name, json_filename, json_dir, na
         logger.warning(f"No items found in {json_filename}")
         return 0
 
-    batch_params = []
-
-    # Prepare SQL statement based on table
-    if table_name == "spells":
-        sql = text("""
-            INSERT INTO spells (id, name, level, school, data)
-            VALUES (:id, :name, :level, :school, :data)
-            ON CONFLICT(id) DO UPDATE SET
-                name=excluded.name,
-                level=excluded.level,
-                school=excluded.school,
-                data=excluded.data
-        """)
-        for item in items:
-            record_id = item.get('index')
-            name = item.get(name_key)
-            if not record_id or not name: continue
-
-            level = item.get('level', 0)
-            try: level = int(level)
-            except (ValueError, TypeError): level = 0
-
-            batch_params.append({
-                "id": record_id,
-                "name": name,
-                "level": level,
-                "school": item.get('school', {}).get('name', 'Unknown'),
-                "data": json.dumps(item)
-            })
-
-    elif table_name == "monsters":
-        sql = text("""
-            INSERT INTO monsters (id, name, type, cr, data)
-            VALUES (:id, :name, :type, :cr, :data)
-            ON CONFLICT(id) DO UPDATE SET
-                name=excluded.name,
-                type=excluded.type,
-                cr=excluded.cr,
-                data=excluded.data
-        """)
-        for item in items:
-            record_id = item.get('index')
-            name = item.get(name_key)
-            if not record_id or not name: continue
-
-            cr = str(item.get('challenge_rating', 0))
-            batch_params.append({
-                "id": record_id,
-                "name": name,
-                "type": item.get('type', 'unknown'),
-                "cr": cr,
-                "data": json.dumps(item)
-            })
-
-    elif table_name == "items":
-        sql = text("""
-            INSERT INTO items (id, name, type, data)
-            VALUES (:id, :name, :type, :data)
-            ON CONFLICT(id) DO UPDATE SET
-                name=excluded.name,
-                type=excluded.type,
-                data=excluded.data
-        """)
-        for item in items:
-            record_id = item.get('index')
-            name = item.get(name_key)
-            if not record_id or not name: continue
-
-            batch_params.append({
-                "id": record_id,
-                "name": name,
-                "type": item.get('equipment_category', {}).get('name', 'Item'),
-                "data": json.dumps(item)
-            })
-
-    elif table_name in ["classes", "races", "alignments", "backgrounds"]:
-        sql = text(f"""
-            INSERT INTO {table_name} (id, name, data)
-            VALUES (:id, :name, :data)
-            ON CONFLICT(id) DO UPDATE SET
-                name=excluded.name,
-                data=excluded.data
-        """)
-        for item in items:
-            record_id = item.get('index')
-            name = item.get(name_key)
-            if not record_id or not name: continue
-
-            batch_params.append({
-                "id": record_id,
-                "name": name,
-                "data": json.dumps(item)
-            })
-
-    else:
+    if table_name not in TABLE_COLUMNS:
         logger.warning(f"Unknown table {table_name}")
         return 0
 
+    columns, batch_params = build_rows(table_name, items, name_key)
     if batch_params:
         try:
-            # Execute batch insert
-            await db.execute(sql, batch_params)
+            await upsert_rows(db, table_name, columns, batch_params)
             await db.commit()
-            logger.info(f"Processed {len(batch_params)} records for {table_name} (Batched)")
+            logger.info(f"Processed {len(batch_params)} records for {table_name} (COPY)")
             return len(batch_params)
         except SQLAlchemyError as e:
             logger.error("Database error executing batch for %s: %s", table_name, str(e))
@@ -156,53 +150,54 @@ async def import_table(db: AsyncSession, table_name, json_filename, json_dir, na
 
     return 0
 
-async def load_basic_dataset():
-    logger.info("Loading basic dataset...")
 
+async def _import_file(db: AsyncSession, filename, targets):
+    """Upsert every table fed by one dataset file. Returns False if the file is unusable."""
+    data = load_json_file(os.path.join(DATA_DIR, filename))
+    if not data:
+        logger.warning(f"No items found in {filename}")
+        return False
+    for table_name, key in targets:
+        items = data if key is None else (data.get(key, []) if isinstance(data, dict) else [])
+        columns, rows = build_rows(table_name, items)
+        if rows:
+            await upsert_rows(db, table_name, columns, rows)
+            logger.info(f"Processed {len(rows)} records for {table_name}")
+    return True
+
+
+async def sync_basic_dataset(force: bool = False):
+    """Import the SRD dataset files whose content changed since the last sync.
+
+    `force` (or an empty compendium) re-imports every file regardless of the manifest.
+    Each file commits with its manifest entry, so a failure part-way leaves the
+    finished files recorded and the rest to retry next time.
+    """
     if not os.path.exists(DATA_DIR):
         msg = f"Error: Could not find data directory at {DATA_DIR}"
         logger.error(msg)
         return False, msg
 
-    logger.info(f"Found data directory at {DATA_DIR}")
-
-    # Create a new session
     async with AsyncSessionLocal() as db:
+        if not force and not await is_dataset_loaded(db):
+            force = True
+        manifest = {} if force else await sync_manifest.load_manifest(db, "dataset:")
+
+        imported, skipped = [], []
         try:
-            # Map tables to files
-            await import_table(db, "spells", "spell_box.json", DATA_DIR)
-            await import_table(db, "items", "equipment_box.json", DATA_DIR)
-            await import_table(db, "monsters", "monsters.json", DATA_DIR)
-            await import_table(db, "classes", "class_box.json", DATA_DIR)
-            await import_table(db, "races", "race_box.json", DATA_DIR)
-
-            # Load stats box for alignments and backgrounds
-            if os.path.exists(os.path.join(DATA_DIR, "stats_box.json")):
-                 stats = load_json_file(os.path.join(DATA_DIR, "stats_box.json"))
-
-                 if isinstance(stats, dict):
-                     if "alignments" in stats:
-                         logger.info("Importing alignments from stats_box.json")
-                         for item in stats["alignments"]:
-                             await db.execute(text("""
-                                INSERT INTO alignments (id, name, data)
-                                VALUES (:id, :name, :data)
-                                ON CONFLICT(id) DO UPDATE SET name=excluded.name, data=excluded.data
-                             """), {"id": item.get('index'), "name": item.get('name'), "data": json.dumps(item)})
-
-                     if "backgrounds" in stats:
-                         logger.info("Importing backgrounds from stats_box.json")
-                         for item in stats["backgrounds"]:
-                             await db.execute(text("""
-                                INSERT INTO backgrounds (id, name, data)
-                                VALUES (:id, :name, :data)
-                                ON CONFLICT(id) DO UPDATE SET name=excluded.name, data=excluded.data
-                             """), {"id": item.get('index'), "name": item.get('name'), "data": json.dumps(item)})
-
-                     await db.commit()
-
-            return True, "Dataset loaded successfully from custom JSON."
+            for source, filename, targets in DATASET_FILES:
+                digest = sync_manifest.file_hash(os.path.join(DATA_DIR, filename))
+                if digest is None:
+                    continue
+                if manifest.get(source) == digest:
+                    skipped.append(filename)
+                    continue
+                if await _import_file(db, filename, targets):
+                    await sync_manifest.record(db, source, digest)
+                    imported.append(filename)
+                await db.commit()
         except SQLAlchemyError as e:
+            await db.rollback()
             msg = f"Dataset database load failed: {str(e)}"
             logger.error(msg)
             return False, msg
@@ -210,3 +205,11 @@ async def load_basic_dataset():
             msg = f"Dataset file load failed: {str(e)}"
             logger.error(msg)
             return False, msg
+
+    logger.info(f"Dataset sync: imported {imported or 'nothing'}, unchanged {len(skipped)} file(s)")
+    return True, "Dataset loaded successfully from custom JSON."
+
+
+async def load_basic_dataset():
+    logger.info("Loading basic dataset...")
+    return await sync_basic_dataset(force=True)
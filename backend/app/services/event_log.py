@@ -0,0 +1,137 @@
+"""Typed game events: derived from saves, replayed on load.
+
+Most saves change only a few small things: who moved, who lost HP, whose turn it is.
+StateService.save_game_state compares the state against what this process last
+committed for the campaign and, when every difference is one of these, appends one
+`game_events` row per change instead of rewriting the `game_states` document and
+every entity row. Anything else (loot, spell slots, roster or location changes) and
+every SNAPSHOT_EVERY events, it writes the full snapshot as before, and its
+`event_seq` records the last event folded in. get_game_state loads the snapshot and
+replays the events after it.
+
+The comparison only trusts a baseline the state was actually loaded or saved from:
+`GameState._event_seq` and `version` must match it, and so must a digest of
+everything the events cannot express. Any mismatch (another worker wrote, a fresh
+process, a rolled-back save) simply produces a snapshot.
+
+Event kinds and payloads:
+
+  move        {"id", "x", "y"}
+  hp          {"id", "hp", "delta"}
+  conditions  {"id", "conditions": [Condition dicts]}
+  turn        the changed subset of TURN_FIELDS
+  log         one combat_log entry (LogEntry dict, e.g. an attack result)
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models import COMBAT_LOG_MAX
+from app.utils import json_codec
+
+MOVE = 'move'
+HP = 'hp'
+CONDITIONS = 'conditions'
+TURN = 'turn'
+LOG = 'log'
+
+# A full snapshot is written once this many events have accumulated since the last
+# one, which bounds the replay on load.
+SNAPSHOT_EVERY = 25
+
+ENTITY_GROUPS = ('party', 'enemies', 'npcs')
+HOT_ENTITY_FIELDS = ('position', 'hp_current', 'conditions')
+TURN_FIELDS = ('turn_index', 'phase', 'active_entity_id', 'turn_order',
+               'has_moved_this_turn', 'has_acted_this_turn')
+# Top-level fields carried by events (or by the event rows themselves, for version)
+_EVENT_FIELDS = frozenset(TURN_FIELDS) | {'version', 'combat_log'}
+
+Event = Tuple[str, dict]
+
+
+@dataclass(frozen=True)
+class StateView:
+    """What a committed save looked like, as far as event derivation is concerned."""
+    seq: int
+    version: int
+    since_snapshot: int
+    digest: str
+    hot: Dict[str, tuple]
+    turn: Dict[str, object]
+    log: List[dict]
+
+
+def capture(dump: dict, seq: int, version: int, since_snapshot: int) -> StateView:
+    """View of a `GameState.model_dump()`."""
+    cold = {k: v for k, v in dump.items() if k not in _EVENT_FIELDS}
+    hot = {}
+    for group in ENTITY_GROUPS:
+        cold[group] = []
+        for doc in dump.get(group) or []:
+            cold[group].append({k: v for k, v in doc.items() if k not in HOT_ENTITY_FIELDS})
+            hot[doc['id']] = (doc.get('position'), doc.get('hp_current'), doc.get('conditions') or [])
+    # Sorted keys: the entity blobs come back from JSONB in a different key order.
+    digest = hashlib.blake2b(json_codec.dumpb(cold, sort_keys=True), digest_size=16).hexdigest()
+    return StateView(
+        seq=seq, version=version, since_snapshot=since_snapshot, digest=digest, hot=hot,
+        turn={k: dump.get(k) for k in TURN_FIELDS}, log=list(dump.get('combat_log') or []),
+    )
+
+
+def _appended(old: List[dict], new: List[dict]) -> Optional[List[dict]]:
+    """Entries appended to the capped log `old` to get `new`, or None if `new` is not
+    `old` plus appends."""
+    for start in range(len(old) + 1):
+        kept = old[start:]
+        if new[:len(kept)] == kept:
+            added = new[len(kept):]
+            if (old + added)[-COMBAT_LOG_MAX:] == new:
+                return added
+    return None
+
+
+def diff(base: StateView, current: StateView) -> Optional[List[Event]]:
+    """Events that turn `base` into `current`, or None when something outside the
+    events changed and a snapshot is needed."""
+    if base.digest != current.digest:
+        return None
+    added = _appended(base.log, current.log)
+    if added is None:
+        return None
+
+    events: List[Event] = []
+    for entity_id, (pos, hp, conditions) in current.hot.items():
+        old_pos, old_hp, old_conditions = base.hot[entity_id]
+        if pos != old_pos:
+            events.append((MOVE, {'id': entity_id, 'x': pos['x'], 'y': pos['y']}))
+        if hp != old_hp:
+            events.append((HP, {'id': entity_id, 'hp': hp, 'delta': hp - old_hp}))
+        if conditions != old_conditions:
+            events.append((CONDITIONS, {'id': entity_id, 'conditions': conditions}))
+    turn = {k: v for k, v in current.turn.items() if v != base.turn.get(k)}
+    if turn:
+        events.append((TURN, turn))
+    events.extend((LOG, entry) for entry in added)
+    return events
+
+
+def apply(state_data: dict, events: Iterable[Event]) -> None:
+    """Replay events onto a hydrated state document (entity docs included), in place."""
+    docs = {doc['id']: doc for group in ENTITY_GROUPS for doc in state_data.get(group) or []}
+    for kind, payload in events:
+        if kind == TURN:
+            state_data.update(payload)
+        elif kind == LOG:
+            log = state_data.setdefault('combat_log', [])
+            log.append(payload)
+            del log[:-COMBAT_LOG_MAX]
+        else:
+            doc = docs.get(payload.get('id'))
+            if doc is None:
+                continue
+            if kind == MOVE:
+                doc['position'] = {'x': payload['x'], 'y': payload['y']}
+            elif kind == HP:
+                doc['hp_current'] = payload['hp']
+            elif kind == CONDITIONS:
+                doc['conditions'] = payload['conditions']
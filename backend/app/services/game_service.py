@@ -1,5 +1,4 @@
 from app.services.combat_service import CombatService
-import json
 import asyncio
 from typing import TYPE_CHECKING
 from sqlalchemy import select
@@ -7,8 +6,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import GameState, Location
 from db.schema import locations
 from app.services.state_service import StateService
+from app.services.image_job_service import ImageJobService
 from app.services.pathfinding_service import PathfindingService
 from app.utils.grid_utils import chebyshev_distance
+from app.utils.json_blob import load_blob
 
 if TYPE_CHECKING:
     pass
@@ -16,66 +17,29 @@ if TYPE_CHECKING:
 class GameService:
     @staticmethod
     def _find_char_by_name(game_state, search_term: str, target_id: str = None):
-        if target_id:
-            for li in [game_state.party, game_state.enemies, game_state.npcs]:
-                for c in li:
-                    if c.id == target_id:
-                        return c
-
-        if not search_term:
-            return None
-
-        term = search_term.lower()
-
-        # Priority 1: Exact ID or target_id Match
-        for li in [game_state.party, game_state.enemies, game_state.npcs]:
-            for c in li:
-                if term == c.id.lower():
-                    return c
-                if hasattr(c, 'target_id') and c.target_id and term == c.target_id.lower():
-                    return c
-
-        # Priority 2: Exact Name Match
-        for li in [game_state.party, game_state.enemies, game_state.npcs]:
-            for c in li:
-                if term == c.name.lower():
-                    return c
-
-        # Priority 3: Prefix Name Match
-        for li in [game_state.party, game_state.enemies, game_state.npcs]:
-            for c in li:
-                if c.name.lower().startswith(term):
-                    return c
-
-        # Priority 4: Race / Type / Role Exact Match
-        for li in [game_state.party, game_state.enemies, game_state.npcs]:
-            for c in li:
-                # Player
-                if hasattr(c, 'race') and c.race and term == c.race.lower(): return c
-                if hasattr(c, 'role') and c.role and term == c.role.lower(): return c
-
-                # Enemy
-                if hasattr(c, 'type') and c.type and term == c.type.lower(): return c
-
-                # NPC
-                if hasattr(c, 'data') and c.data:
-                    if 'race' in c.data and term == str(c.data['race']).lower(): return c
-                    if 'type' in c.data and term == str(c.data['type']).lower(): return c
-                    if 'role' in c.data and term == str(c.data['role']).lower(): return c
-
-        # Priority 5: Substring Name Match (Fallback)
-        for li in [game_state.party, game_state.enemies, game_state.npcs]:
-            for c in li:
-                if term in c.name.lower():
-                    return c
-
-        return None
+        """Resolve an entity by target_id, id, name, name prefix, race/role/type, or
+        name substring (in that priority) via the GameState's cached roster index."""
+        return game_state.entity_index().find(search_term, target_id)
 
     @staticmethod
     def _run_engine_resolution(engine, actor_data, action_type, target_data, params):
-        """Helper to run synchronous engine logic in an executor."""
+        """Run one synchronous engine resolution. Called inline: a single attack/cast
+        is microseconds of dice math, far cheaper than a thread-pool hop."""
         return engine.resolve_action(actor_data, action_type, target_data, params)
 
+    @staticmethod
+    async def run_engine_batch(engine, jobs: list) -> list:
+        """Resolve many (actor_data, action_type, target_data, params) jobs in the
+        default executor — for batched simulation only (e.g. balancing sweeps).
+
+        Jobs run off the event loop while live state may change, so pass snapshot
+        dicts (model_dump), never EntityViews over live entities.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: [engine.resolve_action(*job) for job in jobs]
+        )
+
     @staticmethod
     def get_display_name(entity):
         """Returns name or unidentified_name based on state"""
@@ -193,9 +157,10 @@ class GameService:
 
         if is_success:
             # Update Identified Status (just update the model, StateService will persist)
-            if any(n.id == target_char.id for n in game_state.npcs):
+            faction = game_state.entity_index().faction_of(target_char.id)
+            if faction == "npc":
                  target_char.identified = True
-            elif any(e.id == target_char.id for e in game_state.enemies):
+            elif faction == "enemy":
                  target_char.identified = True
 
             await StateService.save_game_state(campaign_id, game_state, db)
@@ -226,7 +191,7 @@ class GameService:
         if not loc_data_str:
             return {"success": False, "message": "Cannot determine current location layout."}
 
-        loc_data = json.loads(loc_data_str)
+        loc_data = load_blob(loc_data_str)
         description = loc_data.get('description', {})
         connections = description.get('connections', [])
 
@@ -284,7 +249,7 @@ class GameService:
         if not dest_row:
              return {"success": False, "message": "The destination could not be found."}
 
-        dest_data = json.loads(dest_row.data)
+        dest_data = load_blob(dest_row.data)
         dest_desc = dest_data.get('description', {})
         visual = dest_desc.get('visual', "") if isinstance(dest_desc, dict) else str(dest_desc)
         dest_interactables = dest_data.get('interactables', [])
@@ -310,7 +275,7 @@ class GameService:
         # designated party spawn (falling back to a free walkable cell). Without this the
         # destination is effectively unreachable: movement/pathfinding validate against
         # walkable_cells. (Enemy/NPC repopulation per room is a Phase 4 content concern.)
-        walkable_set = {(c.x, c.y) for c in game_state.location.walkable_cells}
+        walkable_set = game_state.location.walkable_cells.cells
         spawn_cells = []
         for p_loc in dest_party_locations:
             pos = p_loc.get('position') if isinstance(p_loc, dict) else None
@@ -329,10 +294,12 @@ class GameService:
                     continue
                 target_cell = next((c for c in fallback_cells if c not in occupied), None)
                 if target_cell:
-                    member.position.x, member.position.y = target_cell
+                    game_state.move_entity(member, *target_cell)
                     occupied.add(target_cell)
 
         await StateService.save_game_state(campaign_id, game_state, db)
+        # Warm the scene art of the rooms the party can go next (IMAGE_PREFETCH_ROOMS).
+        ImageJobService.schedule_prefetch(campaign_id, target_source_id)
 
         return {
              "success": True,
@@ -353,21 +320,6 @@ class GameService:
         if not leader or not leader.position:
             return
 
-        # Occupied cells (enemies/NPCs block movement).
-        def get_obstacle_cells():
-            obstacles = set()
-            for entity in [e for e in game_state.enemies if e.hp_current > 0] + game_state.npcs:
-                if entity.position:
-                    obstacles.add((entity.position.x, entity.position.y))
-            return obstacles
-
-        def get_allied_cells(ignore_id=None):
-            allies = set()
-            for entity in game_state.party:
-                if entity.id != ignore_id and entity.position:
-                    allies.add((entity.position.x, entity.position.y))
-            return allies
-
         state_changed = False
 
         for member in game_state.party:
@@ -384,8 +336,11 @@ class GameService:
 
             # If they are further than 3 cells away, they need to move
             if dist > 3:
-                obstacles = get_obstacle_cells()
-                allies = get_allied_cells(ignore_id=member.id)
+                # Enemies/NPCs block movement; re-read per member since earlier
+                # members may have moved (move_entity keeps the index current).
+                index = game_state.spatial_index()
+                obstacles = index.obstacle_cells()
+                allies = index.party_cells(exclude=member)
                 max_move = member.speed // 5 if member.speed else 6
 
                 start_cell = (member.position.x, member.position.y)
@@ -401,8 +356,7 @@ class GameService:
                     new_dist_to_leader = chebyshev_distance(best_cell[0], best_cell[1], leader.position.x, leader.position.y)
 
                     if new_dist_to_leader < dist:
-                        member.position.x = best_cell[0]
-                        member.position.y = best_cell[1]
+                        game_state.move_entity(member, *best_cell)
                         state_changed = True
                         anim_path = [{"x": c[0], "y": c[1]} for c in reachable[best_cell]]
                         if sio:
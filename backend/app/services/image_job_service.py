@@ -0,0 +1,242 @@
+"""Scene image generation as deduplicated background jobs.
+
+An Imagen call takes seconds and is billed per image. Jobs are keyed by the sha256
+of the prompt — the same key image_cache uses — so every request for a prompt that
+is already being generated joins that job instead of paying for another one, and a
+finished job's image is served from image_cache.
+
+At most IMAGE_WORKERS jobs run at once (each holds a DB session and an "image"
+offload thread while it runs); the rest wait in submission order. Clients can
+block on a job (POST /campaigns/{id}/images/generate, the original contract), poll
+it (GET .../images/jobs/{job_id}), or listen for the `image_ready` / `image_failed`
+socket events sent to every campaign that asked for it.
+
+Prefetch: with IMAGE_PREFETCH_ROOMS=N (default 0, off), entering a room queues the
+scene art of up to N connected rooms that are not cached yet, using the same
+`scene_prompt` as POST .../images/scene/{source_id}.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.schema import image_cache, locations
+from db.session import AsyncSessionLocal
+from app.utils import offload
+from app.utils.json_blob import load_blob
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+IMAGE_WORKERS = offload.POOL_WORKERS["image"]
+MAX_TRACKED_JOBS = 256
+PREFETCH_ROOMS = int(os.getenv("IMAGE_PREFETCH_ROOMS", "0"))
+IMAGE_MODEL = "imagen-4.0-fast-generate-001"
+
+
+@dataclass(eq=False)
+class ImageJob:
+    id: str  # sha256 of the prompt, the image_cache key
+    prompt: str
+    campaign_ids: Set[str] = field(default_factory=set)
+    status: str = PENDING
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    # Resolves to the base64 image (None on failure); dropped once the job ends so
+    # finished jobs don't pin images in memory — later readers go to image_cache.
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class ImageJobService:
+    _jobs: "OrderedDict[str, ImageJob]" = OrderedDict()
+    _queue: Deque[ImageJob] = deque()
+    _running = 0
+    _prefetches: Set[asyncio.Task] = set()  # strong refs until they finish
+
+    @staticmethod
+    def prompt_hash(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def scene_prompt(name: str, visual: str) -> str:
+        """The prompt for a room's scene art (prefetch and the scene endpoint share it)."""
+        return f"{name}. {visual}".strip() if visual else name
+
+    @classmethod
+    def get(cls, job_id: str) -> Optional[ImageJob]:
+        return cls._jobs.get(job_id)
+
+    @classmethod
+    def submit(cls, campaign_id: str, prompt: str) -> ImageJob:
+        """The job for `prompt`: the one already queued / running / finished, or a new
+        one (also replacing a failed one). Must be called on the event loop."""
+        job_id = cls.prompt_hash(prompt)
+        job = cls._jobs.get(job_id)
+        if job is None or job.status == FAILED:
+            job = ImageJob(id=job_id, prompt=prompt, future=asyncio.get_running_loop().create_future())
+            cls._jobs[job_id] = job
+            cls._queue.append(job)
+            cls._trim()
+            cls._pump()
+        job.campaign_ids.add(campaign_id)
+        cls._jobs.move_to_end(job_id)
+        return job
+
+    @classmethod
+    async def wait(cls, job: ImageJob) -> Optional[str]:
+        """The job's image as base64 once it finishes; None if it failed."""
+        if job.future is not None:
+            # Shielded: a client that disconnects must not cancel the shared job.
+            return await asyncio.shield(job.future)
+        if job.status == DONE:
+            async with AsyncSessionLocal() as db:
+                return await cls.read_cache(job.id, db)
+        return None
+
+    @staticmethod
+    async def read_cache(job_id: str, db: AsyncSession) -> Optional[str]:
+        result = await db.execute(select(image_cache.c.image_base64).where(image_cache.c.prompt_hash == job_id))
+        return result.scalar()
+
+    @classmethod
+    def _trim(cls):
+        """Forget the oldest finished jobs beyond MAX_TRACKED_JOBS (live ones stay)."""
+        excess = len(cls._jobs) - MAX_TRACKED_JOBS
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in cls._jobs.values() if j.status in (DONE, FAILED)][:excess]:
+            del cls._jobs[job_id]
+
+    @classmethod
+    def _pump(cls):
+        while cls._running < IMAGE_WORKERS and cls._queue:
+            job = cls._queue.popleft()
+            cls._running += 1
+            asyncio.get_running_loop().create_task(cls._run(job))
+
+    @classmethod
+    async def _run(cls, job: ImageJob):
+        job.status = RUNNING
+        image_b64, generated_for = None, None
+        try:
+            async with AsyncSessionLocal() as db:
+                image_b64 = await cls.read_cache(job.id, db)  # another process may have made it
+                if image_b64 is None:
+                    from app.services.ai_service import AIService
+                    # The first campaign that asked pays for it (its API key).
+                    generated_for = next(iter(job.campaign_ids))
+                    image_bytes = await AIService.generate_scene_image(generated_for, job.prompt, db)
+                    if not image_bytes:
+                        raise RuntimeError("Failed to generate image")
+                    image_b64 = base64.b64encode(image_bytes).decode('utf-8')
+                    await db.execute(pg_insert(image_cache).values(prompt_hash=job.id, image_base64=image_b64)
+                                     .on_conflict_do_nothing(index_elements=['prompt_hash']))
+                    await db.commit()
+            job.status = DONE
+        except Exception as e:
+            logger.error("Image job %s failed: %s", job.id[:12], e)
+            job.status, job.error, image_b64 = FAILED, str(e), None
+        finally:
+            future, job.future = job.future, None
+            if future is not None and not future.done():
+                future.set_result(image_b64)
+            cls._running -= 1
+            cls._pump()
+        await cls._announce(job, generated_for)
+
+    @staticmethod
+    async def _announce(job: ImageJob, generated_for: Optional[str]):
+        from app.socket_manager import sio
+        event = 'image_ready' if job.status == DONE else 'image_failed'
+        payload = {'job_id': job.id, 'prompt': job.prompt, 'status': job.status, 'error': job.error}
+        try:
+            for campaign_id in job.campaign_ids:
+                await sio.emit(event, payload, room=campaign_id)
+            if generated_for and job.status == DONE:
+                await sio.emit('ai_stats', {'type': 'usage', 'is_image': True, 'model': IMAGE_MODEL},
+                               room=generated_for)
+        except Exception as e:
+            logger.warning("Could not announce image job %s: %s", job.id[:12], e)
+
+    @classmethod
+    async def scene_job(cls, campaign_id: str, source_id: str, db: AsyncSession) -> Optional[ImageJob]:
+        """Submit (or join) the scene-art job for a room; None if the room doesn't exist."""
+        row = (await db.execute(
+            select(locations.c.name, locations.c.data)
+            .where(locations.c.campaign_id == campaign_id, locations.c.source_id == source_id))).first()
+        if not row:
+            return None
+        return cls.submit(campaign_id, cls.scene_prompt(row.name, cls._visual(load_blob(row.data))))
+
+    @classmethod
+    def schedule_prefetch(cls, campaign_id: str, source_id: str):
+        """Fire-and-forget prefetch_connected (no-op unless IMAGE_PREFETCH_ROOMS is set).
+        Runs on its own session, so it can never fail the caller's transaction."""
+        if PREFETCH_ROOMS <= 0:
+            return
+
+        async def prefetch():
+            try:
+                async with AsyncSessionLocal() as db:
+                    await cls.prefetch_connected(campaign_id, source_id, db)
+            except Exception as e:
+                logger.warning("Scene art prefetch from %s failed: %s", source_id, e)
+
+        task = asyncio.get_running_loop().create_task(prefetch())
+        cls._prefetches.add(task)
+        task.add_done_callback(cls._prefetches.discard)
+
+    @classmethod
+    async def prefetch_connected(cls, campaign_id: str, source_id: str, db: AsyncSession,
+                                 limit: int = None) -> List[ImageJob]:
+        """Queue scene art for up to `limit` rooms connected to `source_id` that have
+        neither a cached image nor a job yet."""
+        limit = PREFETCH_ROOMS if limit is None else limit
+        if limit <= 0:
+            return []
+        row = (await db.execute(
+            select(locations.c.data)
+            .where(locations.c.campaign_id == campaign_id, locations.c.source_id == source_id))).first()
+        if not row:
+            return []
+        description = load_blob(row.data).get('description', {})
+        connections = description.get('connections', []) if isinstance(description, dict) else []
+        target_ids = [c.get('target_id') if isinstance(c, dict) else c for c in connections]
+        target_ids = [t for t in target_ids if t]
+        if not target_ids:
+            return []
+
+        rows = (await db.execute(
+            select(locations.c.source_id, locations.c.name, locations.c.data)
+            .where(locations.c.campaign_id == campaign_id, locations.c.source_id.in_(target_ids)))).all()
+        order = {t: i for i, t in enumerate(target_ids)}
+        prompts = [cls.scene_prompt(r.name, cls._visual(load_blob(r.data)))
+                   for r in sorted(rows, key=lambda r: order[r.source_id])]
+        wanted = {cls.prompt_hash(p): p for p in prompts if cls.prompt_hash(p) not in cls._jobs}
+        if not wanted:
+            return []
+        cached = set((await db.execute(
+            select(image_cache.c.prompt_hash).where(image_cache.c.prompt_hash.in_(list(wanted))))).scalars())
+        fresh = [prompt for job_id, prompt in wanted.items() if job_id not in cached]
+        return [cls.submit(campaign_id, prompt) for prompt in fresh[:limit]]
+
+    @staticmethod
+    def _visual(data: dict) -> str:
+        desc = data.get('description', {})
+        return desc.get('visual', "") if isinstance(desc, dict) else str(desc or "")
+
+    @classmethod
+    def clear(cls):
+        """Forget all jobs (tests). Running jobs finish but are no longer findable."""
+        cls._jobs.clear()
+        cls._queue.clear()
+        cls._running = 0
@@ -58,9 +58,10 @@ class InteractionService:
 
         if is_success:
             # Update Identified Status (just update the model, StateService will persist)
-            if any(n.id == target_char.id for n in game_state.npcs):
+            faction = game_state.entity_index().faction_of(target_char.id)
+            if faction == "npc":
                  target_char.identified = True
-            elif any(e.id == target_char.id for e in game_state.enemies):
+            elif faction == "enemy":
                  target_char.identified = True
 
             await StateService.save_game_state(campaign_id, game_state, db)
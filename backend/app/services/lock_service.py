@@ -1,8 +1,10 @@
 import asyncio
 import logging
 import hashlib
+import time
 from contextlib import asynccontextmanager
 from db.session import AsyncSessionLocal
+from app.utils import metrics, tracing
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -14,6 +16,9 @@ class LockService:
     _local_locks = {}  # dict mapping campaign_id -> asyncio.Task
     _local_counts = {} # dict mapping campaign_id -> int
     _local_sessions = {} # dict mapping campaign_id -> AsyncSession
+    # Callables (campaign_id, seconds) told how long each advisory-lock acquisition
+    # waited; re-entrant acquisitions don't wait and aren't reported.
+    wait_observers = []
 
     @staticmethod
     def _get_lock_id(campaign_id: str) -> int:
@@ -46,16 +51,18 @@ class LockService:
         lock_id = cls._get_lock_id(campaign_id)
         session = AsyncSessionLocal()
         acquired = False
+        wait_start = time.perf_counter()
 
         try:
             # We use an async timeout because pg_advisory_lock without NOWAIT will block indefinitely
             # until either it gets the lock, or the DB connection drops.
             # Using asyncio.wait_for allows us to enforce LOCK_TIMEOUT_SECONDS asynchronously.
             try:
-                await asyncio.wait_for(
-                    session.execute(text("SELECT pg_advisory_lock(:id)"), {"id": lock_id}),
-                    timeout=cls.LOCK_TIMEOUT_SECONDS
-                )
+                with tracing.span("lock.acquire", campaign_id=campaign_id):
+                    await asyncio.wait_for(
+                        session.execute(text("SELECT pg_advisory_lock(:id)"), {"id": lock_id}),
+                        timeout=cls.LOCK_TIMEOUT_SECONDS
+                    )
                 acquired = True
             except asyncio.TimeoutError:
                 raise TimeoutError(f"Failed to acquire advisory lock for campaign {campaign_id} within {cls.LOCK_TIMEOUT_SECONDS}s.")
@@ -63,6 +70,12 @@ class LockService:
                 logger.error(f"Database error acquiring advisory lock for {campaign_id}: {e}")
                 raise
 
+            held_since = time.perf_counter()
+            waited = held_since - wait_start
+            metrics.LOCK_WAIT_SECONDS.observe(waited, campaign=metrics.campaign_label(campaign_id))
+            for observer in cls.wait_observers:
+                observer(campaign_id, waited)
+
             cls._local_locks[campaign_id] = current_task
             cls._local_counts[campaign_id] = 1
             cls._local_sessions[campaign_id] = session
@@ -72,6 +85,8 @@ class LockService:
             if acquired:
                 cls._local_counts[campaign_id] -= 1
                 if cls._local_counts[campaign_id] <= 0:
+                    metrics.LOCK_HOLD_SECONDS.observe(time.perf_counter() - held_since,
+                                                      campaign=metrics.campaign_label(campaign_id))
                     cls._local_locks.pop(campaign_id, None)
                     cls._local_counts.pop(campaign_id, None)
                     lock_session = cls._local_sessions.pop(campaign_id, None)
@@ -5,7 +5,9 @@ from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.state_service import StateService
+from app.services.combat_profile import invalidate as invalidate_profile
 from db.schema import locations
+from app.utils.json_blob import load_blob
 
 if TYPE_CHECKING:
     pass
@@ -63,7 +65,7 @@ class LootService:
         loc_res = await db.execute(query)
         loc_data_str = loc_res.scalar_one_or_none()
 
-        loc_data = json.loads(loc_data_str) if loc_data_str else {}
+        loc_data = load_blob(loc_data_str)
         interactables = loc_data.get('interactables', [])
 
         actor_char = next((p for p in game_state.party if p.name == actor_name), None)
@@ -162,8 +164,6 @@ class LootService:
         if interrupted:
             return {"success": False, "message": opp_msg, "game_state": latest_state}
 
-        game_state = await StateService.get_game_state(campaign_id, db)  # Refresh state if not interrupted
-
         # 4. Process the interaction
         if target_interactable:
             item_type = target_interactable.get('type')
@@ -197,7 +197,7 @@ class LootService:
                      dest_row = dest_res.first()
 
                      if dest_row:
-                         d_data = json.loads(dest_row.data)
+                         d_data = load_blob(dest_row.data)
                          vis = d_data.get('description', {}).get('visual', '')
                          if vis:
                               vis_lower = vis[0].lower() + vis[1:] if vis else ""
@@ -475,6 +475,7 @@ class LootService:
             # Move from inventory to equipment
             actor.inventory.remove(inventory_item)
             actor.sheet_data['equipment'].append(item_data)
+            invalidate_profile(actor.id)
 
             await StateService.save_game_state(campaign_id, game_state, db)
             return {"success": True, "message": f"Equipped {item_data.get('name', item_id)}.", "actor": actor}
@@ -495,6 +496,7 @@ class LootService:
 
             # Add back to inventory preserving full data
             actor.inventory.append(item_to_remove)
+            invalidate_profile(actor.id)
 
             await StateService.save_game_state(campaign_id, game_state, db)
             return {"success": True, "message": f"Unequipped {item_to_remove.get('name', item_id)}.", "actor": actor}
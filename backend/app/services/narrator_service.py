@@ -2,6 +2,7 @@ import logging
 import asyncio
 from app.services.ai_service import AIService
 from app.services.chat_service import ChatService
+from app.utils import metrics, tracing
 from db.session import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
@@ -29,7 +30,9 @@ class NarratorService:
                  await NarratorService._execute_narration(campaign_id, context, sio, session, mode, sid)
 
     @staticmethod
+    @tracing.traced("narrator.narrate")
     async def _execute_narration(campaign_id: str, context: str, sio, db, mode: str, sid: str = None):
+        tracing.annotate(mode=mode)
         await sio.emit('typing_indicator', {'sender_id': 'dm', 'is_typing': True}, room=campaign_id)
         try:
             # Context Building
@@ -62,6 +65,11 @@ class NarratorService:
                 # In `TurnManager`, we commit mechanics BEFORE calling narration. So it is safe to commit here.
                 await db.commit()
 
+        except asyncio.TimeoutError:
+            metrics.NARRATION_TIMEOUTS.inc(mode=mode)
+            logger.warning(f"Narration ({mode}) timed out for campaign {campaign_id}")
+            await sio.emit('chat_message', {'sender_id': 'system', 'sender_name': 'System', 'content': "🚫 DM Narrator Error: narration timed out", 'timestamp': "Just now", 'is_system': True, 'message_type': 'system'}, room=campaign_id)
+
         except Exception as e:
             logger.error(f"Service Error: {e}", exc_info=True)
             await sio.emit('chat_message', {'sender_id': 'system', 'sender_name': 'System', 'content': f"🚫 DM Narrator Error: {e}", 'timestamp': "Just now", 'is_system': True, 'message_type': 'system'}, room=campaign_id)
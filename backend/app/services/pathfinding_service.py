@@ -1,7 +1,8 @@
 import logging
 from collections import deque
-from typing import List, Tuple, Set, Dict, Optional
+from typing import Iterable, List, Tuple, Set, Dict, Optional
 from app.models import Coordinates
+from app.utils.cell_grid import cell_set
 from app.utils.grid_utils import get_neighbors, chebyshev_distance
 
 logger = logging.getLogger(__name__)
@@ -15,7 +16,7 @@ class PathfindingService:
     """
 
     @staticmethod
-    def check_line_of_sight(start_pos: Coordinates, target_pos: Coordinates, walkable_cells: List[Coordinates]) -> bool:
+    def check_line_of_sight(start_pos: Coordinates, target_pos: Coordinates, walkable_cells: Iterable) -> bool:
         """
         True if every cell on the supercover line between the two points is walkable.
         Because the line is a true supercover, a diagonal wall (both flanking cells
@@ -23,7 +24,7 @@ class PathfindingService:
         """
         if not start_pos or not target_pos:
             return False
-        walkable_set = {(h.x, h.y) for h in walkable_cells} if walkable_cells else set()
+        walkable_set = cell_set(walkable_cells)
         for point in start_pos.get_line_to(target_pos):
             if (point.x, point.y) not in walkable_set:
                 return False
@@ -33,7 +34,7 @@ class PathfindingService:
     def find_reachable_cells(
         start_cell: Tuple[int, int],
         max_move: int,
-        walkable_cells: List[Coordinates],
+        walkable_cells: Iterable,
         obstacle_cells: Set[Tuple[int, int]],
     ) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
         """
@@ -41,7 +42,7 @@ class PathfindingService:
         exactly Chebyshev movement. Returns {cell: path_to_cell} for every cell
         reachable within max_move steps (start cell included, with an empty path).
         """
-        walkable = {(h.x, h.y) for h in walkable_cells} if walkable_cells else set()
+        walkable = cell_set(walkable_cells)
         queue: deque = deque([(start_cell, [])])
         visited: Dict[Tuple[int, int], List[Tuple[int, int]]] = {start_cell: []}
 
@@ -62,7 +63,7 @@ class PathfindingService:
         start: Coordinates,
         target: Coordinates,
         max_move: int,
-        walkable_cells: List[Coordinates],
+        walkable_cells: Iterable,
         obstacle_cells: Set[Tuple[int, int]],
     ) -> Tuple[Optional[Tuple[int, int]], List[Tuple[int, int]]]:
         """
@@ -91,7 +92,7 @@ class PathfindingService:
         start: Coordinates,
         target: Coordinates,
         max_move: int,
-        walkable_cells: List[Coordinates],
+        walkable_cells: Iterable,
         obstacle_cells: Set[Tuple[int, int]],
     ) -> Tuple[Optional[Tuple[int, int]], List[Tuple[int, int]]]:
         """
@@ -4,12 +4,10 @@ Spell service: Tier A whitelist, SRD→engine format normalization, spell lookup
 Only spells that can be fully mechanically resolved are available to players.
 All others are hidden until the systems they require are implemented.
 """
-import json
 import logging
 from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from db.schema import spells as spells_table
+from app.services import compendium_service, compendium_store
 
 logger = logging.getLogger(__name__)
 
@@ -171,26 +169,18 @@ def _extract_damage_dice(damage_info: dict, spell_level: int, index: str) -> str
 
 
 async def lookup_spell(spell_name: str, db: AsyncSession) -> Optional[dict]:
-    """Look up a spell from the spells table by name (fuzzy match)."""
-    # Exact match first
-    result = await db.execute(
-        select(spells_table.c.data)
-        .where(spells_table.c.name.ilike(spell_name))
-    )
-    row = result.scalar()
-    if row:
-        return json.loads(row) if isinstance(row, str) else row
-
-    # Partial match
-    result = await db.execute(
-        select(spells_table.c.data)
-        .where(spells_table.c.name.ilike(f"%{spell_name}%"))
-    )
-    row = result.scalar()
-    if row:
-        return json.loads(row) if isinstance(row, str) else row
+    """Look up a spell by name (exact, then prefix, then partial).
 
-    return None
+    Served from the in-memory compendium store (treat the result as read-only);
+    falls back to the spells table for campaign-scoped spells or when the store
+    is not loaded.
+    """
+    store = compendium_store.get_store()
+    if store:
+        row = store.find("spells", spell_name)
+        if row:
+            return row["data"]
+    return await compendium_service.lookup_by_name(db, "spells", spell_name)
 
 
 async def resolve_spell_for_cast(
@@ -223,6 +213,13 @@ async def resolve_spell_for_cast(
         if inner.get("damage") or inner.get("save") or inner.get("attack_type") or inner.get("heal_at_slot_level"):
             return spell_ref  # already in engine format
 
+    # Pre-normalized SRD record from the compendium store
+    store = compendium_store.get_store()
+    if store:
+        cached = store.engine_spell(index=spell_index, name=spell_name)
+        if cached:
+            return cached
+
     # Otherwise, look up from DB and normalize
     srd_spell = await lookup_spell(spell_name, db)
     if srd_spell:
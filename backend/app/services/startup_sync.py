@@ -0,0 +1,90 @@
+"""Background seeding that runs after the app starts accepting connections.
+
+Startup used to block on the SRD dataset import, the campaign template sync and the
+dev test campaign before the first request could be served. Schema setup and
+Firebase stay in the blocking startup hook; these phases run here instead, in order,
+each one fail-open (a failed phase is logged and reported, the next still runs).
+
+`GET /ready` reports `readiness_snapshot()`: 503 while seeding is in progress or a
+phase failed, 200 once every phase finished. Point the platform's startup / readiness
+probe at it; `/` stays a plain liveness check.
+
+The same module keeps the startup timing report: `timed()` wraps the blocking steps
+(module import, DB init, Firebase, ...), the background phases time themselves, and
+once seeding finishes one summary line is logged. /ready includes the timings too.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+_phases: Dict[str, Dict] = {}
+_timings: Dict[str, float] = {}
+
+
+def record_timing(name: str, seconds: float):
+    _timings[name] = round(seconds, 3)
+
+
+@contextmanager
+def timed(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
+
+
+def timing_report() -> str:
+    return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in _timings.items())
+
+
+def reset(names: List[str]):
+    _phases.clear()
+    for name in names:
+        _phases[name] = {"status": PENDING}
+
+
+def is_ready() -> bool:
+    return bool(_phases) and all(p["status"] == DONE for p in _phases.values())
+
+
+def readiness_snapshot() -> Dict:
+    if is_ready():
+        status = "ready"
+    elif any(p["status"] == FAILED for p in _phases.values()):
+        status = "degraded"
+    else:
+        status = "starting"
+    return {
+        "status": status,
+        "phases": {name: dict(p) for name, p in _phases.items()},
+        "timings": dict(_timings),
+    }
+
+
+async def run_phases(phases: List[Tuple[str, Callable[[], Awaitable]]]):
+    """Run (name, coroutine factory) pairs in order, recording status and duration."""
+    reset([name for name, _ in phases])
+    for name, factory in phases:
+        phase = _phases[name]
+        phase["status"] = RUNNING
+        start = time.perf_counter()
+        try:
+            result = await factory()
+            # Loaders that report (ok, message) instead of raising
+            if isinstance(result, tuple) and result and result[0] is False:
+                raise RuntimeError(result[1] if len(result) > 1 else "failed")
+            phase["status"] = DONE
+        except Exception as e:
+            phase["status"] = FAILED
+            phase["error"] = str(e)
+            logger.error(f"Startup phase '{name}' failed: {e}", exc_info=True)
+        phase["seconds"] = round(time.perf_counter() - start, 3)
+        record_timing(name, phase["seconds"])
+        logger.info(f"Startup phase '{name}' {phase['status']} in {phase['seconds']}s")
+    logger.info(f"Startup timings: {timing_report()}")
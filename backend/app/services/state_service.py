@@ -1,14 +1,87 @@
+import asyncio
+import hashlib
 import json
 import logging
+import time
+from collections import OrderedDict
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, insert, desc, bindparam
-from sqlalchemy.dialects.postgresql import insert as pg_insert
-from db.schema import game_states, characters, monsters, npcs
-from app.models import GameState, Player, Enemy, NPC, Vessel
+from sqlalchemy import select, update, insert, delete, desc, bindparam, cast, event, func
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by, insert as pg_insert
+from sqlalchemy.orm import Session
+from db.schema import game_states, game_events, characters, monsters, npcs
+from app.models import GameState
+from app.services import event_log
+from app.utils import json_codec, metrics, offload, tracing
+from app.utils.json_blob import load_blob
 
 logger = logging.getLogger(__name__)
 
+# Top-level blob keys that change on almost every save (damage, movement, status).
+# When nothing else in an entity's blob changed since this process last committed
+# it, only these are sent: `blob || patch` instead of the whole document.
+HOT_FIELDS = ('hp_current', 'position', 'conditions')
+MAX_TRACKED_BLOBS = 10_000
+# Stamped into every entity blob the save path writes. A blob carrying the current
+# version was produced from a validated model, so hydration skips the repairs older
+# or externally written blobs need (nested enemy 'data' chains, item-dict inventories).
+# Writers that store caller-supplied blobs drop the key (see routers/characters.py).
+SCHEMA_KEY = 'schema_version'
+BLOB_SCHEMA_VERSION = 1
+_PENDING_DIGESTS = "state_service.pending_blob_digests"
+_PENDING_VIEWS = "state_service.pending_event_views"
+MAX_TRACKED_CAMPAIGNS = 1024
+
+# (table, entity id) -> digest of the cold part (blob minus HOT_FIELDS, plus the
+# scalar columns) as last committed. Staged in session.info and only promoted on
+# commit, so a rolled-back save can never make a later one skip its cold fields.
+_committed_digests: "OrderedDict[tuple, str]" = OrderedDict()
+# campaign id -> event_log.StateView of the last committed save, the baseline the
+# next save derives its events from. Staged and promoted the same way.
+_committed_views: "OrderedDict[str, event_log.StateView]" = OrderedDict()
+
+
+def _cold_digest(blob: dict, columns: tuple) -> str:
+    cold = {k: v for k, v in blob.items() if k not in HOT_FIELDS}
+    hot_keys = [k for k in HOT_FIELDS if k in blob]
+    payload = json_codec.dumpb([cold, list(columns), hot_keys])
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+@event.listens_for(Session, "after_commit")
+def _promote_blob_digests(session):
+    pending = session.info.pop(_PENDING_DIGESTS, None)
+    if not pending:
+        return
+    for key, digest in pending.items():
+        _committed_digests[key] = digest
+        _committed_digests.move_to_end(key)
+    while len(_committed_digests) > MAX_TRACKED_BLOBS:
+        _committed_digests.popitem(last=False)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_blob_digests(session):
+    session.info.pop(_PENDING_DIGESTS, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _promote_event_views(session):
+    pending = session.info.pop(_PENDING_VIEWS, None)
+    if not pending:
+        return
+    for campaign_id, view in pending.items():
+        _committed_views[campaign_id] = view
+        _committed_views.move_to_end(campaign_id)
+    while len(_committed_views) > MAX_TRACKED_CAMPAIGNS:
+        _committed_views.popitem(last=False)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_event_views(session):
+    session.info.pop(_PENDING_VIEWS, None)
+
+
 class StateService:
     """
     Handles all hydration, persistence, and querying of the GameState and its entities.
@@ -24,20 +97,37 @@ class StateService:
     ``game_states`` row instead of fragmenting it into several partial commits.
     """
     _last_broadcasted_state = {}
+    # campaign_id -> asyncio.Lock: the diff runs off-loop, so broadcasts for one
+    # campaign are serialized to keep each patch's base_version the previous one's.
+    _broadcast_locks = {}
 
     @classmethod
     def clear_campaign_state(cls, campaign_id: str):
         cls._last_broadcasted_state.pop(campaign_id, None)
+        cls._broadcast_locks.pop(campaign_id, None)
+        _committed_views.pop(campaign_id, None)
 
     @staticmethod
+    @tracing.traced("state.broadcast")
     async def emit_state_update(campaign_id: str, game_state: 'GameState', sio):
-        import jsonpatch
         new_state_dict = game_state.model_dump()
+        lock = StateService._broadcast_locks.setdefault(campaign_id, asyncio.Lock())
+        async with lock:
+            await StateService._broadcast(campaign_id, new_state_dict, sio)
+
+    @staticmethod
+    async def _broadcast(campaign_id: str, new_state_dict: dict, sio):
+        import jsonpatch
         old_state_dict = StateService._last_broadcasted_state.get(campaign_id)
 
         if old_state_dict:
-            patch = jsonpatch.make_patch(old_state_dict, new_state_dict)
+            # Diffing a crowded state is ~10-20ms of pure Python: off the loop. Both
+            # dicts are private snapshots, so the worker reads them safely.
+            patch = await offload.run("cpu", jsonpatch.make_patch, old_state_dict, new_state_dict)
             if patch.patch: # Only emit if there are actual changes
+                metrics.STATE_BROADCASTS.inc(kind='patch')
+                metrics.STATE_PATCH_BYTES.observe(len(json_codec.dumpb(patch.patch)))
+                StateService._observe_fanout(sio, campaign_id)
                 # Version-gated delta: the client applies it only if it currently holds
                 # base_version, otherwise it requests a full-state resync. (A full
                 # game_state_update carries its own version, read directly by the client.)
@@ -47,51 +137,175 @@ class StateService:
                     'version': new_state_dict.get('version', 0),
                 }, room=campaign_id)
         else:
+            metrics.STATE_BROADCASTS.inc(kind='full')
+            StateService._observe_fanout(sio, campaign_id)
             await sio.emit('game_state_update', new_state_dict, room=campaign_id)
 
         StateService._last_broadcasted_state[campaign_id] = new_state_dict
 
     @staticmethod
+    def _observe_fanout(sio, campaign_id: str):
+        """Record how many sockets the broadcast reaches (this process's room only)."""
+        rooms = getattr(getattr(sio, 'manager', None), 'rooms', None)
+        if isinstance(rooms, dict):
+            metrics.BROADCAST_FANOUT.observe(len(rooms.get('/', {}).get(campaign_id, ())))
+
+    @staticmethod
+    @tracing.traced("state.hydrate")
     async def get_game_state(campaign_id: str, db: AsyncSession) -> GameState:
+        # The events after the snapshot ride along as one ordered jsonb array of
+        # [seq, version, kind, payload], so the tail costs no extra round trip.
+        start = time.perf_counter()
+        tail = (
+            select(func.jsonb_agg(aggregate_order_by(
+                func.jsonb_build_array(game_events.c.seq, game_events.c.version,
+                                       game_events.c.kind, game_events.c.payload),
+                game_events.c.seq,
+            )))
+            .where(game_events.c.campaign_id == game_states.c.campaign_id,
+                   game_events.c.seq > game_states.c.event_seq)
+            .scalar_subquery()
+        )
+        tail_bytes = (
+            select(func.coalesce(func.sum(func.pg_column_size(game_events.c.payload)), 0))
+            .where(game_events.c.campaign_id == game_states.c.campaign_id,
+                   game_events.c.seq > game_states.c.event_seq)
+            .scalar_subquery()
+        )
         # One upserted row per campaign (see save_game_state); the order_by is a
         # defensive tiebreaker for the brief window before the dedup migration runs.
         query = (
-            select(game_states.c.state_data)
+            select(game_states.c.state_data, game_states.c.event_seq, tail.label('events'),
+                   (func.pg_column_size(game_states.c.state_data) + tail_bytes).label('stored_bytes'))
             .where(game_states.c.campaign_id == campaign_id)
             .order_by(desc(game_states.c.updated_at), desc(game_states.c.id))
             .limit(1)
         )
         result = await db.execute(query)
-        state_data_str = result.scalar()
+        row = result.first()
 
-        if not state_data_str:
+        if not row or not row.state_data:
             return None
 
-        state_data = json.loads(state_data_str)
+        state_data = load_blob(row.state_data)
+        events = load_blob(row.events) if row.events else []
 
-        # Hydrate Entities
+        # Hydrate Entities (as documents; validated below with the rest of the tree)
         state_data['party'] = await StateService._hydrate_party(state_data.get('party'), db)
         state_data['enemies'] = await StateService._hydrate_enemies(state_data.get('enemies'), db)
         state_data['npcs'] = await StateService._hydrate_npcs(state_data.get('npcs'), db)
 
-        # Hydrate Vessels (stored as dicts in JSON)
-        vessel_data = state_data.get('vessels', [])
-        state_data['vessels'] = [Vessel(**v) for v in vessel_data if isinstance(v, dict)]
+        # Vessels are stored as dicts in JSON
+        state_data['vessels'] = [v for v in state_data.get('vessels', []) if isinstance(v, dict)]
 
-        return GameState(**state_data)
+        event_seq = row.event_seq or 0
+        if events:
+            event_log.apply(state_data, ((kind, payload) for _, _, kind, payload in events))
+            event_seq, state_data['version'] = events[-1][0], events[-1][1]
+
+        # One validation pass over the whole tree: constructing each entity first and
+        # then the GameState around them costs ~30% more (scripts/bench_hydration.py).
+        game_state = GameState.model_validate(state_data)
+        game_state._event_seq = event_seq
+        metrics.STATE_HYDRATE_SECONDS.observe(time.perf_counter() - start)
+        metrics.STATE_HYDRATE_BYTES.observe(row.stored_bytes or 0)
+        return game_state
 
     @staticmethod
+    @tracing.traced("state.save")
     async def save_game_state(campaign_id: str, game_state: GameState, db: AsyncSession):
-        """Stage the full game state for persistence (entities + skeleton row).
+        """Stage the game state for persistence: typed events when only moves / HP /
+        conditions / turn / combat log changed since the last committed save,
+        otherwise (and every event_log.SNAPSHOT_EVERY events) a full snapshot of the
+        entities + skeleton row. See app/services/event_log.py.
 
         Does NOT commit — see the class-level commit contract. The session owner
         commits the whole unit of work atomically.
         """
-        from datetime import datetime, timezone
+        start = time.perf_counter()
+        with metrics.json_tally() as written:
+            kind = await StateService._stage_game_state(campaign_id, game_state, db)
+        if kind:
+            metrics.STATE_SAVE_SECONDS.observe(time.perf_counter() - start, kind=kind)
+            metrics.STATE_SAVE_BYTES.observe(written[0], kind=kind)
+
+    @staticmethod
+    async def _stage_game_state(campaign_id: str, game_state: GameState, db: AsyncSession):
+        """save_game_state's body; returns what it wrote: 'events', 'snapshot' or None."""
+        base = StateService._event_baseline(db, campaign_id, game_state)
+        events = None
+        if base is not None:
+            current = event_log.capture(game_state.model_dump(), base.seq, base.version, base.since_snapshot)
+            events = event_log.diff(base, current)
+            if events == []:
+                return None  # Nothing changed: nothing to write, no new version
 
         # Auto-increment state version for client-side gap detection
         game_state.version += 1
 
+        since_snapshot = 0
+        if events and not await StateService._append_events(campaign_id, base, events, game_state.version, db):
+            events = None
+        if events:
+            game_state._event_seq = base.seq + len(events)
+            since_snapshot = base.since_snapshot + len(events)
+            if since_snapshot < event_log.SNAPSHOT_EVERY:
+                StateService._stage_view(db, campaign_id, event_log.StateView(
+                    game_state._event_seq, game_state.version, since_snapshot,
+                    current.digest, current.hot, current.turn, current.log))
+                return 'events'
+
+        await StateService._save_snapshot(campaign_id, game_state, db)
+        return 'snapshot'
+
+    @staticmethod
+    async def _append_events(campaign_id: str, base: 'event_log.StateView', events: list, version: int,
+                             db: AsyncSession) -> bool:
+        """Insert `events` at the seqs after `base`; False if another save got there first.
+
+        Saves that don't take LockService (interactions, loot, full-state requests) can
+        race a locked one from the same committed view, and both claim base.seq + 1.
+        Postgres makes the later insert wait for the earlier transaction; once that
+        commits, these events no longer describe the change from the log's head, so the
+        rows that did go in are removed and the caller writes a snapshot instead — last
+        writer wins, as the snapshot upsert always did.
+        """
+        rows = [
+            {"campaign_id": campaign_id, "seq": base.seq + i, "version": version,
+             "kind": kind, "payload": payload}
+            for i, (kind, payload) in enumerate(events, start=1)
+        ]
+        stmt = pg_insert(game_events).on_conflict_do_nothing().returning(game_events.c.seq)
+        inserted = (await db.execute(stmt, rows)).scalars().all()
+        if len(inserted) == len(rows):
+            return True
+        if inserted:
+            await db.execute(delete(game_events).where(
+                game_events.c.campaign_id == campaign_id, game_events.c.seq.in_(inserted)))
+        logger.info("Event seq %s of campaign %s was taken by a concurrent save; writing a snapshot",
+                    base.seq + 1, campaign_id)
+        return False
+
+    @staticmethod
+    def _event_baseline(db: AsyncSession, campaign_id: str, game_state: GameState):
+        """The committed (or, within this transaction, staged) view `game_state` was
+        loaded or saved from, or None if there is no such trusted baseline."""
+        view = db.info.get(_PENDING_VIEWS, {}).get(campaign_id) or _committed_views.get(campaign_id)
+        if view is None or game_state._event_seq is None:
+            return None
+        if view.seq != game_state._event_seq or view.version != game_state.version:
+            return None
+        return view
+
+    @staticmethod
+    def _stage_view(db: AsyncSession, campaign_id: str, view: 'event_log.StateView'):
+        db.info.setdefault(_PENDING_VIEWS, {})[campaign_id] = view
+
+    @staticmethod
+    async def _save_snapshot(campaign_id: str, game_state: GameState, db: AsyncSession):
+        """Full write: entity rows + the skeleton row, folding in every event so far."""
+        from datetime import datetime, timezone
+
         # 1. Update Entities in their specific tables
         await StateService._save_party(game_state.party, campaign_id, db)
         await StateService._save_enemies(game_state.enemies, campaign_id, db)
@@ -100,30 +314,41 @@ class StateService:
         # 2. Save Lightweight GameState (Skeleton).
         # ONE upserted row per campaign_id (unique constraint uq_game_states_campaign_id):
         # deterministic to read back, and never an append-log race under rapid AI-turn saves.
-        state_dict = game_state.model_dump()
+        dump = game_state.model_dump()
+        state_dict = dict(dump)
         state_dict['party'] = [p.id for p in game_state.party]
         state_dict['enemies'] = [e.id for e in game_state.enemies]
         state_dict['npcs'] = [n.id for n in game_state.npcs]
-        state_json = json.dumps(state_dict)
         now = datetime.now(timezone.utc)
+        # Everything appended so far (including this save's events) is in the snapshot.
+        event_seq = (
+            select(func.coalesce(func.max(game_events.c.seq), 0))
+            .where(game_events.c.campaign_id == campaign_id)
+            .scalar_subquery()
+        )
 
         stmt = pg_insert(game_states).values(
             id=str(uuid4()),
             campaign_id=campaign_id,
             turn_index=game_state.turn_index,
             phase=game_state.phase,
-            state_data=state_json,
+            state_data=state_dict,
+            event_seq=event_seq,
             updated_at=now,
         ).on_conflict_do_update(
             index_elements=['campaign_id'],
             set_={
                 'turn_index': game_state.turn_index,
                 'phase': game_state.phase,
-                'state_data': state_json,
+                'state_data': state_dict,
+                'event_seq': event_seq,
                 'updated_at': now,
             },
-        )
-        await db.execute(stmt)
+        ).returning(game_states.c.event_seq)
+        seq = (await db.execute(stmt)).scalar()
+        if isinstance(seq, int):
+            game_state._event_seq = seq
+            StateService._stage_view(db, campaign_id, event_log.capture(dump, seq, game_state.version, 0))
 
     @staticmethod
     def _normalize_inventory(inventory) -> list:
@@ -159,7 +384,44 @@ class StateService:
             )
 
     @staticmethod
-    async def _hydrate_party(party_ids: list, db: AsyncSession) -> list['Player']:
+    def _flatten_enemy_blob(d: dict) -> dict:
+        """Merge the nested 'data' chain of older monster blobs into one level.
+
+        Enemies used to be saved as model_dump(), whose 'data' was the previously
+        loaded blob, so every save nested the document one level deeper (and the
+        template's own keys, e.g. actions, sank to the bottom). Outer levels win.
+        """
+        inner = d.get('data')
+        if not isinstance(inner, dict):
+            return d
+        flat = StateService._flatten_enemy_blob(inner)
+        flat.update({k: v for k, v in d.items() if k != 'data'})
+        return flat
+
+    @staticmethod
+    def _stage_blob(db: AsyncSession, table: str, entity_id: str, blob: dict, columns: tuple):
+        """Record the blob's cold digest for this transaction; return the HOT_FIELDS
+        patch if the committed row already holds the same cold part, else None."""
+        digest = _cold_digest(blob, columns)
+        db.info.setdefault(_PENDING_DIGESTS, {})[(table, entity_id)] = digest
+        if _committed_digests.get((table, entity_id)) != digest:
+            return None
+        return {k: blob[k] for k in HOT_FIELDS if k in blob}
+
+    @staticmethod
+    async def _patch_blobs(db: AsyncSession, table, column: str, patches: list):
+        """`column = column || patch` per row. The cast keeps a column init_db could
+        not convert (still TEXT) on the jsonb operator instead of text concatenation."""
+        if not patches:
+            return
+        merged = cast(table.c[column], JSONB).op('||', return_type=JSONB)(bindparam('b_patch', type_=JSONB))
+        await db.execute(
+            update(table).where(table.c.id == bindparam('b_id')).values({column: merged}),
+            patches,
+        )
+
+    @staticmethod
+    async def _hydrate_party(party_ids: list, db: AsyncSession) -> list[dict]:
         if not party_ids: return []
 
         clean_ids = [str(pid.get('id')) if isinstance(pid, dict) else str(pid) for pid in party_ids]
@@ -169,12 +431,12 @@ class StateService:
         rows = (await db.execute(q)).fetchall()
         row_map = {r.id: r for r in rows}
 
-        party_objs: list[Player] = []
+        party_docs: list[dict] = []
         for pid in clean_ids:
             if pid in row_map:
                 r = row_map[pid]
                 try:
-                    s_data = json.loads(r.sheet_data) if r.sheet_data else {}
+                    sheet = load_blob(r.sheet_data)
                 except json.JSONDecodeError as e:
                     logger.error(
                         "Corrupt sheet_data for character id=%s name=%r: %s | raw=%.200r",
@@ -182,9 +444,12 @@ class StateService:
                     )
                     raise ValueError(f"Corrupt sheet_data JSON for character {r.id}") from e
 
-                # Preserve the original sheet structure so Pydantic doesn't wipe non-Entity attributes
+                # Preserve the original sheet structure so Pydantic doesn't wipe non-Entity
+                # attributes. The overlays below go on a copy: the column arrives decoded,
+                # so writing into `sheet` itself would make sheet_data contain itself.
+                s_data = dict(sheet)
                 if 'sheet_data' not in s_data:
-                    s_data['sheet_data'] = json.loads(r.sheet_data) if r.sheet_data else {}
+                    s_data['sheet_data'] = sheet
 
                 s_data.update({
                     'id': str(r.id),
@@ -205,7 +470,8 @@ class StateService:
                     s_data['position'] = {"x": 0, "y": 0}
 
                 # Normalize inventory to canonical id-strings (model is List[str]).
-                if 'inventory' in s_data:
+                # Blobs stamped by _save_party were normalized on the way out.
+                if 'inventory' in s_data and sheet.get(SCHEMA_KEY) != BLOB_SCHEMA_VERSION:
                     s_data['inventory'] = StateService._normalize_inventory(s_data['inventory'])
 
                 # Calculate actual AC based on stats and equipment
@@ -214,11 +480,11 @@ class StateService:
                 s_data['ac'] = temp_sheet.get_ac()
 
                 StateService._flag_all_default("character", r.id, r.name, s_data.get('hp_max'), s_data.get('ac'), s_data.get('position'))
-                party_objs.append(Player(**s_data))
-        return party_objs
+                party_docs.append(s_data)
+        return party_docs
 
     @staticmethod
-    async def _hydrate_enemies(enemy_ids: list, db: AsyncSession) -> list['Enemy']:
+    async def _hydrate_enemies(enemy_ids: list, db: AsyncSession) -> list[dict]:
         if not enemy_ids: return []
 
         clean_ids = [str(eid.get('id')) if isinstance(eid, dict) else str(eid) for eid in enemy_ids]
@@ -228,18 +494,20 @@ class StateService:
         rows = (await db.execute(q)).fetchall()
         row_map = {r.id: r for r in rows}
 
-        enemy_objs: list[Enemy] = []
+        enemy_docs: list[dict] = []
         for eid in clean_ids:
             if eid in row_map:
                 r = row_map[eid]
                 try:
-                    d = json.loads(r.data) if r.data else {}
+                    d = load_blob(r.data)
                 except json.JSONDecodeError as e:
                     logger.error(
                         "Corrupt data for monster id=%s name=%r: %s | raw=%.200r",
                         r.id, r.name, e, r.data,
                     )
                     raise ValueError(f"Corrupt data JSON for monster {r.id}") from e
+                if d.get(SCHEMA_KEY) != BLOB_SCHEMA_VERSION:
+                    d = StateService._flatten_enemy_blob(d)
 
                 # Base init with data blob
                 init_d = {'data': d}
@@ -265,11 +533,11 @@ class StateService:
                     init_d['ac'] = int(d.get('stats', {}).get('ac', 10))
 
                 StateService._flag_all_default("monster", r.id, r.name, init_d.get('hp_max'), init_d.get('ac'), init_d.get('position'))
-                enemy_objs.append(Enemy(**init_d))
-        return enemy_objs
+                enemy_docs.append(init_d)
+        return enemy_docs
 
     @staticmethod
-    async def _hydrate_npcs(npc_ids: list, db: AsyncSession) -> list['NPC']:
+    async def _hydrate_npcs(npc_ids: list, db: AsyncSession) -> list[dict]:
         if not npc_ids: return []
 
         clean_ids = [str(nid.get('id')) if isinstance(nid, dict) else str(nid) for nid in npc_ids]
@@ -279,12 +547,12 @@ class StateService:
         rows = (await db.execute(q)).fetchall()
         row_map = {r.id: r for r in rows}
 
-        npc_objs: list[NPC] = []
+        npc_docs: list[dict] = []
         for nid in clean_ids:
             if nid in row_map:
                 r = row_map[nid]
                 try:
-                    d = json.loads(r.data) if r.data else {}
+                    d = load_blob(r.data)
                 except json.JSONDecodeError as e:
                     logger.error(
                         "Corrupt data for npc id=%s name=%r: %s | raw=%.200r",
@@ -316,8 +584,8 @@ class StateService:
                 if not r.role and 'role' in d: init_d['role'] = str(d['role'])
 
                 StateService._flag_all_default("npc", r.id, r.name, init_d.get('hp_max'), init_d.get('ac'), init_d.get('position'))
-                npc_objs.append(NPC(**init_d))
-        return npc_objs
+                npc_docs.append(init_d)
+        return npc_docs
 
     @staticmethod
     async def _save_party(party: list, campaign_id: str, db: AsyncSession):
@@ -326,27 +594,31 @@ class StateService:
         party_ids = [p.id for p in party]
         existing_pids = set((await db.scalars(select(characters.c.id).where(characters.c.id.in_(party_ids)))).all())
 
-        updates, inserts = [], []
+        updates, patches, inserts = [], [], []
         for p in party:
             if not p.sheet_data: p.sheet_data = {}
             # Sync transient fields to the preserved sheet_data blob (the source of truth)
             for field in ['hp_current', 'hp_max', 'is_ai', 'control_mode', 'currency']:
                 if hasattr(p, field):
                     p.sheet_data[field] = getattr(p, field)
+            p.sheet_data['conditions'] = [c.model_dump() for c in p.conditions]
             # Normalize inventory to canonical id-strings before persisting.
             if hasattr(p, 'inventory'):
                 p.sheet_data['inventory'] = StateService._normalize_inventory(p.inventory)
             if hasattr(p, 'position') and p.position:
                 pos = getattr(p, 'position')
                 p.sheet_data['position'] = pos.model_dump() if hasattr(pos, 'model_dump') else pos
+            p.sheet_data[SCHEMA_KEY] = BLOB_SCHEMA_VERSION
 
-            sheet_json = json.dumps(p.sheet_data)
-            if p.id in existing_pids:
+            patch = StateService._stage_blob(db, "characters", p.id, p.sheet_data, (p.name, p.role, p.control_mode))
+            if p.id in existing_pids and patch is not None:
+                patches.append({"b_id": p.id, "b_patch": patch})
+            elif p.id in existing_pids:
                 # Rewrite scalar columns from the entity too, so columns never drift
                 # from the blob (hydration overlays these columns over the blob).
                 updates.append({
                     "b_id": p.id,
-                    "b_sheet_data": sheet_json,
+                    "b_sheet_data": p.sheet_data,
                     "b_name": p.name,
                     "b_role": p.role,
                     "b_control_mode": p.control_mode,
@@ -354,7 +626,7 @@ class StateService:
             else:
                 inserts.append({
                     "id": p.id,
-                    "sheet_data": sheet_json,
+                    "sheet_data": p.sheet_data,
                     "user_id": p.user_id if p.user_id else "system",
                     "campaign_id": campaign_id,
                     "name": p.name,
@@ -374,6 +646,7 @@ class StateService:
                 ),
                 updates,
             )
+        await StateService._patch_blobs(db, characters, "sheet_data", patches)
         if inserts:
             await db.execute(insert(characters), inserts)
 
@@ -384,15 +657,24 @@ class StateService:
         eids = [e.id for e in enemies]
         existing = set((await db.scalars(select(monsters.c.id).where(monsters.c.id.in_(eids)))).all())
 
-        updates, inserts = [], []
+        updates, patches, inserts = [], [], []
         for e in enemies:
-            e_data = e.model_dump()
-            if e.id in existing:
+            # One flat document: the template / previous blob overlaid with the entity's
+            # current fields (see _flatten_enemy_blob).
+            e_data = {k: v for k, v in (e.data or {}).items() if k != 'data'}
+            e_data.update(e.model_dump(exclude={'data'}))
+            e_data[SCHEMA_KEY] = BLOB_SCHEMA_VERSION
+            # Hold the written blob, as the next load would (keeps event_log digests stable).
+            e.data = e_data
+            patch = StateService._stage_blob(db, "monsters", e.id, e_data, (e.name, e.type))
+            if e.id in existing and patch is not None:
+                patches.append({"b_id": e.id, "b_patch": patch})
+            elif e.id in existing:
                 # Keep scalar columns (name/type) in sync with the blob on update.
-                updates.append({"b_id": e.id, "b_data": json.dumps(e_data), "b_name": e.name, "b_type": e.type})
+                updates.append({"b_id": e.id, "b_data": e_data, "b_name": e.name, "b_type": e.type})
             else:
                 inserts.append({
-                    "id": e.id, "data": json.dumps(e_data), "campaign_id": campaign_id, "name": e.name, "type": e.type
+                    "id": e.id, "data": e_data, "campaign_id": campaign_id, "name": e.name, "type": e.type
                 })
 
         if updates:
@@ -402,6 +684,7 @@ class StateService:
                 .values(data=bindparam('b_data'), name=bindparam('b_name'), type=bindparam('b_type')),
                 updates,
             )
+        await StateService._patch_blobs(db, monsters, "data", patches)
         if inserts:
             await db.execute(insert(monsters), inserts)
 
@@ -412,20 +695,24 @@ class StateService:
         nids = [n.id for n in npcs_list]
         existing = set((await db.scalars(select(npcs.c.id).where(npcs.c.id.in_(nids)))).all())
 
-        updates, inserts = [], []
+        updates, patches, inserts = [], [], []
         for n in npcs_list:
             if not n.data: n.data = {}
             for field in ['hp_current', 'hp_max', 'identified', 'is_ai', 'hostile', 'friendly', 'ally']:
                  n.data[field] = getattr(n, field)
             n.data['position'] = n.position.model_dump()
             n.data['conditions'] = [c.model_dump() for c in n.conditions] if n.conditions else []
+            n.data[SCHEMA_KEY] = BLOB_SCHEMA_VERSION
 
-            if n.id in existing:
+            patch = StateService._stage_blob(db, "npcs", n.id, n.data, (n.name, n.role))
+            if n.id in existing and patch is not None:
+                patches.append({"b_id": n.id, "b_patch": patch})
+            elif n.id in existing:
                 # Keep scalar columns (name/role) in sync with the blob on update.
-                updates.append({"b_id": n.id, "b_data": json.dumps(n.data), "b_name": n.name, "b_role": n.role})
+                updates.append({"b_id": n.id, "b_data": n.data, "b_name": n.name, "b_role": n.role})
             else:
                 inserts.append({
-                    "id": n.id, "data": json.dumps(n.data), "campaign_id": campaign_id, "name": n.name, "role": n.role
+                    "id": n.id, "data": n.data, "campaign_id": campaign_id, "name": n.name, "role": n.role
                 })
 
         if updates:
@@ -435,5 +722,6 @@ class StateService:
                 .values(data=bindparam('b_data'), name=bindparam('b_name'), role=bindparam('b_role')),
                 updates,
             )
+        await StateService._patch_blobs(db, npcs, "data", patches)
         if inserts:
             await db.execute(insert(npcs), inserts)
@@ -0,0 +1,50 @@
+"""Content-hash manifest for the startup syncs (SRD dataset, campaign templates).
+
+Each synced file is recorded under a stable `source` key with the sha256 of its bytes.
+On the next start a file whose hash still matches is skipped entirely: no parse, no
+upserts. One-off data migrations use the same table as a "done" marker.
+
+Reads fail open: if the table can't be queried, everything looks unsynced and the
+caller falls back to a full sync, which is what happened before the manifest existed.
+"""
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError as e:
+        logger.warning(f"Could not hash {path}: {e}")
+        return None
+
+
+async def load_manifest(db: AsyncSession, prefix: str) -> Dict[str, str]:
+    """source -> content_hash for every entry whose source starts with `prefix`."""
+    try:
+        result = await db.execute(
+            text("SELECT source, content_hash FROM sync_manifest WHERE source LIKE :p"),
+            {"p": f"{prefix}%"}
+        )
+        return {row[0]: row[1] for row in result.fetchall()}
+    except SQLAlchemyError as e:
+        logger.warning(f"Sync manifest unavailable, doing a full sync: {e}")
+        await db.rollback()
+        return {}
+
+
+async def record(db: AsyncSession, source: str, content_hash: str):
+    """Upsert a manifest entry. Joins the caller's transaction; the caller commits."""
+    await db.execute(text("""
+        INSERT INTO sync_manifest (source, content_hash, synced_at)
+        VALUES (:source, :hash, now())
+        ON CONFLICT (source) DO UPDATE SET content_hash = excluded.content_hash, synced_at = excluded.synced_at
+    """), {"source": source, "hash": content_hash})
@@ -1,4 +1,3 @@
-from google import genai
 from typing import List
 
 class SystemService:
@@ -16,6 +15,7 @@ class SystemService:
 
 
         if prov_lower == "gemini":
+            from google import genai
             try:
                 client = genai.Client(api_key=api_key)
                 models = []
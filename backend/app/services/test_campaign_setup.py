@@ -25,6 +25,7 @@ from sqlalchemy import select, insert
 from db.schema import campaigns, campaign_participants, profiles, game_states, campaign_templates
 from app.models import GameState, Location, Coordinates, NPC
 from app.services.campaign_loader import instantiate_campaign
+from app.utils.json_blob import load_blob
 
 logger = logging.getLogger(__name__)
 
@@ -213,7 +214,7 @@ async def create_test_campaign(db: AsyncSession):
                 loc_row = loc_result.first()
 
                 if loc_row:
-                    l_data = json.loads(loc_row.data)
+                    l_data = load_blob(loc_row.data)
                     l_desc = l_data.get('description', {})
                     desc_text = l_desc.get('visual', '') if isinstance(l_desc, dict) else str(l_desc)
                     initial_location = Location(
@@ -232,7 +233,7 @@ async def create_test_campaign(db: AsyncSession):
                     .where(npcs_table.c.campaign_id == TEST_CAMPAIGN_ID)
                 )
                 for n_row in npc_result.all():
-                    n_data = json.loads(n_row.data)
+                    n_data = load_blob(n_row.data)
                     schedule = n_data.get('schedule', [])
                     is_here = any(slot.get('location') == start_loc_id for slot in schedule)
                     if is_here:
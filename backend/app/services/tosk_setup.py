@@ -22,6 +22,7 @@ from db.schema import (campaigns, campaign_participants, profiles, game_states,
                        campaign_templates, locations, npcs as npcs_table)
 from app.models import GameState, Location, Coordinates, NPC
 from app.services.campaign_loader import instantiate_campaign
+from app.utils.json_blob import load_blob
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,9 @@ SYSTEM_PROMPT = (
 )
 
 
-async def seed_tosk_campaign(db: AsyncSession, recreate: bool = True):
+async def seed_tosk_campaign(db: AsyncSession, recreate: bool = True,
+                             campaign_id: str = TOSK_CAMPAIGN_ID, gm_id: str = TOSK_GM_ID):
+    """Seed one ToSK campaign. The ids default to the POC's; the load test seeds many."""
     tpl = (await db.execute(
         select(campaign_templates.c.id, campaign_templates.c.config)
         .where(campaign_templates.c.id == TOSK_TEMPLATE_ID))).first()
@@ -48,15 +51,15 @@ async def seed_tosk_campaign(db: AsyncSession, recreate: bool = True):
         return
 
     existing = (await db.execute(
-        select(campaigns.c.id).where(campaigns.c.id == TOSK_CAMPAIGN_ID))).scalar()
+        select(campaigns.c.id).where(campaigns.c.id == campaign_id))).scalar()
     if existing:
         if not recreate:
-            logger.info("ToSK campaign already exists (%s). Use recreate=True to rebuild.", TOSK_CAMPAIGN_ID)
+            logger.info("ToSK campaign already exists (%s). Use recreate=True to rebuild.", campaign_id)
             return
-        for t in ("game_states", "npcs", "locations", "items", "monsters", "quests"):
-            await db.execute(text(f"DELETE FROM {t} WHERE campaign_id=:c"), {"c": TOSK_CAMPAIGN_ID})
-        await db.execute(text("DELETE FROM campaign_participants WHERE campaign_id=:c"), {"c": TOSK_CAMPAIGN_ID})
-        await db.execute(text("DELETE FROM campaigns WHERE id=:c"), {"c": TOSK_CAMPAIGN_ID})
+        for t in ("game_events", "game_states", "npcs", "locations", "items", "monsters", "quests"):
+            await db.execute(text(f"DELETE FROM {t} WHERE campaign_id=:c"), {"c": campaign_id})
+        await db.execute(text("DELETE FROM campaign_participants WHERE campaign_id=:c"), {"c": campaign_id})
+        await db.execute(text("DELETE FROM campaigns WHERE id=:c"), {"c": campaign_id})
         await db.commit()
 
     # Provider is env-driven so the POC can run on a free LOCAL model (Ollama/LM Studio)
@@ -69,20 +72,20 @@ async def seed_tosk_campaign(db: AsyncSession, recreate: bool = True):
         model = os.getenv("LLM_MODEL", "gemini-3-flash-preview")
         api_key = os.getenv("GEMINI_API_KEY", "")
 
-    if not (await db.execute(select(profiles.c.id).where(profiles.c.id == TOSK_GM_ID))).scalar():
+    if not (await db.execute(select(profiles.c.id).where(profiles.c.id == gm_id))).scalar():
         await db.execute(insert(profiles).values(
-            id=TOSK_GM_ID, username="DevTester", is_admin=True, status="active"))
+            id=gm_id, username="DevTester", is_admin=True, status="active"))
 
     await db.execute(insert(campaigns).values(
-        id=TOSK_CAMPAIGN_ID, name="Tomb of the Serpent Kings — POC", gm_id=TOSK_GM_ID,
+        id=campaign_id, name="Tomb of the Serpent Kings — POC", gm_id=gm_id,
         status="active", api_key=api_key, api_key_verified=bool(api_key),
         model=model, system_prompt=SYSTEM_PROMPT,
         template_id=TOSK_TEMPLATE_ID, llm_provider=provider))
 
-    await instantiate_campaign(db, TOSK_CAMPAIGN_ID, TOSK_TEMPLATE_ID)
+    await instantiate_campaign(db, campaign_id, TOSK_TEMPLATE_ID)
 
     await db.execute(insert(campaign_participants).values(
-        id=str(uuid4()), campaign_id=TOSK_CAMPAIGN_ID, user_id=TOSK_GM_ID,
+        id=str(uuid4()), campaign_id=campaign_id, user_id=gm_id,
         role="gm", status="active"))
 
     # ── Build the first GameState at the starting room (Room 6) ──
@@ -94,10 +97,10 @@ async def seed_tosk_campaign(db: AsyncSession, recreate: bool = True):
     if start_loc_id:
         loc = (await db.execute(
             select(locations.c.id, locations.c.name, locations.c.data)
-            .where(locations.c.campaign_id == TOSK_CAMPAIGN_ID,
+            .where(locations.c.campaign_id == campaign_id,
                    locations.c.source_id == start_loc_id))).first()
         if loc:
-            ld = json.loads(loc.data)
+            ld = load_blob(loc.data)
             desc = ld.get("description", {})
             dtext = desc.get("visual", "") if isinstance(desc, dict) else str(desc)
             initial_location = Location(
@@ -108,9 +111,9 @@ async def seed_tosk_campaign(db: AsyncSession, recreate: bool = True):
 
         rows = (await db.execute(
             select(npcs_table.c.id, npcs_table.c.name, npcs_table.c.role, npcs_table.c.data)
-            .where(npcs_table.c.campaign_id == TOSK_CAMPAIGN_ID))).all()
+            .where(npcs_table.c.campaign_id == campaign_id))).all()
         for nr in rows:
-            nd = json.loads(nr.data)
+            nd = load_blob(nr.data)
             if not any(s.get("location") == start_loc_id for s in nd.get("schedule", [])):
                 continue
             hp = nd.get("stats", {}).get("hp", 10)
@@ -128,18 +131,18 @@ async def seed_tosk_campaign(db: AsyncSession, recreate: bool = True):
                 barks=nd.get("voice", {}).get("barks"),
                 knowledge=nd.get("knowledge", []), data=nd))
 
-    gs = GameState(session_id=TOSK_CAMPAIGN_ID, location=initial_location, party=[], npcs=initial_npcs)
+    gs = GameState(session_id=campaign_id, location=initial_location, party=[], npcs=initial_npcs)
     await db.execute(insert(game_states).values(
-        id=str(uuid4()), campaign_id=TOSK_CAMPAIGN_ID, turn_index=0,
+        id=str(uuid4()), campaign_id=campaign_id, turn_index=0,
         phase="exploration", state_data=gs.model_dump_json()))
     await db.commit()
 
     placed = [(n.name, (n.position.x, n.position.y)) for n in initial_npcs]
     logger.info("Seeded ToSK POC: campaign=%s start=%s skeletons=%d",
-                TOSK_CAMPAIGN_ID, start_loc_id, len(initial_npcs))
+                campaign_id, start_loc_id, len(initial_npcs))
     logger.info("  positions: %s", placed)
     logger.info("  provider=%s model=%s api_key_set=%s | dash: /campaign_dash/%s",
-                provider, model, bool(api_key), TOSK_CAMPAIGN_ID)
+                provider, model, bool(api_key), campaign_id)
 
 
 async def _main():
@@ -1,6 +1,5 @@
 import asyncio
 import logging
-import random
 import traceback
 from app.services.game_service import GameService
 from app.services.combat_service import CombatService
@@ -16,7 +15,9 @@ logger = logging.getLogger(__name__)
 from app.services.lock_service import LockService
 from app.services.state_service import StateService
 from app.services.pathfinding_service import PathfindingService
+from app.services.combat_profile import get_profile
 from app.utils.grid_utils import chebyshev_distance
+from app.utils import metrics, tracing
 
 class TurnManager:
     @staticmethod
@@ -38,7 +39,8 @@ class TurnManager:
     @staticmethod
     def _is_character_ai(game_state, character_id: str) -> bool:
         """Determines if the given character ID belongs to an AI controlled entity."""
-        active_char = next((c for c in (game_state.party + game_state.enemies + game_state.npcs) if c.id == character_id), None)
+        index = game_state.entity_index()
+        active_char = index.get(character_id)
         if not active_char:
             return False
 
@@ -46,9 +48,7 @@ class TurnManager:
             return True
         elif hasattr(active_char, 'control_mode') and active_char.control_mode == 'ai':
             return True
-        elif any(e.id == character_id for e in game_state.enemies):
-            return True
-        elif any(n.id == character_id for n in game_state.npcs):
+        elif index.faction_of(character_id) in ("enemy", "npc"):
             return True
         return False
 
@@ -67,7 +67,7 @@ class TurnManager:
          await StateService.emit_state_update(campaign_id, game_state, sio)
 
          # Notify whose turn it is
-         active_char = next((c for c in (game_state.party + game_state.enemies + game_state.npcs) if c.id == active_id), None)
+         active_char = game_state.get_entity(active_id)
          if not active_char:
              return None
 
@@ -196,7 +196,7 @@ class TurnManager:
                         # Execute the Turn
                         try:
                             # Re-resolve active_char from the newly fetched state so mutations apply to the correct object tree
-                            active_char = next((c for c in (game_state.party + game_state.enemies + game_state.npcs) if c.id == active_id), None)
+                            active_char = game_state.get_entity(active_id)
                             if not active_char:
                                 break
 
@@ -221,6 +221,7 @@ class TurnManager:
                                              game_state = new_state
                                              pending_changes = True
                             except asyncio.TimeoutError:
+                                metrics.AI_TURN_TIMEOUTS.inc()
                                 logger.warning(f"AI turn timed out for {active_char.name} ({active_id}), skipping")
                                 await sio.emit('system_message', {
                                     'content': f"*{active_char.name}'s turn timed out and was skipped.*"
@@ -271,7 +272,7 @@ class TurnManager:
     @staticmethod
     async def _select_optimal_target(campaign_id: str, actor, game_state, sio):
         targets = []
-        is_actor_party = any(p.id == actor.id for p in game_state.party)
+        is_actor_party = game_state.entity_index().faction_of(actor.id) == "party"
 
         if is_actor_party:
              # Party members (and their pets/summons) target enemies + hostile NPCs
@@ -279,7 +280,7 @@ class TurnManager:
              hostile_npcs = [n for n in game_state.npcs if n.hostile]
              targets.extend(hostile_npcs)
 
-        elif any(n.id == actor.id for n in game_state.npcs):
+        elif game_state.entity_index().faction_of(actor.id) == "npc":
              # NPC Logic
              is_hostile = actor.hostile
              is_ally = actor.ally or actor.friendly
@@ -356,54 +357,12 @@ class TurnManager:
         Returns [] when the actor has no Multiattack (caller falls back to a single attack).
         Supports two SRD shapes: a flat 'actions' list of {action_name, count}, and
         'action_options' (pick one option set). Each returned item is the matched attack's
-        SRD action dict.
+        SRD action dict. Parsing happens once per stat block (see combat_profile).
         """
-        data = getattr(actor, 'data', {})
-        if not isinstance(data, dict):
-            return []
-
-        actions = data.get('actions', [])
-        if not actions:
-            return []
-
-        multi_action = None
-        for a in actions:
-            if isinstance(a, dict) and 'multiattack' in a.get('name', '').lower():
-                multi_action = a
-                break
-        if not multi_action:
-            return []
-
-        # Look up the actor's concrete attack actions by name (anything with damage).
-        attack_lookup = {}
-        for a in actions:
-            if isinstance(a, dict) and a.get('damage') and 'multiattack' not in a.get('name', '').lower():
-                attack_lookup[a['name']] = a
-
-        attack_sequence = []
-
-        # Format 1: flat list of {action_name, count}.
-        if multi_action.get('multiattack_type') == 'actions' and multi_action.get('actions'):
-            for entry in multi_action['actions']:
-                action_name = entry.get('action_name', '')
-                count = int(entry.get('count', 1))
-                if action_name in attack_lookup:
-                    attack_sequence.extend(attack_lookup[action_name] for _ in range(count))
-
-        # Format 2: action_options — choose one option set.
-        elif multi_action.get('multiattack_type') == 'action_options' and multi_action.get('action_options'):
-            options = multi_action['action_options'].get('from', {}).get('options', [])
-            if options:
-                chosen = random.choice(options)
-                for item in chosen.get('items', []):
-                    action_name = item.get('action_name', '')
-                    count = int(item.get('count', 1))
-                    if action_name in attack_lookup:
-                        attack_sequence.extend(attack_lookup[action_name] for _ in range(count))
-
-        return attack_sequence
+        return get_profile(actor).multiattack_sequence()
 
     @staticmethod
+    @tracing.traced("turn.ai_turn")
     async def execute_ai_turn(campaign_id: str, actor, game_state, sio, db, commit: bool = True):
         """
         Simple AI logic: Attack closest/random hostile.
@@ -416,38 +375,8 @@ class TurnManager:
             logger.debug("No targets found. Passing turn.")
             return game_state
 
-        # Calculate max_attack_range based on equipment/actions
-        max_attack_range = 1
-        weapons = []
-        is_spellcaster = False
-
-        if hasattr(actor, 'sheet_data'):
-            weapons = [item for item in actor.sheet_data.get('equipment', []) if isinstance(item, dict) and item.get('type') == 'Weapon']
-            if actor.sheet_data.get('spells'):
-                is_spellcaster = True
-
-        if hasattr(actor, 'data'):
-            for action in actor.data.get('actions', []):
-                desc = action.get('desc', '').lower()
-                name = action.get('name', '').lower()
-                if 'ranged weapon attack' in desc or 'range ' in desc or 'ft.' in desc or 'feet' in desc:
-                    import re
-                    match = re.search(r'range\s+(\d+)', desc)
-                    if match:
-                        dist_ft = int(match.group(1))
-                        max_attack_range = max(max_attack_range, dist_ft // 5)
-                if 'spellcasting' in name or 'spell' in name:
-                    is_spellcaster = True
-
-        for w in weapons:
-            w_type = w.get('data', {}).get('type', '').lower()
-            if 'ranged' in w_type:
-                normal_range = w.get('data', {}).get('range', {}).get('normal', 120)
-                if isinstance(normal_range, int):
-                    max_attack_range = max(max_attack_range, normal_range // 5)
-
-        if is_spellcaster and max_attack_range <= 1:
-            max_attack_range = 12 # 60ft fallback for typical cantrips
+        # Reach / range / spellcaster flag are precompiled per stat block or loadout
+        max_attack_range = get_profile(actor).max_attack_range
 
         if actor.position is None or target.position is None:
              await sio.emit('system_message', {'content': f"⚠️ {actor.name} passes their turn: Coordinates missing or trapped in void."}, room=campaign_id)
@@ -467,15 +396,9 @@ class TurnManager:
         if needs_to_move:
             # Need to move closer to get within range/LOS.
             # Enemies/NPCs block movement; allies can be passed through but not stopped on.
-            obstacle_cells = set()
-            for entity in [e for e in game_state.enemies if e.hp_current > 0] + game_state.npcs:
-                if entity.id != actor.id and entity.position:
-                    obstacle_cells.add((entity.position.x, entity.position.y))
-
-            allied_cells = set()
-            for p in game_state.party:
-                if p.id != actor.id and p.position:
-                    allied_cells.add((p.position.x, p.position.y))
+            index = game_state.spatial_index()
+            obstacle_cells = index.obstacle_cells(exclude=actor)
+            allied_cells = index.party_cells(exclude=actor)
 
             max_move = actor.speed // 5 if hasattr(actor, 'speed') and actor.speed else 6
 
@@ -494,8 +417,7 @@ class TurnManager:
                 new_dist_to_target = chebyshev_distance(best_cell[0], best_cell[1], target.position.x, target.position.y)
 
                 if new_dist_to_target < dist_to_target:
-                    actor.position.x = best_cell[0]
-                    actor.position.y = best_cell[1]
+                    game_state.move_entity(actor, *best_cell)
 
                     logger.debug(f"AI {actor.name} moved to Position: x={actor.position.x}, y={actor.position.y}")
 
@@ -556,10 +478,7 @@ class TurnManager:
             current_state = game_state
             for _atk_action in multi_attacks:
                 # Stop early once the target is down.
-                target_entity = next(
-                    (e for e in (current_state.party + current_state.enemies + current_state.npcs) if e.id == target.id),
-                    None,
-                )
+                target_entity = current_state.get_entity(target.id)
                 if target_entity and target_entity.hp_current <= 0:
                     break
                 atk_result = await CombatService.resolution_attack(
@@ -603,7 +522,7 @@ class TurnManager:
         logger.debug(f"AI {actor.name} completed Attack Resolution. Result HP: {result.get('target_hp_remaining')}, Position check: x={actor.position.x}, y={actor.position.y}")
 
         # Save & Emit Mechanics
-        is_actor_party = any(p.id == actor.id for p in game_state.party)
+        is_actor_party = game_state.entity_index().faction_of(actor.id) == "party"
 
         if is_actor_party:
              # Formulate hidden context
@@ -2,6 +2,7 @@ import functools
 import traceback
 import logging
 
+from app.utils import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +13,10 @@ def socket_event_handler(func):
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
         try:
-            return await func(*args, **kwargs)
+            # Root span of the event's trace; the exception is recorded on it
+            # before being swallowed below.
+            with tracing.span(f"socket.{func.__name__}"):
+                return await func(*args, **kwargs)
         except Exception as e:
             logger.error(f"Error in socket event {func.__name__}: {e}")
             logger.error(traceback.format_exc())
@@ -10,6 +10,7 @@ from app.services.game_service import GameService
 from app.services.ai_service import AIService
 from app.services.chat_service import ChatService
 from app.services.command_service import CommandService
+from app.utils import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,7 @@ async def handle_clear_chat(sid, sio, connected_users):
     async with AsyncSessionLocal() as db:
         await db.execute(text("DELETE FROM chat_messages WHERE campaign_id = :campaign_id"), {"campaign_id": campaign_id})
         await db.commit()
+    ChatService.clear_tail(campaign_id)
 
     await sio.emit('chat_cleared', {}, room=campaign_id)
     await sio.emit('system_message', {'content': "Chat history has been cleared."}, room=campaign_id)
@@ -93,6 +95,7 @@ async def handle_chat_message(sid, data, sio, connected_users):
     try:
         # 1. Save User Message
         save_result = await ChatService.save_message(campaign_id, sender_id, sender_name, content)
+        tracing.annotate(campaign_id=campaign_id, message_id=save_result['id'])
 
         # 2. Broadcast to room
         await sio.emit('chat_message', {
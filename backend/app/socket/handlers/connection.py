@@ -1,8 +1,8 @@
 import logging
-from firebase_admin import auth as firebase_auth
 from sqlalchemy import text
 from db.session import AsyncSessionLocal
 from app.socket.decorators import socket_event_handler
+from app.utils import token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,7 @@ async def handle_connect(sid, environ, auth, connected_users):
 
     token = auth['token']
     try:
-        decoded_token = firebase_auth.verify_id_token(token)
+        decoded_token = await token_cache.verify_id_token(token)
         user_id = decoded_token['uid']
 
 
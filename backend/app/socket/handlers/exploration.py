@@ -4,6 +4,8 @@ from app.socket.decorators import socket_event_handler
 from app.services.game_service import GameService
 from app.services.lock_service import LockService
 from app.services.state_service import StateService
+from app.utils.entity_index import ENEMY
+from app.utils.spatial_index import living
 
 logger = logging.getLogger(__name__)
 
@@ -66,30 +68,23 @@ async def handle_move_entity(sid, data, sio, connected_users):
                 game_state.has_moved_this_turn = True
 
             # Validate target cell is in walkable_cells
-            target_cell = next((h for h in game_state.location.walkable_cells if h.x == target_x and h.y == target_y), None)
-            if not target_cell:
+            if (target_x, target_y) not in game_state.location.walkable_cells:
                  logger.warning(f"[Move] Target cell not walkable {target_x},{target_y}")
                  return
 
-            # Validate no collision
-            occupied = False
-            for loop_entity in game_state.party + [e for e in game_state.enemies if e.hp_current > 0] + game_state.npcs:
-                if loop_entity.id != entity.id and loop_entity.position is not None:
-                    if loop_entity.position.x == target_x and loop_entity.position.y == target_y:
-                        occupied = True
-                        break
+            # Validate no collision (dead enemies don't block)
+            index = game_state.spatial_index()
+            occupied = any(
+                other is not entity and (index.faction_of(other) != ENEMY or living(other))
+                for other in index.occupants((target_x, target_y))
+            )
 
             if occupied:
                  logger.warning(f"[Move] Target cell occupied {target_x},{target_y}")
                  return
 
             # Update position
-            if entity.position is None:
-                from app.models import Coordinates
-                entity.position = Coordinates(x=target_x, y=target_y)
-            else:
-                entity.position.x = target_x
-                entity.position.y = target_y
+            game_state.move_entity(entity, target_x, target_y)
 
             if path:
                 await sio.emit('entity_path_animation', {'entity_id': entity.id, 'path': path}, room=campaign_id)
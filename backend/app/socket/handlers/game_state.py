@@ -7,13 +7,15 @@ from sqlalchemy.exc import SQLAlchemyError
 from db.session import AsyncSessionLocal
 from app.models import Player, Coordinates, GameState, Location
 from app.socket.decorators import socket_event_handler
-from app.services.chat_service import ChatService
+from app.services.chat_service import ChatService, NOISE_FILTER_SQL
 from app.services.context_builder import build_narrative_context
 from app.agents import get_dm_graph
 from app.callbacks import SocketIOCallbackHandler
 from langchain_core.messages import HumanMessage
 from app.services.game_service import GameService
 from app.services.state_service import StateService
+from app.utils import json_codec
+from app.utils.json_blob import load_blob
 
 logger = logging.getLogger(__name__)
 
@@ -92,7 +94,7 @@ async def handle_join_campaign(sid, data, sio, connected_users):
 
             for char_row in char_rows:
                 try:
-                    sheet_data = json.loads(char_row['sheet_data']) if char_row['sheet_data'] else {}
+                    sheet_data = load_blob(char_row['sheet_data'])
                 except json.JSONDecodeError as e:
                     logger.warning(f"[DEBUG] Error parsing sheet_data for char {char_row['id']}: {e}")
                     sheet_data = {}
@@ -218,6 +220,7 @@ async def handle_join_campaign(sid, data, sio, connected_users):
                             new_p.position = Coordinates(**spawn_data)
 
                 game_state.party.append(new_p)
+            game_state.roster_changed()
 
             # 4.5 Check for Fresh Campaign (Prevent Premature Image Gen)
             # If no chat messages exist and intro hasn't started, clear description so client waits for intro
@@ -277,18 +280,15 @@ async def handle_join_campaign(sid, data, sio, connected_users):
     # Send existing chat history
     async with AsyncSessionLocal() as db:
         result = await db.execute(
-            text("""SELECT * FROM chat_messages
-               WHERE campaign_id = :campaign_id
-               ORDER BY created_at ASC"""),
+            text(f"""SELECT sender_id, sender_name, content, created_at FROM chat_messages
+               WHERE campaign_id = :campaign_id AND {NOISE_FILTER_SQL}
+               ORDER BY created_at ASC, id ASC"""),
             {"campaign_id": campaign_id}
         )
         rows = result.mappings().all()
 
         history_data = []
         for row in rows:
-            if "DM Agent is offline" in row["content"] or "The DM is confused" in row["content"]:
-                continue
-
             history_data.append({
                 'sender_id': row['sender_id'],
                 'sender_name': row['sender_name'],
@@ -372,7 +372,7 @@ async def handle_join_campaign(sid, data, sio, connected_users):
                     )
                     s_row = state_res.mappings().fetchone()
                     if s_row:
-                        gs = GameState(**json.loads(s_row['state_data']))
+                        gs = GameState(**load_blob(s_row['state_data']))
 
                         rich_context = await build_narrative_context(db, campaign_id, gs)
 
@@ -498,7 +498,7 @@ async def handle_join_campaign(sid, data, sio, connected_users):
 
         for row in rows:
             try:
-                full_content = json.loads(row['full_content']) if row['full_content'] else None
+                full_content = json_codec.loads(row['full_content']) if row['full_content'] else None
             except json.JSONDecodeError:
                 full_content = str(row['full_content'])
 
@@ -2,12 +2,16 @@ import socketio
 
 from typing import Dict
 
+from app.utils.json_codec import socketio_json
+from app.utils.session_recorder import recorded
+
 # Import Handlers
 from app.socket.handlers import connection, chat, game_state, inventory, exploration
 
 
 sio = socketio.AsyncServer(
     async_mode='asgi',
+    json=socketio_json,
     cors_allowed_origins=[
         "http://localhost:3000",
         "http://127.0.0.1:3000",
@@ -38,37 +42,46 @@ async def disconnect(sid):
     await connection.handle_disconnect(sid, connected_users)
 
 @sio.event
+@recorded
 async def test_connection(sid, data=None):
     return await connection.handle_test_connection(sid, connected_users)
 
 @sio.event
+@recorded
 async def join_campaign(sid, data):
     await game_state.handle_join_campaign(sid, data, sio, connected_users)
 
 @sio.event
+@recorded
 async def request_full_state(sid, data=None):
     await game_state.handle_request_full_state(sid, data, sio, connected_users)
 
 @sio.event
+@recorded
 async def chat_message(sid, data):
     await chat.handle_chat_message(sid, data, sio, connected_users)
 
 @sio.event
+@recorded
 async def clear_chat(sid):
     await chat.handle_clear_chat(sid, sio, connected_users)
 
 @sio.event
+@recorded
 async def take_items(sid, data):
     await inventory.handle_take_items(sid, data, sio, connected_users)
 
 @sio.event
+@recorded
 async def equip_item(sid, data):
     await inventory.handle_equip_item(sid, data, sio, connected_users)
 
 @sio.event
+@recorded
 async def clear_debug_logs(sid):
     await chat.handle_clear_logs(sid, sio, connected_users)
 
 @sio.event
+@recorded
 async def move_entity(sid, data):
     await exploration.handle_move_entity(sid, data, sio, connected_users)
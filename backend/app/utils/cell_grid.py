@@ -0,0 +1,124 @@
+"""Packed walkable-cell geometry for `Location.walkable_cells`.
+
+Rooms carry hundreds to thousands of walkable cells. As `List[Coordinates]` each one
+was a full BaseModel (validated on every hydration, ~1us, plus a per-instance dict)
+and every pathfinding / line-of-sight call rebuilt a `{(x, y)}` set from them.
+`CellGrid` keeps the cells as two `array('h')` columns and builds the membership
+set once, on first use.
+
+Only the API boundary sees the old shape: pydantic validates a `CellGrid` from a list
+of `{x, y}` dicts, `Coordinates`, or `(x, y)` pairs, and `model_dump()` /
+`model_dump_json()` write it back as `[{"x": .., "y": ..}, ...]` in the original order,
+so stored game states, socket payloads and the frontend are unchanged.
+
+A grid is immutable; `with_cells` returns an extended copy.
+"""
+from array import array
+from typing import Any, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic_core import core_schema
+
+Cell = Tuple[int, int]
+
+
+def _xy(cell: Any) -> Cell:
+    if isinstance(cell, dict):
+        return int(cell['x']), int(cell['y'])
+    if isinstance(cell, (tuple, list)):
+        x, y = cell
+        return int(x), int(y)
+    return int(cell.x), int(cell.y)
+
+
+class CellGrid:
+    __slots__ = ('_xs', '_ys', '_set')
+
+    def __init__(self, cells: Iterable[Any] = ()):
+        self._xs = array('h')
+        self._ys = array('h')
+        self._set: Optional[FrozenSet[Cell]] = None
+        try:
+            for cell in cells:
+                x, y = _xy(cell)
+                self._xs.append(x)
+                self._ys.append(y)
+        except OverflowError as e:
+            raise ValueError(f"walkable cell coordinate out of range: {e}") from e
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"invalid walkable cell: {e!r}") from e
+
+    @property
+    def cells(self) -> FrozenSet[Cell]:
+        """The (x, y) membership set, built once per grid."""
+        if self._set is None:
+            self._set = frozenset(zip(self._xs, self._ys))
+        return self._set
+
+    def __contains__(self, cell: Any) -> bool:
+        if not isinstance(cell, tuple):
+            try:
+                cell = _xy(cell)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                return False
+        return cell in self.cells
+
+    def __iter__(self) -> Iterator[Cell]:
+        return zip(self._xs, self._ys)
+
+    def __len__(self) -> int:
+        return len(self._xs)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CellGrid):
+            return self._xs == other._xs and self._ys == other._ys
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CellGrid({len(self)} cells)"
+
+    def with_cells(self, cells: Iterable[Any]) -> 'CellGrid':
+        """Copy of this grid with `cells` appended (the original is left untouched)."""
+        grid = CellGrid(cells)
+        grid._xs = self._xs + grid._xs
+        grid._ys = self._ys + grid._ys
+        return grid
+
+    def to_list(self) -> List[dict]:
+        """The API / storage shape: `[{"x": .., "y": ..}, ...]`."""
+        return [{'x': x, 'y': y} for x, y in zip(self._xs, self._ys)]
+
+    @classmethod
+    def _validate(cls, value: Any) -> 'CellGrid':
+        if isinstance(value, CellGrid):
+            return value
+        if value is None:
+            return cls()
+        if isinstance(value, (str, bytes, dict)):
+            raise ValueError("walkable_cells must be a list of {x, y} cells")
+        return cls(value)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda grid: grid.to_list(),
+                return_schema=core_schema.list_schema(core_schema.dict_schema(
+                    core_schema.str_schema(), core_schema.int_schema())),
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any) -> dict:
+        cell = core_schema.typed_dict_schema({
+            'x': core_schema.typed_dict_field(core_schema.int_schema()),
+            'y': core_schema.typed_dict_field(core_schema.int_schema()),
+        })
+        return handler(core_schema.list_schema(cell))
+
+
+def cell_set(walkable_cells: Any) -> FrozenSet[Cell]:
+    """(x, y) set for a CellGrid (cached) or any iterable of cells (built here)."""
+    if isinstance(walkable_cells, CellGrid):
+        return walkable_cells.cells
+    return frozenset(_xy(c) for c in walkable_cells) if walkable_cells else frozenset()
@@ -0,0 +1,109 @@
+"""Lookup index over a GameState's roster (party + enemies + npcs).
+
+Replaces the repeated linear passes (`_find_char_by_name`, `next(c for c in party +
+enemies + npcs ...)`) with dict / bisect lookups. `GameState.entity_index()` caches
+one of these until it is dropped: code that adds, removes or replaces a roster
+entity calls `GameState.roster_changed()`, and code that renames one in place
+(name, race, role, type, target_id) calls `GameState.invalidate_entity_index()`.
+A freshly hydrated state starts without one. HP / position / condition edits
+don't touch what the index covers.
+
+Checking a roster signature on every lookup instead would cost more than the
+linear scans it replaces (scripts/bench_entity_lookup.py).
+"""
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional
+
+PARTY, ENEMY, NPC = "party", "enemy", "npc"
+
+
+def _bucket_keys(c) -> Iterable[str]:
+    """Race / role / type terms an entity answers to (find() priority 4)."""
+    for attr in ('race', 'role', 'type'):
+        value = getattr(c, attr, None)
+        if value:
+            yield value.lower()
+    data = getattr(c, 'data', None)
+    if data:
+        for key in ('race', 'type', 'role'):
+            if key in data:
+                yield str(data[key]).lower()
+
+
+class EntityIndex:
+    def __init__(self, party: List[Any], enemies: List[Any], npcs: List[Any]):
+        # Roster order (party, enemies, npcs) is the tie-break everywhere, matching the
+        # old "first match wins" scans.
+        self.entities: List[Any] = [*party, *enemies, *npcs]
+        self.faction: Dict[str, str] = {}
+        self.by_id: Dict[str, Any] = {}
+        self.by_key: Dict[str, Any] = {}      # lowercase id / target_id
+        self.by_name: Dict[str, Any] = {}     # lowercase name
+        self.by_bucket: Dict[str, Any] = {}   # lowercase race / role / type
+        self.party_ids = frozenset(c.id for c in party)
+        self.enemy_ids = frozenset(c.id for c in enemies)
+        self.npc_ids = frozenset(c.id for c in npcs)
+
+        for group, faction in ((party, PARTY), (enemies, ENEMY), (npcs, NPC)):
+            for c in group:
+                self.faction.setdefault(c.id, faction)
+
+        self._lower_names: List[str] = []
+        for c in self.entities:
+            self.by_id.setdefault(c.id, c)
+            self.by_key.setdefault(c.id.lower(), c)
+            target_id = getattr(c, 'target_id', None)
+            if target_id:
+                self.by_key.setdefault(target_id.lower(), c)
+            lower_name = c.name.lower()
+            self._lower_names.append(lower_name)
+            self.by_name.setdefault(lower_name, c)
+            for key in _bucket_keys(c):
+                self.by_bucket.setdefault(key, c)
+
+        # Sorted (name, roster position) pairs: a prefix query is a bisect range scan.
+        self._sorted_names = sorted((n, i) for i, n in enumerate(self._lower_names))
+
+    @classmethod
+    def from_state(cls, game_state) -> "EntityIndex":
+        return cls(game_state.party, game_state.enemies, game_state.npcs)
+
+    def get(self, entity_id: Optional[str]) -> Optional[Any]:
+        return self.by_id.get(entity_id) if entity_id else None
+
+    def faction_of(self, entity_id: Optional[str]) -> Optional[str]:
+        return self.faction.get(entity_id) if entity_id else None
+
+    def find_prefix(self, prefix: str) -> Optional[Any]:
+        """First entity in roster order whose lowercase name starts with `prefix`."""
+        names = self._sorted_names
+        i = bisect_left(names, (prefix, -1))
+        best = None
+        while i < len(names) and names[i][0].startswith(prefix):
+            pos = names[i][1]
+            if best is None or pos < best:
+                best = pos
+            i += 1
+        return self.entities[best] if best is not None else None
+
+    def find(self, search_term: Optional[str], target_id: Optional[str] = None) -> Optional[Any]:
+        """Resolve a free-text reference with the same priorities as the old scans:
+        target_id, exact id/target_id, exact name, name prefix, race/role/type,
+        then name substring."""
+        if target_id and target_id in self.by_id:
+            return self.by_id[target_id]
+        if not search_term:
+            return None
+        term = search_term.lower()
+        for hit in (self.by_key.get(term), self.by_name.get(term)):
+            if hit is not None:
+                return hit
+        hit = self.find_prefix(term)
+        if hit is None:
+            hit = self.by_bucket.get(term)
+        if hit is not None:
+            return hit
+        for pos, name in enumerate(self._lower_names):
+            if term in name:
+                return self.entities[pos]
+        return None
@@ -4,56 +4,9 @@ secure_random = secrets.SystemRandom()
 class EntityUtils:
     @staticmethod
     def find_char_by_name(game_state, search_term: str, target_id: str = None):
-        all_entities = game_state.entities.values() if game_state and hasattr(game_state, 'entities') else []
-
-        if target_id:
-            for c in all_entities:
-                if c.id == target_id:
-                    return c
-
-        if not search_term:
+        if not game_state:
             return None
-
-        term = search_term.lower()
-
-        # Priority 1: Exact ID or target_id Match
-        for c in all_entities:
-            if term == c.id.lower():
-                return c
-            if hasattr(c, 'target_id') and c.target_id and term == c.target_id.lower():
-                return c
-
-        # Priority 2: Exact Name Match
-        for c in all_entities:
-            if term == c.name.lower():
-                return c
-
-        # Priority 3: Prefix Name Match
-        for c in all_entities:
-            if c.name.lower().startswith(term):
-                return c
-
-        # Priority 4: Race / Type / Role Exact Match
-        for c in all_entities:
-            # Player
-            if hasattr(c, 'race') and c.race and term == c.race.lower(): return c
-            if hasattr(c, 'role') and c.role and term == c.role.lower(): return c
-
-            # Enemy
-            if hasattr(c, 'type') and c.type and term == c.type.lower(): return c
-
-            # NPC
-            if hasattr(c, 'data') and c.data:
-                if 'race' in c.data and term == str(c.data['race']).lower(): return c
-                if 'type' in c.data and term == str(c.data['type']).lower(): return c
-                if 'role' in c.data and term == str(c.data['role']).lower(): return c
-
-        # Priority 5: Substring Name Match (Fallback)
-        for c in all_entities:
-            if term in c.name.lower():
-                return c
-
-        return None
+        return game_state.entity_index().find(search_term, target_id)
 
     @staticmethod
     def get_display_name(entity):
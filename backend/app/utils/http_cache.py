@@ -0,0 +1,49 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.utils import json_codec
+
+# Revalidate every time, but let the browser keep the body and send If-None-Match.
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """RFC 9110 weak comparison of `etag` against the request's If-None-Match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    wanted = etag.removeprefix("W/")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == wanted:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def etag_json_response(request: Request, payload: Any, etag: Optional[str] = None) -> Response:
+    """JSON response carrying an ETag; 304 with no body if the client already has it.
+
+    Without an explicit `etag`, a weak one is derived from the serialized body, which
+    still saves the transfer and client-side re-parse on unchanged results.
+    """
+    try:
+        body = json_codec.dumpb(payload)
+    except TypeError:  # models, sets, ... need FastAPI's encoder first
+        body = json_codec.dumpb(jsonable_encoder(payload))
+    if etag is None:
+        etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
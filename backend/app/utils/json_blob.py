@@ -0,0 +1,18 @@
+from typing import Any
+
+from app.utils import json_codec
+
+
+def load_blob(value: Any, default: Any = None) -> Any:
+    """Decode an entity JSON column as read through text() / .mappings().
+
+    characters.sheet_data, game_states.state_data and the npcs / locations / monsters
+    `data` columns are JSONB (db.schema.JSONBlob): asyncpg hands them back already
+    decoded. A database init_db could not convert still stores TEXT, so strings are
+    parsed here; json.JSONDecodeError propagates as before for corrupt rows.
+    """
+    if value is None or value == "":
+        return {} if default is None else default
+    if isinstance(value, (dict, list)):
+        return value
+    return json_codec.loads(value)
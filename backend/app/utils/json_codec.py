@@ -0,0 +1,77 @@
+"""Process-wide JSON codec: orjson when it is installed, stdlib json otherwise.
+
+One place decides how the backend encodes JSON, and it is plugged in everywhere
+JSON crosses a boundary:
+
+- SQLAlchemy: the engine's json_serializer / json_deserializer (the asyncpg json and
+  jsonb codecs), which db.schema.JSONBlob encodes and decodes with.
+- Socket.IO: `socketio_json` is passed as the server's `json` module, so every
+  emitted event (game_state_update / game_state_patch included) is encoded here.
+- HTTP: `CodecJSONResponse` is the app's default response class. Routes with a
+  response_model keep FastAPI's own pydantic fast path, and http_cache bodies use
+  dumpb directly.
+
+Output is always compact and UTF-8, which is not byte-identical to json.dumps (no
+spaces, no \\uXXXX escapes). Non-string dict keys are coerced to strings as the
+stdlib does. Anything orjson refuses, such as integers wider than 64 bits, falls back
+to the stdlib encoder. orjson.JSONDecodeError subclasses json.JSONDecodeError, so
+existing `except json.JSONDecodeError` handlers keep working with either backend.
+"""
+import json
+from types import SimpleNamespace
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _INDENT_OPTIONS = _OPTIONS | orjson.OPT_INDENT_2
+
+    def dumpb(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+        option = _INDENT_OPTIONS if indent else _OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, option=option)
+        except orjson.JSONEncodeError:
+            return _stdlib_dumps(obj, indent, sort_keys).encode()
+
+    def dumps(obj: Any, indent: bool = False) -> str:
+        return dumpb(obj, indent).decode()
+
+    def loads(data):
+        return orjson.loads(data)
+else:  # pragma: no cover
+    def dumpb(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+        return _stdlib_dumps(obj, indent, sort_keys).encode()
+
+    def dumps(obj: Any, indent: bool = False) -> str:
+        return _stdlib_dumps(obj, indent)
+
+    def loads(data):
+        return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any, indent: bool, sort_keys: bool = False) -> str:
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys)
+
+
+# python-socketio / python-engineio call json.dumps(data, separators=...); the output
+# is compact regardless, so the stdlib keyword arguments are accepted and ignored.
+socketio_json = SimpleNamespace(dumps=lambda obj, **_kwargs: dumps(obj), loads=loads)
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered through this module instead of json.dumps."""
+
+    def render(self, content: Any) -> bytes:
+        return dumpb(content)
@@ -0,0 +1,83 @@
+"""Debug watchdog that catches the event loop blocked and reports what blocked it.
+
+Set LOOP_WATCHDOG_MS=<N> and the app starts a `LoopWatchdog` at startup. A task on
+the loop bumps a heartbeat every N/4 ms; a daemon thread checks it at the same
+rate, and once the heartbeat is more than N ms old the loop is stuck inside one
+callback. The thread then logs the loop thread's current stack — the blocking call
+itself, not the callback that eventually finished late — once per stall, and counts
+it in roundtable_event_loop_stalls_total.
+
+Sampling another thread's stack needs no cooperation from the blocked code and costs
+nothing while the loop is healthy, but it is still a debugging aid: leave it off in
+production and use roundtable_event_loop_lag_seconds there. Known-blocking calls
+belong on app/utils/offload.py's pools.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_KEPT_REPORTS = 20
+
+
+class LoopWatchdog:
+    def __init__(self, threshold_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.tick = self.threshold / 4
+        # (stalled seconds when sampled, formatted stack) of recent stalls
+        self.reports: Deque[Tuple[float, str]] = deque(maxlen=MAX_KEPT_REPORTS)
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start watching the running loop (call from a coroutine on it)."""
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info("Event loop watchdog on: reporting stalls over %.0fms", self.threshold * 1000)
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    async def _heartbeat(self):
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.tick)
+
+    def _watch(self):
+        reported = False
+        while not self._stop.wait(self.tick):
+            stalled = time.monotonic() - self._beat
+            # A healthy loop beats every `tick`; allow one missed beat before reporting.
+            if stalled <= self.threshold + self.tick:
+                reported = False
+                continue
+            if reported:
+                continue
+            reported = True
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            self.reports.append((stalled, stack))
+            metrics.EVENT_LOOP_STALLS.inc()
+            logger.warning("Event loop blocked for %.0fms so far; loop thread stack:\n%s",
+                           stalled * 1000, stack)
@@ -0,0 +1,265 @@
+"""In-process metrics, served at GET /metrics in the Prometheus text format.
+
+A deliberately small registry (no prometheus_client dependency): counters and
+histograms with fixed label names, recorded from the hot paths and rendered on
+scrape. Every metric the server exports is declared at the bottom of this module,
+so this file is the catalogue; the instrumented code only calls `.inc()` /
+`.observe()`.
+
+Recording is a dict lookup and a few additions under a per-metric lock (the pool
+and LLM callbacks may run off the loop thread). Label values must stay bounded:
+LLM modes and providers, pool names, never user input. Per-campaign metrics label
+with `campaign_label()` (a short hash, so a scrape doesn't list campaign ids) and
+set `max_series`, which keeps only the most recently recorded campaigns; an evicted
+series simply starts again from zero if that campaign comes back.
+"""
+import abc
+import asyncio
+import bisect
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+MAX_CAMPAIGN_SERIES = 64
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 max_series: Optional[int] = None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _touch(self, store: "OrderedDict", key: Tuple[str, ...]):
+        """Mark `key` most recently used and evict past max_series (lock held)."""
+        if self.max_series is None:
+            return
+        store.move_to_end(key)
+        while len(store) > self.max_series:
+            store.popitem(last=False)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abc.abstractmethod
+    def clear(self):
+        """Drop every recorded series."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 max_series: Optional[int] = None):
+        super().__init__(name, help_text, labelnames, max_series)
+        self._values: "OrderedDict[Tuple[str, ...], float]" = OrderedDict()
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self._touch(self._values, key)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(list(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = SECONDS_BUCKETS, max_series: Optional[int] = None):
+        super().__init__(name, help_text, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (non-cumulative, +Inf last), sum, count]
+        self._series: "OrderedDict[Tuple[str, ...], list]" = OrderedDict()
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+            self._touch(self._series, key)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for key, (counts, total, n) in items:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {n}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+def reset():
+    """Drop every recorded value (tests)."""
+    for metric in _registry:
+        metric.clear()
+
+
+def campaign_label(campaign_id: str) -> str:
+    """Stable short hash of a campaign id for use as a label value."""
+    return hashlib.blake2b(str(campaign_id).encode(), digest_size=6).hexdigest()
+
+
+# JSON bytes the database layer bound for the current task, when a caller asked
+# for a tally (JSONBlob.on_bind, set in db/session.py; StateService.save_game_state).
+_json_tally: ContextVar[Optional[list]] = ContextVar("metrics_json_tally", default=None)
+
+
+def tally_json(nbytes: int):
+    tally = _json_tally.get()
+    if tally is not None:
+        tally[0] += nbytes
+
+
+@contextmanager
+def json_tally() -> Iterator[list]:
+    """Yield a one-item list that accumulates the JSON sent to the database inside
+    the block (by this task and the greenlets SQLAlchemy runs it on)."""
+    tally = [0]
+    token = _json_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _json_tally.reset(token)
+
+
+async def watch_event_loop(interval: float = 0.5):
+    """Record how late the loop wakes a sleeper: the time callbacks waited behind
+    whatever was running. Runs until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - start - interval))
+
+
+# ── The catalogue ────────────────────────────────────────────────────────────────
+
+STATE_HYDRATE_SECONDS = Histogram(
+    "roundtable_state_hydrate_seconds", "StateService.get_game_state latency.")
+STATE_HYDRATE_BYTES = Histogram(
+    "roundtable_state_hydrate_bytes",
+    "Stored size of the snapshot row plus event tail read per hydrate.", buckets=BYTES_BUCKETS)
+STATE_SAVE_SECONDS = Histogram(
+    "roundtable_state_save_seconds", "StateService.save_game_state latency (staging, before commit).",
+    ["kind"])
+STATE_SAVE_BYTES = Histogram(
+    "roundtable_state_save_bytes", "JSON bytes sent to the database per save.", ["kind"],
+    buckets=BYTES_BUCKETS)
+STATE_BROADCASTS = Counter(
+    "roundtable_state_broadcasts_total", "Game state broadcasts by payload kind.", ["kind"])
+STATE_PATCH_BYTES = Histogram(
+    "roundtable_state_patch_bytes", "Serialized JSON-Patch size per game_state_patch.",
+    buckets=BYTES_BUCKETS)
+BROADCAST_FANOUT = Histogram(
+    "roundtable_state_broadcast_fanout", "Sockets in the campaign room per state broadcast.",
+    buckets=COUNT_BUCKETS)
+LOCK_WAIT_SECONDS = Histogram(
+    "roundtable_lock_wait_seconds", "Campaign advisory lock acquisition wait, by hashed campaign id.",
+    ["campaign"], max_series=MAX_CAMPAIGN_SERIES)
+LOCK_HOLD_SECONDS = Histogram(
+    "roundtable_lock_hold_seconds", "Campaign advisory lock hold time, by hashed campaign id.",
+    ["campaign"], max_series=MAX_CAMPAIGN_SERIES)
+LLM_SECONDS = Histogram(
+    "roundtable_llm_seconds", "Agent graph round trip (LLM calls plus tools).", ["mode", "provider"])
+LLM_TOKENS = Counter(
+    "roundtable_llm_tokens_total", "Tokens reported by the provider.", ["mode", "provider", "direction"])
+NARRATION_TIMEOUTS = Counter(
+    "roundtable_narration_timeouts_total", "DM narrations abandoned at the narrator timeout.", ["mode"])
+AI_TURN_TIMEOUTS = Counter(
+    "roundtable_ai_turn_timeouts_total", "AI turns skipped at the turn timeout.")
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "roundtable_db_pool_checkout_seconds", "Time to get a connection from the pool (wait plus connect).")
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "roundtable_event_loop_lag_seconds", "Event loop scheduling delay, sampled every 0.5s.")
+EVENT_LOOP_STALLS = Counter(
+    "roundtable_event_loop_stalls_total", "Loop stalls past LOOP_WATCHDOG_MS (debug watchdog only).")
+OFFLOAD_QUEUE_SECONDS = Histogram(
+    "roundtable_offload_queue_seconds", "Wait for a worker in an offload pool.", ["pool"])
+OFFLOAD_RUN_SECONDS = Histogram(
+    "roundtable_offload_run_seconds", "Blocking call run time in an offload pool.", ["pool"])
@@ -0,0 +1,64 @@
+"""Bounded thread pools for the synchronous calls that used to run on the event loop.
+
+One slow blocking call on the loop stalls every campaign's sockets, so known-blocking
+work goes through `run(pool, func, *args)` instead. Each named pool is its own
+ThreadPoolExecutor: its worker count bounds how many of those calls run at once
+(the rest queue), and one kind of work backing up (a slow Imagen endpoint) cannot
+starve another (logins). The caller's context is copied into the worker, so tracing
+spans and metrics tallies follow the call.
+
+  token-verify   firebase_admin.auth.verify_id_token (app/utils/token_cache.py)
+  image          Imagen generate_images (AIService.generate_scene_image)
+  cpu            JSON-Patch diffs of broadcast state (StateService.emit_state_update)
+
+Queue wait and run time per pool are exported at /metrics (roundtable_offload_*).
+Blocking calls that slip onto the loop show up in the LOOP_WATCHDOG_MS reports
+(app/utils/loop_watchdog.py).
+"""
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from app.utils import metrics
+
+T = TypeVar("T")
+
+POOL_WORKERS = {
+    "token-verify": 4,
+    "image": 2,
+    "cpu": 2,
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def _executor(pool: str) -> ThreadPoolExecutor:
+    executor = _executors.get(pool)
+    if executor is None:
+        executor = _executors[pool] = ThreadPoolExecutor(
+            max_workers=POOL_WORKERS[pool], thread_name_prefix=pool)
+    return executor
+
+
+async def run(pool: str, func: Callable[..., T], *args: Any) -> T:
+    """`func(*args)` on the named pool's threads; raises whatever it raises."""
+    ctx = contextvars.copy_context()
+    queued = time.perf_counter()
+
+    def call():
+        started = time.perf_counter()
+        metrics.OFFLOAD_QUEUE_SECONDS.observe(started - queued, pool=pool)
+        try:
+            return ctx.run(func, *args)
+        finally:
+            metrics.OFFLOAD_RUN_SECONDS.observe(time.perf_counter() - started, pool=pool)
+
+    return await asyncio.get_running_loop().run_in_executor(_executor(pool), call)
+
+
+def shutdown(wait: bool = False):
+    for executor in _executors.values():
+        executor.shutdown(wait=wait, cancel_futures=True)
+    _executors.clear()
@@ -0,0 +1,81 @@
+"""Session recording for deterministic replay (see scripts/replay_session.py).
+
+Set SESSION_RECORD_PATH to a file and the server appends one JSON line per:
+
+  {"type": "event", "t": .., "event": "chat_message", "sid": .., "args": [..], "seed": ..}
+      an inbound socket event. `seed` was fed to `random.seed` right before the
+      handler ran, so dice rolls, initiative and loot replay identically.
+  {"type": "llm", "t": .., "message": {..}}
+      one LLM response (langchain message_to_dict), in completion order; see
+      app/agents/replay_llm.py.
+
+`t` is seconds since recording started. The auth handshake (connect) is never
+recorded; join_campaign carries the user id the replay needs.
+"""
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from app.utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRecorder:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._file = None
+        self._start = time.monotonic()
+        self._lock = threading.Lock()  # LLM callbacks may fire from executor threads
+
+    @property
+    def active(self) -> bool:
+        return bool(self.path)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        record['t'] = round(time.monotonic() - self._start, 4)
+        line = json_codec.dumps(record) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+                logger.info("Recording socket session to %s", self.path)
+            self._file.write(line)
+            self._file.flush()
+
+    def record_event(self, event: str, sid: str, args: list) -> None:
+        seed = random.randrange(2 ** 32)
+        random.seed(seed)
+        self.write({'type': 'event', 'event': event, 'sid': sid, 'args': args, 'seed': seed})
+
+    def record_llm(self, message: dict) -> None:
+        self.write({'type': 'llm', 'message': message})
+
+
+recorder = SessionRecorder(os.getenv("SESSION_RECORD_PATH"))
+
+
+def recorded(func):
+    """Socket event wrapper: record the event (and seed the RNG) before handling it.
+
+    Goes between `@sio.event` and the handler; the event name is the function name.
+    """
+    @functools.wraps(func)
+    async def wrapper(sid, *args):
+        if recorder.active:
+            try:
+                recorder.record_event(func.__name__, sid, list(args))
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning("Session recording failed for %s: %s", func.__name__, e)
+        return await func(sid, *args)
+    return wrapper
+
+
+def read_recording(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json_codec.loads(line)
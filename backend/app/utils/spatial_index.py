@@ -0,0 +1,121 @@
+"""Occupancy spatial hash over a GameState's positioned entities.
+
+Opportunity-attack checks, move collision and obstacle sets used to walk every
+enemy / NPC (and run a line-of-sight test on each one in range). This index maps
+cell -> entities and coarse bucket -> entities, so "who is standing here" is one dict
+lookup and "who is within N cells" only visits the buckets overlapping that square.
+
+`GameState.spatial_index()` caches one and keeps it in step: positions change through
+`GameState.move_entity()`, which refiles only that entity, and
+`GameState.roster_changed()` drops the index. Setting `entity.position` directly on a
+live state leaves it stale. Liveness and hostility are NOT tracked; they change
+without anything moving, so callers filter on the live entity objects (see `living`).
+"""
+from bisect import insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.entity_index import ENEMY, NPC, PARTY
+
+Cell = Tuple[int, int]
+
+# Bucket edge in cells. Proximity queries use radii up to ~10 cells, so an 8-cell
+# bucket keeps a 10-cell query to at most 4x4 buckets.
+BUCKET_SIZE = 8
+
+
+def living(entity) -> bool:
+    return getattr(entity, 'hp_current', 0) > 0
+
+
+def _drop(entries: List[Any], entity) -> None:
+    for i, e in enumerate(entries):
+        if e is entity:
+            del entries[i]
+            return
+
+
+class SpatialIndex:
+    def __init__(self, party: List[Any], enemies: List[Any], npcs: List[Any]):
+        self.by_cell: Dict[Cell, List[Any]] = {}
+        self._buckets: Dict[Cell, List[Any]] = {}
+        # id(entity) -> [entity, faction, roster position, cell or None]
+        self._entries: Dict[int, list] = {}
+
+        order = 0
+        for group, faction in ((party, PARTY), (enemies, ENEMY), (npcs, NPC)):
+            for c in group:
+                entry = self._entries[id(c)] = [c, faction, order, None]
+                order += 1
+                if c.position is not None:
+                    self._file(entry, (c.position.x, c.position.y))
+
+    @classmethod
+    def from_state(cls, game_state) -> "SpatialIndex":
+        return cls(game_state.party, game_state.enemies, game_state.npcs)
+
+    def _roster_pos(self, entity) -> int:
+        return self._entries[id(entity)][2]
+
+    def _file(self, entry: list, cell: Cell):
+        # Insertion keeps every list in roster order, so occupants() needs no sort.
+        entry[3] = cell
+        for store, key in ((self.by_cell, cell), (self._buckets, (cell[0] // BUCKET_SIZE, cell[1] // BUCKET_SIZE))):
+            entries = store.get(key)
+            if entries is None:
+                store[key] = [entry[0]]
+            else:
+                insort(entries, entry[0], key=self._roster_pos)
+
+    def _unfile(self, entry: list):
+        cell, entry[3] = entry[3], None
+        for store, key in ((self.by_cell, cell), (self._buckets, (cell[0] // BUCKET_SIZE, cell[1] // BUCKET_SIZE))):
+            entries = store[key]
+            _drop(entries, entry[0])
+            if not entries:
+                del store[key]
+
+    def move(self, entity, cell: Cell) -> bool:
+        """Refile `entity` under `cell`; False if it isn't in this index's roster."""
+        entry = self._entries.get(id(entity))
+        if entry is None:
+            return False
+        if entry[3] != cell:
+            if entry[3] is not None:
+                self._unfile(entry)
+            self._file(entry, cell)
+        return True
+
+    def faction_of(self, entity) -> Optional[str]:
+        entry = self._entries.get(id(entity))
+        return entry[1] if entry else None
+
+    def occupants(self, cell: Cell) -> List[Any]:
+        """Entities standing on `cell`, in roster order."""
+        return self.by_cell.get(cell, [])
+
+    def within(self, cell: Cell, radius: int, factions: Iterable[str] = (PARTY, ENEMY, NPC)) -> List[Any]:
+        """Entities within Chebyshev distance `radius` of `cell`, in roster order
+        (party, enemies, npcs), optionally restricted to some factions."""
+        x, y = cell
+        factions = frozenset(factions)
+        entries = self._entries
+        hits = []
+        for bx in range((x - radius) // BUCKET_SIZE, (x + radius) // BUCKET_SIZE + 1):
+            for by in range((y - radius) // BUCKET_SIZE, (y + radius) // BUCKET_SIZE + 1):
+                for c in self._buckets.get((bx, by), ()):
+                    _, faction, order, (cx, cy) = entries[id(c)]
+                    if faction in factions and abs(cx - x) <= radius and abs(cy - y) <= radius:
+                        hits.append((order, c))
+        hits.sort(key=lambda hit: hit[0])
+        return [c for _, c in hits]
+
+    def obstacle_cells(self, exclude: Any = None) -> set:
+        """Cells that block movement: living enemies and every NPC."""
+        return {cell for c, faction, _, cell in self._entries.values()
+                if cell is not None and c is not exclude
+                and (faction == NPC or (faction == ENEMY and living(c)))}
+
+    def party_cells(self, exclude: Any = None) -> set:
+        """Cells held by party members (passable, but not a place to stop)."""
+        return {cell for c, faction, _, cell in self._entries.values()
+                if faction == PARTY and cell is not None and c is not exclude}
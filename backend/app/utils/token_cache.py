@@ -0,0 +1,118 @@
+"""Verified Firebase ID-token cache shared by the HTTP and socket auth paths.
+
+`auth.verify_id_token` is synchronous (RS256 signature check, plus a cert fetch when
+the Google x509 bundle is cold), and every REST request and socket connect used to
+run it on the event loop. A client sends the same ID token on every call for up to
+an hour, so we verify it once off-loop and then serve the decoded claims from an
+LRU keyed by the token's sha256 until the token's own `exp`.
+
+Only successful verifications are cached; a bad or expired token is re-verified
+(and rejected) every time. Concurrent first uses of the same token share one
+verification.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from firebase_admin import auth
+
+from app.utils import offload
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_TOKENS = 10_000
+# Stop serving a cached token slightly before it expires so a request that passes
+# here doesn't reach a downstream Firebase call with a token that just lapsed.
+EXPIRY_MARGIN_SECONDS = 5
+
+_verified: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_inflight: Dict[str, "asyncio.Future"] = {}
+
+
+def _key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_cached(token: str) -> Optional[Dict[str, Any]]:
+    """Decoded claims for a previously verified, still-valid token, else None."""
+    key = _key(token)
+    entry = _verified.get(key)
+    if entry is None:
+        return None
+    expires_at, claims = entry
+    if time.time() >= expires_at:
+        del _verified[key]
+        return None
+    _verified.move_to_end(key)
+    return claims
+
+
+def _store(key: str, claims: Dict[str, Any]) -> None:
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)):
+        return
+    expires_at = exp - EXPIRY_MARGIN_SECONDS
+    if time.time() >= expires_at:
+        return
+    _verified[key] = (expires_at, claims)
+    _verified.move_to_end(key)
+    while len(_verified) > MAX_CACHED_TOKENS:
+        _verified.popitem(last=False)
+
+
+async def verify_id_token(token: str) -> Dict[str, Any]:
+    """Cached, off-loop `auth.verify_id_token`. Raises whatever Firebase raises."""
+    claims = get_cached(token)
+    if claims is not None:
+        return claims
+
+    key = _key(token)
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.ensure_future(offload.run("token-verify", auth.verify_id_token, token))
+    _inflight[key] = future
+    try:
+        # Shielded so a cancelled first caller doesn't fail the others waiting on it
+        claims = await asyncio.shield(future)
+    finally:
+        _inflight.pop(key, None)
+    _store(key, claims)
+    return claims
+
+
+def invalidate(token: str) -> None:
+    _verified.pop(_key(token), None)
+
+
+def clear() -> None:
+    _verified.clear()
+    _inflight.clear()
+
+
+def prefetch_certs() -> None:
+    """Warm the SDK's cert cache so the first login doesn't pay the x509 fetch.
+
+    The Admin SDK's verifier keeps its Google certs in an HTTP-cache-aware session
+    (honouring the endpoint's max-age); fetching through that same session once at
+    startup primes it. Best effort: skipped against the auth emulator (its tokens are
+    unsigned) and any failure just leaves the fetch to the first verification.
+    """
+    if os.getenv("FIREBASE_AUTH_EMULATOR_HOST"):
+        return
+    try:
+        from firebase_admin import _token_gen
+
+        verifier = auth._get_client(None)._token_verifier
+        response = verifier.request(_token_gen.ID_TOKEN_CERT_URI, method="GET")
+        if response.status != 200:
+            logger.warning(f"Token cert prefetch returned HTTP {response.status}")
+            return
+        logger.info("Firebase token signing certs prefetched.")
+    except Exception as e:
+        logger.warning(f"Token cert prefetch failed (will fetch on first verify): {e}")
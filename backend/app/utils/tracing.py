@@ -0,0 +1,151 @@
+"""Per-request tracing with OpenTelemetry, exported locally as JSON.
+
+Off unless TRACE_EXPORT is set when the app starts:
+
+  TRACE_EXPORT=console            one JSON span per line on stdout
+  TRACE_EXPORT=/tmp/spans.jsonl   the same, appended to a file
+
+Exporting needs opentelemetry-sdk; the instrumentation only uses opentelemetry-api,
+whose spans are no-ops until `configure()` installs a provider.
+
+A traced `@attack` reads as one tree:
+
+  socket.handle_chat_message      campaign_id, message_id (the saved chat message)
+    command.dispatch              campaign_id
+      command.attack
+        combat.resolution_attack
+          lock.acquire / state.hydrate / state.save / state.broadcast
+        narrator.narrate          mode
+          llm.agent               mode, provider
+            llm.call              model, input_tokens, output_tokens
+        db.SELECT / db.INSERT ... db.statement
+
+The current span lives in a contextvar, so tasks created inside a span (narration,
+AI turns, sio.start_background_task) carry the trace with them, and so do the
+greenlets SQLAlchemy runs statements on. DB statements and LLM calls outside any
+span (startup seeding, background sweeps) are not traced.
+"""
+import functools
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from opentelemetry import trace
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("roundtable")
+STATEMENT_MAX_CHARS = 2000
+
+_enabled = False
+_export_file = None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """A child of the current span; None-valued attributes are dropped."""
+    attrs = {k: v for k, v in attributes.items() if v is not None}
+    with tracer.start_as_current_span(name, attributes=attrs) as current:
+        yield current
+
+
+def traced(name: str):
+    """Decorator: run an async function inside `span(name)`."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def annotate(**attributes: Any):
+    """Set attributes on the current span (no-op when nothing is being traced)."""
+    current = trace.get_current_span()
+    if current.is_recording():
+        current.set_attributes({k: v for k, v in attributes.items() if v is not None})
+
+
+def in_trace() -> bool:
+    return trace.get_current_span().is_recording()
+
+
+def configure(target: Optional[str] = None, engine=None) -> bool:
+    """Install the local JSON exporter (TRACE_EXPORT) and the DB statement hooks on
+    `engine`. Returns False when tracing stays off."""
+    global _enabled, _export_file
+    target = target or os.getenv("TRACE_EXPORT")
+    if not target or _enabled:
+        return _enabled
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        logger.warning("TRACE_EXPORT is set but opentelemetry-sdk is not installed; tracing stays off.")
+        return False
+
+    if target == "console":
+        out = sys.stdout
+    else:
+        out = _export_file = open(target, "a", encoding="utf-8")
+    provider = TracerProvider(resource=Resource.create({"service.name": "roundtable-backend"}))
+    provider.add_span_processor(BatchSpanProcessor(
+        ConsoleSpanExporter(out=out, formatter=lambda s: s.to_json(indent=None) + "\n")))
+    trace.set_tracer_provider(provider)
+    if engine is not None:
+        instrument_engine(engine)
+    _enabled = True
+    logger.info("Tracing enabled; exporting spans to %s", target)
+    return True
+
+
+def instrument_engine(engine):
+    """One `db.<VERB>` span per statement executed inside a trace."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if not in_trace():
+            return
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        context._trace_span = tracer.start_span(f"db.{verb}", attributes={
+            "db.system": "postgresql",
+            "db.statement": statement[:STATEMENT_MAX_CHARS],
+            "db.executemany": executemany,
+        })
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        current = getattr(context, "_trace_span", None)
+        if current is not None:
+            current.end()
+            context._trace_span = None
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        current = getattr(context, "_trace_span", None)
+        if current is not None:
+            current.record_exception(exception_context.original_exception)
+            current.set_status(trace.Status(trace.StatusCode.ERROR))
+            current.end()
+            context._trace_span = None
+
+
+def shutdown():
+    """Flush pending spans (tests, scripts)."""
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "force_flush"):
+        provider.force_flush()
+    if _export_file is not None:
+        _export_file.flush()
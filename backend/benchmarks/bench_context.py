@@ -0,0 +1,55 @@
+"""Prompt-side hot paths: context formatting, memory ranking, entity lookup by name."""
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.services import context_builder  # noqa: E402
+from app.services.game_service import GameService  # noqa: E402
+from app.services.memory_service import _rank_and_gate  # noqa: E402
+
+
+def bench_format_player_state(benchmark, run, crowded_state):
+    benchmark(lambda: run(context_builder.format_player_state(crowded_state.party)))
+
+
+def bench_format_npc_state(benchmark, run, crowded_state):
+    assert crowded_state.npcs
+    benchmark(lambda: run(context_builder.format_npc_state(crowded_state.npcs)))
+
+
+def bench_build_narrative_context(benchmark, run, crowded_state):
+    """The whole block minus the exits lookup (the only DB read, skipped without a source_id)."""
+    crowded_state.location.source_id = None
+    context = benchmark(lambda: run(context_builder.build_narrative_context(None, "bench", crowded_state)))
+    assert "ENEMIES" in context
+
+
+def _episodes(n: int, present: list) -> list:
+    """Memory candidates the way the pool query returns them: a mix of kinds, some
+    about present entities, some full-text hits, spread over a few weeks."""
+    rng = random.Random(7)
+    kinds = ("event", "death", "loot", "relationship", "summary")
+    return [{
+        "id": f"ep-{i}",
+        "kind": rng.choice(kinds),
+        "content": f"episode {i}",
+        "subject_refs": [{"id": rng.choice(present + ["gone-1", "gone-2"])}] if rng.random() < 0.7 else [],
+        "importance": rng.random(),
+        "fts_rank": rng.random() if rng.random() < 0.3 else 0.0,
+        "created_ts": 1_700_000_000 + rng.randrange(0, 30 * 86400),
+    } for i in range(n)]
+
+
+def bench_rank_and_gate(benchmark, crowded_state):
+    present = [e.id for e in crowded_state.party + crowded_state.enemies]
+    candidates = _episodes(40, present)  # memory_service.POOL_LIMIT
+    recently = {"ep-1": 3, "ep-2": 9}
+    top = benchmark(_rank_and_gate, candidates, present, 10, recently)
+    assert top
+
+
+@pytest.mark.parametrize("term", ["Bruna", "bru", "dragon", "nobody-matches"])
+def bench_find_char_by_name(benchmark, crowded_state, term):
+    benchmark(GameService._find_char_by_name, crowded_state, term)
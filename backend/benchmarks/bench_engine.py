@@ -0,0 +1,56 @@
+"""Rules engine and grid: dice, attack resolution, BFS reachability, line of sight."""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.models import Coordinates  # noqa: E402
+from app.services.pathfinding_service import PathfindingService  # noqa: E402
+from game_engine.character_sheet import EntityView  # noqa: E402
+from game_engine.dice import Dice  # noqa: E402
+from game_engine.engine import GameEngine  # noqa: E402
+
+
+@pytest.mark.parametrize("expression", ["1d20+5", "8d6", "1d20 adv", "2d6+1d4+3"])
+def bench_dice_roll(benchmark, expression):
+    benchmark(Dice.roll, expression)
+
+
+def bench_resolve_attack(benchmark, crowded_state):
+    hero, target = crowded_state.party[-1], crowded_state.enemies[0]
+    engine = GameEngine()
+    params = {"weapon_name": "Greataxe", "weapon_damage_dice": "1d12"}
+    benchmark(lambda: engine.resolve_action(EntityView(hero), "attack", EntityView(target), params))
+
+
+def bench_resolve_monster_attack(benchmark, crowded_state):
+    monster, target = crowded_state.enemies[0], crowded_state.party[0]
+    action = (monster.data.get("actions") or [{}])[0]
+    params = {"weapon_name": action.get("name", "Claw"),
+              "weapon_damage_dice": ((action.get("damage") or [{}])[0]).get("damage_dice", "1d6")}
+    engine = GameEngine()
+    benchmark(lambda: engine.resolve_action(EntityView(monster), "attack", EntityView(target), params))
+
+
+def bench_find_reachable_cells(benchmark, crowded_state):
+    """A 30 ft move from one corner of the largest room, around the crowd."""
+    state = crowded_state
+    hero = state.party[0]
+    obstacles = state.spatial_index().obstacle_cells(exclude=hero)
+    reachable = benchmark(PathfindingService.find_reachable_cells, (hero.position.x, hero.position.y), 6,
+                          state.location.walkable_cells, obstacles)
+    assert reachable
+
+
+def bench_find_best_cell_adjacent_to(benchmark, crowded_state):
+    state = crowded_state
+    hero, target = state.party[0], state.enemies[0]
+    obstacles = state.spatial_index().obstacle_cells(exclude=hero)
+    benchmark(PathfindingService.find_best_cell_adjacent_to, hero.position, target.position, 12,
+              state.location.walkable_cells, obstacles)
+
+
+def bench_line_of_sight(benchmark, largest_room):
+    """Corner to corner across the largest room."""
+    cells = sorted(largest_room.walkable_cells)
+    start, end = Coordinates(x=cells[0][0], y=cells[0][1]), Coordinates(x=cells[-1][0], y=cells[-1][1])
+    benchmark(PathfindingService.check_line_of_sight, start, end, largest_room.walkable_cells)
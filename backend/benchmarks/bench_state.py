@@ -0,0 +1,119 @@
+"""StateService: hydrate / save round trips against Postgres, and broadcast diffing."""
+import uuid
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from sqlalchemy import text  # noqa: E402
+
+from app.models import Coordinates  # noqa: E402
+from app.services.state_service import StateService  # noqa: E402
+from conftest import CROWD, build_crowded_state  # noqa: E402
+
+
+class _Sink:
+    """Socket server stand-in: emit_state_update's cost is the diff, not the send."""
+
+    async def emit(self, *args, **kwargs):
+        pass
+
+
+def bench_emit_state_update_diff(benchmark, run, crowded_state):
+    campaign_id = "bench-emit"
+    before = crowded_state.model_dump()
+    goblin = crowded_state.enemies[0]
+    goblin.hp_current -= 3
+    goblin.position = Coordinates(x=goblin.position.x, y=goblin.position.y - 1)
+    crowded_state.turn_index += 1
+
+    def diff():
+        StateService._last_broadcasted_state[campaign_id] = before
+        run(StateService.emit_state_update(campaign_id, crowded_state, _Sink()))
+
+    benchmark(diff)
+    StateService.clear_campaign_state(campaign_id)
+
+
+@pytest.fixture(scope="module")
+def saved_campaign(run, templates, srd_monsters, largest_room):
+    """A throwaway campaign holding the crowded state; torn down after the module."""
+    from db.session import AsyncSessionLocal, engine
+
+    cid, uid = f"bench-camp-{uuid.uuid4()}", f"bench-user-{uuid.uuid4()}"
+    state = build_crowded_state(templates, srd_monsters, largest_room)
+
+    async def setup():
+        for p in state.party:
+            p.id, p.user_id = f"{cid}-{p.id}", uid
+        for e in state.enemies + state.npcs:
+            e.id = f"{cid}-{e.id}"
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("INSERT INTO profiles (id, username) VALUES (:uid, :uid)"), {"uid": uid})
+            await db.execute(text("INSERT INTO campaigns (id, name, gm_id) VALUES (:cid, 'Bench', :uid)"),
+                             {"cid": cid, "uid": uid})
+            await StateService.save_game_state(cid, state, db)
+            await db.commit()
+
+    async def teardown():
+        async with AsyncSessionLocal() as db:
+            for table in ("game_events", "game_states", "characters", "monsters", "npcs"):
+                await db.execute(text(f"DELETE FROM {table} WHERE campaign_id=:cid"), {"cid": cid})
+            await db.execute(text("DELETE FROM campaigns WHERE id=:cid"), {"cid": cid})
+            await db.execute(text("DELETE FROM profiles WHERE id=:uid"), {"uid": uid})
+            await db.commit()
+        StateService.clear_campaign_state(cid)
+        await engine.dispose()
+
+    run(setup())
+    yield cid
+    run(teardown())
+
+
+async def _load(cid):
+    from db.session import AsyncSessionLocal
+    async with AsyncSessionLocal() as db:
+        return await StateService.get_game_state(cid, db)
+
+
+@pytest.mark.integration
+def bench_hydrate(benchmark, run, saved_campaign):
+    state = benchmark(lambda: run(_load(saved_campaign)))
+    assert len(state.enemies) == CROWD
+
+
+@pytest.mark.integration
+def bench_hot_save(benchmark, run, saved_campaign):
+    """An HP change and a turn advance: event appends, with the periodic snapshot."""
+    from db.session import AsyncSessionLocal
+
+    cid = saved_campaign
+    state = run(_load(cid))
+    target = state.enemies[0]
+
+    async def save():
+        target.hp_current = target.hp_max - 1 if target.hp_current == target.hp_max else target.hp_max
+        state.turn_index += 1
+        async with AsyncSessionLocal() as db:
+            await StateService.save_game_state(cid, state, db)
+            await db.commit()
+
+    benchmark(lambda: run(save()))
+
+
+@pytest.mark.integration
+def bench_load_modify_save(benchmark, run, saved_campaign):
+    """The command path: hydrate, change one entity, save, commit."""
+    from db.session import AsyncSessionLocal
+
+    cid = saved_campaign
+
+    async def round_trip():
+        async with AsyncSessionLocal() as db:
+            state = await StateService.get_game_state(cid, db)
+            hero = state.party[0]
+            hero.hp_current = hero.hp_max - 1 if hero.hp_current == hero.hp_max else hero.hp_max
+            await StateService.save_game_state(cid, state, db)
+            await db.commit()
+
+    benchmark(lambda: run(round_trip()))
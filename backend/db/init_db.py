@@ -9,7 +9,7 @@ logger = logging.getLogger(__name__)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.session import engine
-from db.schema import metadata
+from db.schema import metadata, HOT_PATH_INDEXES, JSON_BLOB_COLUMNS
 from app.firebase_config import init_firebase
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
@@ -112,6 +112,14 @@ async def init_db_async():
     except SQLAlchemyError as e:
         logger.warning(f"game_states dedup/unique migration failed (non-fatal): {e}")
 
+    # game_states.event_seq for the event log (game_events itself comes from create_all).
+    # Existing snapshots start at 0, which is every event there is.
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("ALTER TABLE game_states ADD COLUMN IF NOT EXISTS event_seq INTEGER NOT NULL DEFAULT 0"))
+    except SQLAlchemyError as e:
+        logger.warning(f"game_states.event_seq migration failed (non-fatal): {e}")
+
     # --- SPRINT 1: LONG-TERM MEMORY (episodic) — isolated & fail-open ---
     # Created via raw DDL only (intentionally NOT in schema.py metadata, so
     # metadata.create_all never races it). A failure here must not crash startup:
@@ -153,32 +161,104 @@ async def init_db_async():
     except SQLAlchemyError as e:
         logger.warning(f"items.rarity migration failed (non-fatal): {e}")
 
+    # --- HOT-PATH INDEXES (idempotent, fail-open) ---
+    # Defined in db/schema.py (HOT_PATH_INDEXES). create_all only builds indexes along
+    # with a new table, so existing databases get them here; checkfirst makes reruns a
+    # catalog lookup. Each index is its own transaction so one failure can't block the rest.
+    for index in HOT_PATH_INDEXES:
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(index.create, checkfirst=True)
+        except SQLAlchemyError as e:
+            logger.warning(f"Index {index.name} migration failed (non-fatal): {e}")
+
+    # --- COMPENDIUM SEARCH INDEXES (idempotent, fail-open) ---
+    # pg_trgm backs fuzzy/ILIKE '%q%' name matching; the tsvector expression must stay
+    # identical to compendium_service.SEARCH_DOCUMENT_SQL or the planner won't use it.
+    # Managed Postgres may refuse CREATE EXTENSION — search then falls back to full-text.
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except SQLAlchemyError as e:
+        logger.warning(f"pg_trgm extension unavailable (non-fatal): {e}")
+
+    from app.services.compendium_service import SEARCHABLE, SEARCH_DOCUMENT_SQL, SPELL_CLASSES_SQL
+    for table in SEARCHABLE:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_fts ON {table} USING gin ({SEARCH_DOCUMENT_SQL})"))
+                if "class" in SEARCHABLE[table]["filters"]:
+                    # Containment filter on data->'classes' (spells by class list)
+                    await conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_classes ON {table} USING gin (({SPELL_CLASSES_SQL}))"))
+                await conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_name_lower ON {table} (lower(name))"))
+                has_trgm = (await conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))).scalar()
+                if has_trgm:
+                    await conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_name_trgm ON {table} USING gin (name gin_trgm_ops)"))
+        except SQLAlchemyError as e:
+            logger.warning(f"Compendium search index migration failed for {table} (non-fatal): {e}")
+
     # --- COORDINATE MIGRATION: cube {q,r,s} -> square {x,y} (idempotent, fail-open) ---
     # Positions live only inside JSON text columns (no coordinate DDL). init_db is the
     # sole migration execution path in this repo — Alembic is never invoked. A second
     # run reports 0 changed rows. The Coordinates model also has a {q,r}->{x,y} shim,
     # so an un-migrated row still loads even if this step is skipped.
+    # A completed pass is recorded in sync_manifest: every later write is already
+    # square, so restarts skip the full scan of five JSON tables.
+    coords_marker = "migration:coords_square_v1"
     try:
-        from db.migrate_coords import migrate_json_text
-        targets = [
-            ("game_states", "id", "state_data"),
-            ("characters",  "id", "sheet_data"),
-            ("monsters",    "id", "data"),
-            ("npcs",        "id", "data"),
-            ("locations",   "id", "data"),
-        ]
         async with engine.begin() as conn:
-            for table, pk, col in targets:
-                res = await conn.execute(text(f"SELECT {pk}, {col} FROM {table}"))
-                for row_id, raw in res.fetchall():
-                    new_raw, changed = migrate_json_text(raw)
-                    if changed:
-                        await conn.execute(
-                            text(f"UPDATE {table} SET {col} = :v WHERE {pk} = :id"),
-                            {"v": new_raw, "id": row_id},
-                        )
-    except SQLAlchemyError as e:
-        logger.warning(f"Coordinate migration failed (non-fatal): {e}")
+            coords_done = (await conn.execute(
+                text("SELECT 1 FROM sync_manifest WHERE source = :s"), {"s": coords_marker}
+            )).scalar()
+    except SQLAlchemyError:
+        coords_done = False
+    if coords_done:
+        logger.debug("Coordinate migration already applied, skipped.")
+    else:
+        try:
+            from db.migrate_coords import migrate_json_text
+            targets = [
+                ("game_states", "id", "state_data"),
+                ("characters",  "id", "sheet_data"),
+                ("monsters",    "id", "data"),
+                ("npcs",        "id", "data"),
+                ("locations",   "id", "data"),
+            ]
+            async with engine.begin() as conn:
+                for table, pk, col in targets:
+                    res = await conn.execute(text(f"SELECT {pk}, {col} FROM {table}"))
+                    for row_id, raw in res.fetchall():
+                        new_raw, changed = migrate_json_text(raw)
+                        if changed:
+                            await conn.execute(
+                                text(f"UPDATE {table} SET {col} = :v WHERE {pk} = :id"),
+                                {"v": new_raw, "id": row_id},
+                            )
+                await conn.execute(
+                    text("INSERT INTO sync_manifest (source, content_hash) VALUES (:s, 'done') ON CONFLICT (source) DO NOTHING"),
+                    {"s": coords_marker},
+                )
+        except SQLAlchemyError as e:
+            logger.warning(f"Coordinate migration failed (non-fatal): {e}")
+
+    # --- ENTITY BLOBS: TEXT -> JSONB (idempotent, fail-open) ---
+    # db/schema.py declares these columns JSONBlob; create_all only applies that to new
+    # tables. Runs after the coordinate pass, which rewrites the same blobs as text.
+    # One transaction per column: a table holding a row that isn't valid JSON stays
+    # TEXT (logged) and keeps working, since JSONBlob and load_blob accept both.
+    for table, col in JSON_BLOB_COLUMNS:
+        try:
+            async with engine.begin() as conn:
+                data_type = (await conn.execute(
+                    text("SELECT data_type FROM information_schema.columns "
+                         "WHERE table_schema = current_schema() AND table_name = :t AND column_name = :c"),
+                    {"t": table, "c": col},
+                )).scalar()
+                if data_type == "text":
+                    await conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {col} TYPE jsonb USING {col}::jsonb"))
+                    logger.info(f"Converted {table}.{col} to jsonb")
+        except SQLAlchemyError as e:
+            logger.warning(f"{table}.{col} jsonb migration failed (non-fatal): {e}")
 
     logger.info("Database Initialized.")
 
@@ -34,14 +34,18 @@ def migrate_json_text(raw):
     """
     Transform a JSON text blob's coordinate dicts from {q,r,s} to {x,y}.
     Returns (new_json_text, changed?). Safe on NULL/empty/garbage input (returns it
-    unchanged). Idempotent: a second pass reports changed=False.
+    unchanged). Idempotent: a second pass reports changed=False. Already-decoded
+    values (a JSONB column read through asyncpg) are accepted as well.
     """
     if not raw:
         return raw, False
-    try:
-        data = json.loads(raw)
-    except (ValueError, TypeError):
-        return raw, False
+    if isinstance(raw, (dict, list)):
+        data = raw
+    else:
+        try:
+            data = json.loads(raw)
+        except (ValueError, TypeError):
+            return raw, False
     migrated = _walk(data)
     if migrated == data:
         return raw, False
@@ -1,10 +1,53 @@
+import json
+from typing import Callable, ClassVar, Optional
+
 from sqlalchemy import (
-    MetaData, Table, Column, String, Integer, Boolean, DateTime, Text, ForeignKey, UniqueConstraint
+    MetaData, Table, Column, String, Integer, Boolean, DateTime, Text, ForeignKey, UniqueConstraint, Index
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 
 metadata = MetaData()
 
+
+class JSONBlob(TypeDecorator):
+    """
+    JSONB document column that also accepts pre-serialized JSON text on write.
+
+    The entity blobs used to be Text holding json.dumps output, and many writers still
+    bind strings (campaign templates, data_loader rows, text() updates); those pass
+    through untouched, anything else is serialized. Reads return decoded objects, also
+    when the column is still TEXT because init_db could not convert it.
+
+    Encoding uses the engine's json_serializer / json_deserializer (db/session.py).
+    `on_bind`, when set, is called with the length of every document written; the
+    session module points it at the metrics JSON tally.
+    """
+    impl = JSONB
+    cache_ok = True
+    on_bind: ClassVar[Optional[Callable[[int], None]]] = None
+
+    def bind_processor(self, dialect):
+        serialize = dialect._json_serializer or json.dumps
+
+        def process(value):
+            if value is None:
+                return value
+            if not isinstance(value, str):
+                value = serialize(value)
+            if JSONBlob.on_bind is not None:
+                JSONBlob.on_bind(len(value))
+            return value
+        return process
+
+    def result_processor(self, dialect, coltype):
+        deserialize = dialect._json_deserializer or json.loads
+
+        def process(value):
+            return deserialize(value) if isinstance(value, str) else value
+        return process
+
 # PROFILES
 profiles = Table(
     "profiles",
@@ -79,7 +122,7 @@ characters = Table(
     Column("race", String, server_default="Human"),
     Column("level", Integer, server_default="1"),
     Column("xp", Integer, server_default="0"),
-    Column("sheet_data", Text, nullable=False),
+    Column("sheet_data", JSONBlob, nullable=False),
     Column("backstory", Text, nullable=True),
     Column("control_mode", String, server_default="human"),
     Column("created_at", DateTime(timezone=True), server_default=func.now())
@@ -95,11 +138,28 @@ game_states = Table(
     Column("campaign_id", String, ForeignKey("campaigns.id"), nullable=False),
     Column("turn_index", Integer, server_default="0"),
     Column("phase", String, server_default="exploration"),
-    Column("state_data", Text, nullable=False),
+    Column("state_data", JSONBlob, nullable=False),
+    # Last game_events.seq folded into this snapshot; hydration replays the rows after it.
+    Column("event_seq", Integer, nullable=False, server_default="0"),
     Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now()),
     UniqueConstraint("campaign_id", name="uq_game_states_campaign_id"),
 )
 
+# GAME EVENTS
+# Append-only per-campaign log of small typed state changes (moves, HP, conditions,
+# turn advances, combat log entries), written by save_game_state between snapshots
+# (see app/services/event_log.py). The (campaign_id, seq) key serves the tail replay.
+game_events = Table(
+    "game_events",
+    metadata,
+    Column("campaign_id", String, ForeignKey("campaigns.id"), primary_key=True),
+    Column("seq", Integer, primary_key=True),
+    Column("version", Integer, nullable=False), # GameState.version after the save that wrote it
+    Column("kind", String, nullable=False),
+    Column("payload", JSONBlob, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now())
+)
+
 # IMAGE CACHE
 image_cache = Table(
     "image_cache",
@@ -153,7 +213,7 @@ npcs = Table(
     Column("source_id", String, nullable=True), # Original JSON ID
     Column("name", String, nullable=False),
     Column("role", String, nullable=True),
-    Column("data", Text, nullable=False) # JSON: stats, voice, secrets
+    Column("data", JSONBlob, nullable=False) # JSON: stats, voice, secrets
 )
 
 locations = Table(
@@ -163,7 +223,7 @@ locations = Table(
     Column("campaign_id", String, ForeignKey("campaigns.id"), nullable=False),
     Column("source_id", String, nullable=True), # Original JSON ID
     Column("name", String, nullable=False),
-    Column("data", Text, nullable=False) # JSON: description, connections, secrets
+    Column("data", JSONBlob, nullable=False) # JSON: description, connections, secrets
 )
 
 quests = Table(
@@ -209,7 +269,7 @@ monsters = Table(
     Column("name", String, nullable=False),
     Column("type", String, nullable=True),
     Column("cr", String, nullable=True),
-    Column("data", Text, nullable=False)
+    Column("data", JSONBlob, nullable=False)
 )
 
 items = Table(
@@ -229,3 +289,45 @@ alignments = define_compendium_table("alignments")
 feats = define_compendium_table("feats")
 subraces = define_compendium_table("subraces")
 backgrounds = define_compendium_table("backgrounds")
+
+# SYNC MANIFEST
+# Content hashes of the files (and one-off migrations) startup has already applied,
+# so a restart only re-syncs what changed. See app/services/sync_manifest.py.
+sync_manifest = Table(
+    "sync_manifest",
+    metadata,
+    Column("source", String, primary_key=True),
+    Column("content_hash", String, nullable=False),
+    Column("synced_at", DateTime(timezone=True), server_default=func.now())
+)
+
+# HOT-PATH INDEXES
+# Secondary indexes for the per-campaign access patterns. Declared here so this file
+# stays the schema source of truth (create_all builds them on a fresh database);
+# init_db also creates any that are missing on an existing one. Column order matters:
+# the equality columns lead, the ORDER BY column (if any) comes last.
+HOT_PATH_INDEXES = [
+    # Every auth / membership check: WHERE campaign_id = ? AND user_id = ?
+    Index("ix_campaign_participants_campaign_user", campaign_participants.c.campaign_id, campaign_participants.c.user_id),
+    # Party lookup on join / connect and the characters router
+    Index("ix_characters_campaign_user", characters.c.campaign_id, characters.c.user_id),
+    # Lookups by template id (resolution_move, context_builder, opening scene); the
+    # campaign_id prefix also serves the per-campaign loads and deletes.
+    Index("ix_locations_campaign_source", locations.c.campaign_id, locations.c.source_id),
+    Index("ix_npcs_campaign_source", npcs.c.campaign_id, npcs.c.source_id),
+    Index("ix_monsters_campaign", monsters.c.campaign_id),
+    # Debug log replay on join, oldest first
+    Index("ix_debug_logs_campaign_created", debug_logs.c.campaign_id, debug_logs.c.created_at),
+    # Chat tail / history / summarizer window (ChatService), scanned backwards for DESC
+    Index("ix_chat_messages_campaign_created", chat_messages.c.campaign_id, chat_messages.c.created_at, chat_messages.c.id),
+]
+
+# ENTITY BLOB COLUMNS
+# (table, column) of every JSONBlob column. Older databases created them as TEXT;
+# init_db converts each in place.
+JSON_BLOB_COLUMNS = [
+    (table.name, column.name)
+    for table in metadata.sorted_tables
+    for column in table.columns
+    if isinstance(column.type, JSONBlob)
+]
@@ -1,10 +1,15 @@
 import os
+import time
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm import sessionmaker
 from typing import AsyncGenerator
 import logging
 from dotenv import load_dotenv
 
+from app.utils import json_codec, metrics
+from db.schema import JSONBlob
+
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -24,6 +29,25 @@ if DATABASE_URL.startswith("postgresql://"):
 
 logger.info(f"Using Database: PostgreSQL ({DATABASE_URL.split('@')[-1]}) with timeout=10s") # Hide credentials
 
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """The default asyncpg pool, timing each checkout for /metrics."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+# Every JSON document bound for the database goes through a JSONBlob column, which
+# encodes with the engine's json_serializer (or binds pre-serialized text) and
+# reports its size here.
+JSONBlob.on_bind = metrics.tally_json
+
+
 logger.debug("TRACE: Calling create_async_engine (postgres)...")
 try:
     engine = create_async_engine(
@@ -31,6 +55,9 @@ try:
         echo=False,
         future=True,
         pool_pre_ping=True, # Good for Cloud SQL
+        poolclass=TimedQueuePool,
+        json_serializer=json_codec.dumps, # asyncpg json/jsonb codecs, JSONBlob
+        json_deserializer=json_codec.loads,
         pool_size=50,
         max_overflow=20,
         connect_args={
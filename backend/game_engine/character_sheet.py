@@ -1,9 +1,43 @@
 import logging
 import math
-from typing import Optional
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
+
+class EntityView(Mapping):
+    """Read-only dict view over a live Pydantic entity, for the engine's hot path.
+
+    `CharacterSheet` only ever reads its data dict, so instead of `model_dump()`-ing
+    the whole entity (including a player's full sheet_data) per attack, this exposes
+    the model's fields lazily. Nested models (stats, position) are surfaced as their
+    field dicts; containers are the live objects, so callers must not mutate them.
+    """
+    __slots__ = ("_obj", "_fields")
+
+    def __init__(self, obj: Any):
+        self._obj = obj
+        self._fields = type(obj).model_fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        value = getattr(self._obj, key)
+        if hasattr(type(value), "model_fields"):
+            return value.__dict__
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+
 class CharacterSheet:
     # Canonical ability name <-> 3-letter abbreviation, so stat dicts keyed either way resolve.
     _ABILITY_ALIASES = {
@@ -11,7 +45,7 @@ class CharacterSheet:
         "intelligence": "int", "wisdom": "wis", "charisma": "cha",
     }
 
-    def __init__(self, data: dict):
+    def __init__(self, data: Mapping):
         self.data = data
 
         # Stats could be top-level (primitive dict) or inside sheet_data (model dump)
@@ -27,6 +61,11 @@ class CharacterSheet:
 
         self.name = data.get("name", "Unknown")
 
+    @classmethod
+    def from_entity(cls, entity: Any) -> "CharacterSheet":
+        """Sheet over a live entity without copying it (see EntityView)."""
+        return cls(EntityView(entity))
+
     def get_mod(self, stat: str) -> int:
         target = str(stat).lower()
         # Accept both full ("strength") and abbreviated ("str") keys, in either direction.
@@ -173,7 +212,7 @@ class CharacterSheet:
         Returns the primary spellcasting ability based on class, or highest mental stat if unknown.
         """
         role = getattr(self, "role", "").lower()
-        if hasattr(self, "data") and isinstance(self.data, dict):
+        if hasattr(self, "data") and isinstance(self.data, Mapping):
             role = self.data.get("role", role).lower()
 
         if role in ["wizard", "artificer"]:
@@ -200,7 +239,7 @@ class CharacterSheet:
         Levels 1-4: +2, 5-8: +3, 9-12: +4, 13-16: +5, 17-20: +6
         """
         level = 1
-        if hasattr(self, "data") and isinstance(self.data, dict):
+        if hasattr(self, "data") and isinstance(self.data, Mapping):
              level = self.data.get("level", 1)
 
         return 2 + ((int(level) - 1) // 4)
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from typing import List, Dict, Optional, Any
 from .dice import Dice
 from .character_sheet import CharacterSheet
@@ -6,9 +7,10 @@ class GameEngine:
     def __init__(self):
         pass
 
-    def resolve_action(self, actor_data: dict, action_type: str, target_data: Optional[dict] = None, params: dict = {}) -> Any:
+    def resolve_action(self, actor_data: Mapping, action_type: str, target_data: Optional[Mapping] = None, params: dict = {}) -> Any:
         """
         Central resolution method for tool calls.
+        actor_data/target_data may be plain dicts or EntityViews over live entities.
         """
         actor = CharacterSheet(actor_data)
         target = CharacterSheet(target_data) if target_data else None
@@ -1,13 +1,21 @@
+import time
+_import_started = time.perf_counter()
+
 from app.logging_config import logger
 
 from app.config import settings
 logger.info("Configuration loaded")
 
+import asyncio
+import hmac
+import os
 from fastapi import FastAPI, Depends
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
-fastapi_app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION)
+from app.utils.json_codec import CodecJSONResponse
+fastapi_app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, default_response_class=CodecJSONResponse)
 logger.warning("FastAPI app initialized")
 
 # Import Routers
@@ -20,17 +28,29 @@ from db.init_db import init_db_async
 from app.firebase_config import init_firebase
 from app.auth_utils import verify_token
 # Import data loader service
-from app.services.data_loader import load_basic_dataset, is_dataset_loaded
+from app.services.data_loader import sync_basic_dataset
+from app.services import startup_sync
+from app.services.compendium_store import load_store
+from app.utils import metrics, token_cache, tracing
 from app.services.campaign_loader import parse_and_load
 from app.services.test_campaign_setup import create_test_campaign
-from db.session import AsyncSessionLocal
+from db.session import AsyncSessionLocal, engine
 from sqlalchemy import text  # Moved up for cleaner imports
 
+# Strong references to the background seeding task (see end of startup_event) and
+# the event-loop lag sampler behind /metrics
+_seeding_task = None
+_loop_watch_task = None
+_loop_watchdog = None
+
 # ...
 @fastapi_app.on_event("startup")
 async def startup_event():
+    # Span export (TRACE_EXPORT) is opt-in; see app/utils/tracing.py.
+    tracing.configure(engine=engine)
     try:
-        await init_db_async()
+        with startup_sync.timed("db_init"):
+            await init_db_async()
 
         # Forward-only safety net for the hex->square migration: clear the per-campaign
         # last-broadcast cache so the first emit after a (re)start is a full state, never a
@@ -42,26 +62,14 @@ async def startup_event():
         # Database initialized via init_db (Alembic is not used in this project)
         logger.info("Database schema verified.")
 
-        init_firebase()
-        logger.info("Firebase initialized successfully.")
-
-        # Automatic Data Load Check
-        logger.info("Checking if dataset is loaded...")
-        async with AsyncSessionLocal() as db:
-            if not await is_dataset_loaded(db):
-                logger.info("Dataset not found. Loading basic dataset...")
-                await load_basic_dataset()
-            else:
-                logger.info("Dataset already loaded.")
+        with startup_sync.timed("firebase"):
+            init_firebase()
+            logger.info("Firebase initialized successfully.")
+            await asyncio.to_thread(token_cache.prefetch_certs)
 
-        # Sync Campaign Templates
-        logger.info("Syncing campaign templates...")
-        await parse_and_load()
-        logger.info("Campaign templates synced.")
-
-        logger.info("Setting up QoL dependencies...")
-        async with AsyncSessionLocal() as db:
-            await create_test_campaign(db)
+        # Immutable SRD compendium, parsed once for read-through lookups
+        with startup_sync.timed("compendium_store"):
+            load_store()
 
     except Exception as e:
         logger.critical(f"Database initialization failed: {e}")
@@ -72,6 +80,29 @@ async def startup_event():
     from app.services.command_service import CommandService
     CommandService.register_commands()
 
+    # Dataset import, template sync and dev seeding run after startup returns, so the
+    # server accepts connections immediately; /ready reports their progress. Unchanged
+    # files are skipped via the sync manifest, so a warm restart is a few hash checks.
+    global _seeding_task, _loop_watch_task, _loop_watchdog
+    _loop_watch_task = asyncio.create_task(metrics.watch_event_loop())
+    # Debug only: log the loop thread's stack whenever a callback blocks it longer.
+    if os.getenv("LOOP_WATCHDOG_MS"):
+        from app.utils.loop_watchdog import LoopWatchdog
+        _loop_watchdog = LoopWatchdog(float(os.environ["LOOP_WATCHDOG_MS"]))
+        _loop_watchdog.start()
+    _seeding_task = asyncio.create_task(startup_sync.run_phases([
+        ("dataset", sync_basic_dataset),
+        ("templates", parse_and_load),
+        ("dev_campaign", _seed_dev_campaign),
+    ]))
+
+
+async def _seed_dev_campaign():
+    logger.info("Setting up QoL dependencies...")
+    async with AsyncSessionLocal() as db:
+        await create_test_campaign(db)
+
+
 # 2. Include Routers
 fastapi_app.include_router(game.router, dependencies=[Depends(verify_token)])
 fastapi_app.include_router(auth.router)
@@ -92,6 +123,24 @@ async def health_check():
         "version": "0.1.0"
     }
 
+@fastapi_app.get("/ready")
+async def readiness_check():
+    snapshot = startup_sync.readiness_snapshot()
+    return JSONResponse(snapshot, status_code=200 if startup_sync.is_ready() else 503)
+
+@fastapi_app.get("/metrics")
+async def metrics_endpoint(request: Request):
+    # Prometheus scrape target: the scraper sends METRICS_TOKEN as a bearer token.
+    # Without a token it is only served in local dev (the Firebase emulator), like
+    # the /dev routes — a public deployment must not expose it unauthenticated.
+    token = os.getenv("METRICS_TOKEN")
+    if not token:
+        if not os.getenv("FIREBASE_AUTH_EMULATOR_HOST"):
+            return PlainTextResponse("not found\n", status_code=404)
+    elif not hmac.compare_digest(request.headers.get("authorization", "").encode(), f"Bearer {token}".encode()):
+        return PlainTextResponse("unauthorized\n", status_code=401)
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # 3. Middleware Configuration
 
 # CORS Configured via settings
@@ -146,4 +195,6 @@ async def debug_config():
 # It wraps the fully-configured FastAPI app.
 app = socketio.ASGIApp(sio, fastapi_app)
 
+startup_sync.record_timing("import", time.perf_counter() - _import_started)
+
 # Removed uvicorn.run block as it is not needed for production deployment
@@ -0,0 +1,75 @@
+"""Micro-benchmark: attack resolutions/sec, old path vs new path.
+
+  old: model_dump() both entities + run_in_executor per attack
+  new: EntityView over the live entities + inline engine call
+
+Run from backend/:  python scripts/bench_attack_resolution.py [iterations]
+"""
+import asyncio
+import functools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import Coordinates, Enemy, Player  # noqa: E402
+from game_engine.character_sheet import EntityView  # noqa: E402
+from game_engine.engine import GameEngine  # noqa: E402
+
+
+def make_entities():
+    # A realistic player sheet: equipment + a spell list make model_dump() expensive.
+    spells = [{"id": f"spell-{i}", "name": f"Spell {i}", "desc": ["lorem ipsum " * 20], "level": i % 4} for i in range(40)]
+    equipment = [
+        {"id": "longsword", "name": "Longsword", "type": "Weapon", "data": {"type": "Melee", "damage": {"damage_dice": "1d8"}}},
+        {"id": "chain-mail", "name": "Chain Mail", "type": "Armor", "data": {"type": "Heavy", "armor_class": {"base": 16}}},
+    ] + [{"id": f"gear-{i}", "name": f"Gear {i}", "type": "Gear", "data": {"desc": ["x" * 80]}} for i in range(30)]
+    player = Player(
+        id="p1", name="Brom", role="Fighter", is_ai=False, hp_current=40, hp_max=40, ac=18, level=5,
+        position=Coordinates(x=0, y=0), stats={"str": 16, "dex": 12},
+        sheet_data={"equipment": equipment, "spells": spells},
+    )
+    goblin = Enemy(
+        id="g1", name="Goblin", type="goblin", is_ai=True, hp_current=10_000, hp_max=10_000, ac=15,
+        position=Coordinates(x=1, y=0),
+        data={"actions": [{"name": "Scimitar", "desc": "Melee Weapon Attack", "damage": [{"damage_dice": "1d6+2"}]}]},
+    )
+    return player, goblin
+
+
+PARAMS = {"weapon_name": "Longsword", "weapon_damage_dice": "1d8"}
+
+
+async def old_path(engine, actor, target, n):
+    loop = asyncio.get_running_loop()
+    for _ in range(n):
+        actor_data = actor.model_dump()
+        target_data = target.model_dump()
+        await loop.run_in_executor(
+            None, functools.partial(engine.resolve_action, actor_data, "attack", target_data, PARAMS)
+        )
+
+
+async def new_path(engine, actor, target, n):
+    for _ in range(n):
+        engine.resolve_action(EntityView(actor), "attack", EntityView(target), PARAMS)
+
+
+async def main(n: int):
+    engine = GameEngine()
+    actor, target = make_entities()
+    results = {}
+    for label, fn in (("old (model_dump + executor)", old_path), ("new (view + inline)", new_path)):
+        await fn(engine, actor, target, 200)  # warm-up
+        start = time.perf_counter()
+        await fn(engine, actor, target, n)
+        elapsed = time.perf_counter() - start
+        results[label] = n / elapsed
+        print(f"{label:32s} {n / elapsed:10.0f} attacks/sec  ({elapsed * 1e6 / n:7.1f} us/attack)")
+    old, new = results.values()
+    print(f"speedup: {new / old:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,80 @@
+"""Micro-benchmark: roster lookups, linear scans vs GameState.entity_index().
+
+  linear: the pre-index scans (party + enemies + npcs, first match wins)
+  index:  GameState.get_entity / GameService._find_char_by_name on the cached index
+
+Run from backend/:  python scripts/bench_entity_lookup.py [entities]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://u:p@localhost/db")
+
+from app.models import Coordinates, Enemy, GameState, Location, NPC, Player  # noqa: E402
+from app.services.game_service import GameService  # noqa: E402
+
+
+def make_state(n: int) -> GameState:
+    third = max(1, n // 3)
+    pos = Coordinates(x=0, y=0)
+    party = [Player(id=f"p{i}", name=f"Hero {i}", role="Fighter", race="Human", is_ai=False,
+                    hp_current=10, hp_max=10, ac=15, position=pos) for i in range(third)]
+    enemies = [Enemy(id=f"e{i}", name=f"Goblin {i}", type="Goblin", is_ai=True,
+                     hp_current=7, hp_max=7, ac=13, position=pos) for i in range(third)]
+    npcs = [NPC(id=f"n{i}", name=f"Villager {i}", role="Farmer", is_ai=True,
+                hp_current=4, hp_max=4, ac=10, position=pos) for i in range(n - 2 * third)]
+    return GameState(session_id="bench", location=Location(name="Room", description="d"),
+                     party=party, enemies=enemies, npcs=npcs)
+
+
+def linear_get(gs, entity_id):
+    return next((c for c in gs.party + gs.enemies + gs.npcs if c.id == entity_id), None)
+
+
+def linear_find(gs, search_term, target_id=None):
+    lists = (gs.party, gs.enemies, gs.npcs)
+    if target_id:
+        for li in lists:
+            for c in li:
+                if c.id == target_id:
+                    return c
+    term = search_term.lower()
+    for li in lists:
+        for c in li:
+            if term == c.id.lower() or (getattr(c, 'target_id', None) and term == c.target_id.lower()):
+                return c
+    for li in lists:
+        for c in li:
+            if term == c.name.lower():
+                return c
+    for li in lists:
+        for c in li:
+            if c.name.lower().startswith(term):
+                return c
+    return None
+
+
+def main(n: int):
+    gs = make_state(n)
+    mid = gs.enemies[len(gs.enemies) // 2]
+    cases = [
+        ("get_entity(mid enemy)", lambda: linear_get(gs, mid.id), lambda: gs.get_entity(mid.id)),
+        ("find by id (p1)", lambda: linear_find(gs, "p1"), lambda: GameService._find_char_by_name(gs, "p1")),
+        ("find by exact name", lambda: linear_find(gs, mid.name), lambda: GameService._find_char_by_name(gs, mid.name)),
+        ("find by target_id", lambda: linear_find(gs, "x", mid.id),
+         lambda: GameService._find_char_by_name(gs, "x", mid.id)),
+    ]
+    print(f"{n} entities")
+    for label, linear, indexed in cases:
+        assert linear() is indexed()
+        row = []
+        for fn in (linear, indexed):
+            runs = timeit.repeat(fn, number=20_000, repeat=5)
+            row.append(min(runs) / 20_000 * 1e6)
+        print(f"{label:24s} linear {row[0]:6.2f} us   index {row[1]:6.2f} us   {row[0] / row[1]:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,70 @@
+"""Micro-benchmark: proximity queries, linear distance filter vs GameState.spatial_index().
+
+  linear:  the pre-index filter over enemies + npcs
+  index:   spatial_index().within() on the cached index
+  follow:  one party member moves, then the obstacle / ally sets are re-read (what
+           GameService.process_ai_following does per member)
+
+Run from backend/:  python scripts/bench_spatial_index.py [entities]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://u:p@localhost/db")
+
+from app.models import Coordinates, Enemy, GameState, Location, NPC, Player  # noqa: E402
+from app.utils.entity_index import ENEMY, NPC as NPC_FACTION  # noqa: E402
+
+
+def make_state(n: int) -> GameState:
+    third = max(1, n // 3)
+    at = lambda i: Coordinates(x=(i * 7) % 40, y=(i * 11) % 40)  # noqa: E731
+    party = [Player(id=f"p{i}", name=f"Hero {i}", role="Fighter", is_ai=True,
+                    hp_current=10, hp_max=10, ac=15, position=at(i)) for i in range(third)]
+    enemies = [Enemy(id=f"e{i}", name=f"Goblin {i}", type="Goblin", is_ai=True,
+                     hp_current=7, hp_max=7, ac=13, position=at(i + 100)) for i in range(third)]
+    npcs = [NPC(id=f"n{i}", name=f"Villager {i}", role="Farmer", is_ai=True,
+                hp_current=4, hp_max=4, ac=10, position=at(i + 200)) for i in range(n - 2 * third)]
+    return GameState(session_id="bench", location=Location(name="Room", description="d"),
+                     party=party, enemies=enemies, npcs=npcs)
+
+
+def linear_within(gs, cell, radius):
+    x, y = cell
+    return [c for c in gs.enemies + gs.npcs
+            if c.position and max(abs(c.position.x - x), abs(c.position.y - y)) <= radius]
+
+
+def follow_step(gs, member, toggle=[0]):
+    toggle[0] ^= 1
+    x, y = member.position.x + (1 if toggle[0] else -1), member.position.y
+    if hasattr(gs, "move_entity"):
+        gs.move_entity(member, x, y)
+    else:
+        member.position.x, member.position.y = x, y
+    index = gs.spatial_index()
+    return index.obstacle_cells(), index.party_cells(exclude=member)
+
+
+def main(n: int):
+    gs = make_state(n)
+    cell = (20, 20)
+    gs.spatial_index()
+    assert set(map(id, linear_within(gs, cell, 10))) == \
+        set(map(id, gs.spatial_index().within(cell, 10, factions=(ENEMY, NPC_FACTION))))
+    member = gs.party[0]
+    cases = [
+        ("within(cell, 10) linear", lambda: linear_within(gs, cell, 10)),
+        ("within(cell, 10) index", lambda: gs.spatial_index().within(cell, 10, factions=(ENEMY, NPC_FACTION))),
+        ("follow step (move + sets)", lambda: follow_step(gs, member)),
+    ]
+    print(f"{n} entities")
+    for label, fn in cases:
+        per_call = min(timeit.repeat(fn, number=5_000, repeat=5)) / 5_000 * 1e6
+        print(f"{label:28s} {per_call:7.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
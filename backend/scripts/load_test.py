@@ -0,0 +1,397 @@
+"""Load test: how many concurrent campaigns one worker sustains.
+
+Starts the real ASGI app (main:app, startup hooks included) under uvicorn in a thread
+of this process, seeds N copies of the ToSK campaign (load-0000, load-0001, ...) with
+the quickjoin party, and connects one python-socketio client per campaign over a
+websocket. Every campaign uses the "fake" LLM provider, which only this process
+knows: `install_stubs` patches the app's LLM factory to hand those campaigns a
+FakeChatModel (app/agents/fake_llm.py), so narration, mentions and barks run the real
+agent graphs with a fixed latency and reply length and no provider traffic.
+
+Each client joins its campaign and then, until --duration runs out, picks its next
+step from the game state it is sent (full updates plus patches, as the frontend does)
+and waits --think-ms between steps:
+
+  out of combat   chat, an @mention of an AI party member, a move_entity to a
+                  nearby free cell, or an attack: move next to the nearest hostile
+                  and @attack it (starting combat)
+  in combat       on its turn, @attack (moving first when out of reach) or @end;
+                  the AI turns that follow run inside that command, so they show
+                  up in its latency
+
+Latency is client-side, from emit to the server's ack (the handler returning). The
+report gives per-event-type count, throughput and p50/p99/max latency; on the server
+side, event-loop lag (how late a 50 ms ticker on the server's loop wakes) and DB pool
+use (connections checked out, sampled every 50 ms, against pool_size + max_overflow).
+The seeded campaigns are left in the database and rebuilt by the next run.
+
+Needs the local-dev environment (DATABASE_URL, the ToSK template cataloged at startup,
+Firebase settings from .env) and aiohttp for the socketio client. Players sign in
+with "load-token-<uid>" tokens, which `install_stubs` makes Firebase's verify_id_token
+accept in this process (the token cache and auth paths still run), so no Firebase
+calls are made.
+
+Run from backend/:  python scripts/load_test.py [--campaigns 10] [--duration 60] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CALL_TIMEOUT_S = 120
+MONITOR_INTERVAL_S = 0.05
+MELEE_REACH = 1  # cells
+
+
+def percentile(values: List[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1]
+
+
+class ServerMonitor:
+    """Samples event-loop lag and DB pool use on the server's loop."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.capacity = pool.size() + getattr(pool, "_max_overflow", 0)
+        self.lag_ms: List[float] = []
+        self.checked_out: List[int] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(MONITOR_INTERVAL_S)
+            self.lag_ms.append(max(0.0, (time.perf_counter() - start - MONITOR_INTERVAL_S) * 1000))
+            self.checked_out.append(self.pool.checkedout())
+
+    def report(self) -> dict:
+        saturated = sum(1 for n in self.checked_out if n >= self.capacity)
+        return {
+            'loop_lag_p50_ms': percentile(self.lag_ms, 50),
+            'loop_lag_p99_ms': percentile(self.lag_ms, 99),
+            'loop_lag_max_ms': max(self.lag_ms, default=0.0),
+            'pool_capacity': self.capacity,
+            'pool_checked_out_mean': statistics.fmean(self.checked_out) if self.checked_out else 0.0,
+            'pool_checked_out_max': max(self.checked_out, default=0),
+            'pool_saturated_pct': 100 * saturated / len(self.checked_out) if self.checked_out else 0.0,
+        }
+
+
+TOKEN_PREFIX = "load-token-"
+
+
+def install_stubs():
+    """Swap the LLM provider and Firebase token check for local stand-ins, in this process only.
+
+    Must run before the server starts. The app itself has no "fake" provider and no way
+    to skip token verification; both live here.
+    """
+    from firebase_admin import auth
+    from app.agents import models
+    from app.agents.fake_llm import FakeChatModel
+
+    build_llm = models._build_llm
+
+    def _build_llm(api_key, model_name, llm_provider, temperature):
+        if (llm_provider or "").lower() == "fake":
+            return FakeChatModel.from_env()
+        return build_llm(api_key, model_name, llm_provider, temperature)
+
+    def verify_id_token(token, *args, **kwargs):
+        if not token.startswith(TOKEN_PREFIX):
+            raise ValueError("not a load-test token")
+        return {'uid': token[len(TOKEN_PREFIX):], 'exp': time.time() + 3600}
+
+    models._build_llm = _build_llm
+    auth.verify_id_token = verify_id_token
+
+
+class ServerThread(threading.Thread):
+    """uvicorn serving main:app on its own event loop, so client work doesn't skew its lag."""
+
+    def __init__(self, port: int):
+        super().__init__(name="load-test-server", daemon=True)
+        import uvicorn
+        from main import app
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.monitor: Optional[ServerMonitor] = None
+
+    def run(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        from db.session import engine
+        self.loop = asyncio.get_running_loop()
+        self.monitor = ServerMonitor(engine.sync_engine.pool)
+        await self.server.serve()
+        self.monitor.stop()
+        await engine.dispose()
+
+    async def call(self, coro):
+        """Run `coro` on the server's loop (the DB engine's connections live there)."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    async def wait_ready(self):
+        from app.services import startup_sync
+        while not self.server.started:
+            if not self.is_alive():
+                raise SystemExit("Server failed to start (see the log above).")
+            await asyncio.sleep(0.1)
+        while not startup_sync.is_ready():
+            if startup_sync.readiness_snapshot()['status'] == "degraded":
+                raise SystemExit(f"Startup phase failed: {startup_sync.readiness_snapshot()['phases']}")
+            await asyncio.sleep(0.2)
+
+
+async def seed_campaign(index: int) -> dict:
+    """One ToSK campaign owned by a fresh load-test user with the quickjoin party."""
+    from sqlalchemy import delete, insert, select, update
+    from app.services.test_campaign_setup import TEST_PARTY
+    from app.services.tosk_setup import seed_tosk_campaign
+    from db.schema import campaign_memories, campaigns, characters, chat_messages, debug_logs, profiles
+    from db.session import AsyncSessionLocal
+
+    campaign_id, user_id = f"load-{index:04d}", f"load-user-{index:04d}"
+    async with AsyncSessionLocal() as db:
+        # seed_tosk_campaign clears the campaign's world; the player side is ours.
+        for table in (characters, chat_messages, campaign_memories, debug_logs):
+            await db.execute(delete(table).where(table.c.campaign_id == campaign_id))
+        if not (await db.execute(select(profiles.c.id).where(profiles.c.id == user_id))).scalar():
+            await db.execute(insert(profiles).values(id=user_id, username=f"Load {index}", status="active"))
+        await db.commit()
+
+        await seed_tosk_campaign(db, recreate=True, campaign_id=campaign_id, gm_id=user_id)
+        if not (await db.execute(select(campaigns.c.id).where(campaigns.c.id == campaign_id))).scalar():
+            raise SystemExit("ToSK template is not cataloged; start the server once to load templates.")
+        # Served by install_stubs; the key only has to be non-empty to pass the app's key checks.
+        await db.execute(update(campaigns).where(campaigns.c.id == campaign_id).values(
+            llm_provider="fake", model="fake", api_key="load-test", api_key_verified=True))
+
+        character_id = None
+        for member in TEST_PARTY:
+            char_id = str(uuid4())
+            await db.execute(insert(characters).values(
+                id=char_id, user_id=user_id, campaign_id=campaign_id, name=member["name"],
+                role=member["role"], race=member["race"], level=1, xp=0,
+                sheet_data=json.dumps(member["sheet"]), control_mode=member["control_mode"]))
+            if member["control_mode"] == "human":
+                character_id = char_id
+        await db.commit()
+    return {'campaign_id': campaign_id, 'user_id': user_id, 'character_id': character_id}
+
+
+class Player:
+    def __init__(self, url: str, seat: dict, results: Dict[str, List[float]], errors: Dict[str, int],
+                 think_s: float, rng: random.Random):
+        import socketio
+        self.url = url
+        self.seat = seat
+        self.results = results
+        self.errors = errors
+        self.think_s = think_s
+        self.rng = rng
+        self.token = f"{TOKEN_PREFIX}{seat['user_id']}"
+        self.state: Optional[dict] = None
+        self.stale = False
+        self.received = 0
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on('game_state_update', self._on_full_state)
+        self.sio.on('game_state_patch', self._on_patch)
+        self.sio.on('*', self._on_other)
+
+    async def _on_full_state(self, data):
+        self.received += 1
+        self.state = data
+        self.stale = False
+
+    async def _on_patch(self, data):
+        import jsonpatch
+        self.received += 1
+        if self.state is None or self.state.get('version') != data.get('base_version'):
+            self.stale = True
+            return
+        jsonpatch.apply_patch(self.state, data['patch'], in_place=True)
+
+    async def _on_other(self, event, *args):
+        self.received += 1
+
+    async def _timed(self, kind: str, awaitable):
+        start = time.perf_counter()
+        try:
+            await awaitable
+        except Exception:
+            self.errors[kind] += 1
+            return
+        self.results[kind].append((time.perf_counter() - start) * 1000)
+
+    async def _call(self, kind: str, event: str, data: dict):
+        await self._timed(kind, self.sio.call(event, data, timeout=CALL_TIMEOUT_S))
+
+    async def _say(self, kind: str, content: str):
+        me = self._me()
+        await self._call(kind, 'chat_message', {
+            'content': content, 'sender_id': me['id'] if me else self.seat['user_id'],
+            'sender_name': me['name'] if me else "Player"})
+
+    def _me(self) -> Optional[dict]:
+        for p in (self.state or {}).get('party', []):
+            if p.get('id') == self.seat['character_id']:
+                return p
+        return None
+
+    def _hostiles(self) -> List[dict]:
+        state = self.state or {}
+        found = [e for e in state.get('enemies', []) if e.get('hp_current', 0) > 0]
+        found += [n for n in state.get('npcs', []) if (n.get('data') or {}).get('hostile') and n.get('hp_current', 0) > 0]
+        return found
+
+    def _free_cells(self) -> set:
+        state = self.state or {}
+        cells = {(c['x'], c['y']) for c in state.get('location', {}).get('walkable_cells', [])}
+        for key in ('party', 'enemies', 'npcs'):
+            for e in state.get(key, []):
+                pos = e.get('position') or {}
+                cells.discard((pos.get('x'), pos.get('y')))
+        return cells
+
+    async def _move(self, me: dict, cell):
+        await self._call('move_entity', 'move_entity', {'entity_id': me['id'], 'x': cell[0], 'y': cell[1], 'path': []})
+
+    async def _attack(self, me: dict):
+        targets = self._hostiles()
+        if not targets:
+            return await self._say('chat', "We press on.")
+        here = (me['position']['x'], me['position']['y'])
+        dist = lambda e: max(abs(e['position']['x'] - here[0]), abs(e['position']['y'] - here[1]))  # noqa: E731
+        target = min(targets, key=dist)
+        if dist(target) > MELEE_REACH:
+            tx, ty = target['position']['x'], target['position']['y']
+            beside = [c for c in self._free_cells() if max(abs(c[0] - tx), abs(c[1] - ty)) <= MELEE_REACH]
+            if beside:
+                await self._move(me, min(beside, key=lambda c: max(abs(c[0] - here[0]), abs(c[1] - here[1]))))
+        await self._say('attack', f"@attack {target['name']}")
+
+    async def step(self):
+        if self.stale or self.state is None:
+            return await self._call('request_full_state', 'request_full_state', {})
+        me = self._me()
+        if not me or me.get('hp_current', 0) <= 0:
+            return await self._say('chat', "I watch from the shadows.")
+
+        if self.state.get('phase') == 'combat':
+            if self.state.get('active_entity_id') != me['id']:
+                return await self._say('chat', "Hold the line!")
+            if self.state.get('has_acted_this_turn'):
+                return await self._say('end_turn', "@end")
+            return await self._attack(me)
+
+        roll = self.rng.random()
+        if roll < 0.35:
+            await self._say('chat', "I search the room for anything out of place.")
+        elif roll < 0.5:
+            ally = next((p for p in self.state.get('party', []) if p.get('control_mode') == 'ai'), None)
+            await self._say('chat_mention', f"@{ally['name'].split()[0]} what do you make of this?" if ally else "Hello?")
+        elif roll < 0.8:
+            here = (me['position']['x'], me['position']['y'])
+            near = [c for c in self._free_cells() if 0 < max(abs(c[0] - here[0]), abs(c[1] - here[1])) <= 6]
+            if near:
+                await self._move(me, self.rng.choice(sorted(near)))
+        else:
+            await self._attack(me)
+
+    async def run(self, deadline: float):
+        await self._timed('connect', self.sio.connect(
+            self.url, auth={'token': self.token}, transports=['websocket'], wait_timeout=30))
+        if not self.sio.connected:
+            return
+        await self._call('join_campaign', 'join_campaign', {
+            'user_id': self.seat['user_id'], 'campaign_id': self.seat['campaign_id'],
+            'character_id': self.seat['character_id']})
+        try:
+            while time.perf_counter() < deadline:
+                await self.step()
+                await asyncio.sleep(self.think_s * (0.5 + self.rng.random()))
+        finally:
+            await self.sio.disconnect()
+
+
+def print_report(results: Dict[str, List[float]], errors: Dict[str, int], wall_s: float, server: dict,
+                 received: int):
+    total = sum(len(v) for v in results.values())
+    print(f"\n{'event':20s} {'n':>6s} {'/s':>7s} {'p50':>9s} {'p99':>9s} {'max':>9s} {'errors':>7s}")
+    for kind in sorted(set(results) | set(errors)):
+        lat = results.get(kind, [])
+        print(f"{kind:20s} {len(lat):6d} {len(lat) / wall_s:7.2f} {percentile(lat, 50):7.1f}ms "
+              f"{percentile(lat, 99):7.1f}ms {max(lat, default=0):7.1f}ms {errors.get(kind, 0):7d}")
+    print(f"\n{total} events in {wall_s:.1f}s ({total / wall_s:.1f}/s), {received} server emits received")
+    print(f"event-loop lag: p50 {server['loop_lag_p50_ms']:.1f}ms  p99 {server['loop_lag_p99_ms']:.1f}ms  "
+          f"max {server['loop_lag_max_ms']:.1f}ms")
+    print(f"DB pool: mean {server['pool_checked_out_mean']:.1f} / max {server['pool_checked_out_max']} of "
+          f"{server['pool_capacity']} connections checked out, saturated {server['pool_saturated_pct']:.1f}% of samples")
+
+
+async def main(args):
+    install_stubs()
+    server = ServerThread(args.port)
+    server.start()
+    await server.wait_ready()
+    seats = [await server.call(seed_campaign(i)) for i in range(args.campaigns)]
+    print(f"Seeded {len(seats)} campaigns; running {args.duration}s")
+
+    results: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    players = [Player(f"http://127.0.0.1:{args.port}", seat, results, errors, args.think_ms / 1000,
+                      random.Random(args.seed + i)) for i, seat in enumerate(seats)]
+    server.loop.call_soon_threadsafe(server.monitor.start)
+    start = time.perf_counter()
+    await asyncio.gather(*(p.run(start + args.duration) for p in players))
+    wall_s = time.perf_counter() - start
+    server.server.should_exit = True
+    server.join()
+
+    report = server.monitor.report()
+    print_report(results, errors, wall_s, report, sum(p.received for p in players))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'campaigns': args.campaigns, 'duration_s': wall_s, 'llm_latency_ms': args.llm_latency_ms,
+                       'events': {k: {'count': len(v), 'p50_ms': percentile(v, 50), 'p99_ms': percentile(v, 99),
+                                      'errors': errors.get(k, 0)} for k, v in results.items()},
+                       'server': report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--campaigns", type=int, default=10, help="simulated campaigns (one client each)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load after joining")
+    parser.add_argument("--think-ms", type=float, default=500, help="mean pause between a client's steps")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="fake LLM response time")
+    parser.add_argument("--llm-tokens", type=int, default=60, help="fake LLM reply length")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0, help="client decision RNG seed")
+    parser.add_argument("--json", help="write the report here")
+    args = parser.parse_args()
+
+    # Read by FakeChatModel.from_env.
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["FAKE_LLM_TOKENS"] = str(args.llm_tokens)
+    asyncio.run(main(args))
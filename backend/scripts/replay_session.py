@@ -0,0 +1,242 @@
+"""Replay a recorded socket session through the real handlers and report performance.
+
+Record: run the server with SESSION_RECORD_PATH=/tmp/session.jsonl and play
+        (see app/utils/session_recorder.py for the format).
+Replay: python scripts/replay_session.py /tmp/session.jsonl [--realtime] [--reseed-tosk]
+                                         [--json after.json] [--baseline before.json]
+
+Events go to the socket handlers in app/socket_manager.py against the DATABASE_URL
+database, which must be at the recording's starting point: a restored dump, or
+--reseed-tosk for sessions recorded on the ToSK campaign. Each event gets the RNG
+seed it was recorded with, and LLM calls get the recorded responses in order
+(app/agents/replay_llm.py), so no provider is contacted. Emits go to synthetic sids.
+
+Per event it reports:
+
+  handler   time until the socket handler returned
+  settle    time until the background work it started (AI turns, narration) also
+            finished; sequential mode only
+  stmts     SQL statements executed, background work included
+  locks     advisory-lock acquisitions and the time spent waiting for them
+
+Events run one after another by default; --realtime schedules them at their
+recorded offsets so concurrent players contend for the campaign lock as they did.
+--json writes the per-event-type summary; --baseline prints the change against a
+summary written by another commit.
+
+Run from backend/:  python scripts/replay_session.py <recording.jsonl> [options]
+"""
+import argparse
+import asyncio
+import contextvars
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from app import socket_manager  # noqa: E402
+from app.agents.replay_llm import ReplayChatModel, set_replay_model  # noqa: E402
+from app.services.lock_service import LockService  # noqa: E402
+from app.utils import json_codec  # noqa: E402
+from app.utils.session_recorder import read_recording  # noqa: E402
+from db.session import AsyncSessionLocal, engine  # noqa: E402
+
+SETTLE_TIMEOUT_S = 60.0
+
+
+@dataclass
+class EventStats:
+    index: int
+    event: str
+    handler_ms: float = 0.0
+    settle_ms: float = 0.0
+    statements: int = 0
+    lock_waits: int = 0
+    lock_wait_ms: float = 0.0
+    emits: int = 0
+
+
+# The event being replayed. asyncio tasks (and SQLAlchemy's greenlets) copy the
+# context, so work an event spawns in the background is counted toward it.
+_current: contextvars.ContextVar[Optional[EventStats]] = contextvars.ContextVar("replay_event", default=None)
+
+
+def _on_statement(*_args):
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+
+
+def _on_lock_wait(campaign_id: str, seconds: float):
+    stats = _current.get()
+    if stats is not None:
+        stats.lock_waits += 1
+        stats.lock_wait_ms += seconds * 1000
+
+
+def _counting_emit(emit):
+    async def wrapper(*args, **kwargs):
+        stats = _current.get()
+        if stats is not None:
+            stats.emits += 1
+        return await emit(*args, **kwargs)
+    return wrapper
+
+
+async def _settle(timeout: float) -> bool:
+    """Wait until no task but this one is running (background work has finished)."""
+    me = asyncio.current_task()
+    deadline = time.perf_counter() + timeout
+    while True:
+        pending = [t for t in asyncio.all_tasks() if t is not me and not t.done()]
+        remaining = deadline - time.perf_counter()
+        if not pending:
+            return True
+        if remaining <= 0:
+            return False
+        await asyncio.wait(pending, timeout=remaining)
+
+
+class Replayer:
+    def __init__(self, records: List[dict]):
+        self.events = [r for r in records if r.get('type') == 'event']
+        self.llm = ReplayChatModel.from_records(records)
+        self.sids: Dict[str, str] = {}
+        self.results: List[EventStats] = []
+
+    async def _sid(self, recorded_sid: str) -> str:
+        """A sid registered with the socket manager, so rooms and emits work."""
+        if recorded_sid not in self.sids:
+            self.sids[recorded_sid] = await socket_manager.sio.manager.connect(f"replay-{len(self.sids)}", "/")
+        return self.sids[recorded_sid]
+
+    async def _run_one(self, index: int, record: dict, settle: bool) -> EventStats:
+        stats = EventStats(index=index, event=record['event'])
+        _current.set(stats)
+        handler = getattr(socket_manager, record['event'])
+        sid = await self._sid(record['sid'])
+        random.seed(record['seed'])
+        start = time.perf_counter()
+        await handler(sid, *record.get('args', []))
+        stats.handler_ms = (time.perf_counter() - start) * 1000
+        if settle:
+            if not await _settle(SETTLE_TIMEOUT_S):
+                print(f"  event {index} ({stats.event}) still had work running after {SETTLE_TIMEOUT_S:.0f}s")
+            stats.settle_ms = (time.perf_counter() - start) * 1000
+        return stats
+
+    async def run(self, realtime: bool) -> List[EventStats]:
+        set_replay_model(self.llm)
+        LockService.wait_observers.append(_on_lock_wait)
+        event.listen(engine.sync_engine, "before_cursor_execute", _on_statement)
+        sio = socket_manager.sio
+        sio.emit = _counting_emit(sio.emit)
+        try:
+            if realtime:
+                t0 = time.perf_counter()
+                tasks = []
+                for i, record in enumerate(self.events):
+                    delay = record.get('t', 0) - (time.perf_counter() - t0)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    # Each event in its own context, so concurrent events don't share stats.
+                    tasks.append(asyncio.create_task(self._run_one(i, record, settle=False),
+                                                     context=contextvars.copy_context()))
+                self.results = list(await asyncio.gather(*tasks))
+                await _settle(SETTLE_TIMEOUT_S)
+            else:
+                for i, record in enumerate(self.events):
+                    self.results.append(await asyncio.create_task(
+                        self._run_one(i, record, settle=True), context=contextvars.copy_context()))
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", _on_statement)
+            LockService.wait_observers.remove(_on_lock_wait)
+            set_replay_model(None)
+        return self.results
+
+
+def _p95(values: List[float]) -> float:
+    return statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+
+
+def summarize(results: List[EventStats]) -> Dict[str, dict]:
+    by_event: Dict[str, List[EventStats]] = {}
+    for r in results:
+        by_event.setdefault(r.event, []).append(r)
+    summary = {}
+    for name, rows in sorted(by_event.items()):
+        handler = [r.handler_ms for r in rows]
+        summary[name] = {
+            'count': len(rows),
+            'handler_p50_ms': statistics.median(handler),
+            'handler_p95_ms': _p95(handler),
+            'settle_p50_ms': statistics.median(r.settle_ms for r in rows),
+            'statements_mean': statistics.fmean(r.statements for r in rows),
+            'lock_waits': sum(r.lock_waits for r in rows),
+            'lock_wait_ms': sum(r.lock_wait_ms for r in rows),
+        }
+    return summary
+
+
+def print_report(results: List[EventStats], summary: Dict[str, dict], llm: ReplayChatModel,
+                 baseline: Optional[Dict[str, dict]]):
+    print(f"{'#':>4s} {'event':20s} {'handler':>10s} {'settle':>10s} {'stmts':>6s} {'locks':>6s} {'wait':>9s} {'emits':>6s}")
+    for r in results:
+        print(f"{r.index:4d} {r.event:20s} {r.handler_ms:8.1f}ms {r.settle_ms:8.1f}ms {r.statements:6d} "
+              f"{r.lock_waits:6d} {r.lock_wait_ms:7.1f}ms {r.emits:6d}")
+
+    print(f"\n{'event':20s} {'n':>4s} {'p50':>9s} {'p95':>9s} {'settle p50':>11s} {'stmts':>7s} {'lock wait':>10s}")
+    for name, s in summary.items():
+        line = (f"{name:20s} {s['count']:4d} {s['handler_p50_ms']:7.1f}ms {s['handler_p95_ms']:7.1f}ms "
+                f"{s['settle_p50_ms']:9.1f}ms {s['statements_mean']:7.1f} {s['lock_wait_ms']:8.1f}ms")
+        before = (baseline or {}).get(name)
+        if before:
+            line += (f"   vs baseline: p50 {_delta(before['handler_p50_ms'], s['handler_p50_ms'])}, "
+                     f"stmts {_delta(before['statements_mean'], s['statements_mean'])}")
+        print(line)
+    print(f"\nLLM responses served {llm.served}, stubbed {llm.stubbed}, unused {len(llm.responses)}")
+    if llm.stubbed or llm.responses:
+        print("  (the replay diverged from the recording: check the starting database state)")
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return f"{after:.1f} (was 0)"
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+async def main(args):
+    records = list(read_recording(args.recording))
+    if args.reseed_tosk:
+        from app.services.tosk_setup import seed_tosk_campaign
+        async with AsyncSessionLocal() as db:
+            await seed_tosk_campaign(db, recreate=True)
+
+    replayer = Replayer(records)
+    results = await replayer.run(args.realtime)
+    summary = summarize(results) if results else {}
+    baseline = json_codec.loads(open(args.baseline, 'rb').read())['summary'] if args.baseline else None
+    print_report(results, summary, replayer.llm, baseline)
+
+    if args.json:
+        with open(args.json, 'wb') as f:
+            f.write(json_codec.dumpb({'recording': args.recording, 'realtime': args.realtime,
+                                      'summary': summary, 'events': [asdict(r) for r in results]}, indent=True))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("recording")
+    parser.add_argument("--realtime", action="store_true", help="replay at the recorded pace (concurrent events)")
+    parser.add_argument("--reseed-tosk", action="store_true", help="recreate the ToSK campaign before replaying")
+    parser.add_argument("--json", help="write the summary and per-event rows here")
+    parser.add_argument("--baseline", help="summary JSON from another commit to compare against")
+    asyncio.run(main(parser.parse_args()))
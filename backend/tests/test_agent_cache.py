@@ -0,0 +1,103 @@
+"""Tests for the compiled agent graph registry and the campaign LLM config cache."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+
+from app.agents import character_agent
+from app.agents.graph_registry import GraphRegistry, graph_cache_key
+from app.services.ai_service import AIService
+
+
+def test_registry_is_bounded_lru():
+    reg = GraphRegistry("test", maxsize=2)
+    reg.put("a", 1)
+    reg.put("b", 2)
+    assert reg.get("a") == 1  # "b" is now least recently used
+    reg.put("c", 3)
+    assert "b" not in reg and reg.get("a") == 1 and reg.get("c") == 3 and len(reg) == 2
+
+
+def test_cache_key_never_holds_the_raw_api_key():
+    key = graph_cache_key("sk-secret", "m", "openai", "dm")
+    assert "sk-secret" not in repr(key)
+    assert key != graph_cache_key("sk-other", "m", "openai", "dm")
+    assert key != graph_cache_key("sk-secret", "m", "openai", "character")
+
+
+@pytest.fixture
+def character_graphs():
+    character_agent._character_graph_cache.clear()
+    yield character_agent
+    character_agent._character_graph_cache.clear()
+
+
+async def test_character_graph_is_compiled_once_and_reads_character_from_state(character_graphs):
+    # Echo the system prompt back so the test can see which character it was built for.
+    echo = RunnableLambda(lambda messages: AIMessage(content=messages[0].content))
+    with patch.object(character_agent, "get_llm_instance", return_value=echo) as make_llm:
+        graph = character_agent.get_character_graph("key", "qwen", "local")
+        assert character_agent.get_character_graph("key", "qwen", "local") is graph
+        assert make_llm.call_count == 1
+
+        replies = []
+        for name in ("Brom", "Lyra"):
+            state = await graph.ainvoke({
+                "messages": [HumanMessage(content="Hello")],
+                "campaign_id": "camp",
+                "character": {"name": name, "race": "Elf", "role": "Wizard"},
+                "sender_name": "System",
+            })
+            replies.append(state["messages"][-1].content)
+    assert "You are Brom" in replies[0] and "You are Lyra" in replies[1]
+
+
+async def test_interact_tool_acts_for_the_character_in_state(character_graphs):
+    import app.ai_tools as ai_tools
+
+    def respond(messages):
+        if isinstance(messages[-1], ToolMessage):
+            return AIMessage(content=messages[-1].content)
+        return AIMessage(content="", tool_calls=[
+            {"name": "interact_with_object", "args": {"target_name": "door"}, "id": "call-1"}])
+
+    llm = MagicMock()
+    llm.bind_tools.return_value = RunnableLambda(respond)
+    run_interact = AsyncMock(return_value="Opened the door.")
+    session = MagicMock(__aenter__=AsyncMock(return_value=AsyncMock()), __aexit__=AsyncMock(return_value=False))
+    with patch.object(character_agent, "get_llm_instance", return_value=llm), \
+            patch.object(ai_tools, "_run_interact", run_interact), \
+            patch.object(ai_tools, "AsyncSessionLocal", return_value=session):
+        graph = character_agent.get_character_graph("key", "gpt-4o", "openai")
+        state = await graph.ainvoke({
+            "messages": [HumanMessage(content="Open it")],
+            "campaign_id": "camp",
+            "character": {"name": "Brom"},
+        })
+    assert state["messages"][-1].content == "Opened the door."
+    assert run_interact.await_args.args[:3] == ("camp", "Brom", "door")
+
+
+def test_tool_binding_graphs_are_keyed_apart_from_local_ones(character_graphs):
+    with patch.object(character_agent, "get_llm_instance", return_value=MagicMock()):
+        remote = character_agent.get_character_graph("key", "gpt-4o", "openai")
+        local = character_agent.get_character_graph("key", "gpt-4o", "local")
+    assert remote is not local and len(character_agent._character_graph_cache) == 2
+
+
+async def test_campaign_config_is_cached_until_invalidated():
+    AIService._campaign_config_cache.clear()
+    row = {"api_key": "k1", "model": "gpt-4o", "llm_provider": "openai"}
+    db = AsyncMock()
+    db.execute.return_value = MagicMock(mappings=MagicMock(return_value=MagicMock(
+        fetchone=MagicMock(side_effect=lambda: dict(row)))))
+
+    assert await AIService.get_campaign_config("camp", db) == ("k1", "gpt-4o", "openai")
+    row["api_key"] = "k2"
+    assert await AIService.get_campaign_config("camp", db) == ("k1", "gpt-4o", "openai")
+    assert db.execute.await_count == 1
+
+    AIService.invalidate_campaign_config("camp")
+    assert await AIService.get_campaign_config("camp", db) == ("k2", "gpt-4o", "openai")
+    AIService._campaign_config_cache.clear()
@@ -0,0 +1,93 @@
+"""Tests for bulk campaign instantiation and the parsed-template cache."""
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import campaign_loader
+from app.services.campaign_loader import instantiate_campaign, load_template_rows
+
+TEMPLATE = {
+    "id": "tpl",
+    "npcs": [
+        {"id": "npc_rat", "name": "Rat King", "role": "Boss", "disposition": {"attitude": "Hostile"}},
+        {"id": "npc_inn", "name": "Innkeeper", "role": "Vendor", "hostile": False,
+         "disposition": {"attitude": "aggressive haggler"}},
+    ],
+    "atlas": [{"id": "loc_cellar", "name": "Cellar"}, {"id": "loc_inn", "name": "Inn"}],
+    "quests": [{"id": "q1", "title": "Clear the Cellar", "steps": ["go down"], "rewards": ["10gp"]}],
+    "items": [],
+    "monsters": [{"name": "Giant Rat", "type": "beast", "challenge_rating": 0.125}],
+}
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    campaign_loader._template_cache.clear()
+    path = tmp_path / "tpl.json"
+    path.write_text(json.dumps(TEMPLATE))
+    yield str(path)
+    campaign_loader._template_cache.clear()
+
+
+def _db_for(path):
+    db = AsyncMock()
+    select_result = MagicMock()
+    select_result.fetchone.return_value = (path,)
+    db.execute.return_value = select_result
+    return db
+
+
+async def test_one_insert_per_nonempty_table(template_path):
+    db = _db_for(template_path)
+    await instantiate_campaign(db, "camp-1", "tpl")
+
+    # 1 template lookup + npcs, locations, quests, monsters (items is empty)
+    inserts = db.execute.call_args_list[1:]
+    assert [c.args[0].table.name for c in inserts] == ["npcs", "locations", "quests", "monsters"]
+
+    npc_rows = inserts[0].args[1]
+    assert [r["source_id"] for r in npc_rows] == ["npc_rat", "npc_inn"]
+    assert all(r["campaign_id"] == "camp-1" for r in npc_rows)
+    assert len({r["id"] for r in npc_rows}) == 2
+    assert json.loads(npc_rows[0]["data"])["hostile"] is True
+    assert json.loads(npc_rows[1]["data"])["hostile"] is False  # explicit peace is kept
+
+    quest = inserts[2].args[1][0]
+    assert json.loads(quest["steps"]) == ["go down"] and quest["title"] == "Clear the Cellar"
+    assert inserts[3].args[1][0]["cr"] == "0.125"
+
+
+async def test_instances_get_fresh_ids(template_path):
+    db_a, db_b = _db_for(template_path), _db_for(template_path)
+    await instantiate_campaign(db_a, "a", "tpl")
+    await instantiate_campaign(db_b, "b", "tpl")
+    ids_a = {r["id"] for r in db_a.execute.call_args_list[1].args[1]}
+    ids_b = {r["id"] for r in db_b.execute.call_args_list[1].args[1]}
+    assert not ids_a & ids_b
+
+
+def test_template_cache_keyed_by_mtime(template_path, monkeypatch):
+    calls = []
+    real_load = campaign_loader.load_json_file
+    monkeypatch.setattr(campaign_loader, "load_json_file", lambda p: calls.append(p) or real_load(p))
+
+    first = load_template_rows(template_path)
+    assert load_template_rows(template_path) is first
+    assert len(calls) == 1
+
+    edited = {**TEMPLATE, "atlas": TEMPLATE["atlas"][:1]}
+    with open(template_path, "w") as f:
+        json.dump(edited, f)
+    stat = os.stat(template_path)
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    reparsed = load_template_rows(template_path)
+    assert len(calls) == 2 and len(reparsed["locations"]) == 1
+
+
+async def test_missing_template_file(tmp_path):
+    db = _db_for(str(tmp_path / "gone.json"))
+    with pytest.raises(ValueError):
+        await instantiate_campaign(db, "camp", "tpl")
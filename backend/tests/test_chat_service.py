@@ -1,11 +1,19 @@
 import pytest
 import datetime
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 from app.services.chat_service import ChatService
 
+
+def _session():
+    """AsyncSession stand-in: async execute/commit plus a real `info` dict."""
+    session = AsyncMock()
+    session.info = {}
+    return session
+
 @pytest.fixture
 def mock_db_session():
     mock_session = AsyncMock()
@@ -13,7 +21,7 @@ def mock_db_session():
 
 @pytest.mark.asyncio
 async def test_save_message_with_db():
-    mock_db = AsyncMock()
+    mock_db = _session()
     
     result = await ChatService.save_message(
         campaign_id="test_camp",
@@ -48,7 +56,7 @@ async def test_save_message_without_db():
 
 @pytest.mark.asyncio
 async def test_get_chat_history_with_db():
-    mock_db = AsyncMock()
+    mock_db = _session()
     
     # Mock return rows
     mock_result = AsyncMock()
@@ -97,3 +105,145 @@ async def test_get_latest_memory():
         
         assert summary == "The party entered the cave"
         assert created_at == "2023-01-01"
+
+
+# --- In-memory chat tail ---
+
+from app.services import chat_service
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+def _row(i, sender_id="player1", content=None):
+    return {
+        "id": f"m{i:03d}", "sender_id": sender_id, "sender_name": "Alice",
+        "content": content or f"msg {i}",
+        "created_at": datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(minutes=i),
+    }
+
+
+@pytest.fixture
+def fresh_tails():
+    chat_service._tails.clear()
+    yield
+    chat_service._tails.clear()
+
+
+async def test_tail_seeds_once_then_serves_appends(fresh_tails):
+    db = _session()
+    db.execute.return_value = _Rows([_row(2), _row(1)])  # DESC, like the seed query
+
+    first = await ChatService.get_chat_history("camp", limit=5, db=db)
+    assert [m.content for m in first] == ["Alice: msg 1", "Alice: msg 2"]
+    seed_sql = str(db.execute.call_args[0][0])
+    assert "NOT LIKE" in seed_sql and "id DESC" in seed_sql
+
+    await ChatService.save_message("camp", "dm", "Dungeon Master", "The door creaks.", db=db)
+    await ChatService.save_message("camp", "system", "System", "DM Agent is offline.", db=db)
+    db.execute.reset_mock()
+
+    history = await ChatService.get_chat_history("camp", limit=2, db=db)
+    assert [m.content for m in history] == ["Alice: msg 2", "The door creaks."]
+    # Only the two INSERTs hit the DB before; the read came from the tail
+    db.execute.assert_not_called()
+
+
+async def test_appends_during_seed_are_merged(fresh_tails):
+    db = _session()
+
+    async def seed_query(*args, **kwargs):
+        # A message is saved (and committed) while the seed query is in flight
+        chat_service._tails["camp"].append(_row(2))
+        chat_service._tails["camp"].append(_row(3))
+        return _Rows([_row(2), _row(1)])
+
+    db.execute.side_effect = seed_query
+    history = await ChatService.get_chat_history("camp", limit=10, db=db)
+    assert [m.content for m in history] == ["Alice: msg 1", "Alice: msg 2", "Alice: msg 3"]
+
+
+async def test_messages_after_uses_tail_when_covered(fresh_tails, monkeypatch):
+    monkeypatch.setattr(chat_service, "TAIL_SIZE", 3)
+    db = _session()
+    db.execute.return_value = _Rows([_row(5), _row(4), _row(3)])
+    await ChatService.get_chat_history("camp", limit=3, db=db)
+    db.execute.reset_mock()
+
+    # Cutoff inside the buffered window: served from memory
+    after = _row(3)["created_at"]
+    msgs = await ChatService.get_messages_after("camp", after, db=db)
+    assert [m.content for m in msgs] == ["Alice: msg 4", "Alice: msg 5"]
+    db.execute.assert_not_called()
+
+    # Cutoff older than the tail (and the tail is full): falls back to the DB
+    db.execute.return_value = _Rows([_row(1), _row(2)])
+    msgs = await ChatService.get_messages_after("camp", _row(0)["created_at"], db=db)
+    assert [m.content for m in msgs] == ["Alice: msg 1", "Alice: msg 2"]
+    assert "created_at > :dt" in str(db.execute.call_args[0][0])
+
+
+async def test_clear_tail_forces_reseed(fresh_tails):
+    db = _session()
+    db.execute.return_value = _Rows([_row(1)])
+    await ChatService.get_chat_history("camp", limit=5, db=db)
+    ChatService.clear_tail("camp")
+    db.execute.return_value = _Rows([])
+    assert await ChatService.get_chat_history("camp", limit=5, db=db) == []
+
+
+def _commit(db):
+    chat_service._promote_pending_messages(SimpleNamespace(info=db.info))
+
+
+def _rollback(db):
+    chat_service._drop_pending_messages(SimpleNamespace(info=db.info))
+
+
+async def test_staged_messages_reach_the_tail_only_on_commit(fresh_tails):
+    db = _session()
+    db.execute.return_value = _Rows([_row(1)])
+    await ChatService.get_chat_history("camp", limit=5, db=db)
+
+    await ChatService.save_message("camp", "dm", "Dungeon Master", "The door creaks.", db=db)
+    # The saving session already sees it; everyone else only after the commit
+    assert [m.content for m in await ChatService.get_chat_history("camp", limit=5, db=db)] == \
+        ["Alice: msg 1", "The door creaks."]
+    assert [m.content for m in await ChatService.get_chat_history("camp", limit=5)] == ["Alice: msg 1"]
+
+    _commit(db)
+    assert [m.content for m in await ChatService.get_chat_history("camp", limit=5)] == \
+        ["Alice: msg 1", "The door creaks."]
+
+
+async def test_rolled_back_message_never_reaches_the_tail(fresh_tails):
+    db = _session()
+    db.execute.return_value = _Rows([_row(1)])
+    await ChatService.get_chat_history("camp", limit=5, db=db)
+
+    await ChatService.save_message("camp", "dm", "Dungeon Master", "You find a key.", db=db)
+    _rollback(db)
+    _commit(db)  # a later commit on the same session must not resurrect it
+
+    assert [m["content"] for m in chat_service._tails["camp"].messages] == ["msg 1"]
+    assert [m.content for m in await ChatService.get_chat_history("camp", limit=5, db=db)] == ["Alice: msg 1"]
+
+
+async def test_seeding_on_the_saving_session_skips_its_uncommitted_rows(fresh_tails):
+    db = _session()
+    saved = await ChatService.save_message("camp", "dm", "Dungeon Master", "You find a key.", db=db)
+    # The seed query runs in the same transaction, so it returns the staged row too
+    staged = dict(_row(2, sender_id="dm", content="You find a key."), id=saved["id"])
+    db.execute.return_value = _Rows([staged, _row(1)])
+    await ChatService.get_chat_history("camp", limit=5, db=db)
+    _rollback(db)
+
+    assert [m["content"] for m in chat_service._tails["camp"].messages] == ["msg 1"]
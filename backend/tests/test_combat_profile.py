@@ -0,0 +1,108 @@
+"""Tests for precompiled CombatProfiles (attack params, reach, multiattack, caching)."""
+import pytest
+
+from app.services import combat_profile
+from app.services.combat_profile import compile_profile, get_profile, invalidate
+
+
+@pytest.fixture(autouse=True)
+def _clear_profiles():
+    combat_profile.clear()
+    yield
+    combat_profile.clear()
+
+
+LONGBOW = {
+    "id": "longbow", "name": "Longbow", "type": "Weapon",
+    "data": {"type": "Ranged", "damage": {"damage_dice": "1d8"}, "range": {"normal": 150}},
+}
+RAPIER = {
+    "id": "rapier", "name": "Rapier", "type": "Weapon",
+    "data": {"type": "Melee", "damage": {"damage_dice": "1d8"}, "properties": [{"name": "Finesse"}]},
+}
+DAGGER = {
+    "id": "dagger", "name": "Dagger", "type": "Weapon",
+    "data": {"type": "Melee", "damage": {"damage_dice": "1d4"},
+             "properties": [{"name": "Finesse"}, {"name": "Thrown"}], "range": {"normal": 20}},
+}
+
+ARCHER_ACTIONS = [
+    {"name": "Multiattack", "multiattack_type": "actions", "damage": [],
+     "actions": [{"action_name": "Longbow", "count": "2", "type": "ranged"}]},
+    {"name": "Longbow", "desc": "Ranged Weapon Attack: +4 to hit, range 150/600 ft., one target.",
+     "damage": [{"damage_dice": "1d8+2"}]},
+]
+
+
+def test_player_weapon_params(player_factory):
+    p = player_factory(sheet_data={"equipment": [RAPIER, DAGGER, {"name": "Rope", "type": "Gear"}]})
+    profile = compile_profile(p)
+    assert len(profile.weapons) == 2
+    main, off = profile.weapons
+    assert main.attack_params() == {"weapon_damage_dice": "1d8", "weapon_name": "Rapier", "is_finesse": True}
+    assert off.attack_params() == {
+        "weapon_damage_dice": "1d4", "weapon_name": "Dagger", "is_finesse": True,
+        "is_ranged": True, "is_offhand": True,
+    }
+    assert off.range_cells == 4
+    # Thrown weapons don't extend the AI's approach reach
+    assert profile.max_attack_range == 1
+
+
+def test_unarmed_player_and_ranged_reach(player_factory):
+    unarmed = compile_profile(player_factory())
+    assert unarmed.weapons == (combat_profile.UNARMED,)
+    assert unarmed.weapons[0].attack_params() == {}
+
+    archer = compile_profile(player_factory(sheet_data={"equipment": [LONGBOW]}))
+    assert archer.max_attack_range == 30
+    assert archer.weapons[0].range_cells == 30
+
+
+def test_spellcaster_fallback_range(player_factory, npc_factory):
+    caster = compile_profile(player_factory(sheet_data={"spells": [{"name": "Fire Bolt"}]}))
+    assert caster.is_spellcaster and caster.max_attack_range == combat_profile.CANTRIP_FALLBACK_RANGE
+
+    mage = compile_profile(npc_factory(data={"actions": [{"name": "Spellcasting", "desc": "casts spells"}]}))
+    assert mage.is_spellcaster and mage.max_attack_range == combat_profile.CANTRIP_FALLBACK_RANGE
+
+
+def test_monster_range_and_multiattack(enemy_factory):
+    e = enemy_factory(data={"index": "scout", "actions": ARCHER_ACTIONS})
+    profile = compile_profile(e)
+    assert profile.max_attack_range == 30
+    seq = profile.multiattack_sequence()
+    assert [a["name"] for a in seq] == ["Longbow", "Longbow"]
+    assert "Multiattack" not in profile.attacks
+
+
+def test_monsters_share_profile_by_source(enemy_factory):
+    a = enemy_factory(data={"index": "scout", "actions": ARCHER_ACTIONS})
+    b = enemy_factory(data={"index": "scout", "actions": ARCHER_ACTIONS})
+    assert get_profile(a) is get_profile(b)
+
+    variant = enemy_factory(data={"index": "scout", "actions": ARCHER_ACTIONS[1:]})
+    assert get_profile(variant) is not get_profile(a)
+
+
+def test_player_profile_invalidation(player_factory):
+    p = player_factory(sheet_data={"equipment": [RAPIER]})
+    first = get_profile(p)
+    assert get_profile(p) is first
+
+    # Equipment change is picked up by the cache key even without invalidate()
+    p.sheet_data["equipment"] = [LONGBOW]
+    assert get_profile(p).max_attack_range == 30
+
+    # In-place stat edits on the same weapon need the explicit invalidation
+    p.sheet_data["equipment"][0] = {**LONGBOW, "data": {**LONGBOW["data"], "range": {"normal": 60}}}
+    assert get_profile(p).max_attack_range == 30
+    invalidate(p.id)
+    assert get_profile(p).max_attack_range == 12
+
+
+def test_cache_is_bounded(enemy_factory, monkeypatch):
+    monkeypatch.setattr(combat_profile, "MAX_CACHED_PROFILES", 3)
+    for i in range(5):
+        get_profile(enemy_factory(data={"index": f"m{i}", "actions": []}))
+    assert len(combat_profile._profiles) == 3
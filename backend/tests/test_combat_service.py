@@ -99,6 +99,7 @@ class TestHandleEntityDeath:
 
         gs = game_state_factory(phase="combat", players=[p], enemies=[e])
         gs.turn_order = [p.id, e.id]
+        assert gs.get_entity(e.id) is e  # roster index built before the death
 
         death_msg, updates = await CombatService._handle_entity_death(
             "test_camp", e, gs, is_npc=False, db=mock_db, commit=False
@@ -108,6 +109,7 @@ class TestHandleEntityDeath:
         assert len(gs.vessels) == 1
         assert "CORPSE" in gs.vessels[0].name.upper()
         assert e.id not in gs.turn_order
+        assert gs.get_entity(e.id) is None
 
     @pytest.mark.asyncio
     async def test_combat_ends_when_all_enemies_dead(self, game_state_factory, player_factory, enemy_factory, coords, mock_db):
@@ -0,0 +1,117 @@
+"""Unit tests for the compendium search query builder and keyset cursor (no DB)."""
+import pytest
+
+from app.services.compendium_service import (
+    CompendiumQueryError,
+    build_page,
+    build_search_query,
+    decode_cursor,
+    encode_cursor,
+    normalize_cr,
+)
+
+
+def test_cursor_round_trip():
+    token = encode_cursor("1.250000", "fire-bolt")
+    assert "=" not in token
+    assert decode_cursor(token) == ("1.250000", "fire-bolt")
+
+
+def test_bad_cursor_raises():
+    with pytest.raises(CompendiumQueryError):
+        decode_cursor("not-a-cursor!!")
+
+
+def test_normalize_cr_fractions():
+    assert normalize_cr("1/4") == "0.25"
+    assert normalize_cr("1/2") == "0.5"
+    assert normalize_cr("2") == "2"
+    assert normalize_cr(0.125) == "0.125"
+    with pytest.raises(CompendiumQueryError):
+        normalize_cr("abc")
+
+
+def test_unknown_table_rejected():
+    with pytest.raises(CompendiumQueryError):
+        build_search_query("users; DROP TABLE spells", q="x")
+
+
+def test_unsupported_filter_rejected():
+    with pytest.raises(CompendiumQueryError):
+        build_search_query("items", filters={"level": 3})
+
+
+def test_ranked_query_uses_trigram_and_fulltext():
+    sql, params = build_search_query("spells", q="fire", limit=10)
+    assert "similarity(name, :q)" in sql
+    assert "name % :q" in sql
+    assert "@@ plainto_tsquery('english', :q)" in sql
+    assert "ORDER BY score DESC, id" in sql
+    assert params["q_contains"] == "%fire%"
+    assert params["q_prefix"] == "fire%"
+    assert params["limit"] == 11  # +1 probe row
+
+
+def test_ranked_query_without_trgm_falls_back():
+    sql, _ = build_search_query("spells", q="fire", use_trgm=False)
+    assert "similarity" not in sql
+    assert "name % :q" not in sql
+    assert "name ILIKE :q_contains" in sql
+
+
+def test_filters_are_bound_not_interpolated():
+    sql, params = build_search_query(
+        "spells", q="bolt", filters={"level": "1", "school": "Evocation", "class": "Wizard"}
+    )
+    assert "level = :f_level" in sql
+    assert "lower(school) = lower(:f_school)" in sql
+    assert "@> CAST(:f_class AS jsonb)" in sql
+    assert params["f_level"] == 1
+    assert params["f_class"] == '[{"index": "wizard"}]'
+
+    sql, params = build_search_query("monsters", filters={"cr": "1/4", "type": None})
+    assert "cr = :f_cr" in sql and "f_type" not in params
+    assert params["f_cr"] == "0.25"
+
+
+def test_slim_projection_skips_data():
+    sql, _ = build_search_query("monsters", q="gob", slim=True)
+    assert "data," not in sql.split("FROM")[0]
+    assert "type, cr" in sql
+    sql, _ = build_search_query("monsters", q="gob")
+    assert "data" in sql.split(" AS score")[0]
+
+
+def test_keyset_cursor_clauses():
+    cursor = encode_cursor("1.5", "b")
+    sql, params = build_search_query("spells", q="fire", cursor=cursor)
+    assert "score < CAST(:c_score AS numeric)" in sql
+    assert params["c_score"] == "1.5" and params["c_id"] == "b"
+
+    cursor = encode_cursor("Fireball", "fireball")
+    sql, params = build_search_query("spells", cursor=cursor)
+    assert "(name, id) > (:c_name, :c_id)" in sql
+    assert "ORDER BY name, id" in sql
+    assert params["c_name"] == "Fireball"
+
+
+def test_limit_is_clamped():
+    _, params = build_search_query("spells", limit=10_000)
+    assert params["limit"] == 101
+
+
+def test_build_page_emits_cursor_only_when_more_rows():
+    rows = [
+        {"id": "a", "name": "Alpha", "data": '{"x": 1}', "score": 2.5},
+        {"id": "b", "name": "Beta", "data": "not json", "score": 1.0},
+        {"id": "c", "name": "Gamma", "data": "{}", "score": 0.5},
+    ]
+    page = build_page(rows, limit=2, q="a", slim=False)
+    assert [r["id"] for r in page["results"]] == ["a", "b"]
+    assert page["results"][0]["data"] == {"x": 1}
+    assert page["results"][1]["data"] == {}
+    assert decode_cursor(page["next_cursor"]) == ("1.0", "b")
+
+    page = build_page(rows[:2], limit=2, q=None, slim=True)
+    assert page["next_cursor"] is None
+    assert "data" not in page["results"][0]
@@ -0,0 +1,127 @@
+"""Tests for the in-memory SRD compendium store and the ETag helpers (no DB)."""
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from starlette.requests import Request
+
+from app.services import compendium_store
+from app.services.compendium_store import build_store, normalize_name
+from app.utils.http_cache import etag_json_response, etag_matches
+
+
+SPELLS = [
+    {"index": "fire-bolt", "name": "Fire Bolt", "level": 0, "school": {"name": "Evocation"},
+     "attack_type": "ranged", "range": "120 feet",
+     "damage": {"damage_type": {"name": "Fire"}, "damage_at_character_level": {"1": "1d10"}}},
+    {"index": "fireball", "name": "Fireball", "level": 3, "school": {"name": "Evocation"},
+     "dc": {"dc_type": {"index": "dex"}}, "damage": {"damage_at_slot_level": {"3": "8d6"}}},
+    {"index": "magic-missile", "name": "Magic Missile", "level": 1, "school": {"name": "Evocation"}},
+]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    (tmp_path / "spell_box.json").write_text(json.dumps(SPELLS))
+    (tmp_path / "equipment_box.json").write_text(json.dumps([
+        {"index": "longsword", "name": "Longsword", "equipment_category": {"name": "Weapon"}},
+        {"name": "No Index"},
+    ]))
+    (tmp_path / "monsters.json").write_text(json.dumps([
+        {"index": "goblin", "name": "Goblin", "type": "humanoid", "challenge_rating": 0.25},
+    ]))
+    (tmp_path / "stats_box.json").write_text(json.dumps({"alignments": [{"index": "lg", "name": "Lawful Good"}]}))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def loaded_store(data_dir):
+    store = compendium_store.load_store(data_dir)
+    yield store
+    compendium_store._store = None
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_normalize_name():
+    assert normalize_name("Acid Arrow") == normalize_name("acid-arrow") == normalize_name(" ACID_ARROW ")
+
+
+def test_indexes_and_row_shape(data_dir):
+    store = build_store(data_dir)
+    assert set(store.tables) == {"spells", "items", "monsters", "alignments"}
+    assert len(store.table("items")) == 1  # rows without an index are skipped
+    assert store.get("monsters", "goblin")["cr"] == "0.25"
+    assert store.get("items", "longsword")["type"] == "Weapon"
+    spell = store.get("spells", "fireball")
+    assert spell["level"] == 3 and spell["school"] == "Evocation"
+    assert isinstance(spell["data"], dict)
+
+
+def test_find_preference_order(data_dir):
+    store = build_store(data_dir)
+    assert store.find("spells", "FIRE BOLT")["id"] == "fire-bolt"
+    assert store.find("spells", "magic_missile")["id"] == "magic-missile"
+    assert store.find("spells", "fire")["id"] == "fireball"  # shortest prefix match
+    assert store.find("spells", "missile")["id"] == "magic-missile"
+    assert store.find("spells", "wish") is None
+    assert store.find("feats", "anything") is None
+
+
+def test_engine_spells_are_prenormalized_copies(data_dir):
+    store = build_store(data_dir)
+    spell = store.engine_spell(index="fire-bolt")
+    assert spell["data"]["damage"]["damage_dice"] == "1d10"
+    spell["data"]["damage"]["damage_dice"] = "99d99"
+    assert store.engine_spell(name="Fire Bolt")["data"]["damage"]["damage_dice"] == "1d10"
+
+
+def test_etag_is_stable_and_content_sensitive(data_dir, tmp_path):
+    a = build_store(data_dir)
+    b = build_store(data_dir)
+    assert a.version == b.version
+    (tmp_path / "monsters.json").write_text(json.dumps([
+        {"index": "goblin", "name": "Goblin", "type": "humanoid", "challenge_rating": 1},
+    ]))
+    c = build_store(data_dir)
+    assert c.tables["monsters"].etag != a.tables["monsters"].etag
+    assert c.tables["spells"].etag == a.tables["spells"].etag
+
+
+async def test_resolve_spell_for_cast_uses_store_without_db(loaded_store):
+    from app.services.spell_service import lookup_spell, resolve_spell_for_cast
+    db = AsyncMock()
+    spell = await resolve_spell_for_cast({"name": "Fire Bolt", "id": "fire-bolt"}, "wizard", db)
+    assert spell["data"]["damage"]["damage_dice"] == "1d10"
+    assert (await lookup_spell("fireball", db))["index"] == "fireball"
+    db.execute.assert_not_called()
+
+
+def test_load_store_fail_open(tmp_path):
+    try:
+        store = compendium_store.load_store(str(tmp_path / "missing"))
+        assert store is not None and store.tables == {}
+    finally:
+        compendium_store._store = None
+
+
+def test_etag_matches_weak_and_lists():
+    assert etag_matches(_request('W/"abc"'), '"abc"')
+    assert etag_matches(_request('"x", "abc"'), 'W/"abc"')
+    assert etag_matches(_request("*"), '"abc"')
+    assert not etag_matches(_request('"nope"'), '"abc"')
+    assert not etag_matches(_request(), '"abc"')
+
+
+def test_etag_json_response_roundtrip():
+    first = etag_json_response(_request(), [{"id": "a"}])
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    second = etag_json_response(_request(etag), [{"id": "a"}])
+    assert second.status_code == 304 and second.body == b""
+    changed = etag_json_response(_request(etag), [{"id": "b"}])
+    assert changed.status_code == 200
@@ -0,0 +1,87 @@
+"""Tests for the GameState roster index behind GameService._find_char_by_name."""
+from app.services.game_service import GameService
+
+
+def _state(game_state_factory, player_factory, enemy_factory, npc_factory):
+    gs = game_state_factory(
+        players=[player_factory(name="Aldric", role="Paladin", race="Human")],
+        enemies=[
+            enemy_factory(name="Goblin Archer", type="Goblin"),
+            enemy_factory(name="Goblin Boss", type="Goblin"),
+        ],
+    )
+    gs.npcs.append(npc_factory(name="Mira", role="Shopkeeper", data={"race": "Elf"}))
+    return gs
+
+
+def test_find_priorities(game_state_factory, player_factory, enemy_factory, npc_factory):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory)
+    aldric, archer, boss = gs.party[0], gs.enemies[0], gs.enemies[1]
+    mira = gs.npcs[0]
+
+    find = GameService._find_char_by_name
+    assert find(gs, "ignored", target_id=boss.id) is boss
+    assert find(gs, archer.id.upper()) is archer          # exact id, case-insensitive
+    assert find(gs, "goblin boss") is boss                # exact name
+    assert find(gs, "gob") is archer                      # prefix: first in roster order
+    assert find(gs, "goblin") is archer                   # prefix beats type bucket
+    assert find(gs, "paladin") is aldric                  # role bucket
+    assert find(gs, "elf") is mira                        # NPC data race
+    assert find(gs, "boss") is boss                       # substring fallback
+    assert find(gs, "dragon") is None
+    assert find(gs, "") is None
+
+
+def test_target_id_alias(game_state_factory, player_factory, enemy_factory, npc_factory):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory)
+    gs.enemies[1].target_id = "boss_1"
+    gs.invalidate_entity_index()
+    assert GameService._find_char_by_name(gs, "BOSS_1") is gs.enemies[1]
+
+
+def test_index_is_cached_until_the_roster_changes(game_state_factory, player_factory, enemy_factory, npc_factory):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory)
+    index = gs.entity_index()
+    assert gs.entity_index() is index
+
+    # HP edits don't touch the roster: same index
+    gs.enemies[0].hp_current = 0
+    assert gs.entity_index() is index
+
+    newcomer = enemy_factory(name="Hobgoblin")
+    gs.enemies.append(newcomer)
+    gs.invalidate_entity_index()
+    assert gs.entity_index() is not index
+    assert gs.get_entity(newcomer.id) is newcomer
+
+    removed = gs.enemies.pop(0)
+    gs.invalidate_entity_index()
+    assert gs.get_entity(removed.id) is None
+
+    replacement = enemy_factory(name="Bugbear")
+    gs.enemies[0] = replacement
+    gs.invalidate_entity_index()
+    assert GameService._find_char_by_name(gs, "bugbear") is replacement
+
+
+def test_get_entity(game_state_factory, player_factory, enemy_factory, npc_factory):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory)
+    assert gs.get_entity(gs.npcs[0].id) is gs.npcs[0]
+    assert gs.get_entity(None) is None and gs.get_entity("nobody") is None
+
+
+def test_factions(game_state_factory, player_factory, enemy_factory, npc_factory):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory)
+    index = gs.entity_index()
+    assert index.faction_of(gs.party[0].id) == "party"
+    assert index.faction_of(gs.enemies[0].id) == "enemy"
+    assert index.faction_of(gs.npcs[0].id) == "npc"
+    assert index.faction_of("nobody") is None
+    assert gs.enemies[1].id in index.enemy_ids
+
+
+def test_index_not_serialized(game_state_factory, player_factory, enemy_factory, npc_factory):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory)
+    gs.entity_index()
+    dumped = gs.model_dump()
+    assert "_entity_index" not in dumped
@@ -0,0 +1,71 @@
+"""EntityView must read exactly like model_dump() for everything the engine touches."""
+import random
+
+import pytest
+
+from game_engine.character_sheet import CharacterSheet, EntityView
+from game_engine.engine import GameEngine
+
+
+CHAIN_MAIL = {"id": "chain-mail", "name": "Chain Mail", "type": "Armor",
+              "data": {"type": "Heavy", "armor_class": {"base": 16, "dex_bonus": False}}}
+SHIELD = {"id": "shield", "name": "Shield", "type": "Armor", "data": {"type": "Shield", "armor_class": {"base": 2}}}
+LONGSWORD = {"id": "longsword", "name": "Longsword", "type": "Weapon",
+             "data": {"type": "Melee", "damage": {"damage_dice": "1d8"}}}
+
+
+@pytest.fixture
+def fighter(player_factory):
+    return player_factory(
+        name="Brom", level=5, stats={"str": 16, "dex": 12, "con": 14, "int": 8, "wis": 10, "cha": 13},
+        sheet_data={"equipment": [CHAIN_MAIL, SHIELD, LONGSWORD], "saving_throws": ["str", "con"]},
+    )
+
+
+@pytest.fixture
+def goblin(enemy_factory):
+    return enemy_factory(data={
+        "armor_class": [{"value": 15}],
+        "stats": {"dex": 14},
+        "actions": [{"name": "Scimitar", "desc": "Melee Weapon Attack", "damage": [{"damage_dice": "1d6+2"}]}],
+    })
+
+
+def _sheets(entity):
+    return CharacterSheet(entity.model_dump()), CharacterSheet.from_entity(entity)
+
+
+def test_view_mapping_protocol(fighter):
+    view = EntityView(fighter)
+    assert "sheet_data" in view and "hp" not in view
+    assert view["stats"] == fighter.stats.model_dump()
+    assert view.get("missing", "x") == "x"
+    assert set(view) == set(fighter.model_dump())
+    with pytest.raises(KeyError):
+        view["missing"]
+    # No copy: containers are the live objects
+    assert view["sheet_data"] is fighter.sheet_data
+
+
+@pytest.mark.parametrize("which", ["fighter", "goblin"])
+def test_sheet_over_view_matches_dump(which, request):
+    entity = request.getfixturevalue(which)
+    dumped, viewed = _sheets(entity)
+    for stat in ("str", "dexterity", "con", "wis"):
+        assert viewed.get_mod(stat) == dumped.get_mod(stat)
+        assert viewed.get_save(stat) == dumped.get_save(stat)
+    assert viewed.get_ac() == dumped.get_ac()
+    assert viewed.get_weapon() == dumped.get_weapon()
+    assert viewed.hp == dumped.hp
+    assert viewed.get_proficiency_bonus() == dumped.get_proficiency_bonus()
+
+
+def test_engine_attack_identical_and_non_mutating(fighter, goblin):
+    engine = GameEngine()
+    params = {"weapon_name": "Longsword", "weapon_damage_dice": "1d8"}
+    random.seed(7)
+    from_dump = engine.resolve_action(fighter.model_dump(), "attack", goblin.model_dump(), params)
+    random.seed(7)
+    from_view = engine.resolve_action(EntityView(fighter), "attack", EntityView(goblin), params)
+    assert from_view == from_dump
+    assert goblin.hp_current == goblin.hp_max  # the engine never writes through the view
@@ -0,0 +1,181 @@
+"""Tests for the game event log: event derivation on save and replay on load."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import event_log, state_service
+from app.services.state_service import StateService
+
+
+class _Recorder:
+    """Async session stand-in that records statements; entity tables look empty.
+    Event inserts skip seqs already in `log` (shared between sessions, standing in
+    for the game_events primary key) and return the seqs they stored."""
+
+    def __init__(self, log=None):
+        self.info = {}
+        self.calls = []
+        self.log = set() if log is None else log
+        self.scalars = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+
+    async def execute(self, stmt, params=None):
+        self.calls.append((stmt, params))
+        if getattr(stmt, "table", None) is not None and stmt.table.name == "game_events" and params:
+            stored = [p["seq"] for p in params if p["seq"] not in self.log]
+            self.log.update(stored)
+            return MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=stored))))
+        return MagicMock(scalar=MagicMock(return_value=0))
+
+    def written(self, table):
+        return [p for stmt, p in self.calls if getattr(stmt, "table", None) is not None and stmt.table.name == table]
+
+
+@pytest.fixture(autouse=True)
+def _clean_views():
+    state_service._committed_views.clear()
+    state_service._committed_digests.clear()
+    yield
+    state_service._committed_views.clear()
+    state_service._committed_digests.clear()
+
+
+def _commit(db):
+    state_service._promote_blob_digests(SimpleNamespace(info=db.info))
+    state_service._promote_event_views(SimpleNamespace(info=db.info))
+
+
+def _rows(*rows):
+    first = rows[0] if rows else None
+    return MagicMock(fetchall=MagicMock(return_value=list(rows)), first=MagicMock(return_value=first))
+
+
+async def _load(snapshot_db, events=None):
+    """Hydrate from what `snapshot_db` wrote, plus an event tail."""
+    [upsert] = [stmt for stmt, _ in snapshot_db.calls if getattr(stmt, "table", None) is not None
+                and stmt.table.name == "game_states"]
+    state_data = upsert.compile(dialect=postgresql.dialect()).params["state_data"]
+    [party] = snapshot_db.written("characters")
+    [enemies] = snapshot_db.written("monsters")
+    p, e = party[0], enemies[0]
+    db = _Recorder()
+    db.execute = AsyncMock(side_effect=[
+        _rows(SimpleNamespace(state_data=state_data, event_seq=0, events=events, stored_bytes=0)),
+        _rows(SimpleNamespace(id=p["id"], name=p["name"], role=p["role"], race=None, user_id=p["user_id"],
+                              control_mode=p["control_mode"], sheet_data=p["sheet_data"])),
+        _rows(SimpleNamespace(id=e["id"], name=e["name"], type=e["type"], data=e["data"])),
+    ])
+    return await StateService.get_game_state("camp", db)
+
+
+async def test_hot_changes_after_reload_are_events(game_state_factory, coords):
+    first_db = _Recorder()
+    await StateService.save_game_state("camp", game_state_factory(), first_db)
+    _commit(first_db)
+    # Factory-built entities differ from their hydrated form (defaults the loader
+    # fills in), so the first reload's save is a snapshot; from then on it's stable.
+    normalized = await _load(first_db)
+    snap_db = _Recorder()
+    await StateService.save_game_state("camp", normalized, snap_db)
+    assert snap_db.written("game_states")
+    _commit(snap_db)
+
+    loaded = await _load(snap_db)
+    assert loaded._event_seq == 0 and loaded.version == normalized.version == 2
+    hero, goblin = loaded.party[0], loaded.enemies[0]
+    goblin.hp_current -= 4
+    goblin.position = coords(1, 0)
+    loaded.turn_index = 1
+    loaded.log_action(hero.id, "attack", "longsword: hit 4", goblin.id)
+
+    db = _Recorder()
+    await StateService.save_game_state("camp", loaded, db)
+    [(stmt, rows)] = db.calls
+    assert stmt.table.name == "game_events"
+    assert [(r["seq"], r["kind"]) for r in rows] == [(1, "move"), (2, "hp"), (3, "turn"), (4, "log")]
+    assert rows[1]["payload"] == {"id": goblin.id, "hp": goblin.hp_current, "delta": -4}
+    assert {r["version"] for r in rows} == {3} and loaded._event_seq == 4
+    _commit(db)
+
+    # Replaying the tail over the same snapshot gives the saved state back.
+    tail = [[r["seq"], r["version"], r["kind"], r["payload"]] for r in rows]
+    replayed = await _load(snap_db, tail)
+    assert replayed.model_dump() == loaded.model_dump()
+    assert replayed._event_seq == 4
+
+
+async def test_cold_change_and_interval_write_snapshots(game_state_factory):
+    gs = game_state_factory()
+    db = _Recorder()
+    await StateService.save_game_state("camp", gs, db)
+    _commit(db)
+
+    db = _Recorder()
+    await StateService.save_game_state("camp", gs, db)
+    assert db.calls == [] and gs.version == 1  # nothing changed
+
+    gs.party[0].inventory.append("rope")
+    await StateService.save_game_state("camp", gs, db)
+    assert db.written("characters") and not db.written("game_events")
+    _commit(db)
+
+    for i in range(1, event_log.SNAPSHOT_EVERY + 1):
+        db = _Recorder()
+        gs.turn_index = i
+        await StateService.save_game_state("camp", gs, db)
+        assert bool(db.written("game_states")) == (i == event_log.SNAPSHOT_EVERY)
+        _commit(db)
+
+
+async def test_untrusted_baseline_writes_snapshot(game_state_factory):
+    gs = game_state_factory()
+    db = _Recorder()
+    await StateService.save_game_state("camp", gs, db)
+    state_service._drop_event_views(SimpleNamespace(info=db.info))  # rolled back
+
+    db = _Recorder()
+    gs.turn_index = 3
+    await StateService.save_game_state("camp", gs, db)
+    assert db.written("game_states") and not db.written("game_events")
+
+
+async def test_concurrent_save_from_same_baseline_falls_back_to_snapshot(game_state_factory, coords):
+    gs = game_state_factory()
+    db = _Recorder()
+    await StateService.save_game_state("camp", gs, db)
+    _commit(db)
+
+    # Two sessions load the same committed state; both derive events at seq 1..n.
+    locked, unlocked = gs.model_copy(deep=True), gs.model_copy(deep=True)
+    for copy in (locked, unlocked):
+        copy._event_seq = gs._event_seq
+    log = set()
+    first, second = _Recorder(log), _Recorder(log)
+
+    locked.turn_index = 1
+    await StateService.save_game_state("camp", locked, first)
+    assert first.written("game_events") and not first.written("game_states")
+
+    # The second save's baseline check passes before the first commits.
+    unlocked.party[0].position = coords(2, 0)
+    unlocked.turn_index = 2
+    await StateService.save_game_state("camp", unlocked, second)
+    _commit(first)
+    [(_, rows)] = [(stmt, p) for stmt, p in second.calls if getattr(stmt, "table", None) is not None
+                   and stmt.table.name == "game_events" and p]
+    assert [r["seq"] for r in rows] == [1, 2]
+    # Seq 1 was taken: its own seq 2 is removed again and the save is a snapshot.
+    [delete] = [stmt for stmt, _ in second.calls if stmt.is_delete]
+    assert delete.compile().params["seq_1"] == [2]
+    assert second.written("game_states")
+    _commit(second)
+    assert state_service._committed_views["camp"].version == unlocked.version
+
+
+def test_log_diff_handles_capped_log():
+    entry = lambda n: {"tick": n}  # noqa: E731
+    old = [entry(n) for n in range(event_log.COMBAT_LOG_MAX)]
+    new = old[2:] + [entry(100), entry(101)]
+    assert event_log._appended(old, new) == [entry(100), entry(101)]
+    assert event_log._appended(old, old[:-1]) is None
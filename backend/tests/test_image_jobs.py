@@ -0,0 +1,132 @@
+"""Tests for the deduplicating scene image job queue."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import image_job_service
+from app.services.ai_service import AIService
+from app.services.image_job_service import DONE, FAILED, ImageJobService
+from app.socket_manager import sio
+
+
+class _Session:
+    """AsyncSessionLocal stand-in: an empty image_cache that accepts writes."""
+
+    def __init__(self):
+        self.execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=None)))
+        self.commit = AsyncMock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def jobs(monkeypatch):
+    ImageJobService.clear()
+    monkeypatch.setattr(image_job_service, "AsyncSessionLocal", _Session)
+    emit = AsyncMock()
+    monkeypatch.setattr(sio, "emit", emit)
+    yield emit
+    ImageJobService.clear()
+
+
+@pytest.fixture
+def imagen(monkeypatch):
+    """Fake generate_scene_image that tracks how many calls overlap."""
+    stats = SimpleNamespace(calls=[], running=0, peak=0, fail=False)
+
+    async def generate(campaign_id, prompt, db):
+        stats.calls.append(prompt)
+        stats.running += 1
+        stats.peak = max(stats.peak, stats.running)
+        await asyncio.sleep(0.01)
+        stats.running -= 1
+        return None if stats.fail else f"png:{prompt}".encode()
+
+    monkeypatch.setattr(AIService, "generate_scene_image", staticmethod(generate))
+    return stats
+
+
+async def test_same_prompt_generates_once(imagen, jobs):
+    first = ImageJobService.submit("camp-a", "A dusty crypt")
+    second = ImageJobService.submit("camp-b", "A dusty crypt")
+    assert first is second
+
+    images = await asyncio.gather(ImageJobService.wait(first), ImageJobService.wait(second))
+    assert imagen.calls == ["A dusty crypt"]
+    assert images[0] == images[1] and first.status == DONE and first.future is None
+
+    ready_rooms = {c.kwargs["room"] for c in jobs.await_args_list if c.args[0] == "image_ready"}
+    assert ready_rooms == {"camp-a", "camp-b"}
+    # Finished: the same prompt now joins the done job instead of generating again.
+    assert ImageJobService.submit("camp-a", "A dusty crypt") is first
+
+
+async def test_workers_are_bounded(imagen, monkeypatch):
+    monkeypatch.setattr(image_job_service, "IMAGE_WORKERS", 2)
+    submitted = [ImageJobService.submit("camp", f"Room {i}") for i in range(5)]
+    await asyncio.gather(*(ImageJobService.wait(j) for j in submitted))
+    assert imagen.peak == 2 and len(imagen.calls) == 5
+    assert all(j.status == DONE for j in submitted)
+
+
+async def test_failed_job_is_reported_and_retried(imagen, jobs):
+    imagen.fail = True
+    job = ImageJobService.submit("camp", "A flooded vault")
+    assert await ImageJobService.wait(job) is None
+    assert job.status == FAILED
+    assert jobs.await_args_list[-1].args[0] == "image_failed"
+
+    imagen.fail = False
+    retry = ImageJobService.submit("camp", "A flooded vault")
+    assert retry is not job and await ImageJobService.wait(retry)
+
+
+def _rows(rows):
+    return MagicMock(first=MagicMock(return_value=rows[0] if rows else None), all=MagicMock(return_value=rows))
+
+
+async def test_prefetch_skips_cached_rooms_and_respects_limit(imagen):
+    def room(source_id, name, visual, connections=()):
+        return SimpleNamespace(source_id=source_id, name=name, data={
+            "description": {"visual": visual, "connections": [{"target_id": t} for t in connections]}})
+
+    here = room("r1", "Antechamber", "Dust.", ["r2", "r3", "r4"])
+    targets = [room("r2", "Crypt", "Coffins."), room("r3", "Shrine", "Idols."), room("r4", "Pit", "Darkness.")]
+    cached_hash = ImageJobService.prompt_hash(ImageJobService.scene_prompt("Crypt", "Coffins."))
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[
+        _rows([here]), _rows(targets),
+        MagicMock(scalars=MagicMock(return_value=[cached_hash])),
+    ])
+
+    queued = await ImageJobService.prefetch_connected("camp", "r1", db, limit=1)
+    assert [j.prompt for j in queued] == ["Shrine. Idols."]
+    await ImageJobService.wait(queued[0])
+    assert imagen.calls == ["Shrine. Idols."]
+
+
+async def test_blocking_endpoint_releases_its_session_before_waiting(imagen, monkeypatch):
+    from app.dtos import ImageGenerationRequest
+    from app.routers import campaigns
+
+    monkeypatch.setattr(campaigns, "_require_participant", AsyncMock())
+    events = []
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=None)))  # cache miss
+    db.commit = AsyncMock(side_effect=lambda: events.append("commit"))
+
+    async def wait(job):
+        events.append("wait")
+        return "png"
+
+    monkeypatch.setattr(ImageJobService, "wait", staticmethod(wait))
+    response = await campaigns.generate_campaign_image(
+        "camp", ImageGenerationRequest(prompt="A quiet chapel"), user={"uid": "u1"}, db=db)
+    assert response.image_base64 == "png"
+    assert events == ["commit", "wait"]
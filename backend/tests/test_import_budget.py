@@ -0,0 +1,61 @@
+"""Cold-import regression gate for main.py, measured with `python -X importtime`.
+
+Two checks: the heavy, lazily-used stacks (LangGraph, provider SDKs, google.genai,
+Firestore) must not be imported by `import main` at all, and the cumulative import
+time of `main` must stay under IMPORT_BUDGET_SECONDS.
+
+The first is deterministic and always runs. The second is wall-clock, so it depends
+on the machine and on whichever library versions the unpinned requirements resolve
+to; it only runs when IMPORT_BUDGET_SECONDS is set, e.g. on a pinned, quiet runner:
+
+    IMPORT_BUDGET_SECONDS=1.0 python -m pytest tests/test_import_budget.py
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_SECONDS = os.getenv("IMPORT_BUDGET_SECONDS")
+
+DEFERRED_MODULES = (
+    "langgraph",
+    "langchain_google_genai",
+    "langchain_openai",
+    "google.genai",
+    "google.cloud.firestore",
+    "app.agents.dm_agent",
+    "app.agents.character_agent",
+)
+
+
+@pytest.fixture(scope="module")
+def import_profile():
+    env = {**os.environ, "DATABASE_URL": os.getenv("DATABASE_URL", "postgresql+asyncpg://u:p@localhost:5432/db")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_heavy_stacks_are_deferred(import_profile):
+    loaded = [m for m in import_profile if m.startswith(DEFERRED_MODULES)]
+    assert not loaded, f"imported eagerly by main: {sorted(loaded)[:10]}"
+
+
+@pytest.mark.skipif(not IMPORT_BUDGET_SECONDS, reason="timing check is opt-in: set IMPORT_BUDGET_SECONDS")
+def test_cold_import_within_budget(import_profile):
+    seconds, budget = import_profile["main"] / 1e6, float(IMPORT_BUDGET_SECONDS)
+    assert seconds <= budget, (
+        f"import main took {seconds:.2f}s (budget {budget:.2f}s); "
+        "run `python -X importtime -c 'import main'` to find the new heavy import"
+    )
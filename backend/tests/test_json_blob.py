@@ -0,0 +1,138 @@
+"""Tests for the JSONB entity blob columns and StateService's hot-field partial writes."""
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.services import state_service
+from app.services.state_service import StateService
+from app.utils.json_blob import load_blob
+from db.schema import JSONBlob, JSON_BLOB_COLUMNS
+
+
+def test_blob_type_accepts_text_and_objects():
+    dialect = asyncpg.dialect()
+    impl = JSONBlob().dialect_impl(dialect)
+    bind, result = impl.bind_processor(dialect), impl.result_processor(dialect, None)
+
+    assert bind('{"a": 1}') == '{"a": 1}'  # pre-serialized writers pass through
+    assert json.loads(bind({"a": 1})) == {"a": 1}
+    assert bind(None) is None
+    assert result('{"a": 1}') == {"a": 1}  # column still TEXT
+    assert result({"a": 1}) == {"a": 1}
+    assert ("characters", "sheet_data") in JSON_BLOB_COLUMNS
+    assert ("game_states", "state_data") in JSON_BLOB_COLUMNS
+
+
+def test_load_blob():
+    assert load_blob({"a": 1}) == {"a": 1}
+    assert load_blob('{"a": 1}') == {"a": 1}
+    assert load_blob(None) == {} and load_blob("") == {}
+    with pytest.raises(json.JSONDecodeError):
+        load_blob("{not valid json")
+
+
+def test_nested_monster_blobs_are_flattened():
+    template = {"name": "Goblin", "actions": [{"name": "Scimitar"}], "hp_current": 7}
+    saved_twice = {"hp_current": 3, "data": {"hp_current": 5, "data": template}}
+    flat = StateService._flatten_enemy_blob(saved_twice)
+    assert "data" not in flat
+    assert flat["hp_current"] == 3 and flat["actions"] == [{"name": "Scimitar"}]
+
+
+@pytest.fixture
+def session():
+    state_service._committed_digests.clear()
+    db = AsyncMock()
+    db.info = {}
+    yield db
+    state_service._committed_digests.clear()
+
+
+def _existing(db, *ids):
+    db.scalars = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=list(ids))))
+    db.execute.reset_mock()
+
+
+def _commit(db):
+    state_service._promote_blob_digests(SimpleNamespace(info=db.info))
+
+
+async def test_hot_field_change_sends_only_a_patch(session, enemy_factory, coords):
+    goblin = enemy_factory(hp=7)
+    _existing(session, goblin.id)
+    await StateService._save_enemies([goblin], "camp", session)
+    full = session.execute.call_args.args[1][0]
+    assert "b_data" in full and "data" not in full["b_data"]
+    _commit(session)
+
+    goblin.hp_current, goblin.position = 2, coords(5, 5)
+    _existing(session, goblin.id)
+    await StateService._save_enemies([goblin], "camp", session)
+    stmt, params = session.execute.call_args.args
+    assert "||" in str(stmt)
+    assert params == [{"b_id": goblin.id, "b_patch": {
+        "hp_current": 2, "position": {"x": 5, "y": 5}, "conditions": []}}]
+    _commit(session)
+
+    goblin.name = "Goblin Boss"  # cold change -> full rewrite
+    _existing(session, goblin.id)
+    await StateService._save_enemies([goblin], "camp", session)
+    assert session.execute.call_args.args[1][0]["b_name"] == "Goblin Boss"
+
+
+async def test_rolled_back_save_is_not_trusted(session, npc_factory):
+    npc = npc_factory()
+    _existing(session, npc.id)
+    await StateService._save_npcs([npc], "camp", session)
+    state_service._drop_blob_digests(SimpleNamespace(info=session.info))
+
+    _existing(session, npc.id)
+    await StateService._save_npcs([npc], "camp", session)
+    assert "b_data" in session.execute.call_args.args[1][0]
+
+
+def _rows(*rows):
+    first = rows[0] if rows else None
+    return MagicMock(fetchall=MagicMock(return_value=list(rows)), scalar=MagicMock(return_value=first),
+                     first=MagicMock(return_value=first))
+
+
+async def test_saved_blobs_hydrate_in_one_pass(session, player_factory, enemy_factory, coords):
+    hero, goblin = player_factory(hp=12), enemy_factory(hp=7, data={"actions": [{"name": "Scimitar"}]})
+    _existing(session)
+    await StateService._save_party([hero], "camp", session)
+    sheet = session.execute.call_args.args[1][0]["sheet_data"]
+    await StateService._save_enemies([goblin], "camp", session)
+    blob = session.execute.call_args.args[1][0]["data"]
+    assert sheet[state_service.SCHEMA_KEY] == blob[state_service.SCHEMA_KEY] == state_service.BLOB_SCHEMA_VERSION
+
+    skeleton = {"session_id": "camp", "location": {"name": "Arena", "description": "."},
+                "party": [hero.id], "enemies": [goblin.id], "npcs": [],
+                "vessels": [{"name": "Crate", "position": {"x": 1, "y": 1}}]}
+    session.execute = AsyncMock(side_effect=[
+        _rows(SimpleNamespace(state_data=skeleton, event_seq=0, events=None, stored_bytes=0)),
+        _rows(SimpleNamespace(id=hero.id, name=hero.name, role=hero.role, race=None, user_id=None,
+                              control_mode="human", sheet_data=sheet)),
+        _rows(SimpleNamespace(id=goblin.id, name=goblin.name, type=goblin.type, data=blob)),
+    ])
+    gs = await StateService.get_game_state("camp", session)
+    assert gs.party[0].hp_current == 12 and gs.party[0].position == coords(0, 0)
+    assert gs.enemies[0].hp_current == 7 and gs.enemies[0].data["actions"] == [{"name": "Scimitar"}]
+    assert gs.vessels[0].name == "Crate" and gs.get_entity(goblin.id) is gs.enemies[0]
+
+
+async def test_unstamped_blobs_are_still_repaired(session):
+    legacy = {"hp_current": 3, "data": {"hp_current": 5, "data": {"name": "Goblin", "actions": []}}}
+    sheet = {"inventory": [{"id": "dagger"}, "rope"]}
+    session.execute = AsyncMock(side_effect=[
+        _rows(SimpleNamespace(id="p1", name="Brom", role="Fighter", race=None, user_id=None,
+                              control_mode="human", sheet_data=sheet)),
+        _rows(SimpleNamespace(id="g1", name="Goblin", type="goblin", data=legacy)),
+    ])
+    [player] = await StateService._hydrate_party(["p1"], session)
+    [enemy] = await StateService._hydrate_enemies(["g1"], session)
+    assert player["inventory"] == ["dagger", "rope"]
+    assert "data" not in enemy["data"] and enemy["hp_current"] == 3
@@ -0,0 +1,38 @@
+"""Tests for the shared JSON codec (orjson with stdlib fallback) and where it is plugged in."""
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app.models import Coordinates
+from app.utils import json_codec
+from app.utils.http_cache import etag_json_response
+
+
+def test_round_trip_matches_stdlib_semantics():
+    doc = {"name": "Elara", 1: "int key", "hp": [8, 8], "pos": {"x": 0, "y": 0}, "note": "naïve"}
+    assert json_codec.loads(json_codec.dumps(doc)) == json.loads(json.dumps(doc))
+    assert json_codec.loads(json_codec.dumpb(doc)) == json_codec.loads(json_codec.dumps(doc))
+    assert json_codec.dumps(2 ** 70) == "1180591620717411303424"  # wider than orjson's ints
+
+
+def test_decode_errors_are_stdlib_errors():
+    with pytest.raises(json.JSONDecodeError):
+        json_codec.loads("{not valid json")
+
+
+def test_indent_for_prompts():
+    assert json_codec.dumps({"a": [1]}, indent=True) == json.dumps({"a": [1]}, indent=2)
+
+
+def test_socketio_module_accepts_stdlib_kwargs():
+    encoded = json_codec.socketio_json.dumps(["game_state_patch", {"version": 3}], separators=(",", ":"))
+    assert json_codec.socketio_json.loads(encoded) == ["game_state_patch", {"version": 3}]
+
+
+def test_responses_render_through_codec():
+    assert json_codec.CodecJSONResponse({"ok": True}).body == b'{"ok":true}'
+
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+    response = etag_json_response(request, {"pos": Coordinates(x=1, y=2)})  # needs jsonable_encoder
+    assert json.loads(response.body) == {"pos": {"x": 1, "y": 2}}
@@ -1,3 +1,4 @@
+import pytest
 from app.agents.models import get_llm_instance
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
@@ -27,3 +28,24 @@ def test_get_llm_instance():
     assert llm.model_name == "qwen2.5:14b-instruct"
     base = str(llm.openai_api_base)
     assert ("localhost" in base or "127.0.0.1" in base) and "/v1" in base
+
+
+def test_fake_provider_is_not_built_by_the_app():
+    # Only scripts/load_test.py serves "fake", by patching its own process.
+    with pytest.raises(ValueError):
+        get_llm_instance(api_key="", model_name="", llm_provider="fake")
+
+
+async def test_fake_model_is_deterministic(monkeypatch):
+    from app.agents.fake_llm import FakeChatModel
+    from langchain_core.messages import HumanMessage
+
+    monkeypatch.setenv("FAKE_LLM_TOKENS", "12")
+    llm = FakeChatModel.from_env()
+    assert llm.bind_tools([]) is llm
+
+    prompt = [HumanMessage(content="I open the coffin")]
+    first, again = await llm.ainvoke(prompt), await llm.ainvoke(prompt)
+    assert first.content == again.content and len(first.content.split()) == 12
+    assert first.usage_metadata["output_tokens"] == 12
+    assert (await llm.ainvoke([HumanMessage(content="I leave")])).content != first.content
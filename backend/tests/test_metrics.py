@@ -0,0 +1,139 @@
+"""Tests for the in-process metrics registry behind GET /metrics."""
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.services.ai_service import AIService
+from app.services.state_service import StateService
+from app.utils import json_codec, metrics
+from db.schema import JSONBlob
+from db.session import engine
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_histogram_exposition_is_cumulative():
+    h = metrics.Histogram("test_latency_seconds", "Test latency.", ["route"], buckets=(0.1, 1.0))
+    try:
+        for value in (0.05, 0.5, 0.5, 3.0):
+            h.observe(value, route='say "hi"')
+        lines = h.render()
+    finally:
+        metrics._registry.remove(h)
+
+    assert lines[:2] == ["# HELP test_latency_seconds Test latency.", "# TYPE test_latency_seconds histogram"]
+    assert lines[2:] == [
+        'test_latency_seconds_bucket{route="say \\"hi\\"",le="0.1"} 1',
+        'test_latency_seconds_bucket{route="say \\"hi\\"",le="1"} 3',
+        'test_latency_seconds_bucket{route="say \\"hi\\"",le="+Inf"} 4',
+        'test_latency_seconds_sum{route="say \\"hi\\""} 4.05',
+        'test_latency_seconds_count{route="say \\"hi\\""} 4',
+    ]
+
+
+def test_labels_must_match_declaration():
+    with pytest.raises(ValueError):
+        metrics.LOCK_WAIT_SECONDS.observe(0.1)
+
+
+def test_render_lists_the_catalogue():
+    metrics.AI_TURN_TIMEOUTS.inc()
+    text = metrics.render()
+    assert "# TYPE roundtable_event_loop_lag_seconds histogram" in text
+    assert "roundtable_ai_turn_timeouts_total 1\n" in text
+
+
+def test_json_tally_counts_blob_binds():
+    # db.session hooks the tally in and supplies the engine's serializer.
+    process = JSONBlob().bind_processor(engine.dialect)
+    with metrics.json_tally() as written:
+        encoded = process({"hp_current": 7})
+        process('{"a": 1}')
+    process({"outside": True})
+    assert encoded == json_codec.dumps({"hp_current": 7})
+    assert written[0] == len(encoded) + len('{"a": 1}')
+
+
+def test_metric_must_implement_clear():
+    class _Gauge(metrics._Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        _Gauge("roundtable_test_gauge", "x")
+
+
+async def test_llm_tokens_count_only_new_messages():
+    class _Graph:
+        async def ainvoke(self, inputs, config=None):
+            reply = AIMessage(content="Torches gutter.", usage_metadata={
+                "input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+            return {"messages": inputs["messages"] + [reply]}
+
+    old = AIMessage(content="earlier", usage_metadata={"input_tokens": 999, "output_tokens": 999, "total_tokens": 1998})
+    inputs = {"messages": [old, HumanMessage(content="I open the door")]}
+    await AIService._ainvoke_measured(_Graph(), inputs, {}, "move_narration", "Fake")
+
+    labels = {"mode": "move_narration", "provider": "fake"}
+    assert metrics.LLM_TOKENS.value(direction="input", **labels) == 120
+    assert metrics.LLM_TOKENS.value(direction="output", **labels) == 30
+    assert metrics.LLM_SECONDS.count(**labels) == 1
+
+
+async def test_broadcast_records_kind_patch_size_and_fanout(game_state_factory):
+    class _Sio:
+        manager = SimpleNamespace(rooms={"/": {"camp": {"sid-1": "e1", "sid-2": "e2"}}})
+
+        async def emit(self, *args, **kwargs):
+            pass
+
+    state = game_state_factory()
+    StateService.clear_campaign_state("camp")
+    try:
+        await StateService.emit_state_update("camp", state, _Sio())
+        state.turn_index += 1
+        await StateService.emit_state_update("camp", state, _Sio())
+    finally:
+        StateService.clear_campaign_state("camp")
+
+    assert metrics.STATE_BROADCASTS.value(kind="full") == 1
+    assert metrics.STATE_BROADCASTS.value(kind="patch") == 1
+    assert metrics.STATE_PATCH_BYTES.count() == 1
+    assert 'roundtable_state_broadcast_fanout_bucket{le="2"} 2' in metrics.render()
+
+
+def test_campaign_series_are_hashed_and_capped(monkeypatch):
+    monkeypatch.setattr(metrics.LOCK_WAIT_SECONDS, "max_series", 2)
+    for campaign_id in ("camp-secret-1", "camp-secret-2", "camp-secret-1", "camp-secret-3"):
+        metrics.LOCK_WAIT_SECONDS.observe(0.01, campaign=metrics.campaign_label(campaign_id))
+
+    text = metrics.render()
+    assert "camp-secret" not in text
+    # camp-secret-2 was the least recently observed, so its series went first.
+    assert metrics.LOCK_WAIT_SECONDS.count(campaign=metrics.campaign_label("camp-secret-2")) == 0
+    assert metrics.LOCK_WAIT_SECONDS.count(campaign=metrics.campaign_label("camp-secret-1")) == 2
+    assert text.count("roundtable_lock_wait_seconds_count{") == 2
+
+
+@pytest.mark.parametrize("token, emulator, header, status", [
+    (None, None, None, 404),                 # deployed without a token: not exposed
+    (None, "localhost:9099", None, 200),     # local dev
+    ("s3cret", None, None, 401),
+    ("s3cret", None, "Bearer wrong", 401),
+    ("s3cret", None, "Bearer s3cret", 200),
+])
+async def test_metrics_endpoint_access(monkeypatch, token, emulator, header, status):
+    import main
+    for name, value in (("METRICS_TOKEN", token), ("FIREBASE_AUTH_EMULATOR_HOST", emulator)):
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, value)
+    request = SimpleNamespace(headers={"authorization": header} if header else {})
+    response = await main.metrics_endpoint(request)
+    assert response.status_code == status
@@ -1,5 +1,6 @@
 """Tests for Pydantic models: coordinates, entities, game state."""
 import pytest
+from pydantic import ValidationError
 from app.models import Coordinates, Entity, Player, Enemy, NPC, GameState, Location, Vessel
 
 
@@ -260,5 +261,19 @@ class TestLocation:
             walkable_cells=[coords(0, 0)],
             party_locations=[{"position": {"x": 5, "y": 5}}],
         )
-        walkable_set = {(h.x, h.y) for h in loc.walkable_cells}
-        assert (5, 5) in walkable_set
+        assert (5, 5) in loc.walkable_cells
+        assert loc.model_dump()["walkable_cells"] == [{"x": 0, "y": 0}, {"x": 5, "y": 5}]
+
+    def test_walkable_cells_round_trip(self):
+        cells = [{"x": 2, "y": -1}, {"x": 0, "y": 0}, {"x": 2, "y": -1}]
+        loc = Location(name="Test", description="Test", walkable_cells=cells)
+        assert len(loc.walkable_cells) == 3 and (2, -1) in loc.walkable_cells
+        assert {"x": 0, "y": 0} in loc.walkable_cells and (1, 1) not in loc.walkable_cells
+        assert loc.model_dump()["walkable_cells"] == cells
+        assert Location.model_validate_json(loc.model_dump_json()) == loc
+
+    def test_invalid_walkable_cells_rejected(self):
+        with pytest.raises(ValidationError):
+            Location(name="Test", description="Test", walkable_cells=[{"x": 1}])
+        with pytest.raises(ValidationError):
+            Location(name="Test", description="Test", walkable_cells=[{"x": 99999, "y": 0}])
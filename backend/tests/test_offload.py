@@ -0,0 +1,76 @@
+"""Tests for the offload pools and the event-loop watchdog."""
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from app.utils import metrics, offload
+from app.utils.loop_watchdog import LoopWatchdog
+
+_probe = contextvars.ContextVar("probe", default=None)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+async def test_run_uses_named_pool_and_caller_context():
+    _probe.set("from-caller")
+    name, seen = await offload.run("cpu", lambda: (threading.current_thread().name, _probe.get()))
+    assert name.startswith("cpu") and seen == "from-caller"
+    assert metrics.OFFLOAD_RUN_SECONDS.count(pool="cpu") == 1
+
+
+async def test_pool_bounds_concurrency(monkeypatch):
+    monkeypatch.setitem(offload.POOL_WORKERS, "test-bounded", 2)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    try:
+        await asyncio.gather(*(offload.run("test-bounded", work) for _ in range(6)))
+    finally:
+        offload._executors.pop("test-bounded").shutdown()
+    assert peak[0] == 2
+    assert metrics.OFFLOAD_QUEUE_SECONDS.count(pool="test-bounded") == 6
+
+
+def _block_the_loop():
+    time.sleep(0.3)
+
+
+async def test_watchdog_reports_the_blocking_stack():
+    watchdog = LoopWatchdog(threshold_ms=80)
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.05)
+        _block_the_loop()
+        await asyncio.sleep(0.05)
+    finally:
+        watchdog.stop()
+
+    [(stalled, stack)] = watchdog.reports
+    assert stalled > 0.08 and "_block_the_loop" in stack
+    assert metrics.EVENT_LOOP_STALLS.value() == 1
+
+
+async def test_watchdog_quiet_on_a_healthy_loop():
+    watchdog = LoopWatchdog(threshold_ms=80)
+    watchdog.start()
+    try:
+        for _ in range(10):
+            await asyncio.sleep(0.02)
+    finally:
+        watchdog.stop()
+    assert not watchdog.reports
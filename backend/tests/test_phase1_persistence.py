@@ -5,17 +5,20 @@ unique-constraint behaviour against the live database, which mocks cannot model.
 Each test seeds a throwaway profile+campaign with unique ids and tears it down in
 a finally block, so the suite stays re-runnable against the shared dev DB.
 """
+import asyncio
 import json
 import uuid
 
 import pytest
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.pool import NullPool
 
 from db.session import DATABASE_URL
 from app.services.state_service import StateService
 from app.models import GameState, Player, Location, Coordinates
+from app.utils.json_blob import load_blob
 
 pytestmark = pytest.mark.integration
 
@@ -45,6 +48,7 @@ async def _seed_campaign():
 
 async def _cleanup_campaign(cid, uid):
     async with _Session() as db:
+        await db.execute(text("DELETE FROM game_events WHERE campaign_id=:cid"), {"cid": cid})
         await db.execute(text("DELETE FROM game_states WHERE campaign_id=:cid"), {"cid": cid})
         await db.execute(text("DELETE FROM characters WHERE campaign_id=:cid OR user_id=:uid"), {"cid": cid, "uid": uid})
         await db.execute(text("DELETE FROM monsters WHERE campaign_id=:cid"), {"cid": cid})
@@ -96,6 +100,36 @@ async def test_save_game_state_upserts_one_row_and_latest_is_deterministic():
         await _cleanup_campaign(cid, uid)
 
 
+async def test_hot_saves_append_events_and_replay_on_load():
+    """After a snapshot, moves / HP / turn changes are appended as game_events rows
+    (the snapshot row is untouched) and a fresh load replays them."""
+    cid, uid = await _seed_campaign()
+    try:
+        player = _make_player(uid)
+        state = _make_state(cid, player)
+        async with _Session() as db:
+            await StateService.save_game_state(cid, state, db)
+            await db.commit()
+            snapshot = await db.scalar(text("SELECT state_data::text FROM game_states WHERE campaign_id=:cid"), {"cid": cid})
+
+        async with _Session() as db:
+            player.hp_current = 9
+            state.turn_index = 2
+            await StateService.save_game_state(cid, state, db)
+            await db.commit()
+            kinds = (await db.execute(
+                text("SELECT kind FROM game_events WHERE campaign_id=:cid ORDER BY seq"), {"cid": cid})).scalars().all()
+            assert kinds == ["hp", "turn"]
+            assert await db.scalar(text("SELECT state_data::text FROM game_states WHERE campaign_id=:cid"), {"cid": cid}) == snapshot
+
+        async with _Session() as db:
+            loaded = await StateService.get_game_state(cid, db)
+            assert loaded.party[0].hp_current == 9 and loaded.turn_index == 2
+            assert loaded.version == state.version
+    finally:
+        await _cleanup_campaign(cid, uid)
+
+
 async def test_save_is_atomic_rollback_leaves_prior_state_intact():
     """A save stages writes across characters + game_states but does NOT commit; if the
     session owner rolls back, neither the HP change nor the turn change persists."""
@@ -158,9 +192,24 @@ async def test_scalar_columns_track_blob_on_rename():
 
 
 async def test_hydration_raises_on_corrupt_sheet_data():
-    """Corrupt persisted JSON must fail loud, not silently hydrate to all-default stats."""
+    """Corrupt persisted JSON must fail loud, not silently hydrate to all-default stats.
+    Once init_db has converted sheet_data to jsonb, the write itself is rejected."""
     cid, uid = await _seed_campaign()
     try:
+        async with _Session() as db:
+            data_type = await db.scalar(text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = 'characters' AND column_name = 'sheet_data'"))
+        if data_type == "jsonb":
+            async with _Session() as db:
+                with pytest.raises(DBAPIError):
+                    await db.execute(
+                        text("INSERT INTO characters (id, user_id, campaign_id, name, role, sheet_data) "
+                             "VALUES (:id, :uid, :cid, 'Broken', 'Wizard', :sd)"),
+                        {"id": str(uuid.uuid4()), "uid": uid, "cid": cid, "sd": "{not valid json"},
+                    )
+            return
+
         char_id = str(uuid.uuid4())
         skeleton = {
             "session_id": cid, "version": 1, "turn_index": 0, "phase": "exploration",
@@ -204,7 +253,7 @@ async def test_inventory_persists_as_id_strings():
 
         async with _Session() as db:
             sd = await db.scalar(text("SELECT sheet_data FROM characters WHERE id=:id"), {"id": player.id})
-            persisted_inv = json.loads(sd)["inventory"]
+            persisted_inv = load_blob(sd)["inventory"]
             assert persisted_inv == ["wpn-dagger", "arm-leather"]
             assert all(isinstance(x, str) for x in persisted_inv)
 
@@ -212,3 +261,52 @@ async def test_inventory_persists_as_id_strings():
             assert loaded.party[0].inventory == ["wpn-dagger", "arm-leather"]
     finally:
         await _cleanup_campaign(cid, uid)
+
+
+async def test_concurrent_saves_from_same_baseline_both_succeed():
+    """Two sessions load the same committed state and save event-sized changes at once
+    (an unlocked interaction racing a locked move). Both claim the next event seq; the
+    later one waits on the first, then falls back to a snapshot instead of failing its
+    whole unit of work with a unique violation."""
+    cid, uid = await _seed_campaign()
+    try:
+        player = _make_player(uid)
+        async with _Session() as db:
+            await StateService.save_game_state(cid, _make_state(cid, player), db)
+            await db.commit()
+        # Start both saves from the hydrated form, so each would otherwise be events.
+        async with _Session() as db:
+            await StateService.save_game_state(cid, await StateService.get_game_state(cid, db), db)
+            await db.commit()
+        async with _Session() as db:
+            locked = await StateService.get_game_state(cid, db)
+            unlocked = await StateService.get_game_state(cid, db)
+
+        first_staged = asyncio.Event()
+
+        async def locked_save():
+            async with _Session() as db:
+                locked.turn_index = 1
+                await StateService.save_game_state(cid, locked, db)
+                first_staged.set()
+                await asyncio.sleep(0.2)  # hold the seq while the other save runs into it
+                await db.commit()
+
+        async def unlocked_save():
+            await first_staged.wait()
+            async with _Session() as db:
+                unlocked.party[0].hp_current = 5
+                await StateService.save_game_state(cid, unlocked, db)
+                await db.commit()
+
+        await asyncio.gather(locked_save(), unlocked_save())
+
+        async with _Session() as db:
+            loaded = await StateService.get_game_state(cid, db)
+            # Last writer wins, as with the snapshot upsert.
+            assert loaded.party[0].hp_current == 5 and loaded.version == unlocked.version
+            kinds = (await db.execute(
+                text("SELECT kind FROM game_events WHERE campaign_id=:cid ORDER BY seq"), {"cid": cid})).scalars().all()
+            assert kinds == ["turn"]
+    finally:
+        await _cleanup_campaign(cid, uid)
@@ -0,0 +1,105 @@
+"""Query-plan regression test for the hot per-campaign lookups (requires live Postgres).
+
+Run:  pytest backend/tests/test_query_plans.py -m integration
+
+Seeds realistic row counts (hundreds of campaigns, tens of thousands of rows per
+table) inside one transaction, creates the HOT_PATH_INDEXES exactly as init_db does,
+ANALYZEs, and asserts EXPLAIN never picks a sequential scan for the queries the app
+runs on every join / auth check / move. Everything is rolled back afterwards.
+"""
+import pytest
+from sqlalchemy import text
+
+from db.schema import HOT_PATH_INDEXES
+
+pytestmark = pytest.mark.integration
+
+CAMPAIGNS, USERS = 500, 2000
+
+SEED_SQL = [
+    f"INSERT INTO profiles (id, username) SELECT 'qp-user-' || g, 'qp-user-' || g FROM generate_series(1, {USERS}) g",
+    f"""INSERT INTO campaigns (id, name, gm_id)
+        SELECT 'qp-camp-' || g, 'Plan Test ' || g, 'qp-user-' || (g % {USERS} + 1) FROM generate_series(1, {CAMPAIGNS}) g""",
+    f"""INSERT INTO campaign_participants (id, campaign_id, user_id, role)
+        SELECT 'qp-cp-' || g, 'qp-camp-' || (g % {CAMPAIGNS} + 1), 'qp-user-' || (g % {USERS} + 1), 'player'
+        FROM generate_series(1, 20000) g""",
+    f"""INSERT INTO characters (id, user_id, campaign_id, name, role, sheet_data)
+        SELECT 'qp-char-' || g, 'qp-user-' || (g % {USERS} + 1), 'qp-camp-' || (g % {CAMPAIGNS} + 1), 'Hero', 'Fighter', '{{}}'
+        FROM generate_series(1, 20000) g""",
+    f"""INSERT INTO locations (id, campaign_id, source_id, name, data)
+        SELECT 'qp-loc-' || g, 'qp-camp-' || (g % {CAMPAIGNS} + 1), 'loc_' || (g % 100), 'Room', '{{}}'
+        FROM generate_series(1, 50000) g""",
+    f"""INSERT INTO npcs (id, campaign_id, source_id, name, role, data)
+        SELECT 'qp-npc-' || g, 'qp-camp-' || (g % {CAMPAIGNS} + 1), 'npc_' || (g % 100), 'Guard', 'guard', '{{}}'
+        FROM generate_series(1, 50000) g""",
+    f"""INSERT INTO monsters (id, campaign_id, name, type, cr, data)
+        SELECT 'qp-mon-' || g, 'qp-camp-' || (g % {CAMPAIGNS} + 1), 'Goblin', 'humanoid', '1/4', '{{}}'
+        FROM generate_series(1, 50000) g""",
+    f"""INSERT INTO debug_logs (id, campaign_id, type, content, created_at)
+        SELECT 'qp-log-' || g, 'qp-camp-' || (g % {CAMPAIGNS} + 1), 'llm_end', 'x', now() - g * interval '1 second'
+        FROM generate_series(1, 100000) g""",
+    f"""INSERT INTO chat_messages (id, campaign_id, sender_id, sender_name, content, created_at)
+        SELECT 'qp-msg-' || g, 'qp-camp-' || (g % {CAMPAIGNS} + 1), 'dm', 'Dungeon Master', 'hello', now() - g * interval '1 second'
+        FROM generate_series(1, 100000) g""",
+]
+
+ANALYZED = ["profiles", "campaigns", "campaign_participants", "characters", "locations",
+            "npcs", "monsters", "debug_logs", "chat_messages"]
+
+# (table that must not be seq-scanned, query as the app issues it)
+HOT_QUERIES = [
+    ("campaign_participants",
+     "SELECT status FROM campaign_participants WHERE campaign_id = 'qp-camp-7' AND user_id = 'qp-user-8'"),
+    ("characters",
+     "SELECT * FROM characters WHERE user_id = 'qp-user-8' AND campaign_id = 'qp-camp-7'"),
+    ("locations",
+     "SELECT data FROM locations WHERE campaign_id = 'qp-camp-7' AND source_id = 'loc_3'"),
+    ("npcs",
+     "SELECT name, role FROM npcs WHERE campaign_id = 'qp-camp-7' AND source_id = 'npc_3'"),
+    ("monsters",
+     "SELECT * FROM monsters WHERE campaign_id = 'qp-camp-7'"),
+    ("debug_logs",
+     "SELECT * FROM debug_logs WHERE campaign_id = 'qp-camp-7' ORDER BY created_at ASC"),
+    ("chat_messages",
+     "SELECT * FROM chat_messages WHERE campaign_id = 'qp-camp-7' ORDER BY created_at DESC, id DESC LIMIT 100"),
+]
+
+
+def _seq_scans(plan, found=None):
+    found = [] if found is None else found
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        _seq_scans(child, found)
+    return found
+
+
+@pytest.fixture(autouse=True)
+async def _dispose_engine_after_test():
+    """See test_memory_integration: dispose the global pool inside the test's loop."""
+    yield
+    from db.session import engine
+    await engine.dispose()
+
+
+async def test_hot_queries_use_indexes():
+    from db.session import engine
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            for sql in SEED_SQL:
+                await conn.execute(text(sql))
+            for index in HOT_PATH_INDEXES:
+                await conn.run_sync(index.create, checkfirst=True)
+            for table in ANALYZED:
+                await conn.execute(text(f"ANALYZE {table}"))
+
+            failures = {}
+            for table, sql in HOT_QUERIES:
+                plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()[0]["Plan"]
+                if table in _seq_scans(plan):
+                    failures[table] = sql
+            assert not failures, f"sequential scans on hot paths: {failures}"
+        finally:
+            await trans.rollback()
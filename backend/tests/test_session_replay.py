@@ -0,0 +1,54 @@
+"""Tests for session recording and the replay LLM."""
+import random
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage, HumanMessage, message_to_dict
+
+from app.agents.replay_llm import STUB_REPLY, ReplayChatModel
+from app.services.lock_service import LockService
+from app.utils.session_recorder import SessionRecorder, read_recording, recorded
+
+
+async def test_recorded_event_seed_reproduces_rolls(tmp_path):
+    path = tmp_path / "session.jsonl"
+    rolls = []
+
+    async def roll_dice(sid, data):
+        rolls.append([random.randint(1, 20) for _ in range(5)])
+
+    with patch("app.utils.session_recorder.recorder", SessionRecorder(str(path))):
+        await recorded(roll_dice)("sid-1", {"campaign_id": "camp"})
+
+    [record] = read_recording(str(path))
+    assert record["type"] == "event" and record["event"] == "roll_dice"
+    assert record["sid"] == "sid-1" and record["args"] == [{"campaign_id": "camp"}]
+    random.seed(record["seed"])
+    await roll_dice("replay-0", {"campaign_id": "camp"})
+    assert rolls[0] == rolls[1]
+
+
+def test_replay_model_serves_recorded_responses_then_stub():
+    tool_turn = AIMessage(content="", tool_calls=[{"name": "attack", "args": {"target": "goblin"}, "id": "c1"}])
+    records = [
+        {"type": "event", "event": "chat_message"},
+        {"type": "llm", "message": message_to_dict(tool_turn)},
+        {"type": "llm", "message": message_to_dict(AIMessage(content="The goblin falls."))},
+    ]
+    model = ReplayChatModel.from_records(records).bind_tools([])
+    prompt = [HumanMessage(content="I attack")]
+
+    assert model.invoke(prompt).tool_calls[0]["args"] == {"target": "goblin"}
+    assert model.invoke(prompt).content == "The goblin falls."
+    assert model.invoke(prompt).content == STUB_REPLY
+    assert (model.served, model.stubbed) == (2, 1)
+
+
+async def test_lock_wait_observers_hear_each_acquisition():
+    session = MagicMock(execute=AsyncMock(), close=AsyncMock())
+    waits = []
+    with patch("app.services.lock_service.AsyncSessionLocal", return_value=session), \
+         patch.object(LockService, "wait_observers", [lambda cid, s: waits.append((cid, s))]):
+        async with LockService.acquire("camp"):
+            async with LockService.acquire("camp"):  # re-entrant: no second wait
+                pass
+    assert len(waits) == 1 and waits[0][0] == "camp" and waits[0][1] >= 0
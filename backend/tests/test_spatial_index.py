@@ -0,0 +1,100 @@
+"""Tests for the GameState occupancy spatial hash and the checks built on it."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.combat_service import CombatService
+from app.utils.entity_index import ENEMY, NPC
+from app.utils.spatial_index import SpatialIndex
+
+
+def _state(game_state_factory, player_factory, enemy_factory, npc_factory, coords):
+    gs = game_state_factory(
+        players=[player_factory(name="Aldric", position=coords(0, 0)),
+                 player_factory(name="Bryn", position=coords(1, 0))],
+        enemies=[enemy_factory(name="Goblin", position=coords(3, 0)),
+                 enemy_factory(name="Far Goblin", position=coords(40, 40)),
+                 enemy_factory(name="Dead Goblin", hp=0, position=coords(0, 2))],
+    )
+    gs.npcs.append(npc_factory(name="Mira", position=coords(-2, -2)))
+    return gs
+
+
+def test_queries(game_state_factory, player_factory, enemy_factory, npc_factory, coords):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory, coords)
+    aldric, bryn = gs.party
+    goblin, far, dead = gs.enemies
+    mira = gs.npcs[0]
+    index = gs.spatial_index()
+
+    assert index.occupants((3, 0)) == [goblin]
+    assert index.occupants((5, 5)) == []
+    assert index.faction_of(mira) == NPC
+    # Roster order (party, enemies, npcs), across bucket boundaries at negative coords
+    assert index.within((0, 0), 3) == [aldric, bryn, goblin, dead, mira]
+    assert index.within((0, 0), 10, factions=(ENEMY,)) == [goblin, dead]
+    assert index.within((38, 38), 2) == [far]
+    # Dead enemies don't block; NPCs always do
+    assert index.obstacle_cells() == {(3, 0), (40, 40), (-2, -2)}
+    assert index.obstacle_cells(exclude=goblin) == {(40, 40), (-2, -2)}
+    assert index.party_cells(exclude=aldric) == {(1, 0)}
+
+
+def test_moves_update_the_cached_index_in_place(game_state_factory, player_factory, enemy_factory, npc_factory, coords):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory, coords)
+    index = gs.spatial_index()
+    assert gs.spatial_index() is index
+
+    aldric, bryn = gs.party
+    goblin = gs.enemies[0]
+    gs.move_entity(goblin, 2, 2)
+    gs.move_entity(bryn, 2, 2)
+    gs.move_entity(aldric, 30, 30)   # into another bucket
+    gs.move_entity(aldric, 2, 2)
+    assert gs.spatial_index() is index
+    assert goblin.position.x == 2 and goblin.position.y == 2
+    # Roster order within a cell, whatever order they arrived in
+    assert index.occupants((2, 2)) == [aldric, bryn, goblin]
+    assert index.occupants((3, 0)) == [] and index.occupants((30, 30)) == []
+
+    fresh = SpatialIndex.from_state(gs)
+    assert index.by_cell == fresh.by_cell
+    assert index.within((0, 0), 10) == fresh.within((0, 0), 10)
+
+
+def test_roster_change_drops_the_index(game_state_factory, player_factory, enemy_factory, npc_factory, coords):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory, coords)
+    index = gs.spatial_index()
+    gone = gs.enemies.pop(0)
+    gs.roster_changed()
+    assert gs.spatial_index() is not index
+    assert gs.spatial_index().occupants((3, 0)) == []
+
+    # Moving an entity the cached index doesn't know forces a rebuild instead
+    stray = enemy_factory(name="Stray", position=coords(9, 9))
+    gs.enemies.append(stray)
+    gs.move_entity(stray, 8, 8)
+    assert gs.spatial_index().occupants((8, 8)) == [stray]
+    assert gs.spatial_index().faction_of(gone) is None
+
+
+@pytest.mark.asyncio
+async def test_opportunity_attack_uses_nearby_hostiles_without_reload(
+        game_state_factory, player_factory, enemy_factory, npc_factory, coords):
+    gs = _state(game_state_factory, player_factory, enemy_factory, npc_factory, coords)
+    goblin, far = gs.enemies[0], gs.enemies[1]
+
+    with patch("app.services.combat_service.StateService") as mock_ss, \
+         patch("app.services.chat_service.ChatService.save_message", new=AsyncMock()), \
+         patch("app.services.combat_service.PathfindingService.check_line_of_sight", return_value=True) as los:
+        mock_ss.save_game_state = AsyncMock()
+        mock_ss.get_game_state = AsyncMock()
+        interrupted, msg, new_gs = await CombatService._handle_opportunity_attack(
+            "camp", "Aldric", "open the chest", MagicMock(), gs)
+
+    assert interrupted and "Goblin" in msg
+    assert new_gs is gs
+    mock_ss.get_game_state.assert_not_called()
+    # Only the in-range goblin got a line-of-sight test; the friendly NPC is ignored
+    assert los.call_count == 1
+    assert gs.phase == "combat"
+    assert goblin.id in gs.turn_order and far.id in gs.turn_order
@@ -0,0 +1,116 @@
+"""Tests for manifest-gated startup syncs and the background seeding readiness report."""
+import json
+from unittest.mock import AsyncMock, patch
+
+from app.services import campaign_loader, data_loader, startup_sync, sync_manifest
+
+
+# --- Readiness ---
+
+async def test_phases_report_progress_and_failures():
+    async def ok():
+        return None
+
+    async def soft_fail():
+        return False, "no data dir"
+
+    async def boom():
+        raise RuntimeError("db down")
+
+    startup_sync.reset(["a"])
+    assert startup_sync.readiness_snapshot()["status"] == "starting"
+
+    await startup_sync.run_phases([("dataset", ok), ("templates", soft_fail), ("dev", boom)])
+    snap = startup_sync.readiness_snapshot()
+    assert snap["status"] == "degraded" and not startup_sync.is_ready()
+    assert snap["phases"]["dataset"]["status"] == "done"
+    assert snap["phases"]["templates"]["error"] == "no data dir"
+    assert snap["phases"]["dev"]["error"] == "db down"  # a failure doesn't stop later phases
+    assert set(snap["timings"]) >= {"dataset", "templates", "dev"}
+
+    with startup_sync.timed("db_init"):
+        pass
+    assert "db_init" in startup_sync.timing_report()
+
+    await startup_sync.run_phases([("dataset", ok)])
+    assert startup_sync.is_ready() and startup_sync.readiness_snapshot()["status"] == "ready"
+
+
+# --- Dataset rows ---
+
+def test_build_rows_shapes_and_dedup():
+    items = [
+        {"index": "fireball", "name": "Fireball", "level": "3", "school": {"name": "Evocation"}},
+        {"index": "bad-level", "name": "Odd", "level": "cantrip"},
+        {"index": "fireball", "name": "Fireball (errata)", "level": 3},
+        {"name": "No Index"},
+    ]
+    columns, rows = data_loader.build_rows("spells", items)
+    assert columns == ("id", "name", "level", "school", "data")
+    by_id = {r["id"]: r for r in rows}
+    assert set(by_id) == {"fireball", "bad-level"}
+    assert by_id["fireball"]["name"] == "Fireball (errata)"  # later duplicate wins
+    assert by_id["bad-level"]["level"] == 0 and by_id["bad-level"]["school"] == "Unknown"
+    assert json.loads(by_id["fireball"]["data"])["level"] == 3
+
+
+async def test_upsert_falls_back_to_executemany_without_asyncpg():
+    db = AsyncMock()
+    columns, rows = data_loader.build_rows("classes", [{"index": "wizard", "name": "Wizard"}])
+    await data_loader.upsert_rows(db, "classes", columns, rows)
+    sql, params = db.execute.call_args.args
+    assert "ON CONFLICT(id) DO UPDATE SET name=excluded.name, data=excluded.data" in str(sql)
+    assert params == rows
+
+
+# --- Manifest skipping ---
+
+async def test_dataset_sync_skips_unchanged_files(monkeypatch):
+    db = AsyncMock()
+    hashes = {name: f"h-{name}" for _, name, _ in data_loader.DATASET_FILES}
+    monkeypatch.setattr(data_loader.sync_manifest, "file_hash", lambda path: hashes[path.rsplit("/", 1)[-1]])
+    manifest = {source: hashes[name] for source, name, _ in data_loader.DATASET_FILES}
+    manifest["dataset:monsters.json"] = "stale"
+    monkeypatch.setattr(data_loader.sync_manifest, "load_manifest", AsyncMock(return_value=manifest))
+    monkeypatch.setattr(data_loader, "is_dataset_loaded", AsyncMock(return_value=True))
+    imported = AsyncMock(return_value=True)
+    monkeypatch.setattr(data_loader, "_import_file", imported)
+    recorded = AsyncMock()
+    monkeypatch.setattr(data_loader.sync_manifest, "record", recorded)
+
+    with patch.object(data_loader, "AsyncSessionLocal") as maker:
+        maker.return_value.__aenter__.return_value = db
+        ok, _ = await data_loader.sync_basic_dataset()
+        assert ok
+        assert [c.args[1] for c in imported.call_args_list] == ["monsters.json"]
+        recorded.assert_awaited_once_with(db, "dataset:monsters.json", "h-monsters.json")
+
+        # force (the settings "load dataset" button) ignores the manifest
+        imported.reset_mock()
+        await data_loader.load_basic_dataset()
+        assert imported.await_count == len(data_loader.DATASET_FILES)
+
+
+async def test_template_sync_skips_unchanged(tmp_path, monkeypatch):
+    (tmp_path / "a.json").write_text(json.dumps({"id": "a", "title": "A"}))
+    (tmp_path / "b.json").write_text(json.dumps({"id": "b", "title": "B"}))
+    monkeypatch.setattr(campaign_loader, "GAMES_DIR", str(tmp_path))
+    a_source = f"template:{tmp_path / 'a.json'}"
+    monkeypatch.setattr(campaign_loader.sync_manifest, "load_manifest",
+                        AsyncMock(return_value={a_source: sync_manifest.file_hash(str(tmp_path / "a.json"))}))
+    synced = AsyncMock()
+    monkeypatch.setattr(campaign_loader, "sync_template_metadata", synced)
+    monkeypatch.setattr(campaign_loader.sync_manifest, "record", AsyncMock())
+
+    with patch.object(campaign_loader, "AsyncSessionLocal") as maker:
+        maker.return_value.__aenter__.return_value = AsyncMock()
+        await campaign_loader.parse_and_load()
+    assert [c.args[1]["id"] for c in synced.call_args_list] == ["b"]
+
+
+async def test_manifest_read_fails_open():
+    from sqlalchemy.exc import OperationalError
+    db = AsyncMock()
+    db.execute.side_effect = OperationalError("SELECT", {}, Exception("no table"))
+    assert await sync_manifest.load_manifest(db, "dataset:") == {}
+    db.rollback.assert_awaited()
@@ -0,0 +1,88 @@
+"""Tests for the verified-token cache behind verify_token / socket connect."""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth_utils import verify_token
+from app.socket.handlers.connection import handle_connect
+from app.utils import token_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_tokens():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+@pytest.fixture
+def fake_verify(monkeypatch):
+    calls = []
+
+    def verify(token):
+        calls.append((token, threading.current_thread().name))
+        if token.startswith("bad"):
+            raise ValueError("invalid token")
+        time.sleep(0.01)
+        exp = time.time() + (1 if token.startswith("short") else 3600)
+        return {"uid": f"user-{token}", "exp": exp}
+
+    monkeypatch.setattr(token_cache.auth, "verify_id_token", verify)
+    return calls
+
+
+async def test_verifies_once_off_loop(fake_verify):
+    first = await token_cache.verify_id_token("abc")
+    second = await token_cache.verify_id_token("abc")
+    assert first is second and first["uid"] == "user-abc"
+    assert len(fake_verify) == 1
+    assert fake_verify[0][1].startswith("token-verify")
+
+
+async def test_concurrent_first_use_is_coalesced(fake_verify):
+    results = await asyncio.gather(*(token_cache.verify_id_token("abc") for _ in range(5)))
+    assert all(r is results[0] for r in results)
+    assert len(fake_verify) == 1
+
+
+async def test_failures_and_near_expiry_not_cached(fake_verify):
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await token_cache.verify_id_token("bad-token")
+    # Expires inside the safety margin: verified, but never served from cache
+    await token_cache.verify_id_token("short-lived")
+    await token_cache.verify_id_token("short-lived")
+    assert [t for t, _ in fake_verify] == ["bad-token", "bad-token", "short-lived", "short-lived"]
+
+
+async def test_expired_entry_is_reverified(fake_verify, monkeypatch):
+    await token_cache.verify_id_token("abc")
+    real_time = time.time
+    monkeypatch.setattr(token_cache.time, "time", lambda: real_time() + 7200)
+    assert token_cache.get_cached("abc") is None
+    await token_cache.verify_id_token("abc")
+    assert len(fake_verify) == 2
+
+
+async def test_cache_is_bounded(fake_verify, monkeypatch):
+    monkeypatch.setattr(token_cache, "MAX_CACHED_TOKENS", 2)
+    for token in ("a", "b", "c"):
+        await token_cache.verify_id_token(token)
+    assert len(token_cache._verified) == 2
+    assert token_cache.get_cached("a") is None
+
+
+async def test_http_and_socket_share_cache(fake_verify):
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials="abc")
+    claims = await verify_token(creds)
+    user_id, decoded = await handle_connect("sid-1", {}, {"token": "abc"}, {})
+    assert user_id == "user-abc" and decoded is claims
+    assert len(fake_verify) == 1
+
+    with pytest.raises(HTTPException) as exc:
+        await verify_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials="bad"))
+    assert exc.value.status_code == 401
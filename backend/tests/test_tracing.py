@@ -0,0 +1,90 @@
+"""Tests for per-command tracing spans (app/utils/tracing.py)."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+
+from app.agents.fake_llm import FakeChatModel  # noqa: E402
+from app.agents.llm_tracing import TracingCallbackHandler  # noqa: E402
+from app.commands.base import Command, CommandContext  # noqa: E402
+from app.commands.registry import CommandRegistry  # noqa: E402
+from app.socket.decorators import socket_event_handler  # noqa: E402
+from app.utils import tracing  # noqa: E402
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    """Route the module tracer to an in-memory exporter; returns finished spans by name."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+    return lambda: {s.name: s for s in exporter.get_finished_spans()}
+
+
+class _Sio:
+    async def emit(self, *args, **kwargs):
+        pass
+
+
+class _PingCommand(Command):
+    name = "tracetest"
+
+    async def execute(self, ctx, args):
+        # Narration and AI turns run as tasks; they must stay in the command's trace.
+        async def background():
+            with tracing.span("narrator.narrate", mode="combat_narration"):
+                await asyncio.sleep(0)
+        await asyncio.create_task(background())
+        if args == ["boom"]:
+            raise RuntimeError("boom")
+
+
+@pytest.fixture
+def ping_command():
+    CommandRegistry.register(_PingCommand())
+    yield
+    CommandRegistry._commands.pop("tracetest", None)
+
+
+async def test_command_spans_share_one_trace_across_tasks(spans, ping_command):
+    @socket_event_handler
+    async def handle_chat_message(sid, data):
+        tracing.annotate(campaign_id="camp", message_id="msg-1")
+        ctx = CommandContext("camp", "u1", "Hero", _Sio(), db=None)
+        await CommandRegistry.dispatch(data["content"], ctx)
+
+    await handle_chat_message("sid", {"content": "@tracetest"})
+
+    by_name = spans()
+    root, command, narration = by_name["socket.handle_chat_message"], by_name["command.tracetest"], by_name["narrator.narrate"]
+    assert root.attributes["message_id"] == "msg-1"
+    assert command.parent.span_id == root.context.span_id
+    assert narration.parent.span_id == command.context.span_id
+    assert {s.context.trace_id for s in by_name.values()} == {root.context.trace_id}
+
+
+async def test_failed_command_records_exception(spans, ping_command):
+    ctx = CommandContext("camp", "u1", "Hero", _Sio(), db=None)
+    assert await CommandRegistry.dispatch("@tracetest boom", ctx) is True
+    [event] = spans()["command.tracetest"].events
+    assert event.name == "exception" and "boom" in event.attributes["exception.message"]
+
+
+async def test_llm_calls_are_child_spans_with_usage(spans):
+    llm = FakeChatModel(tokens=5, callbacks=[TracingCallbackHandler()])
+    with tracing.span("llm.agent", mode="chat", provider="fake"):
+        await llm.ainvoke([HumanMessage(content="I listen at the door")])
+    await llm.ainvoke([HumanMessage(content="outside any trace")])
+
+    by_name = spans()
+    assert set(by_name) == {"llm.agent", "llm.call"}
+    call = by_name["llm.call"]
+    assert call.parent.span_id == by_name["llm.agent"].context.span_id
+    assert call.attributes["output_tokens"] == 5 and call.attributes["input_tokens"] == 5